@@ -1,9 +1,10 @@
 # coding:utf-8
 
 import time
+from collections import OrderedDict
 
 from ryu.base import app_manager
-from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3, ofproto_v1_3_parser
 from ryu.controller import ofp_event
 from ryu.controller.handler import set_ev_cls
 from ryu.controller.handler import CONFIG_DISPATCHER, MAIN_DISPATCHER, DEAD_DISPATCHER
@@ -13,10 +14,147 @@ from ryu.base.app_manager import lookup_service_brick
 from ryu.lib import hub
 
 
+class HostEntry(object):
+    """
+    主机表项，记录主机的接入位置与 IP。使用 __slots__ 减少大量主机时的内存占用。
+    """
+    __slots__ = ('mac', 'dpid', 'port_no', 'ip', 'last_seen')
+
+    def __init__(self, mac, dpid, port_no, last_seen):
+        self.mac = mac
+        self.dpid = dpid
+        self.port_no = port_no
+        self.ip = None
+        self.last_seen = last_seen
+
+
+class HostTable(object):
+    """
+    主机表，{host_mac: HostEntry, }，并维护 {host_ip: host_mac, } 的索引。
+    表项按最近一次出现的时间排序：超过 idle_timeout 未出现的主机会被老化，
+    表项数超过 capacity 时淘汰最久未出现的主机。
+    主机的接入位置以 ryu.topology.switches.Switches.hosts 为准，本表只是其上带有老化的视图，不修改 Switches.hosts。
+    """
+
+    def __init__(self, capacity, idle_timeout):
+        self.capacity = capacity
+        self.idle_timeout = idle_timeout
+
+        # 最久未出现的主机在前
+        self._entries = OrderedDict()
+        self._ip_to_mac = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, mac):
+        return mac in self._entries
+
+    def get(self, mac):
+        return self._entries.get(mac, None)
+
+    def get_location(self, mac):
+        """
+        :param mac: 主机 MAC。
+        :return: 主机接入的 (datapath_id, datapath_in_port)，未知主机返回 None。
+        """
+        entry = self._entries.get(mac, None)
+        if entry is None:
+            return None
+        return entry.dpid, entry.port_no
+
+    def get_mac_by_ip(self, ip):
+        return self._ip_to_mac.get(ip, None)
+
+    def learn(self, mac, dpid, port_no, now=None):
+        """
+        记录主机 mac 出现在交换机 dpid 的 port_no 端口上，并刷新其老化时间。
+        :return: 若主机发生迁移，返回迁移前的 (datapath_id, datapath_in_port)；否则返回 None。
+        """
+        if now is None:
+            now = time.time()
+
+        moved_from = None
+        entry = self._entries.pop(mac, None)
+        if entry is None:
+            entry = HostEntry(mac, dpid, port_no, now)
+        elif entry.dpid != dpid or entry.port_no != port_no:
+            moved_from = (entry.dpid, entry.port_no)
+            entry.dpid = dpid
+            entry.port_no = port_no
+        entry.last_seen = now
+        self._entries[mac] = entry
+
+        while len(self._entries) > self.capacity:
+            self.remove(next(iter(self._entries)))
+
+        return moved_from
+
+    def update_ip(self, mac, ip):
+        """
+        记录主机 mac 的 IP。若该 IP 之前属于其他主机，则改为属于 mac。
+        """
+        entry = self._entries.get(mac, None)
+        if entry is None:
+            return
+
+        if entry.ip is not None and entry.ip != ip \
+                and self._ip_to_mac.get(entry.ip, None) == mac:
+            del self._ip_to_mac[entry.ip]
+
+        old_mac = self._ip_to_mac.get(ip, None)
+        if old_mac is not None and old_mac != mac:
+            self._entries[old_mac].ip = None
+
+        entry.ip = ip
+        self._ip_to_mac[ip] = mac
+
+    def expire(self, now=None):
+        """
+        删除超过 idle_timeout 未出现的主机。
+        :return: 被删除主机的 MAC 列表。
+        """
+        if now is None:
+            now = time.time()
+
+        expired = []
+        for mac, entry in self._entries.items():
+            if entry.last_seen + self.idle_timeout > now:
+                break
+            expired.append(mac)
+
+        for mac in expired:
+            self.remove(mac)
+
+        return expired
+
+    def remove(self, mac):
+        """
+        删除主机 mac 的表项。
+        :return: 被删除的 HostEntry，未知主机返回 None。
+        """
+        entry = self._entries.pop(mac, None)
+        if entry is None:
+            return None
+
+        if entry.ip is not None and self._ip_to_mac.get(entry.ip, None) == mac:
+            del self._ip_to_mac[entry.ip]
+
+        return entry
+
+
 class MinDelayPathController(app_manager.RyuApp):
     OFP_VERSIONS = [ofproto_v1_3.OFP_VERSION]
 
     DELAY_DETECT_PERIOD = 5     # 延迟探测时间间隔，单位秒
+    PATH_HARD_TIMEOUT = 10      # 路径流表项的 hard timeout，单位秒
+    HOST_TABLE_CAPACITY = 65536     # 主机表最大表项数
+    HOST_IDLE_TIMEOUT = 300     # 主机老化时间，单位秒
+    LINK_DISCOVERY_SETTLE_TIME = 5      # 交换机或端口上线后等待链路发现的时间，单位秒
+
+    # 路径流表项的匹配域模板，预先编译字段布局，安装路径时只需填入 IP
+    PATH_IP_MATCH = ofproto_v1_3_parser.OFPMatchTemplate('eth_type', 'ipv4_src', 'ipv4_dst')
+    PATH_ARP_MATCH = ofproto_v1_3_parser.OFPMatchTemplate('eth_type', 'arp_spa', 'arp_tpa')
 
     def __init__(self, *args, **kwargs):
         super(MinDelayPathController, self).__init__(*args, **kwargs)
@@ -24,8 +162,7 @@ class MinDelayPathController(app_manager.RyuApp):
         # datapath dict，{datapath_id: datapath, }
         self.datapath_dict = {}
 
-        # 相邻交换机节点，{s1: {s2: s1's-port-to-s1}, }
-        self.switch_link_dict = {}
+        # 交换机之间的链路由 Switches 的拓扑图（self.topology）维护，链路属性 delay 为链路延迟
 
         # lldp 延迟，{s1: {s2: controller-s1-s2-controller's delay }}
         self.lldp_delay_dict = {}
@@ -33,19 +170,42 @@ class MinDelayPathController(app_manager.RyuApp):
         # echo 报文延迟，{s1: controller-s1's delay}
         self.echo_delay_dict = {}
 
-        # 相邻交换机之间的链路往返延迟，{ s1: {s2: s1-to-s2's delay}, }
-        self.link_delay_dict = {}
+        self.switches_module = lookup_service_brick("switches")
 
-        # 主机与交换机的连接信息，{host_mac: (datapath_id, datapath_in_port), }
-        self.hosts_dict = {}
+        # 主机与交换机的连接信息以及主机 IP 与 MAC 的映射关系，主机位置来自 Switches.hosts
+        self.host_table = HostTable(MinDelayPathController.HOST_TABLE_CAPACITY,
+                                    MinDelayPathController.HOST_IDLE_TIMEOUT)
 
-        # 主机 IP 与 MAC 的映射关系，{host-ip: host-mac, }
-        self.host_arp_dict = {}
+        # 最近一次有交换机或端口上线的时间，此后 LINK_DISCOVERY_SETTLE_TIME 内链路发现尚未完成
+        self.port_up_timestamp = time.time()
 
-        self.switches_module = lookup_service_brick("switches")
+        # 已安装路径的主机对，{(src_mac, dst_mac): (src_ip, dst_ip, install_timestamp), }
+        self.host_pairs_dict = {}
 
         self.detect_thread = hub.spawn(self.delay_detect_loop)
 
+    @property
+    def topology(self):
+        """
+        Switches 维护的拓扑图（ryu.topology.graph.TopologyGraph），与 Switches 共享，不复制。
+        未加载 Switches 时为 None。
+        """
+        if self.switches_module is None:
+            self.switches_module = lookup_service_brick("switches")
+        if self.switches_module is None:
+            return None
+        return self.switches_module.graph
+
+    def get_link(self, s1, s2):
+        """
+        获取从交换机 s1 到相邻交换机 s2 的链路（ryu.topology.switches.Link），不相邻时返回 None。
+        """
+        topology = self.topology
+        port_no = topology.port_map(s1).get(s2, None)
+        if port_no is None:
+            return None
+        return topology.get_link(s1, port_no)
+
     def get_paths(self, src, dst):
         """
         使用 DFS 算法，获取从 src 到 dst 的所有路径。
@@ -62,7 +222,7 @@ class MinDelayPathController(app_manager.RyuApp):
         stack = [(src, [src])]
         while stack:
             (node, path) = stack.pop()
-            for next in set(self.switch_link_dict[node].keys()) - set(path):
+            for next in set(self.topology.neighbors(node)) - set(path):
                 if next is dst:
                     paths_list.append(path + [next])
                 else:
@@ -77,17 +237,14 @@ class MinDelayPathController(app_manager.RyuApp):
         :param s2: 交换机2。
         :return: 交换机 s1 到 s2 的链路延迟。
         """
-        delay1 = None
-        if s1 in self.link_delay_dict.keys():
-            delay1 = self.link_delay_dict[s1].get(s2, None)
-        delay1 = delay1 if delay1 is not None else float("inf")
-
-        delay2 = None
-        if s2 in self.link_delay_dict.keys():
-            delay2 = self.link_delay_dict[s2].get(s1, None)
-        delay2 = delay2 if delay2 is not None else float("inf")
+        delays = []
+        for link in (self.get_link(s1, s2), self.get_link(s2, s1)):
+            delay = None
+            if link is not None:
+                delay = self.topology.link_attrs(link).get("delay", None)
+            delays.append(delay if delay is not None else float("inf"))
 
-        return (delay1 + delay2) / 2
+        return (delays[0] + delays[1]) / 2
 
     def get_path_delay(self, path):
         """
@@ -96,7 +253,7 @@ class MinDelayPathController(app_manager.RyuApp):
         :return: 路径 path 的延迟。
         """
         delay = 0
-        for i in xrange(len(path) - 1):
+        for i in range(len(path) - 1):
             delay += self.get_link_delay(path[i], path[i + 1])
 
         return delay
@@ -116,9 +273,9 @@ class MinDelayPathController(app_manager.RyuApp):
             paths_with_port = {}
             in_port = first_port
             for s1, s2 in zip(path[:-1], path[1:]):
-                out_port = self.switch_link_dict[s1][s2]
-                paths_with_port[s1] = (in_port, out_port)
-                in_port = self.switch_link_dict[s2][s1]
+                link = self.get_link(s1, s2)
+                paths_with_port[s1] = (in_port, link.src.port_no)
+                in_port = link.dst.port_no
             paths_with_port[path[-1]] = (in_port, last_port)
             paths_with_port_list.append(paths_with_port)
 
@@ -141,32 +298,128 @@ class MinDelayPathController(app_manager.RyuApp):
         paths_with_ports = self.add_ports_to_paths(paths_list, first_port, last_port)
         optimal_path = paths_with_ports[0]
 
-        for switch_id, ports in optimal_path.iteritems():
+        # 路径上所有交换机的匹配域相同，只需构造一次
+        # 匹配 IP 报文
+        match_ip = MinDelayPathController.PATH_IP_MATCH(
+            eth_type=0x0800,
+            ipv4_src=ip_src,
+            ipv4_dst=ip_dst
+        )
+        # 匹配 ARP 报文
+        match_arp = MinDelayPathController.PATH_ARP_MATCH(
+            eth_type=0x0806,
+            arp_spa=ip_src,
+            arp_tpa=ip_dst,
+        )
+
+        for switch_id, ports in optimal_path.items():
             datapath = self.datapath_dict[switch_id]
             ofp = datapath.ofproto
             ofp_parser = datapath.ofproto_parser
             in_port, out_port = ports
 
-            # 匹配 IP 报文
-            match_ip = ofp_parser.OFPMatch(
-                eth_type=0x0800,
-                ipv4_src=ip_src,
-                ipv4_dst=ip_dst
-            )
-            # 匹配 ARP 报文
-            match_arp = ofp_parser.OFPMatch(
-                eth_type=0x0806,
-                arp_spa=ip_src,
-                arp_tpa=ip_dst,
-            )
             actions = [
                 ofp_parser.OFPActionOutput(out_port)
             ]
-            self.add_flow(datapath, 32768, match_ip, actions, hard_timeout=10)
-            self.add_flow(datapath, 1, match_arp, actions, hard_timeout=10)
+            self.add_flow(datapath, 32768, match_ip, actions,
+                          hard_timeout=MinDelayPathController.PATH_HARD_TIMEOUT)
+            self.add_flow(datapath, 1, match_arp, actions,
+                          hard_timeout=MinDelayPathController.PATH_HARD_TIMEOUT)
 
         return optimal_path[src][1]
 
+    def install_host_paths(self, src_mac, dst_mac, src_ip, dst_ip):
+        """
+        为主机 src_mac 与主机 dst_mac 之间安装双向的最低延迟路径，并记录该主机对，以便主机迁移时重新安装。
+        :return: 延迟最低的路径上第一个交换机的输出端口。若主机位置未知，返回 None。
+        """
+        src_location = self.host_table.get_location(src_mac)
+        dst_location = self.host_table.get_location(dst_mac)
+        if src_location is None or dst_location is None:
+            return None
+
+        src_switch, src_switch_port = src_location
+        dst_switch, dst_switch_port = dst_location
+
+        out_port = self.install_paths(src_switch, src_switch_port, dst_switch, dst_switch_port, src_ip, dst_ip)
+        self.install_paths(dst_switch, dst_switch_port, src_switch, src_switch_port, dst_ip, src_ip)
+
+        self.host_pairs_dict[(src_mac, dst_mac)] = (src_ip, dst_ip, time.time())
+
+        return out_port
+
+    def host_moved(self, mac):
+        """
+        主机迁移处理函数：删除各交换机上发往该主机的流表项，并为仍然有效的主机对重新安装路径。
+        """
+        entry = self.host_table.get(mac)
+        if entry is None:
+            return
+
+        self.logger.info("[host_moved] %s ——> datapath(ID:%d, port:%d)", mac, entry.dpid, entry.port_no)
+
+        if entry.ip is not None:
+            for datapath in self.datapath_dict.values():
+                ofp_parser = datapath.ofproto_parser
+                self.delete_flow(datapath, ofp_parser.OFPMatch(eth_type=0x0800, ipv4_dst=entry.ip))
+                self.delete_flow(datapath, ofp_parser.OFPMatch(eth_type=0x0806, arp_tpa=entry.ip))
+
+        now = time.time()
+        for (src_mac, dst_mac), (src_ip, dst_ip, timestamp) in list(self.host_pairs_dict.items()):
+            if mac != src_mac and mac != dst_mac:
+                continue
+            if timestamp + MinDelayPathController.PATH_HARD_TIMEOUT <= now:
+                # 流表项已经超时，无需重新安装
+                del self.host_pairs_dict[(src_mac, dst_mac)]
+                continue
+            if self.install_host_paths(src_mac, dst_mac, src_ip, dst_ip) is None:
+                del self.host_pairs_dict[(src_mac, dst_mac)]
+
+    def expire_hosts(self):
+        """
+        老化主机表，并清除已经超时或者涉及已老化主机的主机对。
+        """
+        now = time.time()
+        expired = self.host_table.expire(now)
+        if expired:
+            self.logger.info("[expire_hosts] %s", expired)
+
+        for pair, (_, _, timestamp) in list(self.host_pairs_dict.items()):
+            if timestamp + MinDelayPathController.PATH_HARD_TIMEOUT <= now \
+                    or pair[0] not in self.host_table or pair[1] not in self.host_table:
+                del self.host_pairs_dict[pair]
+
+    def is_edge_port(self, dpid, port_no, now=None):
+        """
+        判断交换机 dpid 的 port_no 端口是否连接主机，即不是交换机之间的链路端口。
+        链路发现完成之前，尚未发现的链路端口与连接主机的端口无法区分，因此不把任何端口当作连接主机的端口。
+        """
+        if now is None:
+            now = time.time()
+
+        if now < self.port_up_timestamp + MinDelayPathController.LINK_DISCOVERY_SETTLE_TIME:
+            return False
+
+        topology = self.topology
+        return topology is None or not topology.is_link_port(dpid, port_no)
+
+    def sync_host(self, mac, now=None):
+        """
+        按照 Switches 记录的主机位置更新主机表，并刷新主机的老化时间。
+        只记录连接主机的端口上的主机，位置变化表明主机发生了迁移。
+        """
+        if self.switches_module is None:
+            self.switches_module = lookup_service_brick("switches")
+        if self.switches_module is None:
+            return
+
+        host = self.switches_module.hosts.get(mac, None)
+        if host is None or not self.is_edge_port(host.port.dpid, host.port.port_no, now):
+            return
+
+        if self.host_table.learn(mac, host.port.dpid, host.port.port_no, now) is not None:
+            self.host_moved(mac)
+
     def add_flow(self, datapath, priority, match, actions, buffer_id=None, idle_timeout=0, hard_timeout=0):
         """
         发送流表项到交换机 datapath 中。
@@ -199,6 +452,18 @@ class MinDelayPathController(app_manager.RyuApp):
 
         datapath.send_msg(mod)
 
+    def delete_flow(self, datapath, match):
+        """
+        删除交换机 datapath 中与 match 匹配的流表项。
+        """
+        ofp = datapath.ofproto
+        ofp_parser = datapath.ofproto_parser
+
+        mod = ofp_parser.OFPFlowMod(datapath=datapath, command=ofp.OFPFC_DELETE,
+                                    out_port=ofp.OFPP_ANY, out_group=ofp.OFPG_ANY,
+                                    match=match)
+        datapath.send_msg(mod)
+
     @set_ev_cls(ofp_event.EventOFPStateChange,
                 [MAIN_DISPATCHER, DEAD_DISPATCHER])
     def state_change_handler(self, ev):
@@ -211,6 +476,7 @@ class MinDelayPathController(app_manager.RyuApp):
         if ev.state == MAIN_DISPATCHER:
             if datapath.id and datapath.id not in self.datapath_dict:
                 self.datapath_dict[datapath.id] = datapath
+            self.port_up_timestamp = time.time()
 
             # 添加 table-miss 流表项
             match_table_miss = ofp_parser.OFPMatch()
@@ -222,46 +488,10 @@ class MinDelayPathController(app_manager.RyuApp):
         elif ev.state == DEAD_DISPATCHER:
             if datapath.id in self.datapath_dict:
                 del self.datapath_dict[datapath.id]
-            if datapath.id in self.switch_link_dict:
-                del self.switch_link_dict[datapath.id]
             if datapath.id in self.lldp_delay_dict:
                 del self.lldp_delay_dict[datapath.id]
             if datapath.id in self.echo_delay_dict:
                 del self.echo_delay_dict[datapath.id]
-            if datapath.id in self.link_delay_dict:
-                del self.link_delay_dict[datapath.id]
-
-    @set_ev_cls(event.EventLinkAdd, MAIN_DISPATCHER)
-    def link_add_handler(self, ev):
-        """
-        链路新增处理函数。
-        """
-        s1 = ev.link.src
-        s2 = ev.link.dst
-
-        self.logger.info("[link_add_handler] %s ——> %s", s1.dpid, s2.dpid)
-
-        self.switch_link_dict.setdefault(s1.dpid, {})
-        self.switch_link_dict[s1.dpid][s2.dpid] = s1.port_no
-        self.switch_link_dict.setdefault(s2.dpid, {})
-        self.switch_link_dict[s2.dpid][s1.dpid] = s2.port_no
-
-    @set_ev_cls(event.EventLinkDelete, MAIN_DISPATCHER)
-    def link_delete_handler(self, ev):
-        """
-        链路删除处理函数。
-        """
-        s1 = ev.link.src
-        s2 = ev.link.dst
-
-        self.logger.info("[link_delete_handler] %s ——> %s", s1.dpid, s2.dpid)
-
-        self.switch_link_dict.setdefault(s1.dpid, {})
-        if s2.dpid in self.switch_link_dict[s1.dpid]:
-            del self.switch_link_dict[s1.dpid][s2.dpid]
-        self.switch_link_dict.setdefault(s2.dpid, {})
-        if s1.dpid in self.switch_link_dict[s2.dpid]:
-            del self.switch_link_dict[s2.dpid][s1.dpid]
 
     @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
     def packet_in_handler(self, ev):
@@ -275,7 +505,8 @@ class MinDelayPathController(app_manager.RyuApp):
         ofp_parser = datapath.ofproto_parser
         in_port = msg.match["in_port"]
 
-        pkt = packet.Packet(msg.data)
+        # 报头按需解析，只解析到 get_protocol 需要的层
+        pkt = packet.Packet(msg.data, lazy=True)
         eth_pkt = pkt.get_protocol(ethernet.ethernet)
         arp_pkt = pkt.get_protocol(arp.arp)
 
@@ -298,8 +529,8 @@ class MinDelayPathController(app_manager.RyuApp):
                          src_mac,
                          dst_mac)
 
-        if src_mac not in self.hosts_dict:
-            self.hosts_dict[src_mac] = (datapath_id, in_port)
+        # 主机位置以 Switches 为准，这里只刷新主机的老化时间
+        self.sync_host(src_mac)
 
         # 输出端口的默认值是泛洪
         out_port = ofp.OFPP_FLOOD
@@ -309,22 +540,13 @@ class MinDelayPathController(app_manager.RyuApp):
             dst_ip = arp_pkt.dst_ip
 
             if arp_pkt.opcode == arp.ARP_REPLY:
-                self.host_arp_dict[src_ip] = src_mac
-                src_switch, src_switch_port = self.hosts_dict[src_mac]
-                dst_switch, dst_switch_port = self.hosts_dict[dst_mac]
-
-                out_port = self.install_paths(src_switch, src_switch_port, dst_switch, dst_switch_port, src_ip, dst_ip)
-                self.install_paths(dst_switch, dst_switch_port, src_switch, src_switch_port, dst_ip, src_ip)
+                self.host_table.update_ip(src_mac, src_ip)
+                out_port = self.install_host_paths(src_mac, dst_mac, src_ip, dst_ip) or out_port
             elif arp_pkt.opcode == arp.ARP_REQUEST:
-                if dst_ip in self.host_arp_dict:
-                    self.host_arp_dict[src_ip] = src_mac
-                    dst_mac = self.host_arp_dict[dst_ip]
-                    src_switch, src_switch_port = self.hosts_dict[src_mac]
-                    dst_switch, dst_switch_port = self.hosts_dict[dst_mac]
-
-                    out_port = self.install_paths(src_switch, src_switch_port, dst_switch, dst_switch_port, src_ip,
-                                                  dst_ip)
-                    self.install_paths(dst_switch, dst_switch_port, src_switch, src_switch_port, dst_ip, src_ip)
+                dst_mac = self.host_table.get_mac_by_ip(dst_ip)
+                if dst_mac is not None:
+                    self.host_table.update_ip(src_mac, src_ip)
+                    out_port = self.install_host_paths(src_mac, dst_mac, src_ip, dst_ip) or out_port
 
         actions = [
             ofp_parser.OFPActionOutput(out_port)
@@ -341,6 +563,39 @@ class MinDelayPathController(app_manager.RyuApp):
         )
         datapath.send_msg(out)
 
+    @set_ev_cls(event.EventPortAdd, MAIN_DISPATCHER)
+    @set_ev_cls(event.EventPortModify, MAIN_DISPATCHER)
+    def port_handler(self, ev):
+        """
+        端口新增与修改处理函数。端口上线后需要重新等待链路发现。
+        """
+        if not ev.port.is_down():
+            self.port_up_timestamp = time.time()
+
+    @set_ev_cls(event.EventHostAdd, MAIN_DISPATCHER)
+    def host_add_handler(self, ev):
+        """
+        主机新增处理函数。
+        """
+        self.sync_host(ev.host.mac)
+
+    @set_ev_cls(event.EventHostMove, MAIN_DISPATCHER)
+    def host_move_handler(self, ev):
+        """
+        主机迁移处理函数。
+        """
+        self.sync_host(ev.dst.mac)
+
+    @set_ev_cls(event.EventHostDelete, MAIN_DISPATCHER)
+    def host_delete_handler(self, ev):
+        """
+        主机删除处理函数。Switches 发现主机所在端口是链路端口时删除该主机。
+        """
+        entry = self.host_table.get(ev.host.mac)
+        if entry is not None and entry.dpid == ev.host.port.dpid \
+                and entry.port_no == ev.host.port.port_no:
+            self.host_table.remove(ev.host.mac)
+
     @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
     def lldp_packet_in_handler(self, ev):
         """
@@ -399,6 +654,7 @@ class MinDelayPathController(app_manager.RyuApp):
         while self.is_active:
             self.send_echo_request()
             self.calculate_delay()
+            self.expire_hosts()
 
             self.show_link_delay()
 
@@ -410,41 +666,48 @@ class MinDelayPathController(app_manager.RyuApp):
         """
         输出链路延迟到 log 中。
         """
-        if not self.link_delay_dict:
+        topology = self.topology
+        if topology is None or not len(topology):
             return
 
         show_msg = "----------switch link delay----------\n"
-        for dp1 in self.link_delay_dict.keys():
-            for dp2 in self.link_delay_dict[dp1].keys():
-                delay = self.link_delay_dict[dp1][dp2]
-                show_msg += "\t%d ————> %d : %.6f ms\n" % (dp1, dp2, delay * 1000)
+        for link in topology.links():
+            delay = topology.link_attrs(link).get("delay", None)
+            if delay is None:
+                continue
+            show_msg += "\t%d ————> %d : %.6f ms\n" % (link.src.dpid, link.dst.dpid, delay * 1000)
         show_msg += "-------------------------------------\n"
         self.logger.info(show_msg)
 
     def calculate_delay(self):
         """
-        计算交换机之间的延迟。
+        计算交换机之间的延迟，并记录为拓扑图中链路的 delay 属性，供按延迟选路使用。
         """
-        for dp1 in self.switch_link_dict.keys():
-            self.link_delay_dict.setdefault(dp1, {})
+        topology = self.topology
+        if topology is None:
+            return
 
-            for dp2 in self.switch_link_dict[dp1].keys():
-                if dp1 == dp2:
-                    delay = 0
-                else:
-                    try:
-                        lldp_delay1 = self.lldp_delay_dict[dp1][dp2]
-                        lldp_delay2 = self.lldp_delay_dict[dp2][dp1]
-                        echo_delay1 = self.echo_delay_dict[dp1]
-                        echo_delay2 = self.echo_delay_dict[dp2]
-
-                        delay = (lldp_delay1 + lldp_delay2 - echo_delay1 - echo_delay2) / 2
-                        delay = max(delay, 0)
-                    except:
-                        # 若无延迟数据，则表明该路径可能不通
-                        delay = float("inf")
-
-                self.link_delay_dict[dp1][dp2] = delay
+        for link in topology.links():
+            dp1 = link.src.dpid
+            dp2 = link.dst.dpid
+            if dp1 == dp2:
+                delay = 0
+            else:
+                try:
+                    lldp_delay1 = self.lldp_delay_dict[dp1][dp2]
+                    lldp_delay2 = self.lldp_delay_dict[dp2][dp1]
+                    echo_delay1 = self.echo_delay_dict[dp1]
+                    echo_delay2 = self.echo_delay_dict[dp2]
+
+                    delay = (lldp_delay1 + lldp_delay2 - echo_delay1 - echo_delay2) / 2
+                    delay = max(delay, 0)
+                except:
+                    # 若无延迟数据，则表明该路径可能不通
+                    delay = float("inf")
+
+            # 只在延迟变化时更新，避免每个测量周期都在拓扑图的变更日志中产生 LINK_MODIFY
+            if topology.link_attrs(link).get("delay", None) != delay:
+                topology.set_link_attrs(link, delay=delay)
 
 
 
@@ -718,6 +718,9 @@ class RestStatsApi(app_manager.RyuApp):
                        controller=StatsController, action='set_role',
                        conditions=dict(method=['POST']))
 
+    # NOTE: deprecated.  The replies to the requests sent by ofctl_utils
+    # are correlated by Datapath.send_request() and never found in
+    # waiters.  Kept for the applications which still fill waiters.
     @set_ev_cls([ofp_event.EventOFPStatsReply,
                  ofp_event.EventOFPDescStatsReply,
                  ofp_event.EventOFPFlowStatsReply,
@@ -759,6 +762,9 @@ class RestStatsApi(app_manager.RyuApp):
         del self.waiters[dp.id][msg.xid]
         lock.set()
 
+    # NOTE: deprecated.  The replies to the requests sent by ofctl_utils
+    # are correlated by Datapath.send_request() and never found in
+    # waiters.  Kept for the applications which still fill waiters.
     @set_ev_cls([ofp_event.EventOFPSwitchFeatures,
                  ofp_event.EventOFPQueueGetConfigReply,
                  ofp_event.EventOFPRoleReply,
@@ -292,6 +292,9 @@ class RestFirewallAPI(app_manager.RyuApp):
                        conditions=dict(method=['DELETE']),
                        requirements=requirements)
 
+    # NOTE: deprecated.  The replies to the requests sent by ofctl_utils
+    # are correlated by Datapath.send_request() and never found in
+    # waiters.  Kept for the applications which still fill waiters.
     def stats_reply_handler(self, ev):
         msg = ev.msg
         dp = msg.datapath
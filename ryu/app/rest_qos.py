@@ -280,6 +280,9 @@ class RestQoSAPI(app_manager.RyuApp):
         wsgi.registory['QoSController'] = self.data
         wsgi.register(QoSController, self.data)
 
+    # NOTE: deprecated.  The replies to the requests sent by ofctl_utils
+    # are correlated by Datapath.send_request() and never found in
+    # waiters.  Kept for the applications which still fill waiters.
     def stats_reply_handler(self, ev):
         msg = ev.msg
         dp = msg.datapath
@@ -21,7 +21,7 @@ from ryu.app.wsgi import route
 from ryu.app.wsgi import WSGIApplication
 from ryu.base import app_manager
 from ryu.lib import dpid as dpid_lib
-from ryu.topology.api import get_switch, get_link, get_host
+from ryu.topology.api import get_switch, get_host, get_topology_graph
 
 # REST API for switch configuration
 #
@@ -106,7 +106,7 @@ class TopologyController(ControllerBase):
         dpid = None
         if 'dpid' in kwargs:
             dpid = dpid_lib.str_to_dpid(kwargs['dpid'])
-        links = get_link(self.topology_api_app, dpid)
+        links = get_topology_graph(self.topology_api_app).links(dpid)
         body = json.dumps([link.to_dict() for link in links])
         return Response(content_type='application/json', body=body)
 
@@ -107,9 +107,7 @@ class WebSocketRegistrationWrapper(object):
 
 
 class _AlreadyHandledResponse(Response):
-    # XXX: Eventlet API should not be used directly.
-    from eventlet.wsgi import ALREADY_HANDLED
-    _ALREADY_HANDLED = ALREADY_HANDLED
+    _ALREADY_HANDLED = hub.ALREADY_HANDLED
 
     def __call__(self, environ, start_response):
         return self._ALREADY_HANDLED
@@ -25,6 +25,7 @@ The main component of OpenFlow controller.
 import contextlib
 import logging
 import random
+import struct
 from socket import IPPROTO_TCP
 from socket import TCP_NODELAY
 from socket import SHUT_WR
@@ -32,8 +33,10 @@ from socket import timeout as SocketTimeout
 import ssl
 
 from ryu import cfg
+from ryu import exception
 from ryu.lib import hub
 from ryu.lib.hub import StreamServer
+from ryu.lib.packet.stream_parser import Framer
 
 import ryu.base.app_manager
 
@@ -222,6 +225,36 @@ def _deactivate(method):
     return deactivate
 
 
+class _ModBatch(object):
+    # The messages sent by Datapath.send_mods(), which have the xids
+    # from first_xid to last_xid.  The last one is a barrier request or
+    # a bundle commit request, whose reply completes the batch.
+
+    def __init__(self, first_xid, last_xid, max_xid):
+        self.first_xid = first_xid
+        self.last_xid = last_xid
+        self._max_xid = max_xid
+        self.errors = []
+        self.future = hub.Future()
+
+    def __contains__(self, xid):
+        return ((xid - self.first_xid) & self._max_xid <=
+                (self.last_xid - self.first_xid) & self._max_xid)
+
+
+class _Request(object):
+    # A request sent by Datapath.send_request(), waiting for its reply
+    # or all the parts of its multipart reply.
+
+    def __init__(self, xid, timeout):
+        self.xid = xid
+        self.timeout = timeout
+        self.replies = []
+        self.future = hub.Future()
+        self.timer = None
+        self.num_seen = 0
+
+
 class Datapath(ofproto_protocol.ProtocolDesc):
     """
     A class to describe an OpenFlow switch connected to this controller.
@@ -268,6 +301,15 @@ class Datapath(ofproto_protocol.ProtocolDesc):
     send_delete_all_flows                deprecated
     send_barrier                         Queue an OpenFlow barrier message to
                                          send to the switch.
+    send_mods(self, mods, bundle=False)  Queue flow/group/meter mods in one
+                                         buffer followed by a barrier, or
+                                         in a bundle which is committed.
+                                         Returns a hub.Future of the error
+                                         messages for them.
+    send_request(self, msg)              Queue a request message and return
+                                         a hub.Future of the list of its
+                                         reply messages, e.g. all the parts
+                                         of a multipart reply.
     send_nxt_set_flow_format             deprecated
     is_reserved_port                     deprecated
     ==================================== ======================================
@@ -290,8 +332,12 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         self.echo_request_interval = CONF.echo_request_interval
         self.max_unreplied_echo_requests = CONF.maximum_unreplied_echo_requests
         self.unreplied_echo_requests = []
+        self._echo_request_timer = None
 
         self.xid = random.randint(0, self.ofproto.MAX_XID)
+        self._mod_batches = {}  # {last_xid: _ModBatch}
+        self._requests = {}  # {xid: _Request}
+        self._bundle_id = 0
         self.id = None  # datapath_id is unknown yet
         self._ports = None
         self.flow_format = ofproto_v1_0.NXFF_OPENFLOW10
@@ -320,18 +366,24 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         self.ofp_brick.send_event_to_observers(ev, state)
 
     # Low level socket handling layer
+    def _get_msg_len(self, buf, offset):
+        (version, msg_type, msg_len, xid) = struct.unpack_from(
+            ofproto_common.OFP_HEADER_PACK_STR, buf, offset)
+        if msg_len < ofproto_common.OFP_HEADER_SIZE:
+            # Someone isn't playing nicely; log it, and try something sane.
+            LOG.debug("Message with invalid length %s received from switch at address %s",
+                      msg_len, self.address)
+            msg_len = ofproto_common.OFP_HEADER_SIZE
+        return msg_len
+
     @_deactivate
     def _recv_loop(self):
-        buf = bytearray()
+        framer = Framer(ofproto_common.OFP_HEADER_SIZE, self._get_msg_len)
         count = 0
-        min_read_len = remaining_read_len = ofproto_common.OFP_HEADER_SIZE
 
         while self.state != DEAD_DISPATCHER:
             try:
-                read_len = min_read_len
-                if remaining_read_len > min_read_len:
-                    read_len = remaining_read_len
-                ret = self.socket.recv(read_len)
+                ret = framer.recv_into(self.socket)
             except SocketTimeout:
                 continue
             except ssl.SSLError:
@@ -344,21 +396,15 @@ class Datapath(ofproto_protocol.ProtocolDesc):
             if not ret:
                 break
 
-            buf += ret
-            buf_len = len(buf)
-            while buf_len >= min_read_len:
-                (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
-                if msg_len < min_read_len:
-                    # Someone isn't playing nicely; log it, and try something sane.
-                    LOG.debug("Message with invalid length %s received from switch at address %s",
-                              msg_len, self.address)
-                    msg_len = min_read_len
-                if buf_len < msg_len:
-                    remaining_read_len = (msg_len - buf_len)
-                    break
-
+            for frame in framer.frames():
+                # The message gets its own immutable copy of the frame,
+                # which it refers to without copying, e.g. data_view of
+                # OFPPacketIn.
+                frame = frame.tobytes()
+                (version, msg_type, msg_len, xid) = ofproto_parser.header(
+                    frame)
                 msg = ofproto_parser.msg(
-                    self, version, msg_type, msg_len, xid, buf[:msg_len])
+                    self, version, msg_type, len(frame), xid, frame)
                 # LOG.debug('queue msg %s cls %s', msg, msg.__class__)
                 if msg:
                     ev = ofp_event.ofp_msg_to_ev(msg)
@@ -373,9 +419,10 @@ class Datapath(ofproto_protocol.ProtocolDesc):
                     for handler in handlers:
                         handler(ev)
 
-                buf = buf[msg_len:]
-                buf_len = len(buf)
-                remaining_read_len = min_read_len
+                    if self._requests:
+                        self._request_reply(msg)
+                    if self._mod_batches:
+                        self._mod_batch_reply(msg)
 
                 # We need to schedule other greenlets. Otherwise, ryu
                 # can't accept new switches or handle the existing
@@ -416,9 +463,12 @@ class Datapath(ofproto_protocol.ProtocolDesc):
             # Finally, disallow further sends.
             self._close_write()
 
-    def send(self, buf, close_socket=False):
+    def send(self, buf, close_socket=False, blocking=True):
         msg_enqueued = False
-        self._send_q_sem.acquire()
+        if not self._send_q_sem.acquire(blocking):
+            LOG.debug('Send queue to %s is full; send() discarded.',
+                      self.address)
+            return msg_enqueued
         if self.send_q:
             self.send_q.put((buf, close_socket))
             msg_enqueued = True
@@ -435,24 +485,160 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         msg.set_xid(self.xid)
         return self.xid
 
-    def send_msg(self, msg, close_socket=False):
+    def send_msg(self, msg, close_socket=False, blocking=True):
         assert isinstance(msg, self.ofproto_parser.MsgBase)
         if msg.xid is None:
             self.set_xid(msg)
         msg.serialize()
         # LOG.debug('send_msg %s', msg)
-        return self.send(msg.buf, close_socket=close_socket)
+        return self.send(msg.buf, close_socket=close_socket,
+                         blocking=blocking)
+
+    def send_mods(self, mods, bundle=False, bundle_flags=None):
+        """
+        Queue flow/group/meter mods to send to the switch at once.
+
+        The mods, which must not have xids yet, are given xids and
+        serialized into one buffer.  They are followed by a barrier
+        request, or with bundle=True, they are added into a bundle which
+        is committed, so that the switch applies all of them or none of
+        them.  Bundles require OpenFlow 1.4 or later.  bundle_flags
+        defaults to OFPBF_ATOMIC.
+
+        Returns a hub.Future, whose result is the list of the error
+        messages received for the mods when the barrier reply or the
+        commit reply is received.  It fails with OFPDatapathClosed if
+        the connection is closed before that.
+        """
+        ofp = self.ofproto
+        parser = self.ofproto_parser
+        if bundle:
+            if not hasattr(parser, 'OFPBundleCtrlMsg'):
+                raise ValueError('bundles require OpenFlow 1.4 or later')
+            if bundle_flags is None:
+                bundle_flags = ofp.OFPBF_ATOMIC
+            self._bundle_id = (self._bundle_id + 1) & 0xffffffff
+            msgs = [parser.OFPBundleCtrlMsg(self, self._bundle_id,
+                                            ofp.OFPBCT_OPEN_REQUEST,
+                                            bundle_flags, [])]
+            msgs.extend(parser.OFPBundleAddMsg(self, self._bundle_id,
+                                               bundle_flags, mod, [])
+                        for mod in mods)
+            msgs.append(parser.OFPBundleCtrlMsg(self, self._bundle_id,
+                                                ofp.OFPBCT_COMMIT_REQUEST,
+                                                bundle_flags, []))
+        else:
+            msgs = list(mods)
+            msgs.append(parser.OFPBarrierRequest(self))
+
+        buf = bytearray()
+        first_xid = (self.xid + 1) & ofp.MAX_XID
+        for msg in msgs:
+            self.set_xid(msg)
+            msg.serialize_into(buf, len(buf))
+
+        batch = _ModBatch(first_xid, self.xid, ofp.MAX_XID)
+        self._mod_batches[batch.last_xid] = batch
+        if not self.send(buf):
+            del self._mod_batches[batch.last_xid]
+            batch.future.set_exception(
+                exception.OFPDatapathClosed(address=self.address))
+        return batch.future
+
+    def _mod_batch_reply(self, msg):
+        batch = self._mod_batches.pop(msg.xid, None)
+        if batch is not None:
+            # the barrier reply or the commit reply, or an error for them
+            if msg.msg_type == self.ofproto.OFPT_ERROR:
+                batch.errors.append(msg)
+            batch.future.set_result(batch.errors)
+        elif msg.msg_type == self.ofproto.OFPT_ERROR:
+            for batch in self._mod_batches.values():
+                if msg.xid in batch:
+                    batch.errors.append(msg)
+                    break
 
-    def _echo_request_loop(self):
-        if not self.max_unreplied_echo_requests:
+    def send_request(self, msg, timeout=None):
+        """
+        Queue a request message which has a reply, e.g. a multipart
+        (stats) request or a barrier request, to send to the switch.
+
+        Returns a hub.Future, whose result is the list of the reply
+        messages: all the parts of a multipart reply, or the reply for
+        the other requests.  Any number of requests can be outstanding
+        at once; the replies are correlated to them by xid.
+
+        The future fails with OFPErrorReply if the switch replies with
+        an error message, with OFPDatapathClosed if the connection is
+        closed, and with hub.FutureTimeout if no reply (or no more part
+        of the reply) is received for timeout seconds.  The partial
+        attribute of the FutureTimeout is the list of the parts of the
+        reply received before the timeout.
+        """
+        if msg.xid is None:
+            self.set_xid(msg)
+        req = _Request(msg.xid, timeout)
+        self._requests[req.xid] = req
+        if not self.send_msg(msg):
+            self._fail_request(req, exception.OFPDatapathClosed(
+                address=self.address))
+        elif timeout is not None:
+            req.timer = hub.call_later(timeout, self._request_timeout, req)
+        return req.future
+
+    def _fail_request(self, req, exc):
+        if self._requests.pop(req.xid, None) is req:
+            if req.timer is not None:
+                req.timer.cancel()
+            req.future.set_exception(exc)
+
+    def _request_timeout(self, req):
+        # Called on the hub timer wheel.  The timeout is restarted as
+        # long as the parts of a multipart reply keep coming.
+        req.timer = None
+        if len(req.replies) > req.num_seen:
+            req.num_seen = len(req.replies)
+            req.timer = hub.call_later(req.timeout, self._request_timeout,
+                                       req)
+        else:
+            self._fail_request(req, hub.FutureTimeout(partial=req.replies))
+
+    def _reply_more(self, msg):
+        ofp = self.ofproto
+        if msg.msg_type == getattr(ofp, 'OFPT_MULTIPART_REPLY', None):
+            return msg.flags & ofp.OFPMPF_REPLY_MORE
+        if msg.msg_type == getattr(ofp, 'OFPT_STATS_REPLY', None):
+            return msg.flags & ofp.OFPSF_REPLY_MORE
+        return False
+
+    def _request_reply(self, msg):
+        req = self._requests.get(msg.xid)
+        if req is None:
+            return
+        if msg.msg_type == self.ofproto.OFPT_ERROR:
+            self._fail_request(req, exception.OFPErrorReply(msg))
+            return
+        req.replies.append(msg)
+        if self._reply_more(msg):
+            return
+        del self._requests[req.xid]
+        if req.timer is not None:
+            req.timer.cancel()
+        req.future.set_result(req.replies)
+
+    def _echo_request(self):
+        # Called on the hub timer wheel, so that this must not block.
+        self._echo_request_timer = None
+        if (not self.send_q or
+                len(self.unreplied_echo_requests) > self.max_unreplied_echo_requests):
+            hub.spawn(self.close)
             return
-        while (self.send_q and
-               (len(self.unreplied_echo_requests) <= self.max_unreplied_echo_requests)):
-            echo_req = self.ofproto_parser.OFPEchoRequest(self)
-            self.unreplied_echo_requests.append(self.set_xid(echo_req))
-            self.send_msg(echo_req)
-            hub.sleep(self.echo_request_interval)
-        self.close()
+        echo_req = self.ofproto_parser.OFPEchoRequest(self)
+        self.unreplied_echo_requests.append(self.set_xid(echo_req))
+        # If the send queue is full, this request is counted as unreplied.
+        self.send_msg(echo_req, blocking=False)
+        self._echo_request_timer = hub.call_later(self.echo_request_interval,
+                                                  self._echo_request)
 
     def acknowledge_echo_reply(self, xid):
         try:
@@ -467,15 +653,28 @@ class Datapath(ofproto_protocol.ProtocolDesc):
         hello = self.ofproto_parser.OFPHello(self)
         self.send_msg(hello)
 
-        echo_thr = hub.spawn(self._echo_request_loop)
+        if self.max_unreplied_echo_requests:
+            self._echo_request_timer = hub.call_later(0, self._echo_request)
 
         try:
             self._recv_loop()
         finally:
+            if self._echo_request_timer is not None:
+                self._echo_request_timer.cancel()
+                self._echo_request_timer = None
             hub.kill(send_thr)
-            hub.kill(echo_thr)
-            hub.joinall([send_thr, echo_thr])
+            hub.joinall([send_thr])
             self.is_active = False
+            batches, self._mod_batches = self._mod_batches, {}
+            for batch in batches.values():
+                batch.future.set_exception(
+                    exception.OFPDatapathClosed(address=self.address))
+            requests, self._requests = self._requests, {}
+            for req in requests.values():
+                if req.timer is not None:
+                    req.timer.cancel()
+                req.future.set_exception(
+                    exception.OFPDatapathClosed(address=self.address))
 
     #
     # Utility methods for convenience
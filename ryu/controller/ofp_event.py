@@ -62,6 +62,7 @@ class EventOFPMsgBase(event.EventBase):
 #
 
 _OFP_MSG_EVENTS = {}
+_OFP_MSG_CLS_EVENTS = {}    # {msg_cls: ev_cls}
 
 
 def _ofp_msg_name_to_ev_name(msg_name):
@@ -69,7 +70,11 @@ def _ofp_msg_name_to_ev_name(msg_name):
 
 
 def ofp_msg_to_ev(msg):
-    return ofp_msg_to_ev_cls(msg.__class__)(msg)
+    try:
+        ev_cls = _OFP_MSG_CLS_EVENTS[msg.__class__]
+    except KeyError:
+        ev_cls = ofp_msg_to_ev_cls(msg.__class__)
+    return ev_cls(msg)
 
 
 def ofp_msg_to_ev_cls(msg_cls):
@@ -81,14 +86,11 @@ def _create_ofp_msg_ev_class(msg_cls):
     name = _ofp_msg_name_to_ev_name(msg_cls.__name__)
     # print 'creating ofp_event %s' % name
 
-    if name in _OFP_MSG_EVENTS:
-        return
-
-    cls = type(name, (EventOFPMsgBase,),
-               dict(__init__=lambda self, msg:
-                    super(self.__class__, self).__init__(msg)))
-    globals()[name] = cls
-    _OFP_MSG_EVENTS[name] = cls
+    if name not in _OFP_MSG_EVENTS:
+        cls = type(name, (EventOFPMsgBase,), {})
+        globals()[name] = cls
+        _OFP_MSG_EVENTS[name] = cls
+    _OFP_MSG_CLS_EVENTS[msg_cls] = _OFP_MSG_EVENTS[name]
 
 
 def _create_ofp_msg_ev_from_module(ofp_parser):
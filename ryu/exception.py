@@ -52,6 +52,20 @@ class OFPTruncatedMessage(RyuException):
         super(OFPTruncatedMessage, self).__init__(msg, **kwargs)
 
 
+class OFPDatapathClosed(RyuException):
+    message = 'connection to datapath %(address)s is closed'
+
+
+class OFPErrorReply(RyuException):
+    message = 'error reply to xid %(xid)s: type %(type)s code %(code)s'
+
+    def __init__(self, ofpmsg, msg=None, **kwargs):
+        self.ofpmsg = ofpmsg
+        kwargs.update(xid=ofpmsg.xid, type=ofpmsg.type, code=ofpmsg.code)
+
+        super(OFPErrorReply, self).__init__(msg, **kwargs)
+
+
 class OFPInvalidActionString(RyuException):
     message = 'unable to parse: %(action_str)s'
 
@@ -14,7 +14,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import binascii
+import functools
+import socket
+import struct
+
 import netaddr
+import six
+
+# The number of the addresses whose conversions each converter caches
+_CACHE_SIZE = 4096
+
+# Errors of the fast conversions, on which netaddr does the conversion
+_FAST_ERRORS = (socket.error, struct.error, TypeError, ValueError)
 
 
 class AddressConverter(object):
@@ -41,15 +53,86 @@ class AddressConverter(object):
                               **self._addr_kwargs))
 
 
-ipv4 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv4,
-                        fallback=netaddr.IPNetwork, version=4)
-ipv6 = AddressConverter(netaddr.IPAddress, netaddr.strategy.ipv6,
-                        fallback=netaddr.IPNetwork, version=6)
+class _FastAddressConverter(AddressConverter):
+    """AddressConverter which converts the usual forms of the addresses
+    with pack and unpack, and uses netaddr for the others.
+
+    The results for the last _CACHE_SIZE addresses are cached, so that
+    the same objects are returned for the hot addresses.
+    """
+
+    def __init__(self, pack, unpack, addr, strat, fallback=None, **kwargs):
+        super(_FastAddressConverter, self).__init__(addr, strat, fallback,
+                                                    **kwargs)
+        self._pack = pack
+        self._unpack = unpack
+        self._bin_cache = {}
+        self._text_cache = {}
+
+    @staticmethod
+    def _cache(cache, key, value):
+        if len(cache) >= _CACHE_SIZE:
+            cache.clear()
+        cache[key] = value
+
+    def text_to_bin(self, text):
+        try:
+            bin = self._text_cache.get(text)
+        except TypeError:
+            bin = None
+        if bin is not None:
+            return bin
+        try:
+            bin = self._pack(text)
+        except _FAST_ERRORS:
+            return super(_FastAddressConverter, self).text_to_bin(text)
+        self._cache(self._text_cache, text, bin)
+        return bin
+
+    def bin_to_text(self, bin):
+        try:
+            text = self._bin_cache.get(bin)
+        except TypeError:
+            text = None
+        if text is not None:
+            return text
+        try:
+            text = self._unpack(bin)
+        except _FAST_ERRORS:
+            return super(_FastAddressConverter, self).bin_to_text(bin)
+        self._cache(self._bin_cache, six.binary_type(bin), text)
+        return text
+
+
+def _mac_pack(text):
+    # only the form of mac_mydialect, e.g. 'f2:0b:a4:01:0a:23'
+    if len(text) != 17 or text[2::3] != ':::::':
+        raise ValueError(text)
+    return binascii.unhexlify(text.replace(':', ''))
+
+
+def _mac_unpack(bin):
+    return '%02x:%02x:%02x:%02x:%02x:%02x' % struct.unpack('6B', bin)
+
+
+ipv4 = _FastAddressConverter(functools.partial(socket.inet_pton,
+                                               socket.AF_INET),
+                             functools.partial(socket.inet_ntop,
+                                               socket.AF_INET),
+                             netaddr.IPAddress, netaddr.strategy.ipv4,
+                             fallback=netaddr.IPNetwork, version=4)
+ipv6 = _FastAddressConverter(functools.partial(socket.inet_pton,
+                                               socket.AF_INET6),
+                             functools.partial(socket.inet_ntop,
+                                               socket.AF_INET6),
+                             netaddr.IPAddress, netaddr.strategy.ipv6,
+                             fallback=netaddr.IPNetwork, version=6)
 
 
 class mac_mydialect(netaddr.mac_unix):
     word_fmt = '%.2x'
 
 
-mac = AddressConverter(netaddr.EUI, netaddr.strategy.eui48, version=48,
-                       dialect=mac_mydialect)
+mac = _FastAddressConverter(_mac_pack, _mac_unpack,
+                            netaddr.EUI, netaddr.strategy.eui48, version=48,
+                            dialect=mac_mydialect)
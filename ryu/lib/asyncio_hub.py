@@ -0,0 +1,842 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+asyncio backend of ryu.lib.hub, selected by RYU_HUB_TYPE=asyncio.
+
+Ryu code is written against the synchronous API of ryu.lib.hub, so
+green threads are still greenlets.  What differs from the eventlet
+backend is what drives them: an asyncio event loop runs in the hub
+greenlet, and a green thread which blocks parks itself until a callback
+of the loop (a timer, a ready file descriptor, or a wake up by another
+green thread) switches back to it.
+
+Nothing in the standard library is monkey patched; patch() does nothing.
+Sockets must be obtained from this module (listen(), connect(),
+StreamServer, StreamClient) to be cooperative.  Coroutines of asyncio
+based libraries run on the same loop and can be waited for from a green
+thread with run_coroutine().
+"""
+
+import asyncio
+import base64
+import collections
+import errno
+import hashlib
+import io
+import logging
+import os
+import socket
+import ssl
+import struct
+import traceback
+import wsgiref.simple_server
+
+import greenlet
+
+from ryu.lib import ip
+
+
+LOG = logging.getLogger('ryu.lib.hub')
+
+TaskExit = greenlet.GreenletExit
+getcurrent = greenlet.getcurrent
+
+loop = asyncio.new_event_loop()
+_hub = greenlet.greenlet(loop.run_forever)
+
+
+def _exception_handler(loop, context):
+    if isinstance(context.get('exception'), TaskExit):
+        # The hub greenlet is being garbage collected, e.g. at exit.
+        loop.stop()
+    else:
+        loop.default_exception_handler(context)
+
+
+loop.set_exception_handler(_exception_handler)
+
+# returned to a parked green thread when its wait timed out
+_TIMED_OUT = object()
+
+
+def patch(*args, **kwargs):
+    # Nothing to patch.
+    pass
+
+
+class _Waiter(object):
+    # Parks the current green thread until switch() or throw() is called
+    # by a callback of the loop.
+    __slots__ = ('greenlet',)
+
+    def __init__(self):
+        self.greenlet = None
+
+    def switch(self, value=None):
+        g = self.greenlet
+        if g is not None:
+            self.greenlet = None
+            g.switch(value)
+
+    def throw(self, *args):
+        g = self.greenlet
+        if g is not None:
+            self.greenlet = None
+            g.throw(*args)
+
+    def wake(self, value=None):
+        # may be called from any green thread
+        loop.call_soon(self.switch, value)
+
+    def wait(self, timeout=None):
+        current = getcurrent()
+        if current is _hub:
+            raise RuntimeError('hub: blocking call in the hub greenlet')
+        handle = None
+        if timeout is not None:
+            handle = loop.call_later(timeout, self.switch, _TIMED_OUT)
+        self.greenlet = current
+        try:
+            return _hub.switch()
+        finally:
+            self.greenlet = None
+            if handle is not None:
+                handle.cancel()
+
+
+def sleep(seconds=0):
+    waiter = _Waiter()
+    if seconds > 0:
+        handle = loop.call_later(seconds, waiter.switch)
+    else:
+        handle = loop.call_soon(waiter.switch)
+    try:
+        waiter.wait()
+    finally:
+        handle.cancel()
+
+
+class GreenThread(object):
+    def __init__(self, func, args, kwargs):
+        self._func = func
+        self._args = args
+        self._kwargs = kwargs
+        self._greenlet = greenlet.greenlet(self._main, parent=_hub)
+        self._start_handle = None
+        self._joiners = []
+        self._result = None
+        self._exc = None
+        self.dead = False
+
+    def _start(self, seconds):
+        if seconds > 0:
+            self._start_handle = loop.call_later(seconds,
+                                                 self._greenlet.switch)
+        else:
+            self._start_handle = loop.call_soon(self._greenlet.switch)
+
+    def _main(self):
+        self._start_handle = None
+        try:
+            self._result = self._func(*self._args, **self._kwargs)
+        except TaskExit as e:
+            self._exc = e
+        finally:
+            self._finish()
+
+    def _finish(self):
+        self.dead = True
+        for waiter in self._joiners:
+            waiter.wake()
+        del self._joiners[:]
+
+    def wait(self):
+        if not self.dead:
+            waiter = _Waiter()
+            self._joiners.append(waiter)
+            waiter.wait()
+        if self._exc is not None:
+            raise self._exc
+        return self._result
+
+    def kill(self):
+        if self.dead:
+            return
+        if self._start_handle is not None:
+            # not started yet
+            self._start_handle.cancel()
+            self._start_handle = None
+            self._exc = TaskExit()
+            self._finish()
+            return
+        current = getcurrent()
+        if current is self._greenlet:
+            raise TaskExit()
+        if current is not _hub:
+            loop.call_soon(current.switch)
+        self._greenlet.throw(TaskExit)
+
+
+def _launch(raise_error, func, *args, **kwargs):
+    # Mimic gevent's default raise_error=False behaviour
+    # by not propagating an exception to the joiner.
+    try:
+        return func(*args, **kwargs)
+    except TaskExit:
+        pass
+    except BaseException as e:
+        if raise_error:
+            raise e
+        # Log uncaught exception.
+        # Note: this is an intentional divergence from gevent
+        # behaviour; gevent silently ignores such exceptions.
+        LOG.error('hub: uncaught exception: %s',
+                  traceback.format_exc())
+
+
+def spawn(*args, **kwargs):
+    return spawn_after(0, *args, **kwargs)
+
+
+def spawn_after(seconds, *args, **kwargs):
+    raise_error = kwargs.pop('raise_error', False)
+    thread = GreenThread(_launch, (raise_error,) + args, kwargs)
+    thread._start(seconds)
+    return thread
+
+
+def kill(thread):
+    thread.kill()
+
+
+def joinall(threads):
+    for t in threads:
+        # This try-except is necessary when killing an inactive
+        # greenthread.
+        try:
+            t.wait()
+        except TaskExit:
+            pass
+
+
+def run_coroutine(coro):
+    """Run an asyncio coroutine on the hub loop and wait for its result
+    from the current green thread."""
+    future = asyncio.ensure_future(coro, loop=loop)
+    waiter = _Waiter()
+    future.add_done_callback(lambda f: waiter.switch())
+    try:
+        if not future.done():
+            waiter.wait()
+    except BaseException:
+        future.cancel()
+        raise
+    return future.result()
+
+
+class Timeout(BaseException):
+    def __init__(self, seconds=None, exception=None):
+        super(Timeout, self).__init__(seconds)
+        self.seconds = seconds
+        self.exception = exception
+        self._handle = None
+        self.start()
+
+    def start(self):
+        if self.seconds is None:
+            return
+        if self.exception is None or self.exception is False:
+            exc = self
+        else:
+            exc = self.exception
+        self._handle = loop.call_later(self.seconds, self._fire,
+                                       getcurrent(), exc)
+
+    @staticmethod
+    def _fire(g, exc):
+        if not g.dead:
+            g.throw(exc)
+
+    @property
+    def pending(self):
+        return self._handle is not None and not self._handle.cancelled()
+
+    def cancel(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, typ, value, tb):
+        self.cancel()
+        if value is self and self.exception is False:
+            return True
+
+
+def _wait_in(waiters, timeout):
+    # Park the current green thread in waiters. Returns False on timeout.
+    waiter = _Waiter()
+    waiters.append(waiter)
+    try:
+        return waiter.wait(timeout) is not _TIMED_OUT
+    finally:
+        try:
+            waiters.remove(waiter)
+        except ValueError:
+            pass
+
+
+def _wake_one(waiters):
+    if waiters:
+        waiters.popleft().wake()
+
+
+class QueueEmpty(Exception):
+    pass
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Queue(object):
+    # Same semantics as eventlet.queue.LightQueue. maxsize of None means
+    # an unbounded queue.
+    def __init__(self, maxsize=None):
+        if maxsize is not None and maxsize < 0:
+            maxsize = None
+        self.maxsize = maxsize
+        self.queue = collections.deque()
+        self._getters = collections.deque()
+        self._putters = collections.deque()
+
+    def qsize(self):
+        return len(self.queue)
+
+    def empty(self):
+        return not self.queue
+
+    def full(self):
+        return self.maxsize is not None and len(self.queue) >= self.maxsize
+
+    def put(self, item, block=True, timeout=None):
+        while self.full():
+            if not block or not _wait_in(self._putters, timeout):
+                raise QueueFull()
+        self.queue.append(item)
+        _wake_one(self._getters)
+
+    def get(self, block=True, timeout=None):
+        while not self.queue:
+            if not block or not _wait_in(self._getters, timeout):
+                raise QueueEmpty()
+        item = self.queue.popleft()
+        _wake_one(self._putters)
+        if self.queue:
+            # in case the waiter woken up for this item timed out
+            _wake_one(self._getters)
+        return item
+
+    def put_nowait(self, item):
+        self.put(item, False)
+
+    def get_nowait(self):
+        return self.get(False)
+
+
+class Semaphore(object):
+    def __init__(self, value=1):
+        if value < 0:
+            raise ValueError('Semaphore must be initialized with a '
+                             'non-negative value')
+        self.counter = value
+        self._waiters = collections.deque()
+
+    def locked(self):
+        return self.counter <= 0
+
+    def acquire(self, blocking=True, timeout=None):
+        while self.counter <= 0:
+            if not blocking or not _wait_in(self._waiters, timeout):
+                return False
+        self.counter -= 1
+        return True
+
+    def release(self, blocking=True):
+        self.counter += 1
+        _wake_one(self._waiters)
+        return True
+
+    def __enter__(self):
+        self.acquire()
+
+    def __exit__(self, typ, val, tb):
+        self.release()
+
+
+class BoundedSemaphore(Semaphore):
+    def __init__(self, value=1):
+        super(BoundedSemaphore, self).__init__(value)
+        self.original_counter = value
+
+    def release(self, blocking=True):
+        if self.counter >= self.original_counter:
+            raise ValueError('Semaphore released too many times')
+        return super(BoundedSemaphore, self).release(blocking)
+
+
+class Event(object):
+    def __init__(self):
+        self._cond = False
+        self._waiters = collections.deque()
+
+    def is_set(self):
+        return self._cond
+
+    def set(self):
+        self._cond = True
+        while self._waiters:
+            self._waiters.popleft().wake()
+
+    def clear(self):
+        self._cond = False
+
+    def wait(self, timeout=None):
+        if not self._cond:
+            _wait_in(self._waiters, timeout)
+        return self._cond
+
+
+class GreenSocket(object):
+    """Cooperative wrapper of a socket.socket (or ssl.SSLSocket).
+
+    Blocking operations park the calling green thread until the loop
+    reports the socket ready.  The socket timeout is honoured and raises
+    socket.timeout as usual.
+    """
+
+    def __init__(self, sock):
+        self.fd = sock
+        self._timeout = sock.gettimeout()
+        sock.setblocking(False)
+
+    def __getattr__(self, name):
+        return getattr(self.fd, name)
+
+    def settimeout(self, timeout):
+        self._timeout = timeout
+
+    def gettimeout(self):
+        return self._timeout
+
+    def setblocking(self, flag):
+        self._timeout = None if flag else 0.0
+
+    def _wait(self, reading):
+        if self._timeout == 0.0:
+            raise socket.error(errno.EAGAIN, os.strerror(errno.EAGAIN))
+        fileno = self.fd.fileno()
+        waiter = _Waiter()
+        if reading:
+            loop.add_reader(fileno, waiter.switch)
+        else:
+            loop.add_writer(fileno, waiter.switch)
+        try:
+            if waiter.wait(self._timeout) is _TIMED_OUT:
+                raise socket.timeout('timed out')
+        finally:
+            if reading:
+                loop.remove_reader(fileno)
+            else:
+                loop.remove_writer(fileno)
+
+    def _call(self, method, *args):
+        while True:
+            try:
+                return method(*args)
+            except (BlockingIOError, ssl.SSLWantReadError):
+                self._wait(True)
+            except ssl.SSLWantWriteError:
+                self._wait(False)
+
+    def _call_write(self, method, *args):
+        while True:
+            try:
+                return method(*args)
+            except (BlockingIOError, ssl.SSLWantWriteError):
+                self._wait(False)
+            except ssl.SSLWantReadError:
+                self._wait(True)
+
+    def recv(self, *args):
+        return self._call(self.fd.recv, *args)
+
+    def recv_into(self, *args):
+        return self._call(self.fd.recv_into, *args)
+
+    def recvfrom(self, *args):
+        return self._call(self.fd.recvfrom, *args)
+
+    def send(self, *args):
+        return self._call_write(self.fd.send, *args)
+
+    def sendto(self, *args):
+        return self._call_write(self.fd.sendto, *args)
+
+    def sendall(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[self.send(view):]
+
+    def accept(self):
+        sock, addr = self._call(self.fd.accept)
+        return GreenSocket(sock), addr
+
+    def connect(self, address):
+        err = self.fd.connect_ex(address)
+        if err in (errno.EINPROGRESS, errno.EWOULDBLOCK, errno.EALREADY):
+            self._wait(False)
+            err = self.fd.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err and err != errno.EISCONN:
+            raise socket.error(err, os.strerror(err))
+
+    def do_handshake(self):
+        self._call(self.fd.do_handshake)
+
+    def makefile(self, mode='r', bufsize=-1):
+        assert 'b' in mode
+        raw = _SocketIO(self, mode)
+        if bufsize < 0 or bufsize is None:
+            bufsize = io.DEFAULT_BUFFER_SIZE
+        if 'r' in mode and 'w' in mode:
+            return io.BufferedRWPair(raw, raw, bufsize)
+        elif 'r' in mode:
+            return io.BufferedReader(raw, bufsize)
+        return io.BufferedWriter(raw, bufsize)
+
+
+class _SocketIO(io.RawIOBase):
+    def __init__(self, sock, mode):
+        super(_SocketIO, self).__init__()
+        self._sock = sock
+        self._mode = mode
+
+    def readable(self):
+        return 'r' in self._mode
+
+    def writable(self):
+        return 'w' in self._mode
+
+    def readinto(self, b):
+        return self._sock.recv_into(b)
+
+    def write(self, b):
+        return self._sock.send(b)
+
+    def fileno(self):
+        return self._sock.fileno()
+
+
+def listen(addr, family=socket.AF_INET, backlog=50):
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    if family != socket.AF_UNIX:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(addr)
+    sock.listen(backlog)
+    return GreenSocket(sock)
+
+
+def connect(addr, family=socket.AF_INET, bind=None):
+    sock = GreenSocket(socket.socket(family, socket.SOCK_STREAM))
+    if bind is not None:
+        sock.bind(bind)
+    sock.connect(addr)
+    return sock
+
+
+def _ssl_context(ssl_args):
+    # Build an SSLContext from the ssl.wrap_socket() style arguments
+    # which StreamServer and StreamClient accept.
+    ctx = ssl_args.pop('ssl_ctx', None)
+    if ctx is None:
+        ctx = ssl.SSLContext(ssl_args.pop('ssl_version',
+                                          ssl.PROTOCOL_TLS))
+    if 'certfile' in ssl_args:
+        ctx.load_cert_chain(ssl_args.pop('certfile'),
+                            ssl_args.pop('keyfile', None))
+    if 'cert_reqs' in ssl_args:
+        ctx.verify_mode = ssl_args.pop('cert_reqs')
+    if 'ca_certs' in ssl_args:
+        ctx.load_verify_locations(ssl_args.pop('ca_certs'))
+    if 'ciphers' in ssl_args:
+        ctx.set_ciphers(ssl_args.pop('ciphers'))
+    return ctx
+
+
+def _wrap_ssl(sock, ctx, server_side):
+    ssl_sock = GreenSocket(ctx.wrap_socket(sock.fd, server_side=server_side,
+                                           do_handshake_on_connect=False))
+    ssl_sock.settimeout(sock.gettimeout())
+    ssl_sock.do_handshake()
+    return ssl_sock
+
+
+class StreamServer(object):
+    def __init__(self, listen_info, handle=None, backlog=None,
+                 spawn='default', **ssl_args):
+        assert backlog is None
+        assert spawn == 'default'
+
+        if ip.valid_ipv6(listen_info[0]):
+            self.server = listen(listen_info, family=socket.AF_INET6)
+        elif os.path.isdir(os.path.dirname(listen_info[0])):
+            # Case for Unix domain socket
+            self.server = listen(listen_info[0], family=socket.AF_UNIX)
+        else:
+            self.server = listen(listen_info)
+
+        if ssl_args:
+            ssl_args.pop('server_side', None)
+            ctx = _ssl_context(ssl_args)
+
+            def wrap_and_handle(sock, addr):
+                handle(_wrap_ssl(sock, ctx, True), addr)
+
+            self.handle = wrap_and_handle
+        else:
+            self.handle = handle
+
+    def serve_forever(self):
+        while True:
+            sock, addr = self.server.accept()
+            spawn(self.handle, sock, addr)
+
+
+class StreamClient(object):
+    def __init__(self, addr, timeout=None, **ssl_args):
+        assert ip.valid_ipv4(addr[0]) or ip.valid_ipv6(addr[0])
+        self.addr = addr
+        self.timeout = timeout
+        self.ssl_args = ssl_args
+        self._is_active = True
+
+    def connect(self):
+        family = (socket.AF_INET6 if ip.valid_ipv6(self.addr[0])
+                  else socket.AF_INET)
+        client = GreenSocket(socket.socket(family, socket.SOCK_STREAM))
+        client.settimeout(self.timeout)
+        try:
+            client.connect(self.addr)
+            if self.ssl_args:
+                ctx = _ssl_context(dict(self.ssl_args))
+                ctx.check_hostname = False
+                client = _wrap_ssl(client, ctx, False)
+        except (socket.error, ssl.SSLError):
+            client.close()
+            return None
+
+        return client
+
+    def connect_loop(self, handle, interval):
+        while self._is_active:
+            sock = self.connect()
+            if sock:
+                handle(sock, self.addr)
+            sleep(interval)
+
+    def stop(self):
+        self._is_active = False
+
+
+# returned by a WSGI application which has already written the response
+# itself, e.g. for a WebSocket.
+ALREADY_HANDLED = object()
+
+
+class _WSGIServerHandler(wsgiref.simple_server.ServerHandler):
+    def finish_response(self):
+        if self.result is ALREADY_HANDLED:
+            return
+        super(_WSGIServerHandler, self).finish_response()
+
+
+class _WSGIRequestHandler(wsgiref.simple_server.WSGIRequestHandler):
+    def get_environ(self):
+        env = super(_WSGIRequestHandler, self).get_environ()
+        env['ryu.hub.socket'] = self.connection
+        return env
+
+    def handle(self):
+        self.raw_requestline = self.rfile.readline(65537)
+        if not self.parse_request():
+            return
+        handler = _WSGIServerHandler(
+            self.rfile, self.wfile, self.get_stderr(), self.get_environ(),
+            multithread=False)
+        handler.request_handler = self
+        handler.run(self.server.get_app())
+
+    def log_message(self, format, *args):
+        LOG.info('%s - - %s', self.address_string(), format % args)
+
+
+class WSGIServer(StreamServer):
+    def serve_forever(self):
+        host, port = self.server.getsockname()[:2]
+        self.server_name = socket.getfqdn(host)
+        self.server_port = port
+        self.base_environ = {
+            'SERVER_NAME': self.server_name,
+            'GATEWAY_INTERFACE': 'CGI/1.1',
+            'SERVER_PORT': str(port),
+            'REMOTE_HOST': '',
+            'CONTENT_LENGTH': '',
+            'SCRIPT_NAME': '',
+        }
+        while True:
+            sock, addr = self.server.accept()
+            spawn(self._serve, sock, addr)
+
+    def get_app(self):
+        return self.handle
+
+    def _serve(self, sock, addr):
+        try:
+            _WSGIRequestHandler(sock, addr, self)
+        finally:
+            sock.close()
+
+
+class WebSocket(object):
+    # Server side of RFC 6455, with the same interface as
+    # eventlet.websocket.WebSocket.
+    _GUID = b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+    OP_CONTINUATION = 0x0
+    OP_TEXT = 0x1
+    OP_BINARY = 0x2
+    OP_CLOSE = 0x8
+    OP_PING = 0x9
+    OP_PONG = 0xa
+
+    def __init__(self, sock, rfile, environ):
+        self.socket = sock
+        self._rfile = rfile
+        self.environ = environ
+        self.websocket_closed = False
+
+    def _read(self, length):
+        data = self._rfile.read(length)
+        if len(data) != length:
+            raise EOFError()
+        return data
+
+    def _recv_frame(self):
+        b0, b1 = struct.unpack('!BB', self._read(2))
+        length = b1 & 0x7f
+        if length == 126:
+            (length,) = struct.unpack('!H', self._read(2))
+        elif length == 127:
+            (length,) = struct.unpack('!Q', self._read(8))
+        mask = self._read(4) if b1 & 0x80 else None
+        payload = self._read(length)
+        if mask and length:
+            mask = (mask * (length // 4 + 1))[:length]
+            payload = (int.from_bytes(payload, 'big') ^
+                       int.from_bytes(mask, 'big')).to_bytes(length, 'big')
+        return b0 & 0x80, b0 & 0x0f, payload
+
+    def _send_frame(self, opcode, payload):
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, length)
+        elif length < 0x10000:
+            header = struct.pack('!BBH', 0x80 | opcode, 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 127, length)
+        self.socket.sendall(header + payload)
+
+    def send(self, message):
+        if isinstance(message, bytes):
+            self._send_frame(self.OP_BINARY, message)
+        else:
+            self._send_frame(self.OP_TEXT, message.encode('utf-8'))
+
+    def wait(self):
+        """Return the next message, or None if the connection is closed."""
+        message = []
+        msg_opcode = None
+        while not self.websocket_closed:
+            try:
+                fin, opcode, payload = self._recv_frame()
+            except (EOFError, socket.error):
+                self.websocket_closed = True
+                break
+            if opcode == self.OP_CLOSE:
+                self.close()
+                break
+            elif opcode == self.OP_PING:
+                self._send_frame(self.OP_PONG, payload)
+                continue
+            elif opcode == self.OP_PONG:
+                continue
+            if opcode != self.OP_CONTINUATION:
+                msg_opcode = opcode
+            message.append(payload)
+            if fin:
+                data = b''.join(message)
+                if msg_opcode == self.OP_TEXT:
+                    return data.decode('utf-8')
+                return data
+        return None
+
+    def close(self):
+        if self.websocket_closed:
+            return
+        self.websocket_closed = True
+        try:
+            self._send_frame(self.OP_CLOSE, b'')
+            self.socket.shutdown(socket.SHUT_WR)
+        except socket.error:
+            pass
+
+
+class WebSocketWSGI(object):
+    def __init__(self, handler):
+        self.handler = handler
+
+    def __call__(self, environ, start_response):
+        key = environ.get('HTTP_SEC_WEBSOCKET_KEY')
+        if (environ.get('HTTP_UPGRADE', '').lower() != 'websocket' or
+                key is None):
+            start_response('400 Bad Request', [('Connection', 'close')])
+            return [b'Bad Request']
+
+        accept = base64.b64encode(
+            hashlib.sha1(key.encode('ascii') + WebSocket._GUID).digest())
+        sock = environ['ryu.hub.socket']
+        sock.sendall(b'HTTP/1.1 101 Switching Protocols\r\n'
+                     b'Upgrade: websocket\r\n'
+                     b'Connection: Upgrade\r\n'
+                     b'Sec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+        ws = WebSocket(sock, environ['wsgi.input'], environ)
+        try:
+            self.handler(ws)
+        finally:
+            ws.close()
+        return ALREADY_HANDLED
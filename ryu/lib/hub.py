@@ -15,7 +15,10 @@
 # limitations under the License.
 
 import logging
+import math
 import os
+import time
+import traceback
 from ryu.lib import ip
 
 
@@ -41,7 +44,6 @@ if HUB_TYPE == 'eventlet':
     import greenlet
     import ssl
     import socket
-    import traceback
     import sys
 
     getcurrent = eventlet.getcurrent
@@ -197,6 +199,7 @@ if HUB_TYPE == 'eventlet':
             eventlet.wsgi.server(self.server, self.handle, self.logger)
 
     WebSocketWSGI = websocket.WebSocketWSGI
+    ALREADY_HANDLED = eventlet.wsgi.ALREADY_HANDLED
 
     Timeout = eventlet.timeout.Timeout
 
@@ -237,3 +240,272 @@ if HUB_TYPE == 'eventlet':
                     pass
 
             return self._cond
+
+elif HUB_TYPE == 'asyncio':
+    from ryu.lib.asyncio_hub import (
+        ALREADY_HANDLED,
+        BoundedSemaphore,
+        Event,
+        Queue,
+        QueueEmpty,
+        Semaphore,
+        StreamClient,
+        StreamServer,
+        TaskExit,
+        Timeout,
+        WSGIServer,
+        WebSocketWSGI,
+        connect,
+        getcurrent,
+        joinall,
+        kill,
+        listen,
+        patch,
+        run_coroutine,
+        sleep,
+        spawn,
+        spawn_after,
+    )
+
+else:
+    raise ValueError('unknown RYU_HUB_TYPE: %s' % HUB_TYPE)
+
+
+class TimerHandle(object):
+    """A call scheduled by TimerWheel.call_later()."""
+    __slots__ = ('expire', 'func', 'args', 'kwargs', '_wheel', '_slot')
+
+    def __init__(self, expire, func, args, kwargs, wheel):
+        self.expire = expire
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self._wheel = wheel
+        self._slot = None
+
+    def is_pending(self):
+        return self._slot is not None
+
+    def cancel(self):
+        # Cancelling a timer which already fired or was cancelled is a no-op.
+        slot = self._slot
+        if slot is not None:
+            del slot[self]
+            self._slot = None
+            self._wheel._count -= 1
+
+
+class TimerWheel(object):
+    """Hierarchical timing wheel.
+
+    A single greenthread drives all the timers scheduled on a wheel,
+    instead of one sleeping greenthread per timer.  Scheduling and
+    cancelling a timer are O(1).  The resolution is ``tick`` seconds and
+    a timer never fires early.
+
+    Callbacks are called in the greenthread of the wheel, one after
+    another.  They must not block; spawn a greenthread from the callback
+    for anything which may block.
+    """
+
+    def __init__(self, tick=0.01, slots=256, levels=4):
+        assert levels >= 2
+        self.tick = tick
+        self._slots = slots
+        self._levels = levels
+        # _spans[level] is the number of ticks per slot of the level.
+        self._spans = [slots ** level for level in range(levels + 1)]
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._ticks = 0     # number of ticks processed since _base
+        self._base = time.time()
+        self._count = 0
+        self._thread = None
+        self._idle = True
+        self._event = Event()
+
+    def __len__(self):
+        return self._count
+
+    def call_later(self, seconds, func, *args, **kwargs):
+        """Call func(*args, **kwargs) after seconds.
+
+        Returns a TimerHandle which can be used to cancel the call.
+        """
+        now = time.time()
+        was_idle = self._idle
+        if was_idle:
+            # The wheel stops ticking while it is empty.
+            self._base = now - self._ticks * self.tick
+            self._idle = False
+        expire = max(self._ticks + 1,
+                     int(math.ceil((now - self._base + seconds) / self.tick)))
+        timer = TimerHandle(expire, func, args, kwargs, self)
+        self._add(timer)
+        self._count += 1
+
+        if self._thread is None:
+            self._thread = spawn(self._run)
+        elif was_idle:
+            self._event.set()
+        return timer
+
+    def stop(self):
+        """Stop the wheel. Pending timers are discarded."""
+        if self._thread is not None:
+            kill(self._thread)
+            joinall([self._thread])
+            self._thread = None
+        for wheel in self._wheels:
+            for slot in wheel:
+                for timer in slot:
+                    timer._slot = None
+                slot.clear()
+        self._count = 0
+        self._idle = True
+
+    def _add(self, timer):
+        diff = timer.expire - self._ticks
+        level = 0
+        while level < self._levels - 1 and diff >= self._spans[level + 1]:
+            level += 1
+        position = timer.expire
+        if diff >= self._spans[self._levels]:
+            # Beyond the range of the wheel. Park it in the farthest slot;
+            # it is placed again when the slot is cascaded.
+            position = self._ticks + self._spans[self._levels] - 1
+        span = self._spans[level]
+        slot = self._wheels[level][(position // span) % self._slots]
+        slot[timer] = None
+        timer._slot = slot
+
+    def _advance(self):
+        self._ticks += 1
+        ticks = self._ticks
+
+        # Move timers of the upper level slot which has come down to the
+        # current tick into the lower levels.
+        for level in range(1, self._levels):
+            span = self._spans[level]
+            if ticks % span:
+                break
+            slot = self._wheels[level][(ticks // span) % self._slots]
+            timers = list(slot)
+            slot.clear()
+            for timer in timers:
+                self._add(timer)
+
+        slot = self._wheels[0][ticks % self._slots]
+        while slot:
+            timer, _ = slot.popitem()
+            timer._slot = None
+            self._count -= 1
+            try:
+                timer.func(*timer.args, **timer.kwargs)
+            except TaskExit:
+                raise
+            except Exception:
+                LOG.error('hub: uncaught exception in timer: %s',
+                          traceback.format_exc())
+
+    def _run(self):
+        while True:
+            if not self._count:
+                self._idle = True
+                self._event.clear()
+                self._event.wait()
+                continue
+
+            delay = self._base + (self._ticks + 1) * self.tick - time.time()
+            if delay > 0:
+                sleep(delay)
+            now_ticks = int((time.time() - self._base) / self.tick)
+            while self._ticks < now_ticks and self._count:
+                self._advance()
+
+
+_timer_wheel = None
+
+
+def call_later(seconds, func, *args, **kwargs):
+    """Call func(*args, **kwargs) after seconds on the shared TimerWheel.
+
+    Unlike spawn_after(), no greenthread is created for the call.  See
+    TimerWheel for the restrictions on func.
+    """
+    global _timer_wheel
+    if _timer_wheel is None:
+        _timer_wheel = TimerWheel()
+    return _timer_wheel.call_later(seconds, func, *args, **kwargs)
+
+
+class FutureTimeout(Exception):
+    """Raised when a Future is not done in time.
+
+    partial is the part of the result available at the timeout, if
+    any, e.g. the parts of a multipart reply received before it.
+    """
+
+    def __init__(self, partial=None):
+        super(FutureTimeout, self).__init__()
+        self.partial = partial
+
+
+class Future(object):
+    """The result of an operation which completes later.
+
+    Unlike concurrent.futures.Future, it is completed by a greenthread
+    of the hub and waited for by the others.
+    """
+
+    def __init__(self):
+        self._event = Event()
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+
+    def done(self):
+        return self._event.is_set()
+
+    def _complete(self):
+        self._event.set()
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception:
+                LOG.error('exception in future callback:\n%s',
+                          traceback.format_exc())
+
+    def set_result(self, result):
+        assert not self.done()
+        self._result = result
+        self._complete()
+
+    def set_exception(self, exception):
+        assert not self.done()
+        self._exception = exception
+        self._complete()
+
+    def add_done_callback(self, callback):
+        """Call callback(future) when this future is done."""
+        if self.done():
+            callback(self)
+        else:
+            self._callbacks.append(callback)
+
+    def exception(self, timeout=None):
+        if not self._event.wait(timeout):
+            raise FutureTimeout()
+        return self._exception
+
+    def result(self, timeout=None):
+        """Wait for the result.
+
+        Raises FutureTimeout if not done within timeout seconds, or the
+        exception set by set_exception().
+        """
+        if not self._event.wait(timeout):
+            raise FutureTimeout()
+        if self._exception is not None:
+            raise self._exception
+        return self._result
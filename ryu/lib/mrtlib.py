@@ -19,6 +19,7 @@ Information Export Format [RFC6396].
 """
 
 import abc
+import binascii
 import logging
 import struct
 import time
@@ -904,18 +905,37 @@ class MrtRibEntry(stringify.StringifyMixin):
     # peer_index, originated_time, path_id, attr_len
     _HEADER_FMT_ADDPATH = '!HIIH'
     HEADER_SIZE_ADDPATH = struct.calcsize(_HEADER_FMT_ADDPATH)
+    _opt_attributes = ['bgp_attributes']
 
     def __init__(self, peer_index, originated_time, bgp_attributes,
                  attr_len=None, path_id=None):
         self.peer_index = peer_index
         self.originated_time = originated_time
-        assert isinstance(bgp_attributes, (list, tuple))
-        for attr in bgp_attributes:
-            assert isinstance(attr, bgp._PathAttribute)
         self.bgp_attributes = bgp_attributes
         self.attr_len = attr_len
         self.path_id = path_id
 
+    @property
+    def bgp_attributes(self):
+        # The attributes of a parsed entry are parsed at the first access
+        if self._bgp_attributes is None:
+            bgp_attr_bin = self._bgp_attributes_bin
+            bgp_attributes = []
+            while bgp_attr_bin:
+                attr, bgp_attr_bin = bgp._PathAttribute.parser(bgp_attr_bin)
+                bgp_attributes.append(attr)
+            self._bgp_attributes = bgp_attributes
+            self._bgp_attributes_bin = None
+        return self._bgp_attributes
+
+    @bgp_attributes.setter
+    def bgp_attributes(self, bgp_attributes):
+        assert isinstance(bgp_attributes, (list, tuple))
+        for attr in bgp_attributes:
+            assert isinstance(attr, bgp._PathAttribute)
+        self._bgp_attributes = bgp_attributes
+        self._bgp_attributes_bin = None
+
     @classmethod
     def parse(cls, buf, is_addpath=False):
         path_id = None
@@ -928,19 +948,20 @@ class MrtRibEntry(stringify.StringifyMixin):
              attr_len) = struct.unpack_from(cls._HEADER_FMT_ADDPATH, buf)
             _header_size = cls.HEADER_SIZE_ADDPATH
 
-        bgp_attr_bin = buf[_header_size:_header_size + attr_len]
-        bgp_attributes = []
-        while bgp_attr_bin:
-            attr, bgp_attr_bin = bgp._PathAttribute.parser(bgp_attr_bin)
-            bgp_attributes.append(attr)
+        rib = cls(peer_index, originated_time, [], attr_len, path_id)
+        rib._bgp_attributes = None
+        rib._bgp_attributes_bin = buf[_header_size:_header_size + attr_len]
 
-        return cls(peer_index, originated_time, bgp_attributes,
-                   attr_len, path_id), buf[_header_size + attr_len:]
+        return rib, buf[_header_size + attr_len:]
 
     def serialize(self):
-        bgp_attrs_bin = bytearray()
-        for attr in self.bgp_attributes:
-            bgp_attrs_bin += attr.serialize()
+        if self._bgp_attributes is None:
+            # not parsed yet
+            bgp_attrs_bin = self._bgp_attributes_bin
+        else:
+            bgp_attrs_bin = bytearray()
+            for attr in self._bgp_attributes:
+                bgp_attrs_bin += attr.serialize()
         self.attr_len = len(bgp_attrs_bin)  # fixup
 
         if self.path_id is None:
@@ -1268,6 +1289,50 @@ class Bgp4MpMessageAs4LocalMrtMessage(Bgp4MpMessageAs4MrtMessage):
 # class Ospf3MrtMessage(MrtMessage):
 
 
+def _prefix_to_int(prefix_bin, bits):
+    # the prefix of bits as int, padded with 0s
+    prefix_bin = six.binary_type(prefix_bin)
+    prefix_bin += b'\x00' * (bits // 8 - len(prefix_bin))
+    return int(binascii.hexlify(prefix_bin), 16)
+
+
+class _PrefixRange(object):
+    # the prefixes in an IP network, e.g. '10.0.0.0/8'
+    def __init__(self, prefix):
+        net = netaddr.IPNetwork(prefix)
+        self.version = net.version
+        self.bits = 32 if net.version == 4 else 128
+        self.prefix_len = net.prefixlen
+        self._shift = self.bits - net.prefixlen
+        self._net = int(net.network) >> self._shift
+
+    def match(self, version, prefix_bin, prefix_len):
+        return (version == self.version and
+                prefix_len >= self.prefix_len and
+                _prefix_to_int(prefix_bin, self.bits) >> self._shift ==
+                self._net)
+
+
+# The subtypes of the AFI/SAFI specific RIB records of TABLE_DUMP_V2
+# and the IP version of them
+_TABLE_DUMP2_RIB_VERSIONS = {
+    TableDump2MrtRecord.SUBTYPE_RIB_IPV4_UNICAST: 4,
+    TableDump2MrtRecord.SUBTYPE_RIB_IPV4_MULTICAST: 4,
+    TableDump2MrtRecord.SUBTYPE_RIB_IPV6_UNICAST: 6,
+    TableDump2MrtRecord.SUBTYPE_RIB_IPV6_MULTICAST: 6,
+    TableDump2MrtRecord.SUBTYPE_RIB_IPV4_UNICAST_ADDPATH: 4,
+    TableDump2MrtRecord.SUBTYPE_RIB_IPV4_MULTICAST_ADDPATH: 4,
+    TableDump2MrtRecord.SUBTYPE_RIB_IPV6_UNICAST_ADDPATH: 6,
+    TableDump2MrtRecord.SUBTYPE_RIB_IPV6_MULTICAST_ADDPATH: 6,
+}
+
+# The subtypes (AFI) of the records of TABLE_DUMP and the IP version
+_TABLE_DUMP_VERSIONS = {
+    TableDumpMrtRecord.SUBTYPE_AFI_IPv4: 4,
+    TableDumpMrtRecord.SUBTYPE_AFI_IPv6: 6,
+}
+
+
 class Reader(object):
     """
     MRT format file reader.
@@ -1277,6 +1342,12 @@ class Reader(object):
     ========= ================================================
     f         File object which reading MRT format file
               in binary mode.
+    types     MRT types (e.g. MrtRecord.TYPE_TABLE_DUMP_V2) of the
+              records to read, or None for all types.
+    peers     IP addresses of the peers of the records to read,
+              or None for all peers.
+    prefix    IP network (e.g. '10.0.0.0/8') of the prefixes of
+              the RIB records to read, or None for all prefixes.
     ========= ================================================
 
     Example of Usage::
@@ -1289,30 +1360,106 @@ class Reader(object):
                 bz2.BZ2File('rib.YYYYMMDD.hhmm.bz2', 'rb')):
             print("%d, %s" % (count, record))
             count += 1
+
+    The file is read as a stream, and the records not to read are
+    skipped without being parsed.  The records of TABLE_DUMP,
+    BGP4MP and BGP4MP_ET are filtered by their peer IP addresses,
+    and the RIB entries of TABLE_DUMP_V2 by the peers of them in the
+    PEER_INDEX_TABLE, only the records with the RIB entries of the
+    peers are read.  The prefix filters the RIB records of TABLE_DUMP
+    and the AFI/SAFI-specific RIB records of TABLE_DUMP_V2, the
+    records of the other types and subtypes are not filtered by it.
+
+    The BGP attributes of the RIB entries of TABLE_DUMP_V2 are parsed
+    when accessed.
     """
 
-    def __init__(self, f):
+    def __init__(self, f, types=None, peers=None, prefix=None):
         self._f = f
+        self._types = None
+        if types is not None:
+            self._types = frozenset(types)
+        self._peers = None
+        if peers is not None:
+            self._peers = frozenset(ip.bin_to_text(ip.text_to_bin(p))
+                                    for p in peers)
+        # the indexes of the peers in the PEER_INDEX_TABLE
+        self._peer_indexes = frozenset()
+        self._prefix = None
+        if prefix is not None:
+            self._prefix = _PrefixRange(prefix)
 
     def __iter__(self):
         return self
 
     def next(self):
-        header_buf = self._f.read(MrtRecord.HEADER_SIZE)
-        if len(header_buf) < MrtRecord.HEADER_SIZE:
-            raise StopIteration()
-
-        # Hack to avoid eating memory up
-        self._f.seek(-MrtRecord.HEADER_SIZE, 1)
-        required_len = MrtRecord.parse_pre(header_buf)
-        buf = self._f.read(required_len)
-        record, _ = MrtRecord.parse(buf)
-
-        return record
+        while True:
+            header_buf = self._f.read(MrtRecord.HEADER_SIZE)
+            if len(header_buf) < MrtRecord.HEADER_SIZE:
+                raise StopIteration()
+
+            required_len = MrtRecord.parse_pre(header_buf)
+            buf = header_buf + self._f.read(
+                required_len - MrtRecord.HEADER_SIZE)
+            (_timestamp, type_, subtype,
+             _length) = struct.unpack_from(MrtRecord._HEADER_FMT, header_buf)
+            if self._types is not None and type_ not in self._types:
+                continue
+            if (self._prefix is not None and
+                    not self._match_prefix(type_, subtype, buf)):
+                continue
+
+            record, _ = MrtRecord.parse(buf)
+            if self._peers is not None and not self._match_peers(record):
+                continue
+
+            return record
 
     # for Python 3 compatible
     __next__ = next
 
+    def _match_prefix(self, type_, subtype, buf):
+        offset = MrtRecord.HEADER_SIZE
+        if type_ == MrtRecord.TYPE_TABLE_DUMP_V2:
+            version = _TABLE_DUMP2_RIB_VERSIONS.get(subtype)
+            if version is None:
+                return True
+            # seq_num, prefix_len, prefix
+            (prefix_len, ) = struct.unpack_from('!B', buf, offset + 4)
+            offset += 5
+            prefix_bin = buf[offset:offset + (prefix_len + 7) // 8]
+        elif type_ == MrtRecord.TYPE_TABLE_DUMP:
+            version = _TABLE_DUMP_VERSIONS.get(subtype)
+            if version is None:
+                return True
+            # view_num, seq_num, prefix, prefix_len
+            size = 4 if version == 4 else 16
+            prefix_bin = buf[offset + 4:offset + 4 + size]
+            (prefix_len, ) = struct.unpack_from('!B', buf,
+                                                offset + 4 + size)
+        else:
+            return True
+        return self._prefix.match(version, prefix_bin, prefix_len)
+
+    def _match_peers(self, record):
+        message = record.message
+        if isinstance(message, TableDump2PeerIndexTableMrtMessage):
+            self._peer_indexes = frozenset(
+                i for i, peer in enumerate(message.peer_entries)
+                if peer.ip_addr in self._peers)
+            return True
+        elif isinstance(message, (TableDump2AfiSafiSpecificRibMrtMessage,
+                                  TableDump2RibGenericMrtMessage)):
+            rib_entries = [e for e in message.rib_entries
+                           if e.peer_index in self._peer_indexes]
+            if len(rib_entries) != len(message.rib_entries):
+                message.rib_entries = rib_entries
+                message.entry_count = len(rib_entries)
+            return bool(rib_entries)
+        elif isinstance(message, (TableDumpMrtMessage, Bgp4MpMrtMessage)):
+            return message.peer_ip in self._peers
+        return True
+
     def close(self):
         self._f.close()
 
@@ -1320,6 +1467,40 @@ class Reader(object):
         self.close()
 
 
+def rib_routes(records):
+    """
+    Generate the routes of the RIB records of TABLE_DUMP_V2.
+
+    records is an iterable of MrtRecord, e.g. Reader.  Generates
+    (prefix, BGP attributes, next hop) of the first RIB entry of each
+    IPv4 and IPv6 unicast RIB record, which can be loaded into the BGP
+    speaker by BGPSpeaker.rib_load().  Filter the records by a peer
+    with Reader to load the RIB entries of the peer.
+    """
+    for record in records:
+        message = record.message
+        if not isinstance(message, _UNICAST_RIB_MESSAGES):
+            continue
+        if not message.rib_entries:
+            continue
+        bgp_attributes = message.rib_entries[0].bgp_attributes
+        next_hop = None
+        for attr in bgp_attributes:
+            if isinstance(attr, bgp.BGPPathAttributeNextHop):
+                next_hop = attr.value
+            elif isinstance(attr, bgp.BGPPathAttributeMpReachNLRI):
+                next_hop = attr.next_hop
+        yield message.prefix, bgp_attributes, next_hop
+
+
+_UNICAST_RIB_MESSAGES = (
+    TableDump2RibIPv4UnicastMrtMessage,
+    TableDump2RibIPv6UnicastMrtMessage,
+    TableDump2RibIPv4UnicastAddPathMrtMessage,
+    TableDump2RibIPv6UnicastAddPathMrtMessage,
+)
+
+
 class Writer(object):
     """
     MRT format file writer.
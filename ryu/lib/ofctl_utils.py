@@ -19,6 +19,7 @@ import logging
 import netaddr
 import six
 
+from ryu import exception
 from ryu.lib import dpid
 from ryu.lib import hub
 from ryu.ofproto import ofproto_v1_2
@@ -243,23 +244,24 @@ def send_msg(dp, msg, logger=None):
 
 
 def send_stats_request(dp, stats, waiters, msgs, logger=None):
+    # NOTE: waiters is deprecated and ignored; the replies are
+    # correlated to the request by Datapath.send_request().  It is kept
+    # for the compatibility of the callers.
     dp.set_xid(stats)
-    waiters_per_dp = waiters.setdefault(dp.id, {})
-    lock = hub.Event()
-    previous_msg_len = len(msgs)
-    waiters_per_dp[stats.xid] = (lock, msgs)
-    send_msg(dp, stats, logger)
-
-    lock.wait(timeout=DEFAULT_TIMEOUT)
-    current_msg_len = len(msgs)
-
-    while current_msg_len > previous_msg_len:
-        previous_msg_len = current_msg_len
-        lock.wait(timeout=DEFAULT_TIMEOUT)
-        current_msg_len = len(msgs)
-
-    if not lock.is_set():
-        del waiters_per_dp[stats.xid]
+    log = get_logger(logger)
+    log.debug('Sending request with xid(%x) to '
+              'datapath(' + dpid._DPID_FMT + '): %s', stats.xid, dp.id, stats)
+    future = dp.send_request(stats, timeout=DEFAULT_TIMEOUT)
+    try:
+        msgs.extend(future.result())
+    except hub.FutureTimeout as e:
+        # return the parts of a multipart reply received so far
+        msgs.extend(e.partial or [])
+        log.debug('No reply to xid(%x)', stats.xid)
+    except exception.OFPErrorReply as e:
+        log.debug('%s', e)
+    except exception.OFPDatapathClosed:
+        pass
 
 
 def str_to_int(str_num):
@@ -17,9 +17,34 @@
 import struct
 
 
+# format string -> struct.Struct
+_structs = {}
+_MAX_STRUCTS = 1024
+
+
+def get_struct(fmt):
+    """Return the compiled struct.Struct of fmt.
+
+    Structs are cached, so that a format string such as the *_PACK_STR
+    constants of ryu.ofproto.ofproto_v1_x is parsed only once.
+    """
+    try:
+        return _structs[fmt]
+    except KeyError:
+        if len(_structs) >= _MAX_STRUCTS:
+            # formats built at runtime, e.g. '!%ds' % len(data)
+            _structs.clear()
+        s = _structs[fmt] = struct.Struct(fmt)
+        return s
+
+
 def msg_pack_into(fmt, buf, offset, *args):
-    needed_len = offset + struct.calcsize(fmt)
+    try:
+        s = _structs[fmt]
+    except KeyError:
+        s = get_struct(fmt)
+    needed_len = offset + s.size
     if len(buf) < needed_len:
         buf += bytearray(needed_len - len(buf))
 
-    struct.pack_into(fmt, buf, offset, *args)
+    s.pack_into(buf, offset, *args)
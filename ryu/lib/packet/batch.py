@@ -0,0 +1,228 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Batch decoding of the header fields of many frames
+
+Batch extracts the ethertype, the VLAN ID, the IPv4 5-tuple and the
+lengths of frames into columns (array.array) without creating the
+protocol header objects of packet.Packet.  The packet.Packet of a frame
+is decoded only when asked by Batch.packet().
+
+Example of usage::
+
+    from ryu.lib import pcaplib
+    from ryu.lib.packet import batch
+    from ryu.lib.packet import in_proto
+
+    b = batch.Batch.from_pcap(pcaplib.Reader(open('test.pcap', 'rb')))
+    for i in range(len(b)):
+        if b.ip_proto[i] == in_proto.IPPROTO_TCP and b.dst_port[i] == 80:
+            print(b.ts[i], b.packet(i))
+"""
+
+import array
+import struct
+
+from . import ether_types
+from . import in_proto
+from . import packet
+
+# the name and the array typecode of the columns
+COLUMNS = (
+    ('ts', 'd'),            # timestamp, or 0.0 if not known
+    ('length', 'I'),        # length of the frame
+    ('eth_type', 'H'),      # ethertype after the VLAN tags
+    ('vlan_vid', 'H'),      # VID | OFPVID_PRESENT of the outer tag, or 0
+    ('ip_len', 'I'),        # total length of the IPv4/IPv6 packet
+    ('ip_proto', 'B'),      # protocol or next header of IPv4/IPv6
+    ('ipv4_src', 'I'),
+    ('ipv4_dst', 'I'),
+    ('src_port', 'H'),      # port of TCP/UDP/SCTP
+    ('dst_port', 'H'),
+)
+
+_OFPVID_PRESENT = 0x1000
+
+# ethernet, IPv4 without options and ports
+_ETH_IPV4_PORTS = struct.Struct('!12xHBxH2xHxB2xIIHH')
+_ETH_IPV4_PORTS_LEN = _ETH_IPV4_PORTS.size
+_ETH_TYPE = struct.Struct('!H')
+_VLAN = struct.Struct('!HH')
+_IPV4 = struct.Struct('!BxH2xHxB2xII')
+_IPV6 = struct.Struct('!4xHB')
+_PORTS = struct.Struct('!HH')
+
+_VLAN_TYPES = (ether_types.ETH_TYPE_8021Q, ether_types.ETH_TYPE_8021AD)
+_PORT_PROTOS = frozenset([in_proto.IPPROTO_TCP, in_proto.IPPROTO_UDP,
+                          in_proto.IPPROTO_SCTP])
+_TCP_UDP = (in_proto.IPPROTO_TCP, in_proto.IPPROTO_UDP)
+
+
+def _decode(buf):
+    # the header fields of a frame other than the fast path, which are
+    # 0 if not present or truncated, as the row of _ETH_IPV4_PORTS and
+    # the VLAN ID
+    eth_type = vlan_vid = ip_len = ip_proto = 0
+    ipv4_src = ipv4_dst = src_port = dst_port = 0
+    try:
+        (eth_type, ) = _ETH_TYPE.unpack_from(buf, 12)
+        offset = 14
+        while eth_type in _VLAN_TYPES:
+            tci, eth_type = _VLAN.unpack_from(buf, offset)
+            if not vlan_vid:
+                vlan_vid = (tci & 0xfff) | _OFPVID_PRESENT
+            offset += 4
+        if eth_type == ether_types.ETH_TYPE_IP:
+            (ver_ihl, ip_len, flags_off, ip_proto,
+             ipv4_src, ipv4_dst) = _IPV4.unpack_from(buf, offset)
+            offset += (ver_ihl & 0xf) * 4
+            if flags_off & 0x1fff:
+                # not the first fragment
+                offset = None
+        elif eth_type == ether_types.ETH_TYPE_IPV6:
+            payload_len, ip_proto = _IPV6.unpack_from(buf, offset)
+            ip_len = payload_len + 40
+            offset += 40
+        if ip_proto in _PORT_PROTOS and offset is not None:
+            src_port, dst_port = _PORTS.unpack_from(buf, offset)
+    except struct.error:
+        pass
+    return ((eth_type, 0, ip_len, 0, ip_proto,
+             ipv4_src, ipv4_dst, src_port, dst_port), vlan_vid)
+
+
+class Batch(object):
+    """
+    Columns of the header fields of frames
+
+    ================ =================================================
+    Argument         Description
+    ================ =================================================
+    frames           Iterable of the frames (bytes) to decode
+    ================ =================================================
+
+    The columns are array.array attributes named as COLUMNS, one item
+    per frame.  A field not in a frame, e.g. the ports of an ARP frame,
+    is 0.  The ports are not decoded from the fragments of IPv4 other
+    than the first one nor from IPv6 packets with extension headers.
+    """
+
+    def __init__(self, frames=None):
+        super(Batch, self).__init__()
+        self.frames = []
+        for name, typecode in COLUMNS:
+            setattr(self, name, array.array(typecode))
+        if frames is not None:
+            self.extend(frames)
+
+    def __len__(self):
+        return len(self.frames)
+
+    def extend(self, frames, ts=None, lengths=None):
+        """
+        Decode and append frames.
+
+        ts and lengths are sequences of the timestamps and the
+        original lengths of the frames, if known.
+        """
+        frames = list(frames)
+        rows = []
+        vlans = {}
+        add = rows.append
+        unpack = _ETH_IPV4_PORTS.unpack_from
+        fast_len = _ETH_IPV4_PORTS_LEN
+        tcp_udp = _TCP_UDP
+        for buf in frames:
+            if len(buf) >= fast_len:
+                row = unpack(buf)
+                # the most common: ethernet/IPv4/TCP or UDP without
+                # options nor fragments
+                if (row[0] == 0x0800 and row[1] == 0x45 and
+                        not row[3] & 0x1fff and row[4] in tcp_udp):
+                    add(row)
+                    continue
+            row, vlan_vid = _decode(buf)
+            if vlan_vid:
+                vlans[len(rows)] = vlan_vid
+            add(row)
+
+        # build the new items of all the columns before appending them,
+        # so that the columns stay aligned if a value does not fit
+        n = len(frames)
+        columns = dict((name, array.array(typecode))
+                       for name, typecode in COLUMNS)
+        columns['ts'].fromlist([0.0] * n if ts is None else list(ts))
+        columns['length'].fromlist(list(map(len, frames))
+                                   if lengths is None else list(lengths))
+        columns['vlan_vid'].fromlist([0] * n)
+        for i, vlan_vid in vlans.items():
+            columns['vlan_vid'][i] = vlan_vid
+        if n:
+            (eth_type, _ver_ihl, ip_len, _flags_off, ip_proto,
+             ipv4_src, ipv4_dst, src_port, dst_port) = zip(*rows)
+            columns['eth_type'].extend(eth_type)
+            columns['ip_len'].extend(ip_len)
+            columns['ip_proto'].extend(ip_proto)
+            columns['ipv4_src'].extend(ipv4_src)
+            columns['ipv4_dst'].extend(ipv4_dst)
+            columns['src_port'].extend(src_port)
+            columns['dst_port'].extend(dst_port)
+        for name, _typecode in COLUMNS:
+            getattr(self, name).extend(columns[name])
+        self.frames.extend(frames)
+
+    def packet(self, i):
+        """
+        Returns the packet.Packet of the i-th frame.
+        """
+        return packet.Packet(self.frames[i])
+
+    @classmethod
+    def from_pcap(cls, reader):
+        """
+        Decode the frames read by pcaplib.Reader.
+        """
+        ts = []
+        frames = []
+        for t, buf in reader:
+            ts.append(t)
+            frames.append(buf)
+        batch = cls()
+        batch.extend(frames, ts=ts)
+        return batch
+
+    @classmethod
+    def from_sflow(cls, samples):
+        """
+        Decode the sampled headers of sFlow.
+
+        samples is an iterable of xflow.sflow.sFlowV5RawPacketHeader.
+        The sampled headers of other than ethernet are skipped.  The
+        length column is the length of the original frame.
+        """
+        frames = []
+        lengths = []
+        for sample in samples:
+            if sample.header_protocol != 1:   # ETHERNET-ISO88023
+                continue
+            header = sample.header
+            if isinstance(header, tuple):
+                header = b''.join(header)
+            frames.append(header)
+            lengths.append(sample.frame_length)
+        batch = cls()
+        batch.extend(frames, lengths=lengths)
+        return batch
@@ -27,7 +27,6 @@ import base64
 import collections
 import copy
 import functools
-import io
 import itertools
 import math
 import re
@@ -872,6 +871,10 @@ class _LabelledAddrPrefix(_AddrPrefix):
 
 
 class _UnlabelledAddrPrefix(_AddrPrefix):
+    # (length, addr, wire format) of the last serialize().  A prefix is
+    # usually serialized once for each peer which it is advertised to.
+    _serialized = None
+
     @classmethod
     def _to_bin(cls, addr):
         return cls._prefix_to_bin((addr,))
@@ -881,8 +884,49 @@ class _UnlabelledAddrPrefix(_AddrPrefix):
         (addr,) = cls._prefix_from_bin(binaddr)
         return addr
 
+    @classmethod
+    def parse_prefixes(cls, buf):
+        """Returns the list of the prefixes encoded in buf.
+
+        Same as calling parser() until buf is consumed, without copying
+        the rest of buf for each prefix.
+        """
+        buf = six.binary_type(buf)
+        addr_len = cls._ADDR_LEN
+        family = cls._ADDR_FAMILY
+        inet_ntop = socket.inet_ntop
+        paddings = [b'\0' * (addr_len - i) for i in range(addr_len + 1)]
+        prefixes = []
+        offset = 0
+        buf_len = len(buf)
+        while offset < buf_len:
+            length = six.indexbytes(buf, offset)
+            offset += 1
+            end = offset + (length + 7) // 8
+            if length > addr_len * 8 or end > buf_len:
+                raise InvalidNetworkField(
+                    'invalid prefix length %d at offset %d'
+                    % (length, offset - 1))
+            binaddr = buf[offset:end]
+            prefixes.append(cls(
+                length, inet_ntop(family, binaddr + paddings[len(binaddr)])))
+            offset = end
+        return prefixes
+
+    def serialize(self):
+        serialized = self._serialized
+        if (serialized is not None and serialized[0] == self.length and
+                serialized[1] == self.addr):
+            return bytearray(serialized[2])
+        buf = super(_UnlabelledAddrPrefix, self).serialize()
+        self._serialized = (self.length, self.addr, six.binary_type(buf))
+        return buf
+
 
 class _IPAddrPrefix(_AddrPrefix):
+    _ADDR_LEN = 4
+    _ADDR_FAMILY = socket.AF_INET
+
     @staticmethod
     def _prefix_to_bin(addr):
         (addr,) = addr
@@ -894,6 +938,9 @@ class _IPAddrPrefix(_AddrPrefix):
 
 
 class _IP6AddrPrefix(_AddrPrefix):
+    _ADDR_LEN = 16
+    _ADDR_FAMILY = socket.AF_INET6
+
     @staticmethod
     def _prefix_to_bin(addr):
         (addr,) = addr
@@ -3404,6 +3451,17 @@ def _get_addr_class(afi, safi):
         return _BinAddrPrefix
 
 
+def _parse_nlri(addr_cls, buf):
+    # the list of the NLRI of addr_cls encoded in buf
+    if issubclass(addr_cls, _UnlabelledAddrPrefix):
+        return addr_cls.parse_prefixes(buf)
+    nlri = []
+    while buf:
+        n, buf = addr_cls.parser(buf)
+        nlri.append(n)
+    return nlri
+
+
 class _OptParam(StringifyMixin, TypeDisp, _Value):
     _PACK_STR = '!BB'  # type, length
 
@@ -3620,10 +3678,34 @@ class BGPWithdrawnRoute(IPAddrPrefix):
     pass
 
 
+# The wire format of the path attributes keyed by their class and
+# values.  The caches are cleared when they grow to _CACHE_SIZE.
+_CACHE_SIZE = 4096
+_serialized_attributes = {}
+
+# The types of the path attributes interned
+_INTERN_TYPES = frozenset([
+    BGP_ATTR_TYPE_ORIGIN,
+    BGP_ATTR_TYPE_AS_PATH,
+    BGP_ATTR_TYPE_NEXT_HOP,
+    BGP_ATTR_TYPE_MULTI_EXIT_DISC,
+    BGP_ATTR_TYPE_LOCAL_PREF,
+    BGP_ATTR_TYPE_COMMUNITIES,
+])
+
+
+def _cache(cache, key, value):
+    if len(cache) >= _CACHE_SIZE:
+        cache.clear()
+    cache[key] = value
+
+
 class _PathAttribute(StringifyMixin, TypeDisp, _Value):
     _PACK_STR = '!BB'  # flags, type
     _PACK_STR_LEN = '!B'  # length
     _PACK_STR_EXT_LEN = '!H'  # length w/ BGP_ATTR_FLAG_EXTENDED_LENGTH
+    _HDR = struct.Struct('!BBB')  # flags, type, length
+    _EXT_HDR = struct.Struct('!BBH')  # w/ BGP_ATTR_FLAG_EXTENDED_LENGTH
     _ATTR_FLAGS = None
 
     def __init__(self, value=None, flags=0, type_=None, length=None):
@@ -3652,7 +3734,70 @@ class _PathAttribute(StringifyMixin, TypeDisp, _Value):
         return subcls(flags=flags, type_=type_, length=length,
                       **subcls.parse_value(value)), rest
 
+    @classmethod
+    def parse_attributes(cls, buf, interned=None):
+        """Returns the list of the path attributes encoded in buf.
+
+        Same as calling parser() until buf is consumed, without copying
+        the rest of buf for each attribute.
+
+        If interned is a dict, the path attributes ORIGIN, AS_PATH,
+        NEXT_HOP, MULTI_EXIT_DISC, LOCAL_PREF and COMMUNITIES are
+        interned in it by their wire format, so that the attributes
+        parsed with the same dict share the same object for the same
+        bytes.  The interned attributes must not be modified.
+        """
+        buf = six.binary_type(buf)
+        attrs = []
+        offset = 0
+        buf_len = len(buf)
+        while offset < buf_len:
+            if six.indexbytes(buf, offset) & BGP_ATTR_FLAG_EXTENDED_LENGTH:
+                (flags, type_, length) = cls._EXT_HDR.unpack_from(buf,
+                                                                  offset)
+                start = offset + cls._EXT_HDR.size
+            else:
+                (flags, type_, length) = cls._HDR.unpack_from(buf, offset)
+                start = offset + cls._HDR.size
+            end = start + length
+            attr = None
+            if interned is not None and type_ in _INTERN_TYPES:
+                wire = buf[offset:end]
+                attr = interned.get(wire)
+            if attr is None:
+                subcls = cls._lookup_type(type_)
+                attr = subcls(flags=flags, type_=type_, length=length,
+                              **subcls.parse_value(buf[start:end]))
+                if interned is not None and type_ in _INTERN_TYPES:
+                    _cache(interned, wire, attr)
+            attrs.append(attr)
+            offset = end
+        return attrs
+
+    def _serialize_key(self):
+        # the values which serialize_value() depends on, by which the
+        # wire format is cached, or None not to cache it
+        return None
+
     def serialize(self):
+        key = self._serialize_key()
+        if key is not None:
+            key = (self.__class__, self.flags, self.type) + key
+            try:
+                serialized = _serialized_attributes.get(key)
+            except TypeError:
+                # unhashable value
+                return self._serialize()
+            if serialized is not None:
+                (self.flags, self.length, buf) = serialized
+                return bytearray(buf)
+        buf = self._serialize()
+        if key is not None:
+            _cache(_serialized_attributes, key,
+                   (self.flags, self.length, six.binary_type(buf)))
+        return buf
+
+    def _serialize(self):
         # fixup
         if self._ATTR_FLAGS is not None:
             self.flags = (
@@ -3691,12 +3836,18 @@ class BGPPathAttributeUnknown(_PathAttribute):
 class _PathAttributeUint32(_PathAttribute):
     _VALUE_PACK_STR = '!I'
 
+    def _serialize_key(self):
+        return (self.value,)
+
 
 @_PathAttribute.register_type(BGP_ATTR_TYPE_ORIGIN)
 class BGPPathAttributeOrigin(_PathAttribute):
     _VALUE_PACK_STR = '!B'
     _ATTR_FLAGS = BGP_ATTR_FLAG_TRANSITIVE
 
+    def _serialize_key(self):
+        return (self.value,)
+
 
 class _BGPPathAttributeAsPathCommon(_PathAttribute):
     _AS_SET = 1
@@ -3752,21 +3903,22 @@ class _BGPPathAttributeAsPathCommon(_PathAttribute):
     def _is_valid_16bit_as_path(cls, buf):
 
         two_byte_as_size = struct.calcsize('!H')
+        seg_hdr_size = struct.calcsize(cls._SEG_HDR_PACK_STR)
 
-        while buf:
+        buf = six.binary_type(buf)
+        offset = 0
+        while offset < len(buf):
             (type_, num_as) = struct.unpack_from(cls._SEG_HDR_PACK_STR,
-                                                 six.binary_type(buf))
+                                                 buf, offset)
 
             if type_ is not cls._AS_SET and type_ is not cls._AS_SEQUENCE:
                 return False
 
-            buf = buf[struct.calcsize(cls._SEG_HDR_PACK_STR):]
+            offset += seg_hdr_size + num_as * two_byte_as_size
 
-            if len(buf) < num_as * two_byte_as_size:
+            if offset > len(buf):
                 return False
 
-            buf = buf[num_as * two_byte_as_size:]
-
         return True
 
     @classmethod
@@ -3777,17 +3929,18 @@ class _BGPPathAttributeAsPathCommon(_PathAttribute):
             as_pack_str = '!H'
         else:
             as_pack_str = '!I'
+        as_size = struct.calcsize(as_pack_str)
+        seg_hdr_size = struct.calcsize(cls._SEG_HDR_PACK_STR)
 
-        while buf:
+        buf = six.binary_type(buf)
+        offset = 0
+        while offset < len(buf):
             (type_, num_as) = struct.unpack_from(cls._SEG_HDR_PACK_STR,
-                                                 six.binary_type(buf))
-            buf = buf[struct.calcsize(cls._SEG_HDR_PACK_STR):]
-            l = []
-            for _ in range(0, num_as):
-                (as_number,) = struct.unpack_from(as_pack_str,
-                                                  six.binary_type(buf))
-                buf = buf[struct.calcsize(as_pack_str):]
-                l.append(as_number)
+                                                 buf, offset)
+            offset += seg_hdr_size
+            l = list(struct.unpack_from('!%d%s' % (num_as, as_pack_str[1:]),
+                                        buf, offset))
+            offset += num_as * as_size
             if type_ == cls._AS_SET:
                 result.append(set(l))
             elif type_ == cls._AS_SEQUENCE:
@@ -3816,13 +3969,16 @@ class _BGPPathAttributeAsPathCommon(_PathAttribute):
             num_as = len(l)
             if num_as == 0:
                 continue
-            msg_pack_into(self._SEG_HDR_PACK_STR, buf, offset, type_, num_as)
-            offset += struct.calcsize(self._SEG_HDR_PACK_STR)
-            for i in l:
-                msg_pack_into(self._AS_PACK_STR, buf, offset, i)
-                offset += struct.calcsize(self._AS_PACK_STR)
+            buf += struct.pack(
+                '%s%d%s' % (self._SEG_HDR_PACK_STR, num_as,
+                            self._AS_PACK_STR[1:]), type_, num_as, *l)
         return buf
 
+    def _serialize_key(self):
+        # AS_SET and AS_SEQUENCE segments of the same AS numbers differ
+        return (self._AS_PACK_STR,) + tuple(
+            (isinstance(e, set), tuple(e)) for e in self.value)
+
 
 @_PathAttribute.register_type(BGP_ATTR_TYPE_AS_PATH)
 class BGPPathAttributeAsPath(_BGPPathAttributeAsPathCommon):
@@ -3872,6 +4028,9 @@ class BGPPathAttributeNextHop(_PathAttribute):
                       addrconv.ipv4.text_to_bin(self.value))
         return buf
 
+    def _serialize_key(self):
+        return (self.value,)
+
 
 @_PathAttribute.register_type(BGP_ATTR_TYPE_MULTI_EXIT_DISC)
 class BGPPathAttributeMultiExitDisc(_PathAttributeUint32):
@@ -3977,25 +4136,21 @@ class BGPPathAttributeCommunities(_PathAttribute):
 
     @classmethod
     def parse_value(cls, buf):
-        rest = buf
-        communities = []
         elem_size = struct.calcsize(cls._VALUE_PACK_STR)
-        while len(rest) >= elem_size:
-            (comm, ) = struct.unpack_from(cls._VALUE_PACK_STR,
-                                          six.binary_type(rest))
-            communities.append(comm)
-            rest = rest[elem_size:]
+        communities = list(struct.unpack_from(
+            '!%d%s' % (len(buf) // elem_size, cls._VALUE_PACK_STR[1:]),
+            six.binary_type(buf)))
         return {
             'communities': communities,
         }
 
     def serialize_value(self):
-        buf = bytearray()
-        for comm in self.communities:
-            bincomm = bytearray()
-            msg_pack_into(self._VALUE_PACK_STR, bincomm, 0, comm)
-            buf += bincomm
-        return buf
+        return bytearray(struct.pack(
+            '!%d%s' % (len(self.communities), self._VALUE_PACK_STR[1:]),
+            *self.communities))
+
+    def _serialize_key(self):
+        return tuple(self.communities)
 
     @staticmethod
     def is_no_export(comm_attr):
@@ -4799,8 +4954,7 @@ class BGPPathAttributeMpReachNLRI(_PathAttribute):
 
     @staticmethod
     def split_bin_with_len(buf, unit_len):
-        f = io.BytesIO(buf)
-        return [f.read(unit_len) for _ in range(0, len(buf), unit_len)]
+        return [buf[i:i + unit_len] for i in range(0, len(buf), unit_len)]
 
     @classmethod
     def parse_next_hop_ipv4(cls, buf, unit_len):
@@ -4829,10 +4983,7 @@ class BGPPathAttributeMpReachNLRI(_PathAttribute):
 
         nlri_bin = rest[cls._RESERVED_LENGTH:]
         addr_cls = _get_addr_class(afi, safi)
-        nlri = []
-        while nlri_bin:
-            n, nlri_bin = addr_cls.parser(nlri_bin)
-            nlri.append(n)
+        nlri = _parse_nlri(addr_cls, nlri_bin)
 
         rf = RouteFamily(afi, safi)
         if rf == RF_IPv4_VPN:
@@ -4865,7 +5016,8 @@ class BGPPathAttributeMpReachNLRI(_PathAttribute):
     def serialize_next_hop(self):
         buf = bytearray()
         for next_hop in self.next_hop_list:
-            if self.afi == addr_family.IP6:
+            if self.afi == addr_family.IP6 and ':' not in next_hop:
+                # IPv4-mapped IPv6 address
                 next_hop = str(netaddr.IPAddress(next_hop).ipv6())
             next_hop_bin = ip.text_to_bin(next_hop)
             if RouteFamily(self.afi, self.safi) in (RF_IPv4_VPN, RF_IPv6_VPN):
@@ -4950,10 +5102,7 @@ class BGPPathAttributeMpUnreachNLRI(_PathAttribute):
 
         nlri_bin = buf[struct.calcsize(cls._VALUE_PACK_STR):]
         addr_cls = _get_addr_class(afi, safi)
-        nlri = []
-        while nlri_bin:
-            n, nlri_bin = addr_cls.parser(nlri_bin)
-            nlri.append(n)
+        nlri = _parse_nlri(addr_cls, nlri_bin)
 
         return {
             'afi': afi,
@@ -5223,7 +5372,12 @@ class BGPMessage(packet_base.PacketBase, TypeDisp):
         self.type = type_
 
     @classmethod
-    def parser(cls, buf):
+    def parser(cls, buf, interned=None):
+        """Parses a BGP message from buf.
+
+        interned is passed to _PathAttribute.parse_attributes() to
+        intern the path attributes of UPDATE messages.
+        """
         if len(buf) < cls._HDR_LEN:
             raise stream_parser.StreamParser.TooSmallException(
                 '%d < %d' % (len(buf), cls._HDR_LEN))
@@ -5236,7 +5390,10 @@ class BGPMessage(packet_base.PacketBase, TypeDisp):
         binmsg = buf[cls._HDR_LEN:msglen]
         rest = buf[msglen:]
         subcls = cls._lookup_type(type_)
-        kwargs = subcls.parser(binmsg)
+        if interned is not None and subcls is BGPUpdate:
+            kwargs = subcls.parser(binmsg, interned=interned)
+        else:
+            kwargs = subcls.parser(binmsg)
         return subcls(marker=marker, len_=len_, type_=type_,
                       **kwargs), cls, rest
 
@@ -5423,7 +5580,7 @@ class BGPUpdate(BGPMessage):
         return self.pathattr_map.get(attr_name)
 
     @classmethod
-    def parser(cls, buf):
+    def parser(cls, buf, interned=None):
         offset = 0
         buf = six.binary_type(buf)
         (withdrawn_routes_len,) = struct.unpack_from('!H', buf, offset)
@@ -5434,19 +5591,11 @@ class BGPUpdate(BGPMessage):
         binpathattrs = buf[offset + 2:
                            offset + 2 + total_path_attribute_len]
         binnlri = buf[offset + 2 + total_path_attribute_len:]
-        withdrawn_routes = []
-        while binroutes:
-            r, binroutes = BGPWithdrawnRoute.parser(binroutes)
-            withdrawn_routes.append(r)
-        path_attributes = []
-        while binpathattrs:
-            pa, binpathattrs = _PathAttribute.parser(binpathattrs)
-            path_attributes.append(pa)
+        withdrawn_routes = BGPWithdrawnRoute.parse_prefixes(binroutes)
+        path_attributes = _PathAttribute.parse_attributes(binpathattrs,
+                                                           interned)
         offset += 2 + total_path_attribute_len
-        nlri = []
-        while binnlri:
-            n, binnlri = BGPNLRI.parser(binnlri)
-            nlri.append(n)
+        nlri = BGPNLRI.parse_prefixes(binnlri)
         return {
             "withdrawn_routes_len": withdrawn_routes_len,
             "withdrawn_routes": withdrawn_routes,
@@ -5660,6 +5809,13 @@ class StreamParser(stream_parser.StreamParser):
     Its parse method returns a list of BGPMessage subclass instances.
     """
 
+    HEADER_LEN = BGPMessage._HDR_LEN
+
+    def get_length(self, buf, offset):
+        (_marker, len_, _type) = struct.unpack_from(
+            BGPMessage._HDR_PACK_STR, buf, offset)
+        return len_
+
     def try_parse(self, data):
         msg, _, rest = BGPMessage.parser(data)
         return msg, rest
@@ -14,6 +14,7 @@
 # limitations under the License.
 
 import inspect
+import itertools
 import struct
 import base64
 
@@ -38,6 +39,27 @@ for _, m in mod:
     cls_list.extend(list(cl))
 PKT_CLS_DICT = dict(cls_list)
 
+_PKT_CLS_SET = frozenset(PKT_CLS_DICT.values())
+
+
+def _is_pkt_cls(protocol):
+    # Whether protocol is one of the protocol header classes, without
+    # issubclass() of PacketBase, which is slow for ABCMeta
+    try:
+        return protocol in _PKT_CLS_SET
+    except TypeError:
+        return False
+
+
+def _is_padding(buf):
+    # Whether buf is empty or all 0s.  Only a buffer starting with 0 is
+    # copied to check.
+    if not buf:
+        return True
+    if buf[0] not in (0, b'\x00'):
+        return False
+    return not six.binary_type(buf).strip(b'\x00')
+
 
 class Packet(StringifyMixin):
     """A packet decoder/encoder class.
@@ -51,36 +73,125 @@ class Packet(StringifyMixin):
     The payload is a bytearray.  They are iterated in on-wire order.
 
     *data* should be omitted when encoding a packet.
+
+    *max_layer* limits the number of protocol headers decoded.  The data
+    following them is the payload.
+
+    When *lazy* is True, the protocol headers are decoded when they are
+    accessed.  get_protocol() decodes them only until the one asked for
+    is found.
     """
 
     # Ignore data field when outputting json representation.
     _base_attributes = ['data']
-
-    def __init__(self, data=None, protocols=None, parse_cls=ethernet.ethernet):
+    _opt_attributes = ['protocols']
+
+    # The state of the decoding in progress
+    _parsing = False
+    _parse_cls = None
+    _rest_data = None
+    _max_layer = None
+
+    # Maps the class of each protocol header, and its base classes, to
+    # the index of the first header which is an instance of it.  It is
+    # made again when the length of protocols is found changed.
+    _index = None
+    _index_len = 0
+
+    def __init__(self, data=None, protocols=None, parse_cls=ethernet.ethernet,
+                 max_layer=None, lazy=False):
         super(Packet, self).__init__()
         self.data = data
         if protocols is None:
-            self.protocols = []
+            self._protocols = []
         else:
-            self.protocols = protocols
+            self._protocols = protocols
         if self.data:
-            self._parser(parse_cls)
-
-    def _parser(self, cls):
-        rest_data = self.data
-        while cls:
-            # Ignores an empty buffer
-            if not six.binary_type(rest_data).strip(b'\x00'):
-                break
+            self._parsing = True
+            self._parse_cls = parse_cls
+            self._rest_data = self.data
+            self._max_layer = max_layer
+            if not lazy:
+                self._parser()
+
+    @property
+    def protocols(self):
+        if self._parsing:
+            self._parser()
+        return self._protocols
+
+    @protocols.setter
+    def protocols(self, protocols):
+        self._parsing = False
+        self._rest_data = None
+        self._protocols = protocols
+        self._index = None
+
+    def _get_index(self):
+        index = self._index
+        if index is not None and self._index_len == len(self._protocols):
+            return index
+        index = self._index = {}
+        for i, proto in enumerate(self._protocols):
+            self._add_index(proto, i)
+        self._index_len = len(self._protocols)
+        return index
+
+    def _lookup(self, protocol):
+        index = self._index
+        if index is None or self._index_len != len(self._protocols):
+            index = self._get_index()
+        try:
+            i = index.get(protocol)
+        except TypeError:
+            # unhashable protocol header instance
+            return None
+        if i is not None and not isinstance(self._protocols[i], protocol):
+            # replaced in the list of protocols directly
+            self._index = None
+            i = self._get_index().get(protocol)
+        return i
+
+    def _add_index(self, proto, i):
+        if isinstance(proto, packet_base.PacketBase):
+            setdefault = self._index.setdefault
+            for cls in proto.__class__.__mro__:
+                setdefault(cls, i)
+
+    def _append(self, proto):
+        self._get_index()
+        self._protocols.append(proto)
+        self._add_index(proto, self._index_len)
+        self._index_len += 1
+
+    def _parser(self):
+        while self._parsing:
+            self._parse_layer()
+
+    def _parse_layer(self):
+        # Decodes the next protocol header, or ends the decoding
+        cls = self._parse_cls
+        rest_data = self._rest_data
+        # Ignores an empty buffer
+        if (cls and not _is_padding(rest_data) and
+                (self._max_layer is None or self._max_layer > 0)):
             try:
-                proto, cls, rest_data = cls.parser(rest_data)
+                proto, self._parse_cls, self._rest_data = cls.parser(
+                    rest_data)
             except struct.error:
-                break
-            if proto:
-                self.protocols.append(proto)
+                pass
+            else:
+                if proto:
+                    self._append(proto)
+                if self._max_layer is not None:
+                    self._max_layer -= 1
+                return
+        self._parsing = False
+        self._parse_cls = None
+        self._rest_data = None
         # If rest_data is all padding, we ignore rest_data
-        if rest_data and six.binary_type(rest_data).strip(b'\x00'):
-            self.protocols.append(rest_data)
+        if not _is_padding(rest_data):
+            self._append(rest_data)
 
     def serialize(self):
         """Encode a packet and store the resulted bytearray in self.data.
@@ -126,24 +237,41 @@ class Packet(StringifyMixin):
         self.serialize.
         """
 
-        self.protocols.append(proto)
+        if self._parsing:
+            self._parser()
+        self._append(proto)
 
     def get_protocols(self, protocol):
         """Returns a list of protocols that matches to the specified protocol.
         """
-        if isinstance(protocol, packet_base.PacketBase):
-            protocol = protocol.__class__
-        assert issubclass(protocol, packet_base.PacketBase)
-        return [p for p in self.protocols if isinstance(p, protocol)]
+        protocols = self.protocols
+        first = self._lookup(protocol)
+        if first is None:
+            if isinstance(protocol, packet_base.PacketBase):
+                protocol = protocol.__class__
+            assert issubclass(protocol, packet_base.PacketBase)
+            first = self._lookup(protocol)
+            if first is None:
+                return []
+        return [p for p in protocols[first:] if isinstance(p, protocol)]
 
     def get_protocol(self, protocol):
         """Returns the firstly found protocol that matches to the
         specified protocol.
         """
-        result = self.get_protocols(protocol)
-        if len(result) > 0:
-            return result[0]
-        return None
+        i = self._lookup(protocol)
+        if i is None:
+            if not _is_pkt_cls(protocol):
+                if isinstance(protocol, packet_base.PacketBase):
+                    protocol = protocol.__class__
+                assert issubclass(protocol, packet_base.PacketBase)
+                i = self._lookup(protocol)
+            while i is None:
+                if not self._parsing:
+                    return None
+                self._parse_layer()
+                i = self._lookup(protocol)
+        return self._protocols[i]
 
     def __div__(self, trailer):
         self.add_protocol(trailer)
@@ -160,18 +288,27 @@ class Packet(StringifyMixin):
 
     def __setitem__(self, idx, item):
         self.protocols[idx] = item
+        self._index = None
 
     def __delitem__(self, idx):
         del self.protocols[idx]
+        self._index = None
 
     def __len__(self):
         return len(self.protocols)
 
     def __contains__(self, protocol):
-        if (inspect.isclass(protocol) and
+        protocols = self.protocols
+        first = self._lookup(protocol)
+        if first is not None:
+            # only the instances of the class itself
+            return any(p.__class__ is protocol
+                       for p in itertools.islice(protocols, first, None))
+        if _is_pkt_cls(protocol) or (
+                inspect.isclass(protocol) and
                 issubclass(protocol, packet_base.PacketBase)):
-            return protocol in [p.__class__ for p in self.protocols]
-        return protocol in self.protocols
+            return False
+        return protocol in protocols
 
     def __str__(self):
         return ', '.join(repr(protocol) for protocol in self.protocols)
@@ -13,9 +13,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import array
+import binascii
 import six
-import socket
 import struct
 from ryu.lib import addrconv
 
@@ -25,15 +24,49 @@ def carry_around_add(a, b):
     return (c & 0xffff) + (c >> 16)
 
 
-def checksum(data):
-    data = six.binary_type(data)    # input can be bytearray.
+if six.PY2:
+    def _to_int(data):
+        return int(binascii.hexlify(data) or '0', 16)
+else:
+    def _to_int(data):
+        return int.from_bytes(data, 'big')
+
+
+def _sum16(data):
+    # The one's complement sum of the 16 bit words of data.  The sum of
+    # the digits of a number in base 0x10000 is equal to the number
+    # modulo 0xffff, so the sum is made by a long integer from data.
+    try:
+        n = _to_int(data)
+    except TypeError:
+        data = six.binary_type(data)
+        n = _to_int(data)
     if len(data) % 2:
-        data += b'\x00'
+        n <<= 8
+    # 0xffff (-0) for a sum of words which are not all 0
+    return n % 0xffff or (n and 0xffff)
+
+
+def checksum(data):
+    return ~_sum16(data) & 0xffff
+
 
-    s = sum(array.array('H', data))
+def checksum_update(csum, old, new):
+    """
+    update the Internet checksum csum for data changed from old to new
+
+    The incremental update of RFC 1624 (eqn. 3) for rewriting a field
+    of the data without checksumming it again.  old and new are bytes
+    of the same length at an even offset in the data, or 16 bit words
+    as int.
+    """
+    if not isinstance(old, six.integer_types):
+        assert len(old) == len(new)
+        old = _sum16(old)
+        new = _sum16(new)
+    s = (~csum & 0xffff) + (~old & 0xffff) + new
     s = (s & 0xffff) + (s >> 16)
-    s += (s >> 16)
-    return socket.ntohs(~s & 0xffff)
+    return ~((s & 0xffff) + (s >> 16)) & 0xffff
 
 
 # avoid circular import
@@ -96,8 +129,8 @@ def checksum_ip(ipvx, length, payload):
     else:
         raise ValueError('Unknown IP version %d' % ipvx.version)
 
-    buf = header + payload
-    return checksum(buf)
+    # the length of the header is even
+    return ~carry_around_add(_sum16(header), _sum16(payload)) & 0xffff
 
 
 _MODX = 4102
@@ -16,9 +16,146 @@
 
 
 from abc import ABCMeta, abstractmethod
+import struct
+
 import six
 
 
+def length_field(fmt):
+    """Returns a length extractor of Framer which unpacks the message
+    length with the struct format fmt, e.g. '!2xH' for the uint16_t
+    at the offset 2 of the header.
+    """
+    unpack_from = struct.Struct(fmt).unpack_from
+
+    def _get_length(buf, offset):
+        return unpack_from(buf, offset)[0]
+
+    return _get_length
+
+
+class Framer(object):
+    """Framing of the length-prefixed messages of a byte stream.
+
+    ================ =================================================
+    Argument         Description
+    ================ =================================================
+    header_len       Length of the header which has the message length
+    get_length       Callable (buf, offset) returning the length of
+                     the message, including the header, at the offset
+                     of buf, e.g. made by length_field().  It may raise
+                     an exception for a malformed header.  If None,
+                     the data is not framed, for a decoder which frames
+                     the messages by itself, e.g. msgpack.Unpacker.
+    size             Initial size of the buffer
+    ================ =================================================
+
+    The data is received into a buffer with recv_into(), or copied into
+    it with feed(), and frames() yields the complete messages in it as
+    memoryview slices of the buffer.  The buffer is reused from its
+    beginning once all the data in it is consumed, and a partial message
+    at its end is moved to the beginning when there is no room, so the
+    slices are valid only until the next recv_into() or feed().
+
+    Example of usage::
+
+        framer = Framer(8, length_field('!2xH'))
+        while framer.recv_into(sock):
+            for frame in framer.frames():
+                handle(frame.tobytes())
+    """
+
+    # the minimum room for a recv_into()
+    _MIN_RECV = 4096
+
+    def __init__(self, header_len=0, get_length=None, size=16384):
+        super(Framer, self).__init__()
+        self.header_len = header_len
+        self._get_length = get_length
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self._head = 0
+        self._tail = 0
+
+    def __len__(self):
+        # the number of the bytes not yet consumed by frames()
+        return self._tail - self._head
+
+    def _reserve(self, size):
+        if self._tail + size <= len(self._buf):
+            return
+        pending = self._tail - self._head
+        buf_size = len(self._buf)
+        if pending + size <= buf_size:
+            # the size of the buffer can not be changed as _view exports
+            # it, but the items can
+            self._buf[:pending] = self._buf[self._head:self._tail]
+        else:
+            while buf_size < pending + size:
+                buf_size *= 2
+            buf = bytearray(buf_size)
+            buf[:pending] = self._view[self._head:self._tail]
+            self._buf = buf
+            self._view = memoryview(buf)
+        self._head = 0
+        self._tail = pending
+
+    def recv_into(self, sock):
+        """
+        Receives data from the socket sock into the buffer.
+
+        Returns the number of the bytes received, which is 0 if the
+        connection is closed.  The exceptions of sock are not caught.
+        """
+        self._reserve(self._MIN_RECV)
+        n = sock.recv_into(self._view[self._tail:])
+        self._tail += n
+        return n
+
+    def feed(self, data):
+        """
+        Copies data (bytes) read from the stream into the buffer.
+        """
+        n = len(data)
+        self._reserve(n)
+        self._buf[self._tail:self._tail + n] = data
+        self._tail += n
+
+    def frames(self):
+        """
+        Yields the complete messages in the buffer as memoryview.
+
+        Raises ValueError for a message length shorter than the header.
+        The data of a partial message is kept for the next call.
+        Without get_length, yields all the data in the buffer at once.
+        """
+        if self._get_length is None:
+            if self._tail > self._head:
+                frame = self._view[self._head:self._tail]
+                self._head = self._tail = 0
+                yield frame
+            return
+
+        buf = self._buf
+        view = self._view
+        header_len = self.header_len
+        get_length = self._get_length
+        head = self._head
+        tail = self._tail
+        while tail - head >= header_len:
+            length = get_length(buf, head)
+            if length < header_len:
+                raise ValueError('invalid message length %d' % length)
+            end = head + length
+            if end > tail:
+                break
+            self._head = end
+            yield view[head:end]
+            head = end
+        if self._head == self._tail:
+            self._head = self._tail = 0
+
+
 @six.add_metaclass(ABCMeta)
 class StreamParser(object):
     """Streaming parser base class.
@@ -34,8 +171,26 @@ class StreamParser(object):
     class TooSmallException(Exception):
         pass
 
+    # The length of the header with the message length, given by
+    # get_length().  If a subclass sets it, the messages are framed by
+    # Framer and try_parse() is called with a complete message only.
+    # None, the default, means no framing: try_parse() is called with
+    # all the data received so far.
+    HEADER_LEN = None
+
+    # Callable (buf, offset) returning the length of the message at the
+    # offset of buf, as the get_length argument of Framer.  A subclass
+    # which sets HEADER_LEN overrides it with a method.
+    get_length = None
+
     def __init__(self):
         self._q = bytearray()
+        self._framer = None
+        if self.HEADER_LEN is not None:
+            if self.get_length is None:
+                raise TypeError('%s sets HEADER_LEN without get_length'
+                                % self.__class__.__name__)
+            self._framer = Framer(self.HEADER_LEN, self.get_length)
 
     def parse(self, data):
         """Tries to extract messages from a raw byte stream.
@@ -50,7 +205,15 @@ class StreamParser(object):
         kept internally and will be used when more data is come.
         I.e. next time this method is called again.
         """
-        self._q.append(data)
+        if isinstance(data, six.integer_types):
+            # an item of bytes on Python 3
+            data = six.int2byte(data)
+        if self._framer is not None:
+            self._framer.feed(data)
+            return [self.try_parse(frame.tobytes())[0]
+                    for frame in self._framer.frames()]
+
+        self._q += data
         msgs = []
         while True:
             try:
@@ -35,12 +35,42 @@ Reference source: http://wiki.wireshark.org/Development/LibpcapFileFormat
                 +---------------------+
                 |          ...        |
                 +---------------------+
+
+Reader also reads the PCAP Next Generation (pcapng) files.
+Reference source: https://github.com/pcapng/pcapng
 """
 
+import array
+import mmap
 import struct
 import sys
 import time
 
+# pcapng block types
+_PCAPNG_SHB = 0x0a0d0d0a    # Section Header Block
+_PCAPNG_IDB = 0x00000001    # Interface Description Block
+_PCAPNG_PB = 0x00000002     # Packet Block (obsolete)
+_PCAPNG_SPB = 0x00000003    # Simple Packet Block
+_PCAPNG_EPB = 0x00000006    # Enhanced Packet Block
+
+_PCAPNG_MAGIC = b'\x0a\x0d\x0d\x0a'
+_PCAPNG_BYTE_ORDER_MAGIC_BIG = b'\x1a\x2b\x3c\x4d'
+_PCAPNG_BYTE_ORDER_MAGIC_LITTLE = b'\x4d\x3c\x2b\x1a'
+_PCAPNG_OPT_IF_TSRESOL = 9
+
+# the size of the writes of Writer.write_pkts()
+_WRITE_BUFSIZE = 1024 * 1024
+# the size of the reads to skip the bytes of a stream
+_SKIP_BUFSIZE = 1024 * 1024
+
+# the array typecode of the offsets of the records
+try:
+    array.array('Q')
+    _INDEX_TYPECODE = 'Q'
+except ValueError:
+    # Python 2
+    _INDEX_TYPECODE = 'L'
+
 
 class PcapFileHdr(object):
     """
@@ -83,6 +113,10 @@ class PcapFileHdr(object):
     MAGIC_NUMBER_IDENTICAL = b'\xa1\xb2\xc3\xd4'  # Big Endian
     MAGIC_NUMBER_SWAPPED = b'\xd4\xc3\xb2\xa1'    # Little Endian
 
+    # The timestamps are in nanoseconds instead of microseconds.
+    MAGIC_NUMBER_IDENTICAL_NSEC = b'\xa1\xb2\x3c\x4d'  # Big Endian
+    MAGIC_NUMBER_SWAPPED_NSEC = b'\x4d\x3c\xb2\xa1'    # Little Endian
+
     def __init__(self, magic=MAGIC_NUMBER_SWAPPED, version_major=2,
                  version_minor=4, thiszone=0, sigfigs=0, snaplen=0,
                  network=0):
@@ -97,11 +131,13 @@ class PcapFileHdr(object):
     @classmethod
     def parser(cls, buf):
         magic_buf = buf[:4]
-        if magic_buf == cls.MAGIC_NUMBER_IDENTICAL:
+        if magic_buf in (cls.MAGIC_NUMBER_IDENTICAL,
+                         cls.MAGIC_NUMBER_IDENTICAL_NSEC):
             # Big Endian
             fmt = cls._FILE_HDR_FMT_BIG_ENDIAN
             byteorder = 'big'
-        elif magic_buf == cls.MAGIC_NUMBER_SWAPPED:
+        elif magic_buf in (cls.MAGIC_NUMBER_SWAPPED,
+                           cls.MAGIC_NUMBER_SWAPPED_NSEC):
             # Little Endian
             fmt = cls._FILE_HDR_FMT_LITTLE_ENDIAN
             byteorder = 'little'
@@ -190,6 +226,22 @@ class PcapPktHdr(object):
                            self.incl_len, self.orig_len)
 
 
+def _mmap(file_obj):
+    # The read only map of the file, or None if file_obj is not a
+    # regular file, e.g. a pipe or io.BytesIO.
+    try:
+        return mmap.mmap(file_obj.fileno(), 0, access=mmap.ACCESS_READ)
+    except (AttributeError, EnvironmentError, ValueError):
+        return None
+
+
+def _ts_divisor(tsresol):
+    # the number of the units of if_tsresol of pcapng in a second
+    if tsresol & 0x80:
+        return 2 ** (tsresol & 0x7f)
+    return 10 ** tsresol
+
+
 class Reader(object):
     """
     PCAP file reader
@@ -213,35 +265,220 @@ class Reader(object):
             frame_count += 1
             pkt = packet.Packet(buf)
             print("%d, %f, %s" % (frame_count, ts, pkt))
+
+    The file is mapped into memory if possible, or read as a stream,
+    record by record, otherwise, so captures larger than the memory
+    can be read.  Both the PCAP files and the pcapng files are read.
+    pcap_header is None for a pcapng file.
+
+    The records can also be accessed at random, e.g. ``reader[i]`` and
+    ``reader.count()``, if the file is seekable.  The index of the
+    records is made by scanning the file at the first random access.
     """
 
     def __init__(self, file_obj):
         self._fp = file_obj
-        buf = self._fp.read(PcapFileHdr.FILE_HDR_SIZE)
-        # Read only pcap file header
-        self.pcap_header, self._file_byteorder = PcapFileHdr.parser(buf)
-        # Read pcap data with out header
-        self._pcap_body = self._fp.read()
-        self._fp.close()
-        self._next_pos = 0
+        self._map = _mmap(file_obj)
+        self._fp_pos = 0
+        # the offset and the bytes of the last read of the stream
+        self._last = (0, b'')
+        self._index = None
+        self._index_sections = None
+        magic = self._read_at(0, 4)
+        if magic == _PCAPNG_MAGIC:
+            self.pcap_header = None
+            self._file_byteorder = None
+            self._records = self._pcapng_records
+            self._first = 0
+        else:
+            buf = magic + self._read_at(4, PcapFileHdr.FILE_HDR_SIZE - 4)
+            # Read only pcap file header
+            self.pcap_header, self._file_byteorder = PcapFileHdr.parser(buf)
+            if self._file_byteorder == 'big':
+                self._pkt_hdr = struct.Struct(
+                    PcapPktHdr._PKT_HDR_FMT_BIG_ENDIAN)
+            else:
+                self._pkt_hdr = struct.Struct(
+                    PcapPktHdr._PKT_HDR_FMT_LITTLE_ENDIAN)
+            if magic in (PcapFileHdr.MAGIC_NUMBER_IDENTICAL_NSEC,
+                         PcapFileHdr.MAGIC_NUMBER_SWAPPED_NSEC):
+                self._ts_div = 1e9
+            else:
+                self._ts_div = 1e6
+            self._records = self._pcap_records
+            self._first = PcapFileHdr.FILE_HDR_SIZE
+        self._iter = self._records(self._first)
 
     def __iter__(self):
         return self
 
     def next(self):
-        try:
-            pkt_hdr, pkt_data = PcapPktHdr.parser(
-                self._pcap_body[self._next_pos:], self._file_byteorder)
-            self._next_pos += pkt_hdr.incl_len + PcapPktHdr.PKT_HDR_SIZE
-
-        except IndexError:
-            raise StopIteration()
-
-        return pkt_hdr.ts_sec + (pkt_hdr.ts_usec / 1e6), pkt_data
+        _offset, _section, ts, buf = next(self._iter)
+        return ts, buf
 
     # for Python 3 compatible
     __next__ = next
 
+    def count(self):
+        """
+        Returns the number of the records.
+
+        The file must be seekable.  It is scanned to make the index of
+        the records at the first call.
+        """
+        return len(self._get_index())
+
+    def __getitem__(self, i):
+        offset = self._get_index()[i]
+        section = None
+        if self._index_sections is not None:
+            section = self._index_sections[i]
+        _offset, _section, ts, buf = next(self._records(offset, section))
+        return ts, buf
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._fp.close()
+
+    def _read_at(self, offset, size):
+        if self._map is not None:
+            return self._map[offset:offset + size]
+        # The file is read in order while iterating, so that a stream
+        # which is not seekable can be read: the bytes skipped are read
+        # and discarded, and the headers read again, e.g. the magic and
+        # the block headers of pcapng, are in the bytes read last.
+        pos = self._fp_pos
+        buf = b''
+        if offset < pos:
+            last_offset, last = self._last
+            if last_offset <= offset:
+                buf = last[offset - last_offset:offset - last_offset + size]
+                if len(buf) == size:
+                    return buf
+                offset, size = pos, size - len(buf)
+            else:
+                # random access
+                self._fp.seek(offset)
+                pos = offset
+        start = offset - len(buf)
+        while pos < offset:
+            skipped = self._fp.read(min(offset - pos, _SKIP_BUFSIZE))
+            if not skipped:
+                break
+            pos += len(skipped)
+        if pos < offset:
+            # the end of the file
+            self._fp_pos = pos
+            return buf
+        while size > 0:
+            more = self._fp.read(size)
+            if not more:
+                break
+            buf += more
+            size -= len(more)
+        self._fp_pos = start + len(buf)
+        self._last = (start, buf)
+        return buf
+
+    def _get_index(self):
+        if self._index is None:
+            index = array.array(_INDEX_TYPECODE)
+            sections = []
+            for offset, section, _ts, _buf in self._records(
+                    self._first, data=False):
+                index.append(offset)
+                sections.append(section)
+            self._index = index
+            if self.pcap_header is None:
+                # pcapng
+                self._index_sections = sections
+        return self._index
+
+    def _pcap_records(self, offset, section=None, data=True):
+        # yields the offset, None, the timestamp and the data of the
+        # records from offset
+        read = self._read_at
+        unpack = self._pkt_hdr.unpack
+        hdr_size = self._pkt_hdr.size
+        ts_div = self._ts_div
+        while True:
+            hdr = read(offset, hdr_size)
+            if len(hdr) < hdr_size:
+                return
+            ts_sec, ts_frac, incl_len, _orig_len = unpack(hdr)
+            buf = read(offset + hdr_size, incl_len) if data else None
+            yield offset, None, ts_sec + (ts_frac / ts_div), buf
+            offset += hdr_size + incl_len
+
+    def _pcapng_records(self, offset, section=None, data=True):
+        # yields the offset, the section, the timestamp and the data of
+        # the packet blocks from offset.  The section is the byte order
+        # and the interfaces of the Section Header Block, and the
+        # interfaces are the snaplen and the units of the timestamps in
+        # a second for the Interface Description Blocks.
+        read = self._read_at
+        if section is None:
+            section = ('<', [])
+        while True:
+            hdr = read(offset, 12)
+            if len(hdr) < 12:
+                return
+            if hdr[:4] == _PCAPNG_MAGIC:
+                bom = hdr[8:12]
+                if bom == _PCAPNG_BYTE_ORDER_MAGIC_LITTLE:
+                    section = ('<', [])
+                elif bom == _PCAPNG_BYTE_ORDER_MAGIC_BIG:
+                    section = ('>', [])
+                else:
+                    raise struct.error('Invalid byte ordered pcapng file.')
+            order, interfaces = section
+            block_type, block_len = struct.unpack_from(order + 'II', hdr)
+            if block_len < 12:
+                raise struct.error('Invalid pcapng block length %d'
+                                   % block_len)
+
+            if block_type == _PCAPNG_EPB or block_type == _PCAPNG_PB:
+                if block_type == _PCAPNG_EPB:
+                    fmt = order + 'IIIII'
+                else:
+                    fmt = order + 'H2xIIII'
+                (if_id, ts_high, ts_low, cap_len,
+                 _orig_len) = struct.unpack(fmt, read(offset + 8, 20))
+                _snaplen, ts_div = interfaces[if_id]
+                ts_sec, ts_frac = divmod((ts_high << 32) | ts_low, ts_div)
+                buf = read(offset + 28, cap_len) if data else None
+                yield offset, section, ts_sec + ts_frac / float(ts_div), buf
+            elif block_type == _PCAPNG_SPB:
+                (orig_len, ) = struct.unpack_from(order + 'I', hdr, 8)
+                cap_len = min(orig_len, block_len - 16)
+                snaplen, _ts_div = interfaces[0]
+                if snaplen:
+                    cap_len = min(cap_len, snaplen)
+                buf = read(offset + 12, cap_len) if data else None
+                # no timestamp
+                yield offset, section, None, buf
+            elif block_type == _PCAPNG_IDB:
+                body = read(offset + 8, block_len - 12)
+                _linktype, snaplen = struct.unpack_from(order + 'H2xI', body)
+                tsresol = 6
+                opt = 8
+                while opt + 4 <= len(body):
+                    code, length = struct.unpack_from(order + 'HH', body, opt)
+                    if code == 0:
+                        break
+                    if code == _PCAPNG_OPT_IF_TSRESOL:
+                        tsresol = bytearray(body[opt + 4:opt + 5])[0]
+                    opt += 4 + (length + 3) // 4 * 4
+                interfaces.append((snaplen, _ts_divisor(tsresol)))
+            offset += block_len
+
 
 class Writer(object):
     """
@@ -254,6 +491,9 @@ class Writer(object):
     snaplen    Max length of captured packets (in octets)
     network    Data link type. (e.g. 1 for Ethernet,
                see `tcpdump.org`_ for details)
+    bufsize    If not 0, the packets are buffered and written in
+               bulk when the buffer reaches bufsize octets, and on
+               flush() or close()
     ========== ==================================================
 
     .. _tcpdump.org: http://www.tcpdump.org/linktypes.html
@@ -285,25 +525,39 @@ class Writer(object):
                 ...
     """
 
-    def __init__(self, file_obj, snaplen=65535, network=1):
+    def __init__(self, file_obj, snaplen=65535, network=1, bufsize=0):
         self._f = file_obj
         self.snaplen = snaplen
         self.network = network
+        self._bufsize = bufsize
+        self._buf = []
+        self._buf_len = 0
+        if sys.byteorder == 'big':
+            self._pkt_hdr = struct.Struct(PcapPktHdr._PKT_HDR_FMT_BIG_ENDIAN)
+        else:
+            self._pkt_hdr = struct.Struct(
+                PcapPktHdr._PKT_HDR_FMT_LITTLE_ENDIAN)
         self._write_pcap_file_hdr()
 
+    def _write(self, buf):
+        if not self._bufsize:
+            self._f.write(buf)
+            return
+        self._buf.append(buf)
+        self._buf_len += len(buf)
+        if self._buf_len >= self._bufsize:
+            self.flush()
+
     def _write_pcap_file_hdr(self):
         pcap_file_hdr = PcapFileHdr(snaplen=self.snaplen,
                                     network=self.network)
-        self._f.write(pcap_file_hdr.serialize())
+        self._write(pcap_file_hdr.serialize())
 
     def _write_pkt_hdr(self, ts, buf_len):
         sec = int(ts)
         usec = int(round(ts % 1, 6) * 1e6) if sec != 0 else 0
 
-        pc_pkt_hdr = PcapPktHdr(ts_sec=sec, ts_usec=usec,
-                                incl_len=buf_len, orig_len=buf_len)
-
-        self._f.write(pc_pkt_hdr.serialize())
+        self._write(self._pkt_hdr.pack(sec, usec, buf_len, buf_len))
 
     def write_pkt(self, buf, ts=None):
         ts = time.time() if ts is None else ts
@@ -316,7 +570,50 @@ class Writer(object):
 
         self._write_pkt_hdr(ts, buf_len)
 
-        self._f.write(buf)
+        self._write(buf)
+
+    def write_pkts(self, pkts):
+        """
+        Write the packets of an iterable of (timestamp, packet_data),
+        e.g. a Reader, in bulk.
+        """
+        bufsize = self._bufsize or _WRITE_BUFSIZE
+        snaplen = self.snaplen
+        pack = self._pkt_hdr.pack
+        chunks = self._buf
+        append = chunks.append
+        buf_len_sum = self._buf_len
+        for ts, buf in pkts:
+            ts = time.time() if ts is None else ts
+            sec = int(ts)
+            usec = int(round(ts % 1, 6) * 1e6) if sec != 0 else 0
+            buf_len = len(buf)
+            if buf_len > snaplen:
+                buf_len = snaplen
+                buf = buf[:snaplen]
+            append(pack(sec, usec, buf_len, buf_len))
+            append(buf)
+            buf_len_sum += PcapPktHdr.PKT_HDR_SIZE + buf_len
+            if buf_len_sum >= bufsize:
+                self._f.write(b''.join(chunks))
+                del chunks[:]
+                buf_len_sum = 0
+        self._buf_len = buf_len_sum
+        if not self._bufsize:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the packets buffered in the bulk mode.
+        """
+        if self._buf:
+            self._f.write(b''.join(self._buf))
+            self._buf = []
+            self._buf_len = 0
+
+    def close(self):
+        self.flush()
+        self._f.close()
 
     def __del__(self):
-        self._f.close()
+        self.close()
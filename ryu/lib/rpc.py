@@ -26,6 +26,8 @@ import select
 import msgpack
 import six
 
+from ryu.lib.packet.stream_parser import Framer
+
 
 class MessageType(object):
     REQUEST = 0
@@ -115,6 +117,8 @@ class EndPoint(object):
         else:
             self._table = disp_table
         self._send_buffer = bytearray()
+        # the messages are framed by the unpacker of the encoder
+        self._recv_buffer = Framer()
         # msgids for which we sent a request but have not received a response
         self._pending_requests = set()
         # queues for incoming messages
@@ -186,15 +190,16 @@ class EndPoint(object):
         """
         while all or self._incoming == 0:
             try:
-                packet = self._sock.recv(4096)  # XXX the size is arbitrary
+                received = self._recv_buffer.recv_into(self._sock)
             except IOError:
-                packet = None
-            if not packet:
-                if packet is not None:
+                received = None
+            if not received:
+                if received is not None:
                     # socket closed by peer
                     self._closed_by_peer = True
                 break
-            self._encoder.get_and_dispatch_messages(packet, self._table)
+            for packet in self._recv_buffer.frames():
+                self._encoder.get_and_dispatch_messages(packet, self._table)
         return self._incoming > 0
 
     def _enqueue_incoming_request(self, m):
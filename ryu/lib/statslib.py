@@ -0,0 +1,392 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Periodic collection of the flow and port statistics of the switches
+into columnar tables.
+
+StatsLib polls the switches like simple_monitor_13 does, but keeps the
+counters in arrays instead of the stats objects, so that the rates and
+the heaviest flows or ports of large tables can be computed cheaply.
+
+Example::
+
+    class Monitor(app_manager.RyuApp):
+        _CONTEXTS = {'statslib': statslib.StatsLib}
+
+        def __init__(self, *args, **kwargs):
+            super(Monitor, self).__init__(*args, **kwargs)
+            self.stats = kwargs['statslib']
+
+        @set_ev_cls(statslib.EventStatsUpdated)
+        def _stats_updated(self, ev):
+            for key, rate in ev.flows.top('byte_count', 10):
+                self.logger.info('%016x %s %f', ev.dpid, key, rate)
+"""
+
+import array
+import collections
+import heapq
+import itertools
+import logging
+import struct
+import time
+
+from ryu.base import app_manager
+from ryu.controller import event
+from ryu.controller import ofp_event
+from ryu.controller.handler import DEAD_DISPATCHER
+from ryu.controller.handler import MAIN_DISPATCHER
+from ryu.controller.handler import set_ev_cls
+from ryu.lib import hub
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_4
+
+LOG = logging.getLogger(__name__)
+
+try:
+    _TYPECODE = 'Q'
+    array.array(_TYPECODE)
+except ValueError:
+    # Python 2 has no unsigned long long arrays.
+    _TYPECODE = 'd'
+
+FLOW_FIELDS = ('packet_count', 'byte_count')
+PORT_FIELDS = ('rx_packets', 'tx_packets', 'rx_bytes', 'tx_bytes',
+               'rx_dropped', 'tx_dropped', 'rx_errors', 'tx_errors')
+
+_MATCH_LEN = struct.Struct('!H')
+
+
+class StatsTable(object):
+    """
+    Counters of a set of series in columnar arrays.
+
+    Each update is a snapshot of the counters of the series, which are
+    identified by hashable keys.  A series is given a row when it first
+    appears, and the values of a field in a snapshot are an array.array
+    indexed by the rows.  The last ``history`` snapshots are kept.
+
+    A series which is missing in an update keeps its last values, and
+    the rows of the series missing in the latest update are dropped
+    when they are as many as the others.
+
+    ========== ==================================================
+    Attribute  Description
+    ========== ==================================================
+    fields     Names of the counters.
+    keys       Keys of the series in the order of the rows.
+    ========== ==================================================
+    """
+
+    def __init__(self, fields, history=8):
+        assert history >= 2
+        self.fields = tuple(fields)
+        self.keys = []
+        self._index = {}   # {key: row}
+        self._snapshots = collections.deque(maxlen=history)
+        self._last_keys = None
+        self._last_rows = None
+
+    def __len__(self):
+        return len(self.keys)
+
+    def update(self, keys, columns, timestamp=None):
+        """
+        Add a snapshot of the counters.
+
+        columns is a dict of the sequences of the values of each field
+        in the order of keys.
+        """
+        if timestamp is None:
+            timestamp = time.time()
+        keys = list(keys)
+        if keys == self._last_keys:
+            rows = self._last_rows
+        else:
+            rows = self._rows(keys)
+        if len(keys) * 2 < len(self.keys):
+            rows = self._compact(keys)
+
+        if rows is None:
+            # The series are in the order of the rows.
+            snapshot = dict((f, array.array(_TYPECODE, columns[f]))
+                            for f in self.fields)
+        else:
+            snapshot = {}
+            last = self._snapshots[-1][1] if self._snapshots else {}
+            for f in self.fields:
+                values = array.array(_TYPECODE, last.get(f, ()))
+                values.extend(itertools.repeat(0, len(self.keys) -
+                                               len(values)))
+                for row, value in zip(rows, columns[f]):
+                    values[row] = value
+                snapshot[f] = values
+        self._snapshots.append((timestamp, snapshot))
+        self._last_keys = keys
+        self._last_rows = rows
+
+    def _rows(self, keys):
+        # Returns the rows of keys, or None if they are all the rows.
+        index = self._index
+        for key in keys:
+            if key not in index:
+                index[key] = len(self.keys)
+                self.keys.append(key)
+        if len(keys) == len(self.keys) and keys == self.keys:
+            return None
+        return [index[key] for key in keys]
+
+    def _compact(self, keys):
+        # Drops the rows which are missing in keys.
+        rows = [self._index[key] for key in keys]
+        for i, (timestamp, snapshot) in enumerate(self._snapshots):
+            compacted = {}
+            for f, values in snapshot.items():
+                n = len(values)
+                compacted[f] = array.array(
+                    _TYPECODE, [values[row] if row < n else 0
+                                for row in rows])
+            self._snapshots[i] = (timestamp, compacted)
+        self.keys = keys
+        self._index = dict((key, row) for row, key in enumerate(keys))
+        return None
+
+    def timestamps(self):
+        """Returns the timestamps of the snapshots, the oldest first."""
+        return [timestamp for timestamp, _snapshot in self._snapshots]
+
+    def values(self, field, age=0):
+        """
+        Returns the array of the values of field, in the order of keys,
+        of the latest snapshot or the snapshot age updates before.
+        """
+        values = self._snapshots[-1 - age][1][field]
+        if len(values) < len(self.keys):
+            values = values + array.array(
+                _TYPECODE, itertools.repeat(0, len(self.keys) - len(values)))
+        return values
+
+    def deltas(self, field):
+        """
+        Returns the list of the increases of field since the previous
+        snapshot.  A counter which decreased, e.g. of a flow which was
+        replaced, counts from zero.
+        """
+        current = self.values(field)
+        if len(self._snapshots) < 2:
+            return list(current)
+        return [c - p if c >= p else c
+                for c, p in zip(current, self.values(field, 1))]
+
+    def rates(self, field):
+        """
+        Returns the list of the increases of field per second since the
+        previous snapshot.
+        """
+        if len(self._snapshots) < 2:
+            return [0.0] * len(self.keys)
+        interval = self._snapshots[-1][0] - self._snapshots[-2][0]
+        if interval <= 0:
+            return [0.0] * len(self.keys)
+        return [d / interval for d in self.deltas(field)]
+
+    def series(self, key, field):
+        """Returns [(timestamp, value), ...] of the series of key."""
+        row = self._index[key]
+        return [(timestamp, snapshot[field][row])
+                for timestamp, snapshot in self._snapshots
+                if row < len(snapshot[field])]
+
+    def top(self, field, n, by='rate'):
+        """
+        Returns [(key, value), ...] of the n series of the largest
+        values of field, in O(N log n).  by is one of 'rate', 'delta'
+        and 'value'.
+        """
+        if not self._snapshots:
+            return []
+        if by == 'rate':
+            values = self.rates(field)
+        elif by == 'delta':
+            values = self.deltas(field)
+        elif by == 'value':
+            values = self.values(field)
+        else:
+            raise ValueError('unknown order: %s' % by)
+        rows = heapq.nlargest(n, range(len(values)), key=values.__getitem__)
+        return [(self.keys[row], values[row]) for row in rows]
+
+
+def flow_stats_columns(replies):
+    """
+    Decodes the counters of flow stats replies of OpenFlow 1.3 or 1.4
+    into (keys, columns) for StatsTable.update() without creating
+    the stats objects.  The key of a flow is a tuple of the table id,
+    the priority, the cookie and the wire format of the match.
+    """
+    keys = []
+    packet_counts = []
+    byte_counts = []
+    for msg in replies:
+        ofp = msg.datapath.ofproto
+        unpack_from = struct.Struct(ofp.OFP_FLOW_STATS_0_PACK_STR).unpack_from
+        match_offset = ofp.OFP_FLOW_STATS_0_SIZE
+        buf = msg.buf
+        offset = ofp.OFP_MULTIPART_REPLY_SIZE
+        while offset < msg.msg_len:
+            stats = unpack_from(buf, offset)
+            match_start = offset + match_offset
+            match_len, = _MATCH_LEN.unpack_from(buf, match_start + 2)
+            keys.append((stats[1], stats[4], stats[-3],
+                         bytes(buf[match_start:match_start + match_len])))
+            packet_counts.append(stats[-2])
+            byte_counts.append(stats[-1])
+            offset += stats[0]
+        hub.sleep(0)
+    return keys, {'packet_count': packet_counts, 'byte_count': byte_counts}
+
+
+def port_stats_columns(replies):
+    """
+    Decodes the counters of port stats replies into (keys, columns)
+    for StatsTable.update().  The key of a port is its number.
+    """
+    keys = []
+    columns = dict((f, []) for f in PORT_FIELDS)
+    for msg in replies:
+        for stats in msg.iter_body():
+            keys.append(stats.port_no)
+            for f in PORT_FIELDS:
+                columns[f].append(getattr(stats, f))
+    return keys, columns
+
+
+class EventStatsUpdated(event.EventBase):
+    """
+    An event class to notify the update of the statistics of a switch.
+
+    ========== ==================================================
+    Attribute  Description
+    ========== ==================================================
+    dpid       Datapath ID of the switch.
+    flows      StatsTable of the flows of the switch.
+    ports      StatsTable of the ports of the switch.
+    ========== ==================================================
+    """
+
+    def __init__(self, dpid, flows, ports):
+        super(EventStatsUpdated, self).__init__()
+        self.dpid = dpid
+        self.flows = flows
+        self.ports = ports
+
+
+class StatsLib(app_manager.RyuApp):
+    """
+    Stats collection library.  This works only for OpenFlow 1.3 and 1.4.
+
+    The flow and port stats of all the switches are requested at once
+    every ``interval`` seconds.  The counters of each switch are kept
+    in StatsTables of FLOW_FIELDS and PORT_FIELDS, and
+    EventStatsUpdated is sent when they are updated.
+    """
+
+    _EVENTS = [EventStatsUpdated]
+    _VERSIONS = (ofproto_v1_3.OFP_VERSION, ofproto_v1_4.OFP_VERSION)
+
+    def __init__(self, *args, **kwargs):
+        super(StatsLib, self).__init__(*args, **kwargs)
+        self.name = 'statslib'
+        self.interval = 10
+        self.timeout = 5
+        self.history = 8
+        self.datapaths = {}
+        self.flows = {}     # {dpid: StatsTable}
+        self.ports = {}     # {dpid: StatsTable}
+        self.monitor_thread = hub.spawn(self._monitor)
+
+    def top_flows(self, field='byte_count', n=10, by='rate'):
+        """
+        Returns [(dpid, key, value), ...] of the n flows of the largest
+        values of field among all the switches.
+        """
+        return self._top(self.flows, field, n, by)
+
+    def top_ports(self, field='tx_bytes', n=10, by='rate'):
+        """
+        Returns [(dpid, port_no, value), ...] of the n ports of the
+        largest values of field among all the switches.
+        """
+        return self._top(self.ports, field, n, by)
+
+    @staticmethod
+    def _top(tables, field, n, by):
+        tops = [[(dpid, key, value) for key, value in table.top(field, n, by)]
+                for dpid, table in tables.items()]
+        return heapq.nlargest(n, (t for top in tops for t in top),
+                              key=lambda t: t[2])
+
+    @set_ev_cls(ofp_event.EventOFPStateChange,
+                [MAIN_DISPATCHER, DEAD_DISPATCHER])
+    def _state_change_handler(self, ev):
+        datapath = ev.datapath
+        if ev.state == MAIN_DISPATCHER:
+            if datapath.ofproto.OFP_VERSION in self._VERSIONS:
+                self.datapaths[datapath.id] = datapath
+        elif ev.state == DEAD_DISPATCHER:
+            if datapath.id in self.datapaths:
+                del self.datapaths[datapath.id]
+                self.flows.pop(datapath.id, None)
+                self.ports.pop(datapath.id, None)
+
+    def _monitor(self):
+        while True:
+            self._poll(list(self.datapaths.values()))
+            hub.sleep(self.interval)
+
+    def _poll(self, datapaths):
+        requests = []
+        for dp in datapaths:
+            parser = dp.ofproto_parser
+            requests.append((
+                dp,
+                dp.send_request(parser.OFPFlowStatsRequest(dp),
+                                timeout=self.timeout),
+                dp.send_request(parser.OFPPortStatsRequest(
+                    dp, 0, dp.ofproto.OFPP_ANY), timeout=self.timeout)))
+
+        for dp, flow_future, port_future in requests:
+            try:
+                flow_replies = flow_future.result()
+                port_replies = port_future.result()
+            except Exception as e:
+                self.logger.debug('stats of %016x not collected: %r',
+                                  dp.id, e)
+                continue
+            if dp.id not in self.datapaths:
+                continue
+            if dp.id not in self.flows:
+                self.flows[dp.id] = StatsTable(FLOW_FIELDS, self.history)
+                self.ports[dp.id] = StatsTable(PORT_FIELDS, self.history)
+            flows = self.flows[dp.id]
+            ports = self.ports[dp.id]
+            timestamp = time.time()
+            flows.update(*flow_stats_columns(flow_replies),
+                         timestamp=timestamp)
+            ports.update(*port_stats_columns(port_replies),
+                         timestamp=timestamp)
+            self.send_event_to_observers(
+                EventStatsUpdated(dp.id, flows, ports))
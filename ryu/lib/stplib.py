@@ -745,13 +745,13 @@ class Port(object):
         # Receive BPDU data
         self.designated_priority = None
         self.designated_times = None
-        # BPDU handling threads
-        self.send_bpdu_thread = PortThread(self._transmit_bpdu)
-        self.wait_bpdu_thread = PortThread(self._wait_bpdu_timer)
+        # BPDU handling timers
+        self.send_bpdu_timer = PortTimer(
+            self._transmit_bpdu, lambda: self.port_times.hello_time)
+        self.wait_bpdu_timer = PortTimer(self._wait_bpdu_timeout)
         self.send_tc_flg = None
         self.send_tc_timer = None
         self.send_tcn_flg = None
-        self.wait_timer_event = None
         # State machine thread
         self.state_machine = PortThread(self._state_machine)
         self.state_event = None
@@ -766,14 +766,11 @@ class Port(object):
 
     def delete(self):
         self.state_machine.stop()
-        self.send_bpdu_thread.stop()
-        self.wait_bpdu_thread.stop()
+        self.send_bpdu_timer.stop()
+        self.wait_bpdu_timer.stop()
         if self.state_event is not None:
             self.state_event.set()
             self.state_event = None
-        if self.wait_timer_event is not None:
-            self.wait_timer_event.set()
-            self.wait_timer_event = None
         self.logger.debug('[port=%d] Stop port threads.',
                           self.ofport.port_no, extra=self.dpid_str)
 
@@ -876,9 +873,9 @@ class Port(object):
             self.send_tc_flg = False
             self.send_tc_timer = None
             self.send_tcn_flg = False
-            self.send_bpdu_thread.stop()
+            self.send_bpdu_timer.stop()
         elif new_state is PORT_STATE_LISTEN:
-            self.send_bpdu_thread.start()
+            self.send_bpdu_timer.start()
 
         self.state = new_state
         self.send_event(EventPortStateChange(self.dp, self))
@@ -895,10 +892,10 @@ class Port(object):
         self.role = new_role
         if (new_role is ROOT_PORT
                 or new_role is NON_DESIGNATED_PORT):
-            self.wait_bpdu_thread.start()
+            self.wait_bpdu_timer.start(self._get_wait_bpdu_time())
         else:
             assert new_role is DESIGNATED_PORT
-            self.wait_bpdu_thread.stop()
+            self.wait_bpdu_timer.stop()
 
     def rcv_config_bpdu(self, bpdu_pkt):
         # Check received BPDU is superior to currently held BPDU.
@@ -954,69 +951,50 @@ class Port(object):
         return rcv_info, rcv_tc
 
     def _update_wait_bpdu_timer(self):
-        if self.wait_timer_event is not None:
-            self.wait_timer_event.set()
-            self.wait_timer_event = None
+        if self.wait_bpdu_timer.is_pending():
+            self.wait_bpdu_timer.start(self._get_wait_bpdu_time())
             self.logger.debug('[port=%d] Wait BPDU timer is updated.',
                               self.ofport.port_no, extra=self.dpid_str)
-        hub.sleep(0)  # For thread switching.
 
-    def _wait_bpdu_timer(self):
-        time_exceed = False
+    def _get_wait_bpdu_time(self):
+        message_age = (self.designated_times.message_age
+                       if self.designated_times else 0)
+        return self.port_times.max_age - message_age
 
-        while True:
-            self.wait_timer_event = hub.Event()
-            message_age = (self.designated_times.message_age
-                           if self.designated_times else 0)
-            timer = self.port_times.max_age - message_age
-            timeout = hub.Timeout(timer)
-            try:
-                self.wait_timer_event.wait()
-            except hub.Timeout as t:
-                if t is not timeout:
-                    err_msg = 'Internal error. Not my timeout.'
-                    raise RyuException(msg=err_msg)
-                self.logger.info('[port=%d] Wait BPDU timer is exceeded.',
-                                 self.ofport.port_no, extra=self.dpid_str)
-                time_exceed = True
-            finally:
-                timeout.cancel()
-                self.wait_timer_event = None
-
-            if time_exceed:
-                break
-
-        if time_exceed:  # Bridge.recalculate_spanning_tree
-            hub.spawn(self.wait_bpdu_timeout)
+    def _wait_bpdu_timeout(self):
+        self.logger.info('[port=%d] Wait BPDU timer is exceeded.',
+                         self.ofport.port_no, extra=self.dpid_str)
+        # Bridge.recalculate_spanning_tree
+        hub.spawn(self.wait_bpdu_timeout)
 
     def _transmit_bpdu(self):
-        while True:
-            # Send config BPDU packet if port role is DESIGNATED_PORT.
-            if self.role == DESIGNATED_PORT:
-                now = datetime.datetime.today()
-                if self.send_tc_timer and self.send_tc_timer < now:
-                    self.send_tc_timer = None
-                    self.send_tc_flg = False
-
-                if not self.send_tc_flg:
-                    flags = 0b00000000
-                    log_msg = '[port=%d] Send Config BPDU.'
-                else:
-                    flags = 0b00000001
-                    log_msg = '[port=%d] Send TopologyChange BPDU.'
-                bpdu_data = self._generate_config_bpdu(flags)
-                self.ofctl.send_packet_out(self.ofport.port_no, bpdu_data)
-                self.logger.debug(log_msg, self.ofport.port_no,
-                                  extra=self.dpid_str)
-
-            # Send Topology Change Notification BPDU until receive Ack.
-            if self.send_tcn_flg:
-                bpdu_data = self._generate_tcn_bpdu()
-                self.ofctl.send_packet_out(self.ofport.port_no, bpdu_data)
-                self.logger.debug('[port=%d] Send TopologyChangeNotify BPDU.',
-                                  self.ofport.port_no, extra=self.dpid_str)
-
-            hub.sleep(self.port_times.hello_time)
+        # Called on the hub timer wheel, so that this must not block.
+        # Send config BPDU packet if port role is DESIGNATED_PORT.
+        if self.role == DESIGNATED_PORT:
+            now = datetime.datetime.today()
+            if self.send_tc_timer and self.send_tc_timer < now:
+                self.send_tc_timer = None
+                self.send_tc_flg = False
+
+            if not self.send_tc_flg:
+                flags = 0b00000000
+                log_msg = '[port=%d] Send Config BPDU.'
+            else:
+                flags = 0b00000001
+                log_msg = '[port=%d] Send TopologyChange BPDU.'
+            bpdu_data = self._generate_config_bpdu(flags)
+            self.ofctl.send_packet_out(self.ofport.port_no, bpdu_data,
+                                       blocking=False)
+            self.logger.debug(log_msg, self.ofport.port_no,
+                              extra=self.dpid_str)
+
+        # Send Topology Change Notification BPDU until receive Ack.
+        if self.send_tcn_flg:
+            bpdu_data = self._generate_tcn_bpdu()
+            self.ofctl.send_packet_out(self.ofport.port_no, bpdu_data,
+                                       blocking=False)
+            self.logger.debug('[port=%d] Send TopologyChangeNotify BPDU.',
+                              self.ofport.port_no, extra=self.dpid_str)
 
     def transmit_tc_bpdu(self):
         """ Set send_tc_flg to send Topology Change BPDU. """
@@ -1102,6 +1080,35 @@ class PortThread(object):
             self.thread = None
 
 
+class PortTimer(object):
+    """ Call function on the hub timer wheel, once or periodically
+         while interval is given, without a dedicated thread. """
+    def __init__(self, function, interval=None):
+        super(PortTimer, self).__init__()
+        self.function = function
+        self.interval = interval
+        self.timer = None
+
+    def start(self, seconds=0):
+        self.stop()
+        self.timer = hub.call_later(seconds, self._expire)
+
+    def stop(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+
+    def is_pending(self):
+        return self.timer is not None
+
+    def _expire(self):
+        if self.interval is not None:
+            self.timer = hub.call_later(self.interval(), self._expire)
+        else:
+            self.timer = None
+        self.function()
+
+
 class BridgeId(object):
     def __init__(self, priority, system_id_extension, mac_addr):
         super(BridgeId, self).__init__()
@@ -1144,11 +1151,14 @@ class OfCtl_v1_0(object):
         super(OfCtl_v1_0, self).__init__()
         self.dp = dp
 
-    def send_packet_out(self, out_port, data):
+    def send_packet_out(self, out_port, data, blocking=True):
         actions = [self.dp.ofproto_parser.OFPActionOutput(out_port, 0)]
-        self.dp.send_packet_out(buffer_id=self.dp.ofproto.OFP_NO_BUFFER,
-                                in_port=self.dp.ofproto.OFPP_CONTROLLER,
-                                actions=actions, data=data)
+        msg = self.dp.ofproto_parser.OFPPacketOut(
+            self.dp, buffer_id=self.dp.ofproto.OFP_NO_BUFFER,
+            in_port=self.dp.ofproto.OFPP_CONTROLLER,
+            actions=actions, data=data)
+        # If not blocking and the send queue is full, the packet is dropped.
+        self.dp.send_msg(msg, blocking=blocking)
 
     def set_port_status(self, port, state):
         ofproto_parser = self.dp.ofproto_parser
@@ -112,8 +112,19 @@ _types = {
 }
 
 
+def _tobytes(v):
+    # memoryview, e.g. OFPPacketIn.data_view passed to OFPPacketOut, is
+    # shown as bytes
+    if isinstance(v, memoryview):
+        return v.tobytes()
+    return v
+
+
 class StringifyMixin(object):
 
+    # No instance attributes, so that subclasses can define __slots__.
+    __slots__ = ()
+
     _TYPE = {}
     """_TYPE class attribute is used to annotate types of attributes.
 
@@ -160,7 +171,7 @@ class StringifyMixin(object):
     def __str__(self):
         # repr() to escape binaries
         return self.__class__.__name__ + '(' + \
-            ','.join("%s=%s" % (k, repr(v)) for k, v in
+            ','.join("%s=%s" % (k, repr(_tobytes(v))) for k, v in
                      self.stringify_attrs()) + ')'
     __repr__ = __str__  # note: str(list) uses __repr__ for elements
 
@@ -207,6 +218,7 @@ class StringifyMixin(object):
     @classmethod
     def _get_default_encoder(cls, encode_string):
         def _encode(v):
+            v = _tobytes(v)
             if isinstance(v, (bytes, six.text_type)):
                 if isinstance(v, six.text_type):
                     v = v.encode('utf-8')
@@ -378,6 +390,7 @@ def obj_python_attrs(msg_):
         return
     base = getattr(msg_, '_base_attributes', [])
     opt = getattr(msg_, '_opt_attributes', [])
+    slots = _class_slots(msg_.__class__)
     for k, v in inspect.getmembers(msg_):
         if k in opt:
             pass
@@ -387,11 +400,34 @@ def obj_python_attrs(msg_):
             continue
         elif k in base:
             continue
+        elif k in slots:
+            # skip the slots which are not set
+            if not hasattr(msg_, k):
+                continue
         elif hasattr(msg_.__class__, k):
             continue
         yield (k, v)
 
 
+_CLASS_SLOTS = {}
+
+
+def _class_slots(cls):
+    # names of the __slots__ of cls and its base classes
+    try:
+        return _CLASS_SLOTS[cls]
+    except KeyError:
+        pass
+    slots = set()
+    for c in cls.__mro__:
+        names = c.__dict__.get('__slots__', ())
+        if isinstance(names, six.string_types):
+            names = (names,)
+        slots.update(names)
+    _CLASS_SLOTS[cls] = slots
+    return slots
+
+
 def obj_attrs(msg_):
     """similar to obj_python_attrs() but deals with python reserved keywords
     """
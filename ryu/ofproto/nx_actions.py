@@ -32,6 +32,29 @@ def generate(ofp_name, ofpp_name):
     ofp = sys.modules[ofp_name]
     ofpp = sys.modules[ofpp_name]
 
+    # The wire format of the actions and the flow specs keyed by their
+    # class and attribute values, and of the OXM/NXM headers by field
+    # name.  The caches are cleared when they grow to _CACHE_SIZE.
+    _CACHE_SIZE = 4096
+    _serialized = {}
+    _oxm_headers = {}
+
+    def _cache(cache, key, value):
+        if len(cache) >= _CACHE_SIZE:
+            cache.clear()
+        cache[key] = value
+
+    def _oxm_header(field):
+        try:
+            return _oxm_headers[field]
+        except KeyError:
+            pass
+        buf = bytearray()
+        ofp.oxm_serialize_header(ofp.oxm_from_user_header(field), buf, 0)
+        buf = six.binary_type(buf)
+        _cache(_oxm_headers, field, buf)
+        return buf
+
     class _NXFlowSpec(StringifyMixin):
         _hdr_fmt_str = '!H'  # 2 bit 0s, 1 bit src, 2 bit dst, 11 bit n_bits
         _dst_type = None
@@ -82,7 +105,23 @@ def generate(ofp_name, ofpp_name):
                 dst = ''  # empty
             return subcls(src=src, dst=dst, n_bits=n_bits), rest
 
+        def _serialize_key(self):
+            return (self.__class__, self.src, self.dst, self.n_bits)
+
         def serialize(self):
+            key = self._serialize_key()
+            try:
+                buf = _serialized.get(key)
+            except TypeError:
+                # unhashable attribute value
+                return self._serialize()
+            if buf is None:
+                buf = self._serialize()
+                _cache(_serialized, key, six.binary_type(buf))
+                return buf
+            return bytearray(buf)
+
+        def _serialize(self):
             buf = bytearray()
             if isinstance(self.src, tuple):
                 src_type = 0  # subfield
@@ -118,9 +157,7 @@ def generate(ofp_name, ofpp_name):
         @staticmethod
         def _serialize_subfield(subfield):
             (field, ofs) = subfield
-            buf = bytearray()
-            n = ofp.oxm_from_user_header(field)
-            ofp.oxm_serialize_header(n, buf, 0)
+            buf = bytearray(_oxm_header(field))
             assert len(buf) == 4  # only 4-bytes NXM/OXM are defined
             msg_pack_into('!H', buf, 4, ofs)
             return buf
@@ -197,6 +234,10 @@ def generate(ofp_name, ofpp_name):
         _fmt_str = '!H'  # subtype
         _subtypes = {}
         _experimenter = ofproto_common.NX_EXPERIMENTER_ID
+        # The names of the attributes which serialize_body() depends on.
+        # The wire format of the actions of the subclasses which set this
+        # is cached by the values of the attributes.
+        _body_attrs = None
 
         def __init__(self):
             super(NXAction, self).__init__(self._experimenter)
@@ -212,7 +253,33 @@ def generate(ofp_name, ofpp_name):
                 return NXActionUnknown(subtype, rest)
             return subtype_cls.parser(rest)
 
+        def _serialize_key(self):
+            if self._body_attrs is None:
+                return None
+            return (self.__class__,) + tuple(
+                [getattr(self, attr) for attr in self._body_attrs])
+
         def serialize(self, buf, offset):
+            key = self._serialize_key()
+            if key is None:
+                return self._serialize(buf, offset)
+            try:
+                packed = _serialized.get(key)
+            except TypeError:
+                # unhashable attribute value
+                return self._serialize(buf, offset)
+            if packed is None:
+                packed = bytearray()
+                self._serialize(packed, 0)
+                packed = six.binary_type(packed)
+                _cache(_serialized, key, packed)
+            else:
+                self.len = utils.round_up(len(packed), 8)
+            if len(buf) < offset:
+                buf += bytearray(offset - len(buf))
+            buf[offset:offset + len(packed)] = packed
+
+        def _serialize(self, buf, offset):
             data = self.serialize_body()
             payload_offset = (
                 ofp.OFP_ACTION_EXPERIMENTER_HEADER_SIZE +
@@ -283,6 +350,7 @@ def generate(ofp_name, ofpp_name):
 
         # queue_id
         _fmt_str = '!2xI'
+        _body_attrs = ('queue_id',)
 
         def __init__(self, queue_id,
                      type_=None, len_=None, vendor=None, subtype=None):
@@ -371,6 +439,7 @@ def generate(ofp_name, ofpp_name):
         """
         _subtype = nicira_ext.NXAST_REG_LOAD
         _fmt_str = '!HIQ'  # ofs_nbits, dst, value
+        _body_attrs = ('ofs_nbits', 'dst', 'value')
         _TYPE = {
             'ascii': [
                 'dst',
@@ -533,6 +602,7 @@ def generate(ofp_name, ofpp_name):
 
     class _NXActionSetTunnelBase(NXAction):
         # _subtype, _fmt_str must be attributes of subclass.
+        _body_attrs = ('tun_id',)
 
         def __init__(self,
                      tun_id,
@@ -666,6 +736,8 @@ def generate(ofp_name, ofpp_name):
         """
         _subtype = nicira_ext.NXAST_REG_MOVE
         _fmt_str = '!HHH'  # n_bits, src_ofs, dst_ofs
+        _body_attrs = ('n_bits', 'src_ofs', 'dst_ofs',
+                       'src_field', 'dst_field')
         # Followed by OXM fields (src, dst) and padding to 8 bytes boundary
         _TYPE = {
             'ascii': [
@@ -707,11 +779,9 @@ def generate(ofp_name, ofpp_name):
             msg_pack_into(self._fmt_str, data, 0,
                           self.n_bits, self.src_ofs, self.dst_ofs)
             # src field
-            n = ofp.oxm_from_user_header(self.src_field)
-            ofp.oxm_serialize_header(n, data, len(data))
+            data += _oxm_header(self.src_field)
             # dst field
-            n = ofp.oxm_from_user_header(self.dst_field)
-            ofp.oxm_serialize_header(n, data, len(data))
+            data += _oxm_header(self.dst_field)
             return data
 
     class NXActionResubmit(NXAction):
@@ -744,6 +814,7 @@ def generate(ofp_name, ofpp_name):
 
         # in_port
         _fmt_str = '!H4x'
+        _body_attrs = ('in_port',)
 
         def __init__(self,
                      in_port=0xfff8,
@@ -795,6 +866,7 @@ def generate(ofp_name, ofpp_name):
 
         # in_port, table_id
         _fmt_str = '!HB3x'
+        _body_attrs = ('in_port', 'table_id')
 
         def __init__(self,
                      in_port=0xfff8,
@@ -854,6 +926,7 @@ def generate(ofp_name, ofpp_name):
 
         # ofs_nbits, src, max_len
         _fmt_str = '!H4sH6x'
+        _body_attrs = ('ofs_nbits', 'src', 'max_len')
         _TYPE = {
             'ascii': [
                 'src',
@@ -932,6 +1005,7 @@ def generate(ofp_name, ofpp_name):
 
         # ofs_nbits, src, max_len
         _fmt_str = '!HH4s'
+        _body_attrs = ('ofs_nbits', 'src', 'max_len')
         _TYPE = {
             'ascii': [
                 'src',
@@ -1086,6 +1160,9 @@ def generate(ofp_name, ofpp_name):
         # idle_timeout, hard_timeout, priority, cookie, flags,
         # table_id, pad, fin_idle_timeout, fin_hard_timeout
         _fmt_str = '!HHHQHBxHH'
+        _body_attrs = ('idle_timeout', 'hard_timeout', 'priority', 'cookie',
+                       'flags', 'table_id', 'fin_idle_timeout',
+                       'fin_hard_timeout')
         # Followed by flow_mod_specs
 
         def __init__(self,
@@ -1139,6 +1216,10 @@ def generate(ofp_name, ofpp_name):
                        fin_hard_timeout=fin_hard_timeout,
                        specs=specs)
 
+        def _serialize_key(self):
+            return (super(NXActionLearn, self)._serialize_key() +
+                    tuple([spec._serialize_key() for spec in self.specs]))
+
         def serialize_body(self):
             # fixup
             data = bytearray()
@@ -1273,6 +1354,7 @@ def generate(ofp_name, ofpp_name):
 
         # max_len, controller_id, reason
         _fmt_str = '!HHBx'
+        _body_attrs = ('max_len', 'controller_id', 'reason')
 
         def __init__(self,
                      max_len,
@@ -1940,6 +2022,7 @@ def generate(ofp_name, ofpp_name):
     class NXActionStackBase(NXAction):
         # start, field, end
         _fmt_str = '!H4sH'
+        _body_attrs = ('start', 'field', 'end')
         _TYPE = {
             'ascii': [
                 'field',
@@ -2232,6 +2315,7 @@ def generate(ofp_name, ofpp_name):
 
         # fin_idle_timeout, fin_hard_timeout
         _fmt_str = '!HH2x'
+        _body_attrs = ('fin_idle_timeout', 'fin_hard_timeout')
 
         def __init__(self,
                      fin_idle_timeout,
@@ -2292,6 +2376,7 @@ def generate(ofp_name, ofpp_name):
 
         # clause, n_clauses, id
         _fmt_str = '!BBI'
+        _body_attrs = ('clause', 'n_clauses', 'id')
 
         def __init__(self,
                      clause,
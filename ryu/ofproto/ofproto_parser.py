@@ -24,6 +24,7 @@ import functools
 
 from ryu import exception
 from ryu import utils
+from ryu.lib import pack_utils
 from ryu.lib import stringify
 
 from ryu.ofproto import ofproto_common
@@ -43,28 +44,54 @@ def header(buf):
 
 
 _MSG_PARSERS = {}
+_MSG_TYPE_PARSERS = {}  # {version: {msg_type: parser}}
+_MSG_DISPATCH = {}      # {version: [parser indexed by msg_type]}
 
 
-def register_msg_parser(version):
+def register_msg_parser(version, msg_type_parsers=None):
+    """
+    Register msg_parser of an OpenFlow version.  msg_type_parsers is
+    the dict of the parsers of the message types the msg_parser
+    dispatches to, which msg() indexes by msg_type directly.
+    """
     def register(msg_parser):
         _MSG_PARSERS[version] = msg_parser
+        if msg_type_parsers is not None:
+            _MSG_TYPE_PARSERS[version] = msg_type_parsers
+        _MSG_DISPATCH.pop(version, None)
         return msg_parser
     return register
 
 
-def msg(datapath, version, msg_type, msg_len, xid, buf):
-    exp = None
-    try:
-        assert len(buf) >= msg_len
-    except AssertionError as e:
-        exp = e
-
+def _msg_dispatch(version):
+    # The flat dispatch array of version, built when the first message
+    # of the version is parsed, i.e. after all the message classes are
+    # registered.  The unknown types are left to msg_parser.
     msg_parser = _MSG_PARSERS.get(version)
     if msg_parser is None:
         raise exception.OFPUnknownVersion(version=version)
+    dispatch = [msg_parser] * 256
+    for msg_type, parser in _MSG_TYPE_PARSERS.get(version, {}).items():
+        dispatch[msg_type] = parser
+    _MSG_DISPATCH[version] = dispatch
+    return dispatch
+
+
+def msg(datapath, version, msg_type, msg_len, xid, buf):
+    exp = None
+    if len(buf) < msg_len:
+        # not an assert statement, which -O would remove
+        exp = AssertionError('truncated message: msg_len %d buf len %d'
+                             % (msg_len, len(buf)))
 
     try:
-        msg = msg_parser(datapath, version, msg_type, msg_len, xid, buf)
+        dispatch = _MSG_DISPATCH[version]
+    except KeyError:
+        dispatch = _msg_dispatch(version)
+
+    try:
+        msg = dispatch[msg_type](datapath, version, msg_type, msg_len, xid,
+                                 buf)
     except exception.OFPTruncatedMessage as e:
         raise e
     except:
@@ -176,6 +203,7 @@ def ofp_instruction_from_jsondict(dp, jsonlist, encap=True):
 
 
 class StringifyMixin(stringify.StringifyMixin):
+    __slots__ = ()
     _class_prefixes = ["OFP", "ONF", "MT", "NX"]
 
     @classmethod
@@ -202,6 +230,10 @@ class MsgBase(StringifyMixin):
     ========= ==============================
     """
 
+    # Length of the fixed part of the message. If set, _serialize_pre()
+    # allocates it at once so that _serialize_body() need not grow buf.
+    _FIXED_LEN = None
+
     @create_list_of_base_attributes
     def __init__(self, datapath):
         super(MsgBase, self).__init__()
@@ -242,10 +274,27 @@ class MsgBase(StringifyMixin):
         msg_.set_buf(buf)
         return msg_
 
+    @classmethod
+    def _parser_new(cls, datapath, version, msg_type, msg_len, xid, buf):
+        # Same as MsgBase.parser() but without calling __init__() of the
+        # class, for the parsers of the hot message types, which must
+        # set all the attributes __init__() sets.  The first message of
+        # the class is still initialized to record _base_attributes.
+        if '_base_attributes' not in cls.__dict__:
+            return MsgBase.parser.__func__(cls, datapath, version, msg_type,
+                                           msg_len, xid, buf)
+        assert msg_type == cls.cls_msg_type
+        msg_ = cls.__new__(cls)
+        msg_.__dict__.update(datapath=datapath, version=version,
+                             msg_type=msg_type, msg_len=msg_len, xid=xid,
+                             buf=buffer(buf))
+        return msg_
+
     def _serialize_pre(self):
         self.version = self.datapath.ofproto.OFP_VERSION
         self.msg_type = self.cls_msg_type
-        self.buf = bytearray(self.datapath.ofproto.OFP_HEADER_SIZE)
+        self.buf = bytearray(self._FIXED_LEN or
+                             self.datapath.ofproto.OFP_HEADER_SIZE)
 
     def _serialize_header(self):
         # buffer length is determined after trailing data is formated.
@@ -258,8 +307,9 @@ class MsgBase(StringifyMixin):
         if self.xid is None:
             self.xid = 0
 
-        struct.pack_into(self.datapath.ofproto.OFP_HEADER_PACK_STR,
-                         self.buf, 0,
+        header = pack_utils.get_struct(
+            self.datapath.ofproto.OFP_HEADER_PACK_STR)
+        header.pack_into(self.buf, 0,
                          self.version, self.msg_type, self.msg_len, self.xid)
 
     def _serialize_body(self):
@@ -270,6 +320,61 @@ class MsgBase(StringifyMixin):
         self._serialize_body()
         self._serialize_header()
 
+    def serialize_into(self, buf, offset=0):
+        """Serialize this message and write it into buf at offset.
+
+        buf is a bytearray and is extended as needed.  This allows a
+        sender to pack several messages into a single buffer.
+        Returns the length of the message.
+        """
+        self.serialize()
+        if len(buf) < offset:
+            buf += bytearray(offset - len(buf))
+        buf[offset:offset + self.msg_len] = self.buf
+        return self.msg_len
+
+
+class PacketDataMixin(object):
+    """
+    data of a message carrying a packet, e.g. OFPPacketIn.
+
+    The parser calls _set_data_view().  On Python 3, no copy of the
+    packet is made: data_view is a memoryview of the packet in the
+    message buffer, and can be passed as is to packet.Packet() or
+    OFPPacketOut.  data is a bytes copy of it, made when it is accessed
+    for the first time.  On Python 2, the packet is copied to data and
+    data_view is a memoryview of the copy.
+    """
+
+    _opt_attributes = ['data']
+    _data = None
+    _data_view = None
+
+    @property
+    def data(self):
+        if self._data is None and self._data_view is not None:
+            self._data = self._data_view.tobytes()
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self._data_view = None
+
+    @property
+    def data_view(self):
+        if self._data_view is None and self._data is not None:
+            self._data_view = memoryview(self._data)
+        return self._data_view
+
+    def _set_data_view(self, buf, start, end=None):
+        if six.PY2:
+            # buffer objects do not support memoryview
+            self.data = buf[start:end]
+            return
+        self._data = None
+        self._data_view = memoryview(buf)[start:end]
+
 
 class MsgInMsgBase(MsgBase):
     @classmethod
@@ -295,3 +400,189 @@ def msg_str_attr(msg_, buf, attr_list=None):
             buf += ' %s %s' % (attr, val)
 
     return buf
+
+
+class CompiledMatchMixin(object):
+    """
+    Mixin for OFPMatch of OpenFlow 1.3 and later, for matches built
+    by OFPMatchTemplate.
+
+    The wire format is built together with the match, so serialize()
+    only copies it.  The user representation of the fields is decoded
+    from the wire format when it is asked for.
+    """
+
+    def __init__(self, template, data, values):
+        # OFPMatch.__init__() is skipped as the fields are already
+        # converted.
+        self.type = template._ofproto.OFPMT_OXM
+        self.length = template.length
+        self.fields = []
+        self._template = template
+        self._data = data
+        # list of (value, mask) in the wire format
+        self._values = values
+
+    @property
+    def _fields2(self):
+        to_user = self._template._ofproto.oxm_to_user
+        return [to_user(num, value, mask) for num, (value, mask)
+                in zip(self._template._nums, self._values)]
+
+    def _composed_with_old_api(self):
+        return False
+
+    def serialize(self, buf, offset):
+        data = self._data
+        if len(buf) < offset:
+            buf += bytearray(offset - len(buf))
+        buf[offset:offset + len(data)] = data
+        return len(data)
+
+
+def compiled_match_class(match_cls):
+    """Return the CompiledMatchMixin subclass of match_cls.
+
+    It has the same name as match_cls so that it is the same as
+    match_cls in to_jsondict() and str().
+    """
+    return type(match_cls.__name__, (CompiledMatchMixin, match_cls), {})
+
+
+class OXMMatchTemplate(object):
+    """
+    Precompiled flow match layout
+
+    A template is made once for a set of match field names, and then
+    builds OFPMatch instances from the values of these fields.  The
+    OXM headers, the order of the fields and the padding are computed
+    when the template is made, and the conversion of the values is
+    cached, so building and serializing a match is much cheaper than
+    with OFPMatch(**kwargs).
+
+    The fields in ``masked`` take a (value, mask) tuple or a CIDR
+    notation, eg. '10.0.0.1/32' for an exact match.  The other ones
+    take a value only.  Giving a mask to a field which is not masked,
+    or a plain value to a field which is masked, raises ValueError.
+
+    Example::
+
+        template = ofp_parser.OFPMatchTemplate('eth_type', 'ipv4_src',
+                                               'ipv4_dst')
+        match = template(eth_type=0x0800, ipv4_src='10.0.0.1',
+                         ipv4_dst='10.0.0.2')
+        # or positionally, in the order of the template
+        match = template(0x0800, '10.0.0.1', '10.0.0.2')
+
+        template = ofp_parser.OFPMatchTemplate('eth_type', 'ipv4_dst',
+                                               masked=['ipv4_dst'])
+        match = template(eth_type=0x0800, ipv4_dst='10.0.0.0/24')
+
+    This is the base class of OFPMatchTemplate of OpenFlow 1.3 and
+    later.  Subclasses set _ofproto to the ofproto module of the version
+    and _match_cls to compiled_match_class() of its OFPMatch.
+    """
+
+    _ofproto = None
+    _match_cls = None
+
+    # max number of converted values cached per field
+    _CACHE_SIZE = 4096
+
+    def __init__(self, *fields, **kwargs):
+        masked = kwargs.pop('masked', ())
+        if kwargs:
+            raise TypeError('unexpected keyword arguments: %s'
+                            % ', '.join(kwargs))
+        ofproto = self._ofproto
+        layout = []
+        for name in fields:
+            if name in [f[1] for f in layout]:
+                raise ValueError('duplicated match field: %s' % name)
+            num, type_ = ofproto.oxm_get_field_info_by_name(name)
+            size = getattr(type_, 'size', None)
+            if size is None:
+                raise ValueError('match field without fixed size: %s'
+                                 % name)
+            is_masked = name in masked
+            # serialize a dummy value to get the OXM header
+            dummy = b'\x00' * size
+            buf = bytearray()
+            field_len = ofproto.oxm_serialize(
+                num, dummy, dummy if is_masked else None, buf, 0)
+            header_len = field_len - size * (2 if is_masked else 1)
+            layout.append((num, name, size, is_masked,
+                           bytes(buf[:header_len]), field_len))
+
+        # same order as OFPMatch, which meets the prerequisites
+        # (eg. eth_type before ipv4_src)
+        layout.sort(key=lambda f: f[0][0] if isinstance(f[0], tuple)
+                    else f[0])
+
+        self.fields = fields
+        self.masked = tuple(masked)
+        self._nums = [f[0] for f in layout]
+        self._layout = [(name, size, is_masked, header, {})
+                        for (_, name, size, is_masked, header, _)
+                        in layout]
+        self.length = 4 + sum(f[5] for f in layout)
+        self._header = struct.pack('!HH', ofproto.OFPMT_OXM, self.length)
+        self._pad = b'\x00' * (utils.round_up(self.length, 8) - self.length)
+
+    def _from_user(self, name, size, is_masked, user_value):
+        _num, value, mask = self._ofproto.oxm_from_user(name, user_value)
+        if len(value) != size:
+            raise ValueError('unexpected length of %s: %d' %
+                             (name, len(value)))
+        if mask is None:
+            if is_masked:
+                raise ValueError('%s is masked in this template, '
+                                 'a mask is required' % name)
+        elif not is_masked:
+            raise ValueError('%s is not masked in this template' % name)
+        else:
+            # same as OFPMatch, the value is masked
+            value = bytes(bytearray(
+                v & m for v, m in zip(bytearray(value), bytearray(mask))))
+        return value, mask
+
+    def __call__(self, *args, **kwargs):
+        """
+        Build an OFPMatch from the values of the fields of this template,
+        given positionally in the order of the template or by keyword.
+        """
+        if args:
+            if len(args) > len(self.fields):
+                raise TypeError('too many match values')
+            kwargs.update(zip(self.fields, args))
+        if len(kwargs) > len(self._layout):
+            raise TypeError('unknown match fields: %s' %
+                            ', '.join(sorted(set(kwargs) -
+                                             set(self.fields))))
+
+        chunks = [self._header]
+        values = []
+        for name, size, is_masked, header, cache in self._layout:
+            try:
+                user_value = kwargs[name]
+            except KeyError:
+                raise TypeError('missing match field: %s' % name)
+            try:
+                value_mask = cache[user_value]
+            except KeyError:
+                value_mask = self._from_user(name, size, is_masked,
+                                             user_value)
+                if len(cache) >= self._CACHE_SIZE:
+                    cache.clear()
+                cache[user_value] = value_mask
+            except TypeError:
+                # unhashable value, eg. a list of value and mask
+                value_mask = self._from_user(name, size, is_masked,
+                                             user_value)
+            values.append(value_mask)
+            chunks.append(header)
+            chunks.append(value_mask[0])
+            if is_masked:
+                chunks.append(value_mask[1])
+        chunks.append(self._pad)
+        return self._match_cls(self, b''.join(chunks), values)
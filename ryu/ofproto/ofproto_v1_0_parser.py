@@ -59,7 +59,7 @@ def _register_parser(cls):
     return cls
 
 
-@ofproto_parser.register_msg_parser(ofproto.OFP_VERSION)
+@ofproto_parser.register_msg_parser(ofproto.OFP_VERSION, _MSG_PARSERS)
 def msg_parser(datapath, version, msg_type, msg_len, xid, buf):
     parser = _MSG_PARSERS.get(msg_type)
     return parser(datapath, version, msg_type, msg_len, xid, buf)
@@ -1349,8 +1349,8 @@ class OFPEchoReply(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        msg = super(OFPEchoReply, cls).parser(datapath, version, msg_type,
-                                              msg_len, xid, buf)
+        msg = cls._parser_new(datapath, version, msg_type, msg_len,
+                              xid, buf)
         msg.data = msg.buf[ofproto.OFP_HEADER_SIZE:]
         return msg
 
@@ -1789,8 +1789,8 @@ class OFPPortStatus(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        msg = super(OFPPortStatus, cls).parser(datapath, version, msg_type,
-                                               msg_len, xid, buf)
+        msg = cls._parser_new(datapath, version, msg_type, msg_len,
+                              xid, buf)
         msg.reason = struct.unpack_from(
             ofproto.OFP_PORT_STATUS_PACK_STR,
             msg.buf, ofproto.OFP_HEADER_SIZE)[0]
@@ -1801,7 +1801,7 @@ class OFPPortStatus(MsgBase):
 
 @_register_parser
 @_set_msg_type(ofproto.OFPT_PACKET_IN)
-class OFPPacketIn(MsgBase):
+class OFPPacketIn(ofproto_parser.PacketDataMixin, MsgBase):
     """
     Packet-In message
 
@@ -1820,6 +1820,8 @@ class OFPPacketIn(MsgBase):
                   | OFPR_ACTION
                   | OFPR_INVALID_TTL
     data          Ethernet frame.
+    data_view     ``memoryview`` of the Ethernet frame in the
+                  message buffer (no copy)
     ============= =========================================================
 
     Example::
@@ -1857,18 +1859,18 @@ class OFPPacketIn(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        msg = super(OFPPacketIn, cls).parser(datapath, version, msg_type,
-                                             msg_len, xid, buf)
+        msg = cls._parser_new(datapath, version, msg_type, msg_len,
+                              xid, buf)
         (msg.buffer_id,
          msg.total_len,
          msg.in_port,
          msg.reason) = struct.unpack_from(
             ofproto.OFP_PACKET_IN_PACK_STR,
             msg.buf, ofproto.OFP_HEADER_SIZE)
-        msg.data = msg.buf[ofproto.OFP_PACKET_IN_SIZE:]
-        if msg.total_len < len(msg.data):
-            # discard padding for 8-byte alignment of OFP packet
-            msg.data = msg.data[:msg.total_len]
+        # discard padding for 8-byte alignment of OFP packet
+        offset = ofproto.OFP_PACKET_IN_SIZE
+        msg._set_data_view(msg.buf, offset,
+                           min(offset + msg.total_len, len(msg.buf)))
         return msg
 
 
@@ -2644,8 +2646,9 @@ class OFPPacketOut(MsgBase):
     buffer_id        ID assigned by datapath (0xffffffff if none).
     in_port          Packet's input port (OFPP_NONE if none).
     actions          ist of ``OFPAction*`` instance.
-    data             Packet data of a binary type value or
-                     an instances of packet.Packet.
+    data             Packet data of a binary type value (including
+                     ``OFPPacketIn.data_view``) or an instances of
+                     packet.Packet.
     ================ ======================================================
 
     Example::
@@ -47,6 +47,7 @@ import six
 
 from ryu.lib import addrconv
 from ryu.lib import mac
+from ryu.lib.pack_utils import get_struct
 from ryu.lib.pack_utils import msg_pack_into
 from ryu.lib.packet import packet
 from ryu import exception
@@ -88,7 +89,7 @@ def _register_exp_type(experimenter, exp_type):
     return _wrapper
 
 
-@ofproto_parser.register_msg_parser(ofproto.OFP_VERSION)
+@ofproto_parser.register_msg_parser(ofproto.OFP_VERSION, _MSG_PARSERS)
 def msg_parser(datapath, version, msg_type, msg_len, xid, buf):
     parser = _MSG_PARSERS.get(msg_type)
     return parser(datapath, version, msg_type, msg_len, xid, buf)
@@ -394,8 +395,8 @@ class OFPEchoReply(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        msg = super(OFPEchoReply, cls).parser(datapath, version, msg_type,
-                                              msg_len, xid, buf)
+        msg = cls._parser_new(datapath, version, msg_type, msg_len,
+                              xid, buf)
         msg.data = msg.buf[ofproto.OFP_HEADER_SIZE:]
         return msg
 
@@ -876,9 +877,6 @@ class OFPMatch(StringifyMixin):
         define.
         """
         super(OFPMatch, self).__init__()
-        self._wc = FlowWildcards()
-        self._flow = Flow()
-        self.fields = []
         self.type = ofproto.OFPMT_OXM
         self.length = length
 
@@ -900,6 +898,44 @@ class OFPMatch(StringifyMixin):
             self._fields2 = [ofproto.oxm_to_user(n, v, m) for (n, v, m)
                              in fields]
 
+    # The FlowWildcards, Flow and OFPMatchField list of the old API are
+    # made when they are used.  A parsed match keeps the wire format of
+    # its fields to decode the OFPMatchField list from.
+    _old_wc = None
+    _old_flow = None
+    _old_fields = None
+    _old_fields_buf = None
+
+    @property
+    def _wc(self):
+        if self._old_wc is None:
+            self._old_wc = FlowWildcards()
+        return self._old_wc
+
+    @property
+    def _flow(self):
+        if self._old_flow is None:
+            self._old_flow = Flow()
+        return self._old_flow
+
+    @property
+    def fields(self):
+        if self._old_fields is None:
+            self._old_fields = []
+            buf = self._old_fields_buf
+            if buf is not None:
+                self._old_fields_buf = None
+                try:
+                    self.parser_old(self, buf, 0, len(buf))
+                except struct.error:
+                    pass
+        return self._old_fields
+
+    @fields.setter
+    def fields(self, fields):
+        self._old_fields = fields
+        self._old_fields_buf = None
+
     def __getitem__(self, key):
         return dict(self._fields2)[key]
 
@@ -1036,8 +1072,9 @@ class OFPMatch(StringifyMixin):
         self.fields.append(OFPMatchField.make(header, value, mask))
 
     def _composed_with_old_api(self):
-        return (self.fields and not self._fields2) or \
-            self._wc.__dict__ != FlowWildcards().__dict__
+        return (self._old_fields and not self._fields2) or \
+            (self._old_wc is not None and
+             self._old_wc.__dict__ != FlowWildcards().__dict__)
 
     def serialize(self, buf, offset):
         """
@@ -1320,10 +1357,7 @@ class OFPMatch(StringifyMixin):
         exc = None
         residue = None
         # XXXcompat
-        try:
-            cls.parser_old(match, buf, offset, length)
-        except struct.error as e:
-            exc = e
+        match._old_fields_buf = six.binary_type(buf[offset:offset + length])
 
         fields = []
         try:
@@ -1590,6 +1624,16 @@ class OFPMatch(StringifyMixin):
         self._flow.ipv6_exthdr = hdr
 
 
+class OFPMatchTemplate(ofproto_parser.OXMMatchTemplate):
+    """
+    Precompiled flow match layout
+
+    See ryu.ofproto.ofproto_parser.OXMMatchTemplate.
+    """
+    _ofproto = ofproto
+    _match_cls = ofproto_parser.compiled_match_class(OFPMatch)
+
+
 class OFPPropUnknown(StringifyMixin):
     def __init__(self, type_=None, length=None, buf=None):
         self.buf = buf
@@ -2260,7 +2304,7 @@ class MTIPv6ExtHdr(OFPMatchField):
 
 @_register_parser
 @_set_msg_type(ofproto.OFPT_PACKET_IN)
-class OFPPacketIn(MsgBase):
+class OFPPacketIn(ofproto_parser.PacketDataMixin, MsgBase):
     """
     Packet-In message
 
@@ -2281,6 +2325,8 @@ class OFPPacketIn(MsgBase):
     cookie        Cookie of the flow entry that was looked up
     match         Instance of ``OFPMatch``
     data          Ethernet frame
+    data_view     ``memoryview`` of the Ethernet frame in the
+                  message buffer (no copy)
     ============= =========================================================
 
     Example::
@@ -2321,8 +2367,8 @@ class OFPPacketIn(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        msg = super(OFPPacketIn, cls).parser(datapath, version, msg_type,
-                                             msg_len, xid, buf)
+        msg = cls._parser_new(datapath, version, msg_type, msg_len,
+                              xid, buf)
         (msg.buffer_id, msg.total_len, msg.reason,
          msg.table_id, msg.cookie) = struct.unpack_from(
             ofproto.OFP_PACKET_IN_PACK_STR,
@@ -2332,12 +2378,12 @@ class OFPPacketIn(MsgBase):
                                     ofproto.OFP_MATCH_SIZE)
 
         match_len = utils.round_up(msg.match.length, 8)
-        msg.data = msg.buf[(ofproto.OFP_PACKET_IN_SIZE -
-                            ofproto.OFP_MATCH_SIZE + match_len + 2):]
+        offset = (ofproto.OFP_PACKET_IN_SIZE - ofproto.OFP_MATCH_SIZE +
+                  match_len + 2)
 
-        if msg.total_len < len(msg.data):
-            # discard padding for 8-byte alignment of OFP packet
-            msg.data = msg.data[:msg.total_len]
+        # discard padding for 8-byte alignment of OFP packet
+        msg._set_data_view(msg.buf, offset,
+                           min(offset + msg.total_len, len(msg.buf)))
 
         return msg
 
@@ -2544,8 +2590,8 @@ class OFPPortStatus(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        msg = super(OFPPortStatus, cls).parser(datapath, version, msg_type,
-                                               msg_len, xid, buf)
+        msg = cls._parser_new(datapath, version, msg_type, msg_len,
+                              xid, buf)
         msg.reason = struct.unpack_from(
             ofproto.OFP_PORT_STATUS_PACK_STR, msg.buf,
             ofproto.OFP_HEADER_SIZE)[0]
@@ -2568,8 +2614,9 @@ class OFPPacketOut(MsgBase):
     buffer_id        ID assigned by datapath (OFP_NO_BUFFER if none)
     in_port          Packet's input port or ``OFPP_CONTROLLER``
     actions          list of OpenFlow action class
-    data             Packet data of a binary type value or
-                     an instances of packet.Packet.
+    data             Packet data of a binary type value (including
+                     ``OFPPacketIn.data_view``) or an instances of
+                     packet.Packet.
     ================ ======================================================
 
     Example::
@@ -2595,6 +2642,8 @@ class OFPPacketOut(MsgBase):
         self.actions = actions
         self.data = data
 
+    _FIXED_LEN = ofproto.OFP_PACKET_OUT_SIZE
+
     def _serialize_body(self):
         self.actions_len = 0
         offset = ofproto.OFP_PACKET_OUT_SIZE
@@ -2611,9 +2660,9 @@ class OFPPacketOut(MsgBase):
             else:
                 self.buf += self.data
 
-        msg_pack_into(ofproto.OFP_PACKET_OUT_PACK_STR,
-                      self.buf, ofproto.OFP_HEADER_SIZE,
-                      self.buffer_id, self.in_port, self.actions_len)
+        get_struct(ofproto.OFP_PACKET_OUT_PACK_STR).pack_into(
+            self.buf, ofproto.OFP_HEADER_SIZE,
+            self.buffer_id, self.in_port, self.actions_len)
 
     @classmethod
     def from_jsondict(cls, dict_, decode_string=base64.b64decode,
@@ -2729,13 +2778,15 @@ class OFPFlowMod(MsgBase):
             assert isinstance(i, OFPInstruction)
         self.instructions = instructions
 
+    _FIXED_LEN = ofproto.OFP_FLOW_MOD_SIZE - ofproto.OFP_MATCH_SIZE
+
     def _serialize_body(self):
-        msg_pack_into(ofproto.OFP_FLOW_MOD_PACK_STR0, self.buf,
-                      ofproto.OFP_HEADER_SIZE,
-                      self.cookie, self.cookie_mask, self.table_id,
-                      self.command, self.idle_timeout, self.hard_timeout,
-                      self.priority, self.buffer_id, self.out_port,
-                      self.out_group, self.flags)
+        get_struct(ofproto.OFP_FLOW_MOD_PACK_STR0).pack_into(
+            self.buf, ofproto.OFP_HEADER_SIZE,
+            self.cookie, self.cookie_mask, self.table_id,
+            self.command, self.idle_timeout, self.hard_timeout,
+            self.priority, self.buffer_id, self.out_port,
+            self.out_group, self.flags)
 
         offset = (ofproto.OFP_FLOW_MOD_SIZE -
                   ofproto.OFP_MATCH_SIZE)
@@ -2791,6 +2842,7 @@ class OFPFlowMod(MsgBase):
 
 
 class OFPInstruction(StringifyMixin):
+    __slots__ = ()
     _INSTRUCTION_TYPES = {}
 
     @staticmethod
@@ -2897,6 +2949,7 @@ class OFPInstructionActions(OFPInstruction):
 
     ``type`` attribute corresponds to ``type_`` parameter of __init__.
     """
+    __slots__ = ('type', 'len', 'actions')
 
     def __init__(self, type_, actions=None, len_=None):
         super(OFPInstructionActions, self).__init__()
@@ -2981,6 +3034,8 @@ class OFPInstructionMeter(OFPInstruction):
 
 
 class OFPActionHeader(StringifyMixin):
+    __slots__ = ('type', 'len')
+
     def __init__(self, type_, len_):
         self.type = type_
         self.len = len_
@@ -2991,6 +3046,7 @@ class OFPActionHeader(StringifyMixin):
 
 
 class OFPAction(OFPActionHeader):
+    __slots__ = ()
     _ACTION_TYPES = {}
 
     @staticmethod
@@ -3031,6 +3087,7 @@ class OFPActionOutput(OFPAction):
     max_len          Max length to send to controller
     ================ ======================================================
     """
+    __slots__ = ('port', 'max_len')
 
     def __init__(self, port, max_len=ofproto.OFPCML_MAX,
                  type_=None, len_=None):
@@ -3877,25 +3934,41 @@ class OFPMultipartRequest(MsgBase):
     def _serialize_stats_body(self):
         pass
 
+    _FIXED_LEN = ofproto.OFP_MULTIPART_REQUEST_SIZE
+
     def _serialize_body(self):
-        msg_pack_into(ofproto.OFP_MULTIPART_REQUEST_PACK_STR,
-                      self.buf, ofproto.OFP_HEADER_SIZE,
-                      self.type, self.flags)
+        get_struct(ofproto.OFP_MULTIPART_REQUEST_PACK_STR).pack_into(
+            self.buf, ofproto.OFP_HEADER_SIZE, self.type, self.flags)
         self._serialize_stats_body()
 
 
+_UNPARSED_BODY = object()
+
+
 @_register_parser
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
 class OFPMultipartReply(MsgBase):
+    """
+    Multipart reply message
+
+    The body of the reply types registered with lazy_body=True is not
+    decoded by the parser.  It is decoded from the message buffer when
+    ``body`` is accessed for the first time, or entry by entry by
+    iter_body(), which does not build the list of all the entries.
+    """
+
     _STATS_MSG_TYPES = {}
+    _opt_attributes = ['body']
 
     @staticmethod
-    def register_stats_type(body_single_struct=False):
+    def register_stats_type(body_single_struct=False, lazy_body=False):
         def _register_stats_type(cls):
             assert cls.cls_stats_type is not None
             assert cls.cls_stats_type not in OFPMultipartReply._STATS_MSG_TYPES
             assert cls.cls_stats_body_cls is not None
+            assert not (body_single_struct and lazy_body)
             cls.cls_body_single_struct = body_single_struct
+            cls.cls_body_lazy = lazy_body
             OFPMultipartReply._STATS_MSG_TYPES[cls.cls_stats_type] = cls
             return cls
         return _register_stats_type
@@ -3905,6 +3978,69 @@ class OFPMultipartReply(MsgBase):
         self.body = body
         self.flags = flags
 
+    @property
+    def body(self):
+        if self._body is _UNPARSED_BODY:
+            self._body = list(self.iter_body())
+        return self._body
+
+    @body.setter
+    def body(self, body):
+        self._body = body
+
+    def iter_body(self, fields=None, yield_every=None):
+        """
+        Iterate the entries of the body, decoding them on demand.
+
+        ================ ==================================================
+        Argument         Description
+        ================ ==================================================
+        fields           Names of the attributes to decode, e.g.
+                         ``('cookie', 'packet_count')``.  The entry
+                         classes skip decoding the variable length
+                         attributes (match, instructions, properties)
+                         which are not listed and leave them None.
+                         None decodes all the attributes.
+        yield_every      Yield to the other threads with hub.sleep(0)
+                         every this number of entries.
+        ================ ==================================================
+
+        Example::
+
+            @set_ev_cls(ofp_event.EventOFPFlowStatsReply, MAIN_DISPATCHER)
+            def flow_stats_reply_handler(self, ev):
+                packets = 0
+                for stat in ev.msg.iter_body(fields=('packet_count',),
+                                             yield_every=1000):
+                    packets += stat.packet_count
+        """
+        if yield_every:
+            from ryu.lib import hub
+        if self._body is not _UNPARSED_BODY:
+            body = self._body
+            if self.cls_body_single_struct:
+                body = [body]
+            for i, entry in enumerate(body or [], 1):
+                yield entry
+                if yield_every and i % yield_every == 0:
+                    hub.sleep(0)
+            return
+
+        body_cls = self.cls_stats_body_cls
+        buf = self.buf
+        offset = ofproto.OFP_MULTIPART_REPLY_SIZE
+        i = 0
+        while offset < self.msg_len:
+            if fields is None:
+                entry = body_cls.parser(buf, offset)
+            else:
+                entry = body_cls.parser(buf, offset, fields)
+            offset += entry.length if hasattr(entry, 'length') else entry.len
+            yield entry
+            i += 1
+            if yield_every and i % yield_every == 0:
+                hub.sleep(0)
+
     @classmethod
     def parser_stats_body(cls, buf, msg_len, offset):
         body_cls = cls.cls_stats_body_cls
@@ -3937,6 +4073,10 @@ class OFPMultipartReply(MsgBase):
         msg.type = type_
         msg.flags = flags
 
+        if stats_type_cls.cls_body_lazy:
+            msg.body = _UNPARSED_BODY
+            return msg
+
         offset = ofproto.OFP_MULTIPART_REPLY_SIZE
         body = []
         while offset < msg_len:
@@ -4035,6 +4175,11 @@ class OFPDescStatsReply(OFPMultipartReply):
 
 
 class OFPFlowStats(StringifyMixin):
+    __slots__ = ('table_id', 'duration_sec', 'duration_nsec', 'priority',
+                 'idle_timeout', 'hard_timeout', 'flags', 'cookie',
+                 'packet_count', 'byte_count', 'match', 'instructions',
+                 'length')
+
     def __init__(self, table_id=None, duration_sec=None, duration_nsec=None,
                  priority=None, idle_timeout=None, hard_timeout=None,
                  flags=None, cookie=None, packet_count=None,
@@ -4056,7 +4201,7 @@ class OFPFlowStats(StringifyMixin):
         self.length = length
 
     @classmethod
-    def parser(cls, buf, offset):
+    def parser(cls, buf, offset, fields=None):
         flow_stats = cls()
 
         (flow_stats.length, flow_stats.table_id,
@@ -4068,8 +4213,18 @@ class OFPFlowStats(StringifyMixin):
             ofproto.OFP_FLOW_STATS_0_PACK_STR, buf, offset)
         offset += ofproto.OFP_FLOW_STATS_0_SIZE
 
-        flow_stats.match = OFPMatch.parser(buf, offset)
-        match_length = utils.round_up(flow_stats.match.length, 8)
+        if fields is not None and 'match' not in fields:
+            if 'instructions' not in fields:
+                return flow_stats
+            match_length = struct.unpack_from(
+                ofproto.OFP_MATCH_PACK_STR, buf, offset)[1]
+        else:
+            flow_stats.match = OFPMatch.parser(buf, offset)
+            match_length = flow_stats.match.length
+        match_length = utils.round_up(match_length, 8)
+        if fields is not None and 'instructions' not in fields:
+            return flow_stats
+
         inst_length = (flow_stats.length - (ofproto.OFP_FLOW_STATS_SIZE -
                                             ofproto.OFP_MATCH_SIZE +
                                             match_length))
@@ -4096,11 +4251,14 @@ class OFPFlowStatsRequestBase(OFPMultipartRequest):
         self.cookie_mask = cookie_mask
         self.match = match
 
+    _FIXED_LEN = (ofproto.OFP_MULTIPART_REQUEST_SIZE +
+                  ofproto.OFP_FLOW_STATS_REQUEST_0_SIZE)
+
     def _serialize_stats_body(self):
         offset = ofproto.OFP_MULTIPART_REQUEST_SIZE
-        msg_pack_into(ofproto.OFP_FLOW_STATS_REQUEST_0_PACK_STR,
-                      self.buf, offset, self.table_id, self.out_port,
-                      self.out_group, self.cookie, self.cookie_mask)
+        get_struct(ofproto.OFP_FLOW_STATS_REQUEST_0_PACK_STR).pack_into(
+            self.buf, offset, self.table_id, self.out_port,
+            self.out_group, self.cookie, self.cookie_mask)
 
         offset += ofproto.OFP_FLOW_STATS_REQUEST_0_SIZE
         self.match.serialize(self.buf, offset)
@@ -4155,7 +4313,7 @@ class OFPFlowStatsRequest(OFPFlowStatsRequestBase):
                                                   cookie, cookie_mask, match)
 
 
-@OFPMultipartReply.register_stats_type()
+@OFPMultipartReply.register_stats_type(lazy_body=True)
 @_set_stats_type(ofproto.OFPMP_FLOW, OFPFlowStats)
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
 class OFPFlowStatsReply(OFPMultipartReply):
@@ -4367,7 +4525,7 @@ class OFPPortStats(ofproto_parser.namedtuple('OFPPortStats', (
         'rx_frame_err', 'rx_over_err', 'rx_crc_err', 'collisions',
         'duration_sec', 'duration_nsec'))):
     @classmethod
-    def parser(cls, buf, offset):
+    def parser(cls, buf, offset, fields=None):
         port = struct.unpack_from(ofproto.OFP_PORT_STATS_PACK_STR,
                                   buf, offset)
         stats = cls(*port)
@@ -4406,14 +4564,15 @@ class OFPPortStatsRequest(OFPMultipartRequest):
         super(OFPPortStatsRequest, self).__init__(datapath, flags)
         self.port_no = port_no
 
+    _FIXED_LEN = (ofproto.OFP_MULTIPART_REQUEST_SIZE +
+                  ofproto.OFP_PORT_STATS_REQUEST_SIZE)
+
     def _serialize_stats_body(self):
-        msg_pack_into(ofproto.OFP_PORT_STATS_REQUEST_PACK_STR,
-                      self.buf,
-                      ofproto.OFP_MULTIPART_REQUEST_SIZE,
-                      self.port_no)
+        get_struct(ofproto.OFP_PORT_STATS_REQUEST_PACK_STR).pack_into(
+            self.buf, ofproto.OFP_MULTIPART_REQUEST_SIZE, self.port_no)
 
 
-@OFPMultipartReply.register_stats_type()
+@OFPMultipartReply.register_stats_type(lazy_body=True)
 @_set_stats_type(ofproto.OFPMP_PORT_STATS, OFPPortStats)
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
 class OFPPortStatsReply(OFPMultipartReply):
@@ -5248,7 +5407,7 @@ class OFPTableFeaturesStats(StringifyMixin):
         self.properties = properties
 
     @classmethod
-    def parser(cls, buf, offset):
+    def parser(cls, buf, offset, fields=None):
         table_features = cls()
         (table_features.length, table_features.table_id,
          name, table_features.metadata_match,
@@ -5257,6 +5416,8 @@ class OFPTableFeaturesStats(StringifyMixin):
          ) = struct.unpack_from(ofproto.OFP_TABLE_FEATURES_PACK_STR,
                                 buf, offset)
         table_features.name = name.rstrip(b'\0')
+        if fields is not None and 'properties' not in fields:
+            return table_features
 
         props = []
         rest = buf[offset + ofproto.OFP_TABLE_FEATURES_SIZE:
@@ -5586,7 +5747,7 @@ class OFPTableFeaturesStatsRequest(OFPMultipartRequest):
         self.buf += bin_body
 
 
-@OFPMultipartReply.register_stats_type()
+@OFPMultipartReply.register_stats_type(lazy_body=True)
 @_set_stats_type(ofproto.OFPMP_TABLE_FEATURES, OFPTableFeaturesStats)
 @_set_msg_type(ofproto.OFPT_MULTIPART_REPLY)
 class OFPTableFeaturesStatsReply(OFPMultipartReply):
@@ -52,7 +52,7 @@ def _register_parser(cls):
     return cls
 
 
-@ofproto_parser.register_msg_parser(ofproto.OFP_VERSION)
+@ofproto_parser.register_msg_parser(ofproto.OFP_VERSION, _MSG_PARSERS)
 def msg_parser(datapath, version, msg_type, msg_len, xid, buf):
     parser = _MSG_PARSERS.get(msg_type)
     return parser(datapath, version, msg_type, msg_len, xid, buf)
@@ -359,8 +359,8 @@ class OFPEchoReply(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        msg = super(OFPEchoReply, cls).parser(datapath, version, msg_type,
-                                              msg_len, xid, buf)
+        msg = cls._parser_new(datapath, version, msg_type, msg_len,
+                              xid, buf)
         msg.data = msg.buf[ofproto.OFP_HEADER_SIZE:]
         return msg
 
@@ -857,6 +857,16 @@ class OFPMatch(StringifyMixin):
         return OFPMatch(_ordered_fields=fields)
 
 
+class OFPMatchTemplate(ofproto_parser.OXMMatchTemplate):
+    """
+    Precompiled flow match layout
+
+    See ryu.ofproto.ofproto_parser.OXMMatchTemplate.
+    """
+    _ofproto = ofproto
+    _match_cls = ofproto_parser.compiled_match_class(OFPMatch)
+
+
 class OFPPropUnknown(StringifyMixin):
     def __init__(self, type_=None, length=None, buf=None):
         self.buf = buf
@@ -1158,7 +1168,7 @@ class OFPBundlePropExperimenter(OFPPropCommonExperimenter4ByteData):
 
 @_register_parser
 @_set_msg_type(ofproto.OFPT_PACKET_IN)
-class OFPPacketIn(MsgBase):
+class OFPPacketIn(ofproto_parser.PacketDataMixin, MsgBase):
     """
     Packet-In message
 
@@ -1182,6 +1192,8 @@ class OFPPacketIn(MsgBase):
     cookie        Cookie of the flow entry that was looked up
     match         Instance of ``OFPMatch``
     data          Ethernet frame
+    data_view     ``memoryview`` of the Ethernet frame in the
+                  message buffer (no copy)
     ============= =========================================================
 
     Example::
@@ -1228,8 +1240,8 @@ class OFPPacketIn(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        msg = super(OFPPacketIn, cls).parser(datapath, version, msg_type,
-                                             msg_len, xid, buf)
+        msg = cls._parser_new(datapath, version, msg_type, msg_len,
+                              xid, buf)
         (msg.buffer_id, msg.total_len, msg.reason,
          msg.table_id, msg.cookie) = struct.unpack_from(
             ofproto.OFP_PACKET_IN_PACK_STR,
@@ -1239,12 +1251,12 @@ class OFPPacketIn(MsgBase):
                                     ofproto.OFP_MATCH_SIZE)
 
         match_len = utils.round_up(msg.match.length, 8)
-        msg.data = msg.buf[(ofproto.OFP_PACKET_IN_SIZE -
-                            ofproto.OFP_MATCH_SIZE + match_len + 2):]
+        offset = (ofproto.OFP_PACKET_IN_SIZE - ofproto.OFP_MATCH_SIZE +
+                  match_len + 2)
 
-        if msg.total_len < len(msg.data):
-            # discard padding for 8-byte alignment of OFP packet
-            msg.data = msg.data[:msg.total_len]
+        # discard padding for 8-byte alignment of OFP packet
+        msg._set_data_view(msg.buf, offset,
+                           min(offset + msg.total_len, len(msg.buf)))
 
         return msg
 
@@ -4029,8 +4041,8 @@ class OFPPortStatus(MsgBase):
 
     @classmethod
     def parser(cls, datapath, version, msg_type, msg_len, xid, buf):
-        msg = super(OFPPortStatus, cls).parser(datapath, version, msg_type,
-                                               msg_len, xid, buf)
+        msg = cls._parser_new(datapath, version, msg_type, msg_len,
+                              xid, buf)
         msg.reason = struct.unpack_from(
             ofproto.OFP_PORT_STATUS_PACK_STR, msg.buf,
             ofproto.OFP_HEADER_SIZE)[0]
@@ -4250,8 +4262,9 @@ class OFPPacketOut(MsgBase):
     buffer_id        ID assigned by datapath (OFP_NO_BUFFER if none)
     in_port          Packet's input port or ``OFPP_CONTROLLER``
     actions          list of OpenFlow action class
-    data             Packet data of a binary type value or
-                     an instances of packet.Packet.
+    data             Packet data of a binary type value (including
+                     ``OFPPacketIn.data_view``) or an instances of
+                     packet.Packet.
     ================ ======================================================
 
     Example::
@@ -285,6 +285,12 @@ def del_network(prefix):
     tm.update_global_table(prefix, is_withdraw=True)
     return True
 
+
+@register(name='network.load')
+def load_networks(routes):
+    tm = CORE_MANAGER.get_core_service().table_manager
+    return tm.load_global_table(routes)
+
 # =============================================================================
 # BMP configuration related APIs
 # =============================================================================
@@ -685,6 +685,29 @@ class BGPSpeaker(object):
 
         call(func_name, **networks)
 
+    def rib_load(self, routes):
+        """ This method adds routes to be advertised in bulk.
+
+        ``routes`` is an iterable of (prefix, path attributes, next hop)
+        of IPv4 and IPv6 unicast routes, where prefix is an instance of
+        IPAddrPrefix or IP6AddrPrefix, path attributes is a list of the
+        BGP path attributes to advertise and next hop is the next hop
+        address or None.
+
+        For example, to advertise the routes of a peer in a MRT RIB
+        dump::
+
+            import bz2
+            from ryu.lib import mrtlib
+
+            reader = mrtlib.Reader(bz2.BZ2File('rib.bz2', 'rb'),
+                                   peers=['192.168.0.1'])
+            speaker.rib_load(mrtlib.rib_routes(reader))
+
+        Returns the number of the routes added.
+        """
+        return call('network.load', routes=routes)
+
     def evpn_prefix_add(self, route_type, route_dist, esi=0,
                         ethernet_tag_id=None, mac_addr=None, ip_addr=None,
                         ip_prefix=None, gw_ip_addr=None, vni=None,
@@ -55,6 +55,9 @@ from ryu.lib.packet.bgp import BGPPathAttributeAsPath
 from ryu.lib.packet.bgp import BGPPathAttributeExtendedCommunities
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_ORIGIN
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_AS_PATH
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_NEXT_HOP
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_MP_REACH_NLRI
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_MP_UNREACH_NLRI
 from ryu.lib.packet.bgp import BGP_ATTR_ORIGIN_IGP
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_EXTENDED_COMMUNITIES
 from ryu.lib.packet.bgp import EvpnEsi
@@ -811,6 +814,56 @@ class TableCoreManager(object):
         # add to global table and propagates to neighbors
         self.learn_path(new_path)
 
+    def load_global_table(self, routes):
+        """Add BGP routes to the Global table in bulk.
+
+        `routes` is an iterable of (`nlri`, `pathattrs`, `next_hop`) with
+        `nlri` of IPAddrPrefix or IP6AddrPrefix, the list of the path
+        attributes `pathattrs` and `next_hop`, which is None for the
+        default, e.g. mrtlib.rib_routes() of a RIB dump.  The paths are
+        made from the parsed NLRI and path attributes as they are,
+        without converting the prefixes from and to strings.
+
+        Returns the number of the routes added.
+        """
+        src_ver_num = 1
+        peer = None
+        count = 0
+        for nlri, pathattrs, next_hop in routes:
+            if isinstance(nlri, IPAddrPrefix):
+                p = Ipv4Path
+                default_next_hop = '0.0.0.0'
+            elif isinstance(nlri, IP6AddrPrefix):
+                p = Ipv6Path
+                default_next_hop = '::'
+            else:
+                raise ValueError('Invalid NLRI for the Global table: %s'
+                                 % nlri)
+
+            pattrs = OrderedDict()
+            pattrs[BGP_ATTR_TYPE_ORIGIN] = None
+            pattrs[BGP_ATTR_TYPE_AS_PATH] = None
+            for attr in pathattrs:
+                pattrs[attr.type] = attr
+            # the next hop is of the path
+            for attr_type in (BGP_ATTR_TYPE_NEXT_HOP,
+                              BGP_ATTR_TYPE_MP_REACH_NLRI,
+                              BGP_ATTR_TYPE_MP_UNREACH_NLRI):
+                pattrs.pop(attr_type, None)
+            # set mandatory path attributes
+            if pattrs[BGP_ATTR_TYPE_ORIGIN] is None:
+                pattrs[BGP_ATTR_TYPE_ORIGIN] = BGPPathAttributeOrigin(
+                    BGP_ATTR_ORIGIN_IGP)
+            if pattrs[BGP_ATTR_TYPE_AS_PATH] is None:
+                pattrs[BGP_ATTR_TYPE_AS_PATH] = BGPPathAttributeAsPath([[]])
+
+            new_path = p(peer, nlri, src_ver_num, pattrs=pattrs,
+                         nexthop=next_hop or default_next_hop)
+            self.learn_path(new_path)
+            count += 1
+
+        return count
+
     def update_flowspec_global_table(self, flowspec_family, rules,
                                      actions=None, is_withdraw=False):
         """Update a BGP route in the Global table for Flow Specification.
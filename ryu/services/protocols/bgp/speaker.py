@@ -41,6 +41,7 @@ from ryu.lib.packet.bgp import BGP_CAP_MULTIPROTOCOL
 from ryu.lib.packet.bgp import BGP_ERROR_HOLD_TIMER_EXPIRED
 from ryu.lib.packet.bgp import BGP_ERROR_SUB_HOLD_TIMER_EXPIRED
 from ryu.lib.packet.bgp import get_rf
+from ryu.lib.packet.stream_parser import Framer
 
 from ryu.services.protocols.bgp.base import Activity
 from ryu.services.protocols.bgp.base import add_bgp_error_metadata
@@ -102,7 +103,10 @@ class BgpProtocol(Protocol, Activity):
         Activity.__init__(self, name=activity_name)
         # Initialize instance variables.
         self._peer = None
-        self._recv_buff = b''
+        self._recv_buff = Framer(BGP_MIN_MSG_LEN, self._get_msg_len)
+        # The path attributes received from the peer interned by their
+        # wire format, which the paths learned share and never modify.
+        self._interned_attributes = {}
         self._socket = socket
         self._socket.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
         self._sendlock = semaphore.Semaphore()
@@ -274,7 +278,7 @@ class BgpProtocol(Protocol, Activity):
         # We wait for peer to send messages.
         self._recv_loop()
 
-    def data_received(self, next_bytes):
+    def data_received(self, next_bytes=None):
         try:
             self._data_received(next_bytes)
         except bgp.BgpExc as exc:
@@ -297,61 +301,63 @@ class BgpProtocol(Protocol, Activity):
         """
         return struct.unpack('!16sHB', buff)
 
-    def _data_received(self, next_bytes):
-        """Maintains buffer of bytes received from peer and extracts bgp
-        message from this buffer if enough data is received.
+    def _get_msg_len(self, buff, offset):
+        """Validates bgp message marker and length of the message header at
+        `offset` of `buff` and returns the length.
+        """
+        # Parse message header into elements.
+        auth, length, ptype = BgpProtocol.parse_msg_header(
+            buff[offset:offset + BGP_MIN_MSG_LEN])
 
-        Validates bgp message marker, length, type and data and constructs
-        appropriate bgp message instance and calls handler.
+        # Check if we have valid bgp message marker.
+        # We should get default marker since we are not supporting any
+        # authentication.
+        if (auth != BgpProtocol.MESSAGE_MARKER):
+            LOG.error('Invalid message marker received: %s', auth)
+            raise bgp.NotSync()
 
-        :Parameters:
-            - `next_bytes`: next set of bytes received from peer.
-        """
-        # Append buffer with received bytes.
-        self._recv_buff += next_bytes
+        # Check if we have valid bgp message length.
+        check = (length < BGP_MIN_MSG_LEN or length > BGP_MAX_MSG_LEN)
 
-        while True:
-            # If current buffer size is less then minimum bgp message size, we
-            # return as we do not have a complete bgp message to work with.
-            if len(self._recv_buff) < BGP_MIN_MSG_LEN:
-                return
+        # RFC says: The minimum length of the OPEN message is 29
+        # octets (including the message header).
+        check2 = (ptype == BGP_MSG_OPEN and length < BGPOpen._MIN_LEN)
 
-            # Parse message header into elements.
-            auth, length, ptype = BgpProtocol.parse_msg_header(
-                self._recv_buff[:BGP_MIN_MSG_LEN])
+        # RFC says: A KEEPALIVE message consists of only the
+        # message header and has a length of 19 octets.
+        check3 = (ptype == BGP_MSG_KEEPALIVE and
+                  length != BGPKeepAlive._MIN_LEN)
 
-            # Check if we have valid bgp message marker.
-            # We should get default marker since we are not supporting any
-            # authentication.
-            if (auth != BgpProtocol.MESSAGE_MARKER):
-                LOG.error('Invalid message marker received: %s', auth)
-                raise bgp.NotSync()
+        # RFC says: The minimum length of the UPDATE message is 23
+        # octets.
+        check4 = (ptype == BGP_MSG_UPDATE and
+                  length < BGPUpdate._MIN_LEN)
 
-            # Check if we have valid bgp message length.
-            check = (length < BGP_MIN_MSG_LEN or length > BGP_MAX_MSG_LEN)
+        if any((check, check2, check3, check4)):
+            raise bgp.BadLen(ptype, length)
 
-            # RFC says: The minimum length of the OPEN message is 29
-            # octets (including the message header).
-            check2 = (ptype == BGP_MSG_OPEN and length < BGPOpen._MIN_LEN)
+        return length
 
-            # RFC says: A KEEPALIVE message consists of only the
-            # message header and has a length of 19 octets.
-            check3 = (ptype == BGP_MSG_KEEPALIVE and
-                      length != BGPKeepAlive._MIN_LEN)
+    def _data_received(self, next_bytes=None):
+        """Maintains buffer of bytes received from peer and extracts bgp
+        message from this buffer if enough data is received.
 
-            # RFC says: The minimum length of the UPDATE message is 23
-            # octets.
-            check4 = (ptype == BGP_MSG_UPDATE and
-                      length < BGPUpdate._MIN_LEN)
+        Validates bgp message marker, length, type and data and constructs
+        appropriate bgp message instance and calls handler.
 
-            if any((check, check2, check3, check4)):
-                raise bgp.BadLen(ptype, length)
+        :Parameters:
+            - `next_bytes`: next set of bytes received from peer, or None
+              if they are received into the buffer by `_recv_loop`.
+        """
+        # Append buffer with received bytes.
+        if next_bytes is not None:
+            self._recv_buff.feed(next_bytes)
 
-            # If we have partial message we wait for rest of the message.
-            if len(self._recv_buff) < length:
-                return
-            msg, _, rest = BGPMessage.parser(self._recv_buff)
-            self._recv_buff = rest
+        # The buffer keeps a partial message until the rest of it is
+        # received.
+        for frame in self._recv_buff.frames():
+            msg, _, _ = BGPMessage.parser(
+                frame.tobytes(), interned=self._interned_attributes)
 
             # If we have a valid bgp message we call message handler.
             self._handle_msg(msg)
@@ -551,15 +557,13 @@ class BgpProtocol(Protocol, Activity):
         """Sits in tight loop collecting data received from peer and
         processing it.
         """
-        required_len = BGP_MIN_MSG_LEN
         conn_lost_reason = "Connection lost as protocol is no longer active"
         try:
             while True:
-                next_bytes = self._socket.recv(required_len)
-                if len(next_bytes) == 0:
+                if not self._recv_buff.recv_into(self._socket):
                     conn_lost_reason = 'Peer closed connection'
                     break
-                self.data_received(next_bytes)
+                self.data_received()
         except socket.error as err:
             conn_lost_reason = 'Connection to peer lost: %s.' % err
         except bgp.BgpExc as ex:
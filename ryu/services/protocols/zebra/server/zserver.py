@@ -21,7 +21,6 @@ import contextlib
 import logging
 import os
 import socket
-import struct
 
 from ryu import cfg
 from ryu.base import app_manager
@@ -30,6 +29,8 @@ from ryu.controller.handler import set_ev_cls
 from ryu.lib import hub
 from ryu.lib import ip
 from ryu.lib.packet import zebra
+from ryu.lib.packet.stream_parser import Framer
+from ryu.lib.packet.stream_parser import length_field
 
 from ryu.services.protocols.zebra import db
 from ryu.services.protocols.zebra import event
@@ -96,28 +97,18 @@ class ZClient(object):
         self.stop()
 
     def _recv_loop(self):
-        buf = b''
-        min_len = recv_len = zebra.ZebraMessage.get_header_size(
-            self.zserv_ver)
+        framer = Framer(zebra.ZebraMessage.get_header_size(self.zserv_ver),
+                        length_field('!H'))
         try:
             while self.is_active:
                 try:
-                    recv_buf = self.sock.recv(recv_len)
+                    if not framer.recv_into(self.sock):
+                        break
                 except socket.timeout:
                     continue
 
-                if len(recv_buf) == 0:
-                    break
-
-                buf += recv_buf
-                while len(buf) >= min_len:
-                    (length,) = struct.unpack_from('!H', buf)
-                    if (length - len(buf)) > 0:
-                        # Need to receive remaining data
-                        recv_len = length - len(buf)
-                        break
-
-                    msg, _, buf = zebra.ZebraMessage.parser(buf)
+                for frame in framer.frames():
+                    msg, _, _ = zebra.ZebraMessage.parser(frame.tobytes())
 
                     ev = event.message_to_event(self, msg)
                     if ev:
@@ -128,6 +119,9 @@ class ZClient(object):
             self.logger.exception(
                 'Error while sending message to Zebra client%s: %s',
                 self.addr, e)
+        except ValueError as e:
+            self.logger.error(
+                'Invalid message from Zebra client%s: %s', self.addr, e)
 
         self.stop()
 
@@ -0,0 +1,37 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Micro benchmarks.
+
+These are not unit tests and are not collected by the test runner.
+Run each module directly, e.g.::
+
+    $ python -m ryu.tests.benchmark.bench_topology_graph
+"""
+
+from __future__ import print_function
+
+import timeit
+
+
+def bench(name, func, number=1000, repeat=3):
+    """Run func number times, repeat times, and print the best result.
+
+    Returns the best time per call in seconds.
+    """
+    best = min(timeit.repeat(func, number=number, repeat=repeat)) / number
+    print('%-48s %12.3f usec/call' % (name, best * 1e6))
+    return best
@@ -0,0 +1,86 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Address conversions of ryu.lib.addrconv, one call at a time, and as
+part of parsing Ethernet/IPv4/TCP and Ethernet/ARP packets.
+"""
+
+from __future__ import print_function
+
+import struct
+
+from ryu.lib import addrconv
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.tests.benchmark import bench
+
+NUMBER = 100000
+
+
+def _packets():
+    pkt = packet.Packet()
+    pkt.add_protocol(ethernet.ethernet(src='f2:0b:a4:01:0a:23',
+                                       dst='f2:0b:a4:01:0a:24'))
+    pkt.add_protocol(ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2', proto=6))
+    pkt.add_protocol(tcp.tcp(src_port=1234, dst_port=80))
+    pkt.serialize()
+    tcp_data = bytes(pkt.data)
+
+    pkt = packet.Packet()
+    pkt.add_protocol(ethernet.ethernet(src='f2:0b:a4:01:0a:23',
+                                       dst='ff:ff:ff:ff:ff:ff',
+                                       ethertype=0x0806))
+    pkt.add_protocol(arp.arp(src_mac='f2:0b:a4:01:0a:23',
+                             src_ip='10.0.0.1', dst_ip='10.0.0.2'))
+    pkt.serialize()
+    return tcp_data, bytes(pkt.data)
+
+
+def main():
+    ipv4_bin = b'\x0a\x00\x00\x01'
+    ipv6_bin = (b'\xfe\x80\x00\x00\x00\x00\x00\x00'
+                b'\xf0\x0b\xa4\xff\xfe\x7d\xf8\xea')
+    mac_bin = b'\xf2\x0b\xa4\x01\x0a\x23'
+    for name, conv, bin in (('ipv4', addrconv.ipv4, ipv4_bin),
+                            ('ipv6', addrconv.ipv6, ipv6_bin),
+                            ('mac', addrconv.mac, mac_bin)):
+        text = conv.bin_to_text(bin)
+        bench('%s.bin_to_text()' % name,
+              lambda: conv.bin_to_text(bin), number=NUMBER)
+        bench('%s.text_to_bin()' % name,
+              lambda: conv.text_to_bin(text), number=NUMBER)
+
+    # distinct addresses, which miss the caches
+    addrs = [struct.pack('!I', 0x0a000000 + i) for i in range(NUMBER)]
+
+    def _distinct():
+        for bin in addrs:
+            addrconv.ipv4.bin_to_text(bin)
+
+    bench('ipv4.bin_to_text(), %d distinct' % NUMBER, _distinct, number=1)
+
+    tcp_data, arp_data = _packets()
+    bench('Packet(), ethernet/ipv4/tcp',
+          lambda: packet.Packet(tcp_data), number=NUMBER // 10)
+    bench('Packet(), ethernet/arp',
+          lambda: packet.Packet(arp_data), number=NUMBER // 10)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Extracting the 5-tuple of 100000 ethernet/IPv4/TCP and UDP frames, one
+packet.Packet per frame against batch.Batch.
+"""
+
+from __future__ import print_function
+
+from ryu.lib.packet import batch
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+from ryu.tests.benchmark import bench
+
+NUMBER = 100000
+
+
+def _frames():
+    frames = []
+    for i in range(NUMBER):
+        if i % 2:
+            l4 = tcp.tcp(1024 + i % 1000, 80)
+            proto = inet.IPPROTO_TCP
+        else:
+            l4 = udp.udp(1024 + i % 1000, 53)
+            proto = inet.IPPROTO_UDP
+        pkt = (ethernet.ethernet('f2:0b:a4:01:0a:24', 'f2:0b:a4:01:0a:23',
+                                 ether.ETH_TYPE_IP) /
+               ipv4.ipv4(src='10.0.%d.%d' % (i // 256 % 256, i % 256),
+                         dst='10.1.0.1', proto=proto) /
+               l4 / (b'\x01' * (i % 1400)))
+        pkt.serialize()
+        frames.append(bytes(pkt.data))
+    return frames
+
+
+def main():
+    frames = _frames()
+
+    def _packets():
+        for data in frames:
+            pkt = packet.Packet(data)
+            ip = pkt.get_protocol(ipv4.ipv4)
+            l4 = pkt.protocols[2]
+            (ip.src, ip.dst, ip.proto, l4.src_port, l4.dst_port)
+
+    def _batch():
+        batch.Batch(frames)
+
+    t = bench('Packet() per frame, %d frames' % NUMBER, _packets, number=1)
+    print('%48s %12.0f frames/s' % ('', NUMBER / t))
+    t = bench('Batch(), %d frames' % NUMBER, _batch, number=1)
+    print('%48s %12.0f frames/s' % ('', NUMBER / t))
+
+
+if __name__ == '__main__':
+    main()
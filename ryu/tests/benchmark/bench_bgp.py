@@ -0,0 +1,94 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parsing and serializing BGP UPDATE messages of a full table churn:
+IPv4 UPDATEs of 100 prefixes and IPv6 UPDATEs of 50 prefixes (in
+MP_REACH_NLRI) with ORIGIN, AS_PATH, NEXT_HOP, MULTI_EXIT_DISC,
+LOCAL_PREF and COMMUNITIES of 10 different values, with and without
+interning the path attributes, and serializing each UPDATE for 10
+peers.
+"""
+
+from __future__ import print_function
+
+from ryu.lib.packet import bgp
+from ryu.tests.benchmark import bench
+
+NUMBER = 1000
+
+
+def _attributes(i):
+    return [
+        bgp.BGPPathAttributeOrigin(0),
+        bgp.BGPPathAttributeAsPath([[65001, 3356, 1299, 64512 + i % 10]],
+                                   as_pack_str='!I'),
+        bgp.BGPPathAttributeNextHop('192.0.2.1'),
+        bgp.BGPPathAttributeMultiExitDisc(100),
+        bgp.BGPPathAttributeLocalPref(200),
+        bgp.BGPPathAttributeCommunities([0xfde80001, 0xfde80002,
+                                         0xfde80000 + i % 10]),
+    ]
+
+
+def _updates():
+    ipv4 = []
+    ipv6 = []
+    for i in range(NUMBER):
+        nlri = [bgp.IPAddrPrefix(24, '%d.%d.%d.0' % (
+            1 + i // 256, i % 256, j)) for j in range(100)]
+        msg = bgp.BGPUpdate(path_attributes=_attributes(i), nlri=nlri)
+        ipv4.append(bytes(msg.serialize()))
+        nlri = [bgp.IP6AddrPrefix(48, '2001:db8:%x:%x::' % (i, j))
+                for j in range(50)]
+        attrs = _attributes(i)
+        attrs[2] = bgp.BGPPathAttributeMpReachNLRI(
+            afi=2, safi=1, next_hop='2001:db8::1', nlri=nlri)
+        msg = bgp.BGPUpdate(path_attributes=attrs)
+        ipv6.append(bytes(msg.serialize()))
+    return ipv4, ipv6
+
+
+def main():
+    ipv4, ipv6 = _updates()
+
+    def _parse(bufs, interned):
+        for buf in bufs:
+            bgp.BGPMessage.parser(buf, interned=interned)
+
+    for interning in (False, True):
+        name = ', interning' if interning else ''
+        interned = {} if interning else None
+        t = bench('parse IPv4 UPDATE x %d%s' % (NUMBER, name),
+                  lambda: _parse(ipv4, interned), number=1)
+        print('%48s %12.0f prefixes/s' % ('', NUMBER * 100 / t))
+        t = bench('parse IPv6 UPDATE x %d%s' % (NUMBER, name),
+                  lambda: _parse(ipv6, interned), number=1)
+        print('%48s %12.0f prefixes/s' % ('', NUMBER * 50 / t))
+
+    msgs = [bgp.BGPMessage.parser(buf)[0] for buf in ipv4]
+
+    def _serialize():
+        for msg in msgs:
+            for _peer in range(10):
+                bgp.BGPUpdate(path_attributes=msg.path_attributes,
+                              nlri=msg.nlri).serialize()
+
+    bench('serialize IPv4 UPDATE x %d x 10 peers' % NUMBER, _serialize,
+          number=1)
+
+
+if __name__ == '__main__':
+    main()
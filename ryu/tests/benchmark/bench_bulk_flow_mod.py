@@ -0,0 +1,132 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Programming 50k flows into a switch over TCP loopback, from sending
+the FlowMods to the barrier (or bundle commit) reply: one send_msg()
+per FlowMod, and Datapath.send_mods() with a barrier and with a bundle.
+"""
+
+from __future__ import print_function
+
+import struct
+import time
+
+from ryu.lib import hub
+hub.patch()
+
+from ryu.base import app_manager
+from ryu.controller import controller
+from ryu.controller import handler
+from ryu.ofproto import ofproto_common
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_4
+
+NUM_FLOWS = 50000
+
+
+class _OFPHandler(object):
+    # ofp_event brick without any application
+    def send_event_to_observers(self, ev, state=None):
+        pass
+
+    def get_handlers(self, ev, state=None):
+        return []
+
+
+def _switch(sock, done):
+    # replies to barrier and bundle control requests
+    rfile = sock.makefile('rb')
+    while True:
+        header = rfile.read(ofproto_common.OFP_HEADER_SIZE)
+        if not header:
+            break
+        version, msg_type, msg_len, xid = struct.unpack(
+            ofproto_common.OFP_HEADER_PACK_STR, header)
+        body = rfile.read(msg_len - len(header))
+        if msg_type == ofproto_v1_3.OFPT_BARRIER_REQUEST:
+            done.set()
+            sock.sendall(struct.pack(ofproto_common.OFP_HEADER_PACK_STR,
+                                     version,
+                                     ofproto_v1_3.OFPT_BARRIER_REPLY,
+                                     ofproto_common.OFP_HEADER_SIZE, xid))
+        elif (version == ofproto_v1_4.OFP_VERSION and
+              msg_type == ofproto_v1_4.OFPT_BUNDLE_CONTROL):
+            bundle_id, type_, flags = struct.unpack_from('!IHH', body)
+            sock.sendall(struct.pack(ofproto_common.OFP_HEADER_PACK_STR +
+                                     'IHH', version, msg_type,
+                                     ofproto_common.OFP_HEADER_SIZE + 8,
+                                     xid, bundle_id, type_ + 1, flags))
+
+
+def _run(name, version, program):
+    server = hub.listen(('127.0.0.1', 0))
+    sw_sock = hub.connect(server.getsockname())
+    ctl_sock, _addr = server.accept()
+    server.close()
+    done = hub.Event()
+    sw_thread = hub.spawn(_switch, sw_sock, done)
+    dp = controller.Datapath(ctl_sock, ('127.0.0.1', 0))
+    dp.set_version(version)
+    dp.set_state(handler.MAIN_DISPATCHER)
+    dp_thread = hub.spawn(dp.serve)
+
+    parser = dp.ofproto_parser
+    template = parser.OFPMatchTemplate('eth_type', 'ipv4_dst')
+    mods = []
+    for i in range(NUM_FLOWS):
+        match = template(eth_type=0x0800, ipv4_dst=i + 1)
+        inst = [parser.OFPInstructionActions(
+            dp.ofproto.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(2)])]
+        mods.append(parser.OFPFlowMod(dp, priority=1, match=match,
+                                      instructions=inst))
+
+    start = time.time()
+    program(dp, mods, done)
+    elapsed = time.time() - start
+    print('%-32s %6.2f sec %8.0f flows/s' %
+          (name, elapsed, NUM_FLOWS / elapsed))
+
+    hub.kill(dp_thread)
+    sw_sock.close()
+    hub.joinall([dp_thread, sw_thread])
+
+
+def _send_msg(dp, mods, done):
+    for mod in mods:
+        dp.send_msg(mod)
+    dp.send_barrier()
+    done.wait()
+
+
+def _send_mods(dp, mods, done):
+    dp.send_mods(mods).result()
+
+
+def _send_mods_bundle(dp, mods, done):
+    dp.send_mods(mods, bundle=True).result()
+
+
+def main():
+    app_manager.SERVICE_BRICKS['ofp_event'] = _OFPHandler()
+    _run('OF1.3 send_msg() per FlowMod', ofproto_v1_3.OFP_VERSION,
+         _send_msg)
+    _run('OF1.3 send_mods()', ofproto_v1_3.OFP_VERSION, _send_mods)
+    _run('OF1.4 send_mods(bundle=True)', ofproto_v1_4.OFP_VERSION,
+         _send_mods_bundle)
+
+
+if __name__ == '__main__':
+    main()
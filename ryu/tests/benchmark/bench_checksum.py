@@ -0,0 +1,53 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The Internet checksum of packet_utils over an IPv4 header, a full
+Ethernet payload and a jumbo frame, and rewriting the TTL of an IPv4
+header with checksum_update() instead of recomputing the checksum.
+"""
+
+from __future__ import print_function
+
+from ryu.lib.packet import packet_utils
+from ryu.tests.benchmark import bench
+
+NUMBER = 10000
+
+
+def main():
+    for length in (20, 1500, 9000):
+        data = bytes(bytearray(i % 251 for i in range(length)))
+        bench('checksum(), %d bytes' % length,
+              lambda: packet_utils.checksum(data), number=NUMBER)
+
+    header = bytearray(b'\x45\x00\x00\x54\x00\x00\x40\x00\x40\x01'
+                       b'\x00\x00\x0a\x00\x00\x01\x0a\x00\x00\x02')
+    csum = packet_utils.checksum(header)
+
+    def _recompute():
+        header[8] = 0x3f
+        header[10:12] = b'\x00\x00'
+        return packet_utils.checksum(header)
+
+    bench('TTL rewrite, recomputed', _recompute, number=NUMBER)
+    if hasattr(packet_utils, 'checksum_update'):
+        bench('TTL rewrite, checksum_update()',
+              lambda: packet_utils.checksum_update(csum, 0x4001, 0x3f01),
+              number=NUMBER)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Looking up the protocol headers of a decoded Ethernet/IPv4/TCP packet
+as the PacketIn handlers do, e.g. MinDelayPath asking for ethernet,
+arp and ipv6.
+"""
+
+from __future__ import print_function
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+from ryu.tests.benchmark import bench
+
+NUMBER = 100000
+
+
+def main():
+    pkt = (ethernet.ethernet('f2:0b:a4:01:0a:24', 'f2:0b:a4:01:0a:23',
+                             ether.ETH_TYPE_IP) /
+           ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2',
+                     proto=inet.IPPROTO_TCP) /
+           tcp.tcp(1234, 80) / (b'\x01' * 64))
+    pkt.serialize()
+    pkt = packet.Packet(pkt.data)
+
+    def _mindelaypath():
+        pkt.get_protocol(ethernet.ethernet)
+        pkt.get_protocol(arp.arp)
+        pkt.get_protocol(ipv6.ipv6)
+
+    bench('get_protocol() ethernet, arp, ipv6', _mindelaypath, number=NUMBER)
+    bench('get_protocol(tcp)', lambda: pkt.get_protocol(tcp.tcp),
+          number=NUMBER)
+    bench('get_protocols(tcp)', lambda: pkt.get_protocols(tcp.tcp),
+          number=NUMBER)
+    bench('arp in pkt', lambda: arp.arp in pkt, number=NUMBER)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+PacketIn -> FlowMod round trip latency over TCP loopback with the hub
+backend selected by RYU_HUB_TYPE.  Compare the backends with::
+
+    $ RYU_HUB_TYPE=eventlet python -m ryu.tests.benchmark.bench_hub_backends
+    $ RYU_HUB_TYPE=asyncio python -m ryu.tests.benchmark.bench_hub_backends
+"""
+
+from __future__ import print_function
+
+import struct
+import time
+
+from ryu.lib import hub
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import packet
+from ryu.ofproto import ofproto_common
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+NUM_ROUND_TRIPS = 5000
+NUM_SWITCHES = 20
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = ofproto_v1_3_parser
+
+
+def _packet_in():
+    # OFPPacketIn cannot be serialized, build it by hand
+    pkt = packet.Packet()
+    pkt.add_protocol(ethernet.ethernet(dst='00:00:00:00:00:02',
+                                       src='00:00:00:00:00:01'))
+    pkt.serialize()
+    buf = bytearray()
+    match = ofproto_v1_3_parser.OFPMatch(in_port=1)
+    match.serialize(buf, 0)
+    body = struct.pack(ofproto_v1_3.OFP_PACKET_IN_PACK_STR,
+                       ofproto_v1_3.OFP_NO_BUFFER, len(pkt.data),
+                       ofproto_v1_3.OFPR_NO_MATCH, 0, 0)
+    msg = body + bytes(buf) + b'\x00' * 2 + bytes(pkt.data)
+    header = struct.pack(ofproto_common.OFP_HEADER_PACK_STR,
+                         ofproto_v1_3.OFP_VERSION,
+                         ofproto_v1_3.OFPT_PACKET_IN,
+                         ofproto_common.OFP_HEADER_SIZE + len(msg), 0)
+    return header + msg
+
+
+def _recv_msg(rfile):
+    header = rfile.read(ofproto_common.OFP_HEADER_SIZE)
+    if len(header) < ofproto_common.OFP_HEADER_SIZE:
+        return None
+    _version, _msg_type, msg_len, _xid = struct.unpack(
+        ofproto_common.OFP_HEADER_PACK_STR, header)
+    return header + rfile.read(msg_len - len(header))
+
+
+def _controller(sock, addr):
+    # what a learning switch does for each packet-in
+    dp = _Datapath()
+    parser = dp.ofproto_parser
+    rfile = sock.makefile('rb')
+    while True:
+        buf = _recv_msg(rfile)
+        if buf is None:
+            break
+        version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+        msg = ofproto_parser.msg(dp, version, msg_type, msg_len, xid, buf)
+        eth = packet.Packet(msg.data).get_protocols(ethernet.ethernet)[0]
+        match = parser.OFPMatch(in_port=msg.match['in_port'],
+                                eth_dst=eth.dst, eth_src=eth.src)
+        actions = [parser.OFPActionOutput(2)]
+        inst = [parser.OFPInstructionActions(
+            dp.ofproto.OFPIT_APPLY_ACTIONS, actions)]
+        mod = parser.OFPFlowMod(dp, priority=1, match=match,
+                                instructions=inst)
+        mod.serialize()
+        sock.sendall(mod.buf)
+    sock.close()
+
+
+def _switch(port, count, latencies):
+    sock = hub.connect(('127.0.0.1', port))
+    rfile = sock.makefile('rb')
+    packet_in = _packet_in()
+    for _ in range(count):
+        start = time.time()
+        sock.sendall(packet_in)
+        _recv_msg(rfile)
+        latencies.append(time.time() - start)
+    sock.close()
+
+
+def _report(name, latencies, elapsed):
+    latencies.sort()
+    n = len(latencies)
+    print('%-24s %6d round trips  p50 %7.1f usec  p99 %7.1f usec  '
+          '%8.0f msg/s' % (name, n, latencies[n // 2] * 1e6,
+                           latencies[n * 99 // 100] * 1e6, n / elapsed))
+
+
+def main():
+    server = hub.StreamServer(('127.0.0.1', 0), _controller)
+    port = server.server.getsockname()[1]
+    server_thread = hub.spawn(server.serve_forever)
+    print('hub type: %s' % hub.HUB_TYPE)
+
+    latencies = []
+    start = time.time()
+    _switch(port, NUM_ROUND_TRIPS, latencies)
+    _report('1 switch', latencies, time.time() - start)
+
+    latencies = []
+    start = time.time()
+    threads = [hub.spawn(_switch, port, NUM_ROUND_TRIPS // NUM_SWITCHES,
+                         latencies)
+               for _ in range(NUM_SWITCHES)]
+    hub.joinall(threads)
+    _report('%d switches' % NUM_SWITCHES, latencies, time.time() - start)
+
+    hub.kill(server_thread)
+
+
+if __name__ == '__main__':
+    hub.patch()
+    main()
@@ -0,0 +1,78 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Making and parsing the LLDP frames of link discovery for the number of
+ports given as the argument (20000 by default), 40 ports per switch:
+packet.Packet against the template and the fixed offsets, and
+rejecting as many packet-ins of other than LLDP.
+"""
+
+from __future__ import print_function
+
+import sys
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.ofproto import ether
+from ryu.tests.benchmark import bench
+from ryu.topology.switches import LLDPPacket
+
+PORTS_PER_SWITCH = 40
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    ports = [(1 + i // PORTS_PER_SWITCH, 1 + i % PORTS_PER_SWITCH,
+              '02:00:00:%02x:%02x:%02x' % (i >> 16, (i >> 8) & 0xff,
+                                           i & 0xff))
+             for i in range(number)]
+
+    def _make(lldp_packet):
+        return [bytes(lldp_packet(dpid, port_no, hw_addr, 120))
+                for dpid, port_no, hw_addr in ports]
+
+    frames = _make(LLDPPacket.lldp_packet)
+    pkt = (ethernet.ethernet('ff:ff:ff:ff:ff:ff', '02:00:00:00:00:01',
+                             ether.ETH_TYPE_ARP) /
+           arp.arp(src_mac='02:00:00:00:00:01', src_ip='10.0.0.1',
+                   dst_ip='10.0.0.2'))
+    pkt.serialize()
+    others = [bytes(pkt.data)] * number
+
+    def _parse(lldp_parse, frames):
+        for data in frames:
+            try:
+                lldp_parse(data)
+            except LLDPPacket.LLDPUnknownFormat:
+                pass
+
+    print('%d ports' % number)
+    bench('lldp_packet(), packet.Packet',
+          lambda: _make(LLDPPacket._lldp_packet), number=1)
+    bench('lldp_packet(), template', lambda: _make(LLDPPacket.lldp_packet),
+          number=1)
+    bench('lldp_parse(), packet.Packet',
+          lambda: _parse(LLDPPacket._lldp_parse, frames), number=1)
+    bench('lldp_parse(), fixed offsets',
+          lambda: _parse(LLDPPacket.lldp_parse, frames), number=1)
+    bench('lldp_parse() of ARP, packet.Packet',
+          lambda: _parse(LLDPPacket._lldp_parse, others), number=1)
+    bench('lldp_parse() of ARP, fixed offsets',
+          lambda: _parse(LLDPPacket.lldp_parse, others), number=1)
+
+
+if __name__ == '__main__':
+    main()
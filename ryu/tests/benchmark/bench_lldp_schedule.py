@@ -0,0 +1,81 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+LLDP scheduling of Switches with 20k ports, all of them with a stable
+link, in simulated time: packet-outs per second once the periods have
+backed off, and the cost of finding the ports to probe.
+"""
+
+from __future__ import print_function
+
+from ryu.tests.benchmark import bench
+from ryu.topology import switches
+
+NUM_PORTS = 20000
+DURATION = 300
+
+
+class _Port(object):
+    def __init__(self, port_no):
+        self.port_no = port_no
+
+    def is_down(self):
+        return False
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 0.
+
+    def time(self):
+        return self.now
+
+
+def main():
+    clock = _Clock()
+    switches.time = clock
+    sw = switches.Switches
+    ports = switches.PortDataState(sw.LLDP_SEND_PERIOD_PER_PORT,
+                                   sw._lldp_send_period_max(sw),
+                                   sw.LINK_LLDP_DROP)
+    for port_no in range(NUM_PORTS):
+        ports.add_port(_Port(port_no), b'')
+
+    sent = []
+    step = 1. / sw.LLDP_SEND_RATE
+    limit = 1
+    while clock.now < DURATION:
+        for port in ports.pop_expired(clock.now, limit):
+            ports.lldp_sent(port)
+            ports.lldp_received(port)
+            sent.append(clock.now)
+        clock.now += step
+
+    last_minute = [t for t in sent if t >= DURATION - 60]
+    print('max LLDP period %.1f s, link down detected within %.0f s' %
+          (ports.max_period, sw.LINK_DETECT_TIME))
+    print('packet-outs in the first 10 s: %8.0f/s' %
+          (len([t for t in sent if t < 10]) / 10.))
+    print('packet-outs in the last minute: %7.0f/s' %
+          (len(last_minute) / 60.))
+
+    bench('PortDataState.next_deadline', ports.next_deadline, number=10000)
+    bench('PortDataState.pop_expired (nothing due)',
+          lambda: ports.pop_expired(clock.now, 100), number=10000)
+
+
+if __name__ == '__main__':
+    main()
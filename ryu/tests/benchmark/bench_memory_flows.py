@@ -0,0 +1,82 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Memory used by 100k OpenFlow 1.3 flows: FlowMods built by an
+application, and flow stats entries decoded from a reply.
+Requires tracemalloc (Python 3).
+"""
+
+from __future__ import print_function
+
+import gc
+import struct
+import tracemalloc
+
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser as parser
+
+NUM_FLOWS = 100000
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = parser
+
+
+def _flow_mods():
+    dp = _Datapath()
+    mods = []
+    for i in range(NUM_FLOWS):
+        match = parser.OFPMatch(in_port=1, eth_type=0x0800, ipv4_dst=i)
+        inst = [parser.OFPInstructionActions(
+            ofproto_v1_3.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(2)])]
+        mods.append(parser.OFPFlowMod(dp, priority=1, match=match,
+                                      instructions=inst))
+    return mods
+
+
+def _flow_stats():
+    dp = _Datapath()
+    match = parser.OFPMatch(in_port=1, eth_type=0x0800,
+                            ipv4_src='10.0.0.1', ipv4_dst='10.0.0.2')
+    inst = [parser.OFPInstructionActions(
+        ofproto_v1_3.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(2)])]
+    mod = parser.OFPFlowMod(dp, match=match, instructions=inst)
+    mod.serialize()
+    tail = bytes(mod.buf[ofproto_v1_3.OFP_FLOW_MOD_SIZE -
+                         ofproto_v1_3.OFP_MATCH_SIZE:])
+    length = ofproto_v1_3.OFP_FLOW_STATS_0_SIZE + len(tail)
+    entry = struct.pack(ofproto_v1_3.OFP_FLOW_STATS_0_PACK_STR, length, 0,
+                        10, 0, 1, 0, 0, 0, 0, 100, 6400) + tail
+    return [parser.OFPFlowStats.parser(entry, 0) for _i in range(NUM_FLOWS)]
+
+
+def main():
+    for name, func in (('OFPFlowMod', _flow_mods),
+                       ('OFPFlowStats', _flow_stats)):
+        func()  # warm up the caches of the classes
+        gc.collect()
+        tracemalloc.start()
+        flows = func()
+        size, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del flows
+        print('%-16s %d flows %8.1f MB %8.0f bytes/flow' %
+              (name, NUM_FLOWS, size / 1e6, size / NUM_FLOWS))
+
+
+if __name__ == '__main__':
+    main()
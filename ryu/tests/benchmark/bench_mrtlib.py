@@ -0,0 +1,99 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Reading a TABLE_DUMP_V2 RIB dump of the number of IPv4 prefixes given
+as the argument (100000 by default) with the RIB entries of 4 peers:
+reading all the records, accessing the BGP attributes of them, reading
+the records of a peer, of a prefix and of other types, and making the
+routes to load into the Global table.
+"""
+
+from __future__ import print_function
+
+import io
+import sys
+
+from ryu.lib import mrtlib
+from ryu.lib.packet import bgp
+from ryu.tests.benchmark import bench
+
+PEERS = ['192.0.2.%d' % i for i in range(1, 5)]
+
+
+def _dump(number):
+    f = io.BytesIO()
+    writer = mrtlib.Writer(f)
+    writer.write(mrtlib.TableDump2MrtRecord(
+        message=mrtlib.TableDump2PeerIndexTableMrtMessage(
+            bgp_id='192.0.2.254',
+            peer_entries=[mrtlib.MrtPeer(bgp_id=ip, ip_addr=ip,
+                                         as_num=65001 + i)
+                          for i, ip in enumerate(PEERS)]),
+        timestamp=0))
+    for seq_num in range(number):
+        prefix = bgp.IPAddrPrefix(
+            24, '%d.%d.%d.0' % (1 + seq_num // 65536 % 223,
+                                seq_num // 256 % 256, seq_num % 256))
+        rib_entries = [
+            mrtlib.MrtRibEntry(
+                peer_index=i, originated_time=0,
+                bgp_attributes=[
+                    bgp.BGPPathAttributeOrigin(0),
+                    bgp.BGPPathAttributeAsPath(
+                        [[65001 + i, 64512 + seq_num % 1000, 3356]]),
+                    bgp.BGPPathAttributeNextHop(ip)])
+            for i, ip in enumerate(PEERS)]
+        writer.write(mrtlib.TableDump2MrtRecord(
+            message=mrtlib.TableDump2RibIPv4UnicastMrtMessage(
+                seq_num=seq_num, prefix=prefix, rib_entries=rib_entries),
+            timestamp=0))
+    return f.getvalue()
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    buf = _dump(number)
+    print('%d prefixes, %d MB' % (number, len(buf) // (1024 * 1024)))
+
+    def _read(**kwargs):
+        n = 0
+        for _record in mrtlib.Reader(io.BytesIO(buf), **kwargs):
+            n += 1
+        return n
+
+    def _attributes():
+        for record in mrtlib.Reader(io.BytesIO(buf)):
+            for rib_entry in getattr(record.message, 'rib_entries', []):
+                rib_entry.bgp_attributes
+
+    def _rib_routes():
+        for _route in mrtlib.rib_routes(
+                mrtlib.Reader(io.BytesIO(buf), peers=PEERS[:1])):
+            pass
+
+    bench('Reader', _read, number=1, repeat=1)
+    bench('Reader, BGP attributes', _attributes, number=1, repeat=1)
+    bench('Reader, peers', lambda: _read(peers=PEERS[:1]),
+          number=1, repeat=1)
+    bench('Reader, prefix', lambda: _read(prefix='1.1.0.0/16'),
+          number=1, repeat=1)
+    bench('Reader, types', lambda: _read(
+        types=[mrtlib.MrtRecord.TYPE_BGP4MP]), number=1, repeat=1)
+    bench('rib_routes(), a peer', _rib_routes, number=1, repeat=1)
+
+
+if __name__ == '__main__':
+    main()
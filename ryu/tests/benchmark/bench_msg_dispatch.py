@@ -0,0 +1,99 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Decoding an OpenFlow 1.3 message stream into events as the receive
+loop of Datapath does.  The stream is a file of raw OpenFlow messages
+given as the argument, or 1M generated messages: PacketIn, EchoReply,
+PortStatus and BarrierReply.
+"""
+
+from __future__ import print_function
+
+import struct
+import sys
+import time
+
+from ryu.controller import ofp_event
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser as parser
+
+NUM_MSGS = 1000000
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = parser
+
+
+def _header(msg_type, body):
+    return struct.pack(ofproto_v1_3.OFP_HEADER_PACK_STR,
+                       ofproto_v1_3.OFP_VERSION, msg_type,
+                       ofproto_v1_3.OFP_HEADER_SIZE + len(body), 0) + body
+
+
+def _stream():
+    frame = (b'\xff' * 6 + b'\x00\x00\x00\x00\x00\x01' + b'\x08\x06' +
+             b'\x00' * 46)
+    match = bytearray()
+    parser.OFPMatch(in_port=1).serialize(match, 0)
+    packet_in = _header(ofproto_v1_3.OFPT_PACKET_IN, struct.pack(
+        ofproto_v1_3.OFP_PACKET_IN_PACK_STR, ofproto_v1_3.OFP_NO_BUFFER,
+        len(frame), ofproto_v1_3.OFPR_NO_MATCH, 0, 0) +
+        bytes(match) + b'\x00' * 2 + frame)
+    echo_reply = _header(ofproto_v1_3.OFPT_ECHO_REPLY, b'')
+    port_status = _header(ofproto_v1_3.OFPT_PORT_STATUS, struct.pack(
+        '!B7x', ofproto_v1_3.OFPPR_MODIFY) + struct.pack(
+        ofproto_v1_3.OFP_PORT_PACK_STR, 1, b'\x00\x00\x00\x00\x00\x01',
+        b'eth1', 0, 0, 0, 0, 0, 0, 0, 0))
+    barrier_reply = _header(ofproto_v1_3.OFPT_BARRIER_REPLY, b'')
+    # 70% PacketIn, 20% EchoReply, 5% PortStatus, 5% BarrierReply
+    cycle = ([packet_in] * 14 + [echo_reply] * 4 + [port_status] +
+             [barrier_reply])
+    return b''.join(cycle) * (NUM_MSGS // len(cycle))
+
+
+def _decode(stream):
+    dp = _Datapath()
+    count = 0
+    offset = 0
+    end = len(stream)
+    while offset < end:
+        (version, msg_type, msg_len, xid) = ofproto_parser.header(
+            stream[offset:offset + ofproto_v1_3.OFP_HEADER_SIZE])
+        msg = ofproto_parser.msg(dp, version, msg_type, msg_len, xid,
+                                 stream[offset:offset + msg_len])
+        ofp_event.ofp_msg_to_ev(msg)
+        offset += msg_len
+        count += 1
+    return count
+
+
+def main():
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            stream = f.read()
+    else:
+        stream = _stream()
+    start = time.time()
+    count = _decode(stream)
+    elapsed = time.time() - start
+    print('%d messages %6.2f sec %8.0f messages/s' %
+          (count, elapsed, count / elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Parsing of a full (64KB) OpenFlow 1.3 flow stats reply: the time spent
+in the receive loop, and reading the whole body, selected fields only
+or the counters of the entries.
+"""
+
+from __future__ import print_function
+
+import struct
+
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser as parser
+from ryu.tests.benchmark import bench
+
+NUMBER = 20
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = parser
+
+
+def _flow_stats_reply():
+    dp = _Datapath()
+    match = parser.OFPMatch(in_port=1, eth_type=0x0800,
+                            ipv4_src='10.0.0.1', ipv4_dst='10.0.0.2')
+    inst = [parser.OFPInstructionActions(
+        ofproto_v1_3.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(2)])]
+    # a FlowMod and a flow stats entry share the match and instructions
+    mod = parser.OFPFlowMod(dp, match=match, instructions=inst)
+    mod.serialize()
+    tail = bytes(mod.buf[ofproto_v1_3.OFP_FLOW_MOD_SIZE -
+                         ofproto_v1_3.OFP_MATCH_SIZE:])
+    length = ofproto_v1_3.OFP_FLOW_STATS_0_SIZE + len(tail)
+    entry = struct.pack(ofproto_v1_3.OFP_FLOW_STATS_0_PACK_STR, length,
+                        0, 10, 0, 1, 0, 0, 0, 0, 100, 6400) + tail
+    count = (0xffff - ofproto_v1_3.OFP_MULTIPART_REPLY_SIZE) // length
+    body = entry * count
+    header = struct.pack(ofproto_v1_3.OFP_HEADER_PACK_STR,
+                         ofproto_v1_3.OFP_VERSION,
+                         ofproto_v1_3.OFPT_MULTIPART_REPLY,
+                         ofproto_v1_3.OFP_MULTIPART_REPLY_SIZE + len(body),
+                         0)
+    header += struct.pack(ofproto_v1_3.OFP_MULTIPART_REPLY_PACK_STR,
+                          ofproto_v1_3.OFPMP_FLOW, 0)
+    return count, header + body
+
+
+def main():
+    dp = _Datapath()
+    count, buf = _flow_stats_reply()
+    print('%d flow stats entries per reply' % count)
+
+    def _parse():
+        version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+        return ofproto_parser.msg(dp, version, msg_type, msg_len, xid, buf)
+
+    def _body():
+        return _parse().body
+
+    def _fields():
+        for stat in _parse().iter_body(fields=('cookie', 'packet_count')):
+            pass
+
+    bench('parse (receive loop)', _parse, number=NUMBER)
+    bench('parse + body', _body, number=NUMBER)
+    bench('parse + iter_body(cookie, packet_count)', _fields, number=NUMBER)
+
+
+if __name__ == '__main__':
+    main()
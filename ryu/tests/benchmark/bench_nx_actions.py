@@ -0,0 +1,93 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Serializing the Nicira extension actions of OpenFlow 1.3 FlowMods:
+the ARP reply actions of rest_vtep, and a mix of learn, conjunction
+and resubmit actions of the kinds ofctl_nicira_ext handles.
+"""
+
+from __future__ import print_function
+
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser as parser
+from ryu.tests.benchmark import bench
+
+NUMBER = 10000
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = parser
+
+
+def _rest_vtep_actions(i):
+    # as rest_vtep._add_arp_reply_flow()
+    return [
+        parser.NXActionRegMove(
+            src_field="eth_src", dst_field="eth_dst", n_bits=48),
+        parser.OFPActionSetField(eth_src='aa:bb:cc:dd:ee:%02x' % (i % 256)),
+        parser.OFPActionSetField(arp_op=2),
+        parser.NXActionRegMove(
+            src_field="arp_sha", dst_field="arp_tha", n_bits=48),
+        parser.NXActionRegMove(
+            src_field="arp_spa", dst_field="arp_tpa", n_bits=32),
+        parser.OFPActionOutput(ofproto_v1_3.OFPP_IN_PORT)]
+
+
+def _ovs_actions(i):
+    return [
+        parser.NXActionConjunction(clause=i % 2, n_clauses=2, id_=i % 64),
+        parser.NXActionLearn(
+            table_id=10,
+            specs=[parser.NXFlowSpecMatch(src=0x800,
+                                          dst=('eth_type_nxm', 0),
+                                          n_bits=16),
+                   parser.NXFlowSpecMatch(src=('eth_src_nxm', 0),
+                                          dst=('eth_dst_nxm', 0),
+                                          n_bits=48),
+                   parser.NXFlowSpecLoad(src=('in_port', 0),
+                                         dst=('reg0', 0),
+                                         n_bits=16),
+                   parser.NXFlowSpecOutput(src=('in_port', 0),
+                                           n_bits=16)],
+            idle_timeout=180, priority=1),
+        parser.NXActionRegLoad(ofs_nbits=31, dst='reg1', value=i % 16),
+        parser.NXActionResubmitTable(in_port=0xfff8, table_id=20)]
+
+
+def _flow_mods(actions):
+    dp = _Datapath()
+    return [parser.OFPFlowMod(dp, match=parser.OFPMatch(in_port=1),
+                              instructions=[parser.OFPInstructionActions(
+                                  ofproto_v1_3.OFPIT_APPLY_ACTIONS,
+                                  actions(i))])
+            for i in range(NUMBER)]
+
+
+def main():
+    for name, actions in (('rest_vtep ARP reply', _rest_vtep_actions),
+                          ('learn, conjunction, resubmit', _ovs_actions)):
+        mods = _flow_mods(actions)
+
+        def _serialize():
+            for mod in mods:
+                mod.serialize()
+
+        bench('%s, %d FlowMods' % (name, NUMBER), _serialize, number=1)
+
+
+if __name__ == '__main__':
+    main()
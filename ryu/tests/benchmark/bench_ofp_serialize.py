@@ -0,0 +1,80 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Serialization of common OpenFlow 1.3 messages.
+"""
+
+from __future__ import print_function
+
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser as parser
+from ryu.tests.benchmark import bench
+
+NUMBER = 20000
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = parser
+
+
+def main():
+    dp = _Datapath()
+    match = parser.OFPMatch(in_port=1, eth_type=0x0800,
+                            ipv4_src='10.0.0.1', ipv4_dst='10.0.0.2')
+    inst = [parser.OFPInstructionActions(
+        ofproto_v1_3.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(2)])]
+    data = b'\x00' * 64
+    actions = [parser.OFPActionOutput(2)]
+    buf = bytearray(4096)
+
+    def _flow_mod():
+        parser.OFPFlowMod(dp, priority=1, match=match,
+                          instructions=inst).serialize()
+
+    def _flow_mod_no_match():
+        parser.OFPFlowMod(dp, priority=1, instructions=inst).serialize()
+
+    def _packet_out():
+        parser.OFPPacketOut(dp, buffer_id=ofproto_v1_3.OFP_NO_BUFFER,
+                            in_port=ofproto_v1_3.OFPP_CONTROLLER,
+                            actions=actions, data=data).serialize()
+
+    def _echo_request():
+        parser.OFPEchoRequest(dp, data=data).serialize()
+
+    def _echo_request_into():
+        parser.OFPEchoRequest(dp, data=data).serialize_into(buf, 0)
+
+    def _flow_stats_request():
+        parser.OFPFlowStatsRequest(dp).serialize()
+
+    def _port_stats_request():
+        parser.OFPPortStatsRequest(dp, 0, ofproto_v1_3.OFPP_ANY).serialize()
+
+    bench('OFPFlowMod 4 field match', _flow_mod, number=NUMBER)
+    bench('OFPFlowMod empty match', _flow_mod_no_match, number=NUMBER)
+    bench('OFPPacketOut', _packet_out, number=NUMBER)
+    bench('OFPEchoRequest', _echo_request, number=NUMBER)
+    if hasattr(parser.OFPEchoRequest, 'serialize_into'):
+        bench('OFPEchoRequest.serialize_into', _echo_request_into,
+              number=NUMBER)
+    bench('OFPFlowStatsRequest', _flow_stats_request, number=NUMBER)
+    bench('OFPPortStatsRequest', _port_stats_request, number=NUMBER)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Build and serialize of common 2-5 field OpenFlow 1.3 matches, with
+OFPMatch and with a precompiled OFPMatchTemplate.
+"""
+
+from __future__ import print_function
+
+from ryu.ofproto import ofproto_v1_3_parser as parser
+from ryu.tests.benchmark import bench
+
+NUMBER = 20000
+
+MATCHES = [
+    ('2 fields', {'in_port': 1, 'eth_type': 0x0800}),
+    ('3 fields', {'eth_type': 0x0800, 'ipv4_src': '10.0.0.1',
+                  'ipv4_dst': '10.0.0.2'}),
+    ('4 fields', {'in_port': 1, 'eth_type': 0x0800,
+                  'ipv4_src': '10.0.0.1', 'ipv4_dst': '10.0.0.2'}),
+    ('5 fields', {'in_port': 1, 'eth_type': 0x0800, 'ip_proto': 6,
+                  'ipv4_dst': '10.0.0.2', 'tcp_dst': 80}),
+]
+
+
+def main():
+    buf = bytearray()
+
+    for name, fields in MATCHES:
+        template = parser.OFPMatchTemplate(*fields)
+
+        def _match():
+            del buf[:]
+            parser.OFPMatch(**fields).serialize(buf, 0)
+
+        def _template():
+            del buf[:]
+            template(**fields).serialize(buf, 0)
+
+        bench('OFPMatch %s' % name, _match, number=NUMBER)
+        bench('OFPMatchTemplate %s' % name, _template, number=NUMBER)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The flood path of an OpenFlow 1.3 controller for a 1500 bytes frame:
+PacketIn parse, ethernet parse and PacketOut serialize of the frame,
+with OFPPacketIn.data and with OFPPacketIn.data_view.
+"""
+
+from __future__ import print_function
+
+import struct
+
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet
+from ryu.lib.packet import udp
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser as parser
+from ryu.tests.benchmark import bench
+
+NUMBER = 20000
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = parser
+
+
+def _packet_in():
+    pkt = packet.Packet()
+    pkt.add_protocol(ethernet.ethernet())
+    pkt.add_protocol(ipv4.ipv4(proto=17))
+    pkt.add_protocol(udp.udp())
+    pkt.add_protocol(b'\x00' * 1458)
+    pkt.serialize()
+    match = bytearray()
+    parser.OFPMatch(in_port=1).serialize(match, 0)
+    body = struct.pack(ofproto_v1_3.OFP_PACKET_IN_PACK_STR,
+                       ofproto_v1_3.OFP_NO_BUFFER, len(pkt.data),
+                       ofproto_v1_3.OFPR_NO_MATCH, 0, 0)
+    body += bytes(match) + b'\x00' * 2 + bytes(pkt.data)
+    return struct.pack(ofproto_v1_3.OFP_HEADER_PACK_STR,
+                       ofproto_v1_3.OFP_VERSION, ofproto_v1_3.OFPT_PACKET_IN,
+                       ofproto_v1_3.OFP_HEADER_SIZE + len(body), 0) + body
+
+
+def main():
+    dp = _Datapath()
+    buf = _packet_in()
+    actions = [parser.OFPActionOutput(ofproto_v1_3.OFPP_FLOOD)]
+
+    def _flood(use_view):
+        version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+        msg = ofproto_parser.msg(dp, version, msg_type, msg_len, xid, buf)
+        data = msg.data_view if use_view else msg.data
+        ethernet.ethernet.parser(data)
+        out = parser.OFPPacketOut(dp, buffer_id=ofproto_v1_3.OFP_NO_BUFFER,
+                                  in_port=msg.match['in_port'],
+                                  actions=actions, data=data)
+        out.serialize()
+
+    bench('flood with data', lambda: _flood(False), number=NUMBER)
+    if hasattr(parser.OFPPacketIn, 'data_view'):
+        bench('flood with data_view', lambda: _flood(True), number=NUMBER)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Decoding a mixed corpus of frames with packet.Packet: the pcap files
+given as the arguments, or those of ryu/tests/packet_data/pcap, plus
+generated ARP, IPv4/TCP, IPv4/UDP and IPv6 frames of 60 to 1514 bytes.
+The full decoding is compared with max_layer=2, which MinDelayPath
+uses, and with the lazy mode looking up the ethernet header only.
+"""
+
+from __future__ import print_function
+
+import glob
+import os
+import sys
+
+from ryu.lib import pcaplib
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+from ryu.tests.benchmark import bench
+
+PCAP_DIR = os.path.join(os.path.dirname(__file__), '../packet_data/pcap')
+
+NUMBER = 10
+
+
+def _generated():
+    src = 'f2:0b:a4:01:0a:23'
+    dst = 'f2:0b:a4:01:0a:24'
+    frames = []
+    for payload_len in (0, 512, 1460):
+        payload = b'\x01' * payload_len
+        for pkt in (
+                ethernet.ethernet(dst, src, ether.ETH_TYPE_IP) /
+                ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2',
+                          proto=inet.IPPROTO_TCP) /
+                tcp.tcp(1234, 80) / payload,
+                ethernet.ethernet(dst, src, ether.ETH_TYPE_IP) /
+                ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2',
+                          proto=inet.IPPROTO_UDP) /
+                udp.udp(1234, 53) / payload,
+                ethernet.ethernet(dst, src, ether.ETH_TYPE_IPV6) /
+                ipv6.ipv6(src='fe80::1', dst='fe80::2',
+                          nxt=inet.IPPROTO_UDP) /
+                udp.udp(1234, 53) / payload):
+            pkt.serialize()
+            frames.append(bytes(pkt.data))
+    pkt = (ethernet.ethernet('ff:ff:ff:ff:ff:ff', src, ether.ETH_TYPE_ARP) /
+           arp.arp(src_mac=src, src_ip='10.0.0.1', dst_ip='10.0.0.2'))
+    pkt.serialize()
+    frames.append(bytes(pkt.data))
+    return frames
+
+
+def _corpus(files):
+    frames = []
+    for name in files:
+        with open(name, 'rb') as f:
+            frames.extend(bytes(buf) for _ts, buf in pcaplib.Reader(f))
+    # as many generated frames as read ones
+    generated = _generated()
+    return frames + generated * max(1, len(frames) // len(generated))
+
+
+def main():
+    files = sys.argv[1:] or sorted(glob.glob(os.path.join(PCAP_DIR,
+                                                          '*.pcap')))
+    frames = _corpus(files)
+    print('%d frames, %d bytes' % (len(frames), sum(map(len, frames))))
+
+    def _full():
+        for data in frames:
+            packet.Packet(data)
+
+    def _max_layer():
+        for data in frames:
+            packet.Packet(data, max_layer=2)
+
+    def _lazy():
+        for data in frames:
+            packet.Packet(data, lazy=True).get_protocol(ethernet.ethernet)
+
+    bench('Packet(data)', _full, number=NUMBER)
+    bench('Packet(data, max_layer=2)', _max_layer, number=NUMBER)
+    bench('Packet(data, lazy=True), ethernet only', _lazy, number=NUMBER)
+
+
+if __name__ == '__main__':
+    main()
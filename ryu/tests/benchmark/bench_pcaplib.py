@@ -0,0 +1,105 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Writing and reading a PCAP file of the size in MB given as the argument
+(1024 by default) with frames of 64 to 1514 bytes: writing packet by
+packet and in bulk, iterating the mapped file and the file read as a
+stream, and reading 10000 records at random.
+"""
+
+from __future__ import print_function
+
+import os
+import random
+import sys
+import tempfile
+
+from ryu.lib import pcaplib
+from ryu.tests.benchmark import bench
+
+
+class _Stream(object):
+    # a file object which can not be mapped, e.g. a pipe
+    def __init__(self, f):
+        self._f = f
+
+    def read(self, size):
+        return self._f.read(size)
+
+    def close(self):
+        self._f.close()
+
+
+def _pkts(size):
+    frames = [bytes(bytearray(i % 256 for i in range(length)))
+              for length in (64, 64, 128, 576, 1024, 1514)]
+    n = 0
+    i = 0
+    while n < size:
+        frame = frames[i % len(frames)]
+        yield 1000000000 + i / 1000.0, frame
+        n += len(frame) + pcaplib.PcapPktHdr.PKT_HDR_SIZE
+        i += 1
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    size *= 1024 * 1024
+    fd, name = tempfile.mkstemp(suffix='.pcap')
+    os.close(fd)
+    try:
+        def _write_pkt():
+            w = pcaplib.Writer(open(name, 'wb'))
+            for ts, buf in _pkts(size):
+                w.write_pkt(buf, ts)
+            w.close()
+
+        def _write_pkts():
+            w = pcaplib.Writer(open(name, 'wb'))
+            w.write_pkts(_pkts(size))
+            w.close()
+
+        print('%d MB' % (size // (1024 * 1024)))
+        bench('Writer.write_pkt()', _write_pkt, number=1, repeat=1)
+        bench('Writer.write_pkts()', _write_pkts, number=1, repeat=1)
+
+        def _read(f):
+            n = 0
+            for _ts, buf in pcaplib.Reader(f):
+                n += 1
+            return n
+
+        bench('Reader, mapped', lambda: _read(open(name, 'rb')),
+              number=1, repeat=1)
+        bench('Reader, stream', lambda: _read(_Stream(open(name, 'rb'))),
+              number=1, repeat=1)
+
+        reader = pcaplib.Reader(open(name, 'rb'))
+        bench('Reader, index', reader.count, number=1, repeat=1)
+        rand = random.Random(0)
+        indexes = [rand.randrange(reader.count()) for _i in range(10000)]
+
+        def _random():
+            for i in indexes:
+                reader[i]
+
+        bench('Reader, 10000 records at random', _random, number=1)
+    finally:
+        os.remove(name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Polling the port, flow and table stats of 1000 switches over TCP
+loopback, each of which replies in two parts: one request at a time
+as ofctl does, and all the requests outstanding at once with
+Datapath.send_request().
+"""
+
+from __future__ import print_function
+
+import struct
+import time
+
+from ryu.lib import hub
+hub.patch()
+
+from ryu.base import app_manager
+from ryu.controller import controller
+from ryu.controller import handler
+from ryu.lib import ofctl_v1_3
+from ryu.ofproto import ofproto_common
+from ryu.ofproto import ofproto_v1_3
+
+NUM_SWITCHES = 1000
+TIMEOUT = 10
+
+
+class _OFPHandler(object):
+    # ofp_event brick without any application
+    def send_event_to_observers(self, ev, state=None):
+        pass
+
+    def get_handlers(self, ev, state=None):
+        return []
+
+
+def _part(xid, mp_type, flags):
+    return struct.pack(ofproto_v1_3.OFP_HEADER_PACK_STR +
+                       ofproto_v1_3.OFP_MULTIPART_REPLY_PACK_STR[1:],
+                       ofproto_v1_3.OFP_VERSION,
+                       ofproto_v1_3.OFPT_MULTIPART_REPLY,
+                       ofproto_v1_3.OFP_MULTIPART_REPLY_SIZE, xid,
+                       mp_type, flags)
+
+
+def _switch(sock):
+    # replies to multipart requests with an empty body in two parts
+    rfile = sock.makefile('rb')
+    while True:
+        header = rfile.read(ofproto_common.OFP_HEADER_SIZE)
+        if not header:
+            break
+        version, msg_type, msg_len, xid = struct.unpack(
+            ofproto_common.OFP_HEADER_PACK_STR, header)
+        body = rfile.read(msg_len - len(header))
+        if msg_type == ofproto_v1_3.OFPT_MULTIPART_REQUEST:
+            mp_type, = struct.unpack_from('!H', body)
+            sock.sendall(_part(xid, mp_type, ofproto_v1_3.OFPMPF_REPLY_MORE) +
+                         _part(xid, mp_type, 0))
+
+
+def _connect(server):
+    sw_sock = hub.connect(server.getsockname())
+    ctl_sock, _addr = server.accept()
+    dp = controller.Datapath(ctl_sock, ('127.0.0.1', 0))
+    dp.set_version(ofproto_v1_3.OFP_VERSION)
+    dp.set_state(handler.MAIN_DISPATCHER)
+    dp.id = sw_sock.fileno()
+    return dp, sw_sock, [hub.spawn(_switch, sw_sock), hub.spawn(dp.serve)]
+
+
+def _requests(dp):
+    parser = dp.ofproto_parser
+    return [parser.OFPPortStatsRequest(dp),
+            parser.OFPFlowStatsRequest(dp),
+            parser.OFPTableStatsRequest(dp)]
+
+
+def _ofctl(dps):
+    for dp in dps:
+        ofctl_v1_3.get_port_stats(dp, {})
+        ofctl_v1_3.get_flow_stats(dp, {})
+        ofctl_v1_3.get_table_stats(dp, {})
+
+
+def _send_request(dps):
+    futures = [dp.send_request(req, timeout=TIMEOUT)
+               for dp in dps for req in _requests(dp)]
+    for future in futures:
+        assert len(future.result()) == 2
+
+
+def main():
+    app_manager.SERVICE_BRICKS['ofp_event'] = _OFPHandler()
+    server = hub.listen(('127.0.0.1', 0), backlog=NUM_SWITCHES)
+    switches = [_connect(server) for _i in range(NUM_SWITCHES)]
+    server.close()
+    dps = [dp for dp, _sock, _threads in switches]
+    hub.sleep(0.5)  # until the hello messages are sent
+
+    for name, poll in (('ofctl, one request at a time', _ofctl),
+                       ('send_request(), all at once', _send_request)):
+        start = time.time()
+        poll(dps)
+        elapsed = time.time() - start
+        print('%-32s %6.2f sec %8.0f requests/s' %
+              (name, elapsed, 3 * NUM_SWITCHES / elapsed))
+
+    for dp, sw_sock, threads in switches:
+        hub.kill(threads[1])
+        sw_sock.close()
+        hub.joinall(threads)
+
+
+if __name__ == '__main__':
+    main()
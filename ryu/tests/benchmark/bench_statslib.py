@@ -0,0 +1,117 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+A poll cycle of 1M OpenFlow 1.3 flow stats entries: decoding the
+replies into stats objects as simple_monitor_13 does, and decoding
+them into a StatsTable of statslib, computing the rates and the top
+100 flows.
+"""
+
+from __future__ import print_function
+
+import heapq
+import struct
+
+from ryu.lib import statslib
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser as parser
+from ryu.tests.benchmark import bench
+
+NUM_FLOWS = 1000000
+NUMBER = 3
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = parser
+
+
+def _flow_stats_replies(poll):
+    dp = _Datapath()
+    match = parser.OFPMatch(in_port=1, eth_type=0x0800,
+                            ipv4_dst='10.0.0.2')
+    inst = [parser.OFPInstructionActions(
+        ofproto_v1_3.OFPIT_APPLY_ACTIONS, [parser.OFPActionOutput(2)])]
+    mod = parser.OFPFlowMod(dp, match=match, instructions=inst)
+    mod.serialize()
+    tail = bytes(mod.buf[ofproto_v1_3.OFP_FLOW_MOD_SIZE -
+                         ofproto_v1_3.OFP_MATCH_SIZE:])
+    length = ofproto_v1_3.OFP_FLOW_STATS_0_SIZE + len(tail)
+    per_msg = (0xffff - ofproto_v1_3.OFP_MULTIPART_REPLY_SIZE) // length
+
+    msgs = []
+    for start in range(0, NUM_FLOWS, per_msg):
+        cookies = range(start, min(start + per_msg, NUM_FLOWS))
+        # the cookies identify the flows
+        body = b''.join(
+            struct.pack(ofproto_v1_3.OFP_FLOW_STATS_0_PACK_STR, length, 0,
+                        10, 0, 1, 0, 0, 0, cookie, cookie * poll,
+                        cookie * poll * 64) + tail
+            for cookie in cookies)
+        flags = ofproto_v1_3.OFPMPF_REPLY_MORE
+        if start + per_msg >= NUM_FLOWS:
+            flags = 0
+        buf = struct.pack(ofproto_v1_3.OFP_HEADER_PACK_STR,
+                          ofproto_v1_3.OFP_VERSION,
+                          ofproto_v1_3.OFPT_MULTIPART_REPLY,
+                          ofproto_v1_3.OFP_MULTIPART_REPLY_SIZE + len(body),
+                          0)
+        buf += struct.pack(ofproto_v1_3.OFP_MULTIPART_REPLY_PACK_STR,
+                           ofproto_v1_3.OFPMP_FLOW, flags)
+        buf += body
+        version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+        msgs.append(ofproto_parser.msg(dp, version, msg_type, msg_len, xid,
+                                       buf))
+    return msgs
+
+
+def main():
+    polls = [_flow_stats_replies(poll) for poll in (1, 2)]
+    print('%d flow stats entries in %d replies' %
+          (NUM_FLOWS, len(polls[0])))
+
+    def _objects():
+        # the entries of both polls, as simple_monitor_13 gets them
+        flows = [dict(((s.table_id, s.priority, s.cookie),
+                       (s.packet_count, s.byte_count))
+                      for msg in replies for s in msg.iter_body())
+                 for replies in polls]
+        return heapq.nlargest(100, flows[1].items(), key=lambda f: f[1][1])
+
+    def _statslib():
+        table = statslib.StatsTable(statslib.FLOW_FIELDS)
+        for i, replies in enumerate(polls):
+            table.update(*statslib.flow_stats_columns(replies), timestamp=i)
+        return table.top('byte_count', 100)
+
+    bench('stats objects, 2 polls + top 100', _objects, number=1, repeat=1)
+    bench('statslib, 2 polls + top 100', _statslib, number=NUMBER)
+
+    table = statslib.StatsTable(statslib.FLOW_FIELDS)
+    keys, columns = statslib.flow_stats_columns(polls[0])
+    table.update(keys, columns, timestamp=0)
+    keys, columns = statslib.flow_stats_columns(polls[1])
+    bench('StatsTable.update() same keys',
+          lambda: table.update(keys, columns), number=NUMBER)
+    bench('StatsTable.rates()',
+          lambda: table.rates('byte_count'), number=NUMBER)
+    bench('StatsTable.top(100)',
+          lambda: table.top('byte_count', 100), number=NUMBER)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Framing the number of messages given as the argument (100000 by
+default) received from a socket, per protocol: the receive loops
+which Datapath, BgpProtocol, ZClient and rpc.EndPoint had against
+stream_parser.Framer.  The messages are only framed, not parsed but
+by msgpack.
+"""
+
+from __future__ import print_function
+
+import socket
+import struct
+import sys
+import threading
+
+from ryu.lib import rpc
+from ryu.lib.packet import stream_parser
+from ryu.tests.benchmark import bench
+
+# the length of the header, the format of the length field and the
+# lengths of the messages of the protocols
+OFP = (8, '!2xH', (8, 8, 24, 114, 1038))  # echo, flow removed, packet-in
+BGP = (19, '!16xH', (19, 19, 55, 98, 412))  # keepalive, update
+ZEBRA = (10, '!H', (10, 24, 37, 60))
+
+
+def _stream(protocol, number):
+    header_len, fmt, lengths = protocol
+    pack = struct.Struct(fmt).pack_into
+    msgs = []
+    for length in lengths:
+        msg = bytearray(b'\xff' * length)
+        pack(msg, 0, length)
+        msgs.append(bytes(msg))
+    return b''.join(msgs[i % len(msgs)] for i in range(number))
+
+
+def _socket(data):
+    # a connection which receives data from another thread
+    rsock, wsock = socket.socketpair()
+
+    def _send():
+        wsock.sendall(data)
+        wsock.close()
+
+    thread = threading.Thread(target=_send)
+    thread.start()
+    return rsock, thread
+
+
+def _run(data, loop):
+    sock, thread = _socket(data)
+    try:
+        return loop(sock)
+    finally:
+        thread.join()
+        sock.close()
+
+
+def _ofp_loop(sock):
+    # Datapath._recv_loop
+    n = 0
+    buf = bytearray()
+    min_read_len = remaining_read_len = 8
+    while True:
+        read_len = min_read_len
+        if remaining_read_len > min_read_len:
+            read_len = remaining_read_len
+        ret = sock.recv(read_len)
+        if not ret:
+            break
+        buf += ret
+        buf_len = len(buf)
+        while buf_len >= min_read_len:
+            (msg_len, ) = struct.unpack_from('!2xH', buf)
+            if buf_len < msg_len:
+                remaining_read_len = (msg_len - buf_len)
+                break
+            memoryview(buf)[:msg_len].tobytes()
+            n += 1
+            del buf[:msg_len]
+            buf_len = len(buf)
+            remaining_read_len = min_read_len
+    return n
+
+
+def _bgp_loop(sock):
+    # BgpProtocol._recv_loop and _data_received
+    n = 0
+    buf = b''
+    while True:
+        next_bytes = sock.recv(19)
+        if len(next_bytes) == 0:
+            break
+        buf += next_bytes
+        while len(buf) >= 19:
+            (length, ) = struct.unpack('!16xHx', buf[:19])
+            if len(buf) < length:
+                break
+            buf[:length]
+            buf = buf[length:]
+            n += 1
+    return n
+
+
+def _zebra_loop(sock):
+    # ZClient._recv_loop
+    n = 0
+    buf = b''
+    min_len = recv_len = 10
+    while True:
+        recv_buf = sock.recv(recv_len)
+        if len(recv_buf) == 0:
+            break
+        buf += recv_buf
+        while len(buf) >= min_len:
+            (length, ) = struct.unpack_from('!H', buf)
+            if (length - len(buf)) > 0:
+                recv_len = length - len(buf)
+                break
+            buf[:length]
+            buf = buf[length:]
+            n += 1
+    return n
+
+
+def _framer_loop(protocol):
+    header_len, fmt, _ = protocol
+
+    def _loop(sock):
+        n = 0
+        framer = stream_parser.Framer(header_len,
+                                      stream_parser.length_field(fmt))
+        while framer.recv_into(sock):
+            for frame in framer.frames():
+                frame.tobytes()
+                n += 1
+        return n
+
+    return _loop
+
+
+def _rpc_loop(sock):
+    # rpc.EndPoint.receive_messages
+    encoder = rpc.MessageEncoder()
+    msgs = []
+    while True:
+        packet = sock.recv(4096)
+        if not packet:
+            break
+        encoder.get_and_dispatch_messages(packet, {2: msgs.append})
+    return len(msgs)
+
+
+def _rpc_framer_loop(sock):
+    encoder = rpc.MessageEncoder()
+    msgs = []
+    framer = stream_parser.Framer()
+    while framer.recv_into(sock):
+        for packet in framer.frames():
+            encoder.get_and_dispatch_messages(packet, {2: msgs.append})
+    return len(msgs)
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print('%d messages' % number)
+    for name, protocol, loop in (('OpenFlow', OFP, _ofp_loop),
+                                 ('BGP', BGP, _bgp_loop),
+                                 ('Zebra', ZEBRA, _zebra_loop)):
+        data = _stream(protocol, number)
+        assert _run(data, loop) == number
+        assert _run(data, _framer_loop(protocol)) == number
+        bench('%s, recv() loop' % name, lambda: _run(data, loop), number=1)
+        bench('%s, Framer' % name,
+              lambda: _run(data, _framer_loop(protocol)), number=1)
+
+    encoder = rpc.MessageEncoder()
+    data = b''.join(encoder.create_notification('event', [i, 'x' * (i % 64)])
+                    for i in range(number))
+    assert _run(data, _rpc_loop) == number
+    assert _run(data, _rpc_framer_loop) == number
+    bench('msgpack-rpc, recv() loop', lambda: _run(data, _rpc_loop),
+          number=1)
+    bench('msgpack-rpc, Framer', lambda: _run(data, _rpc_framer_loop),
+          number=1)
+
+
+if __name__ == '__main__':
+    main()
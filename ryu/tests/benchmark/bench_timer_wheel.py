@@ -0,0 +1,101 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+10k periodic timers: one sleeping greenthread per timer (as BFD, STP and
+Datapath used to do) versus hub.TimerWheel.
+"""
+
+from __future__ import print_function
+
+import os
+import time
+
+from ryu.lib import hub
+from ryu.tests.benchmark import bench
+
+NUM_TIMERS = 10000
+PERIOD = 0.1
+DURATION = 3
+
+
+class _Stats(object):
+    def __init__(self):
+        self.fired = 0
+        self.late = 0.0
+
+
+def _run_threads(stats):
+    def _loop():
+        while True:
+            expected = time.time() + PERIOD
+            hub.sleep(PERIOD)
+            stats.fired += 1
+            stats.late += time.time() - expected
+
+    return [hub.spawn(_loop) for _ in range(NUM_TIMERS)]
+
+
+def _run_wheel(stats, wheel):
+    def _fire(expected):
+        stats.fired += 1
+        stats.late += time.time() - expected
+        wheel.call_later(PERIOD, _fire, time.time() + PERIOD)
+
+    for _ in range(NUM_TIMERS):
+        wheel.call_later(PERIOD, _fire, time.time() + PERIOD)
+
+
+def _cpu_time():
+    t = os.times()
+    return t[0] + t[1]
+
+
+def _report(name, stats, cpu):
+    fired = max(stats.fired, 1)
+    print('%-24s fired %7d  mean lateness %6.2f ms  cpu %6.2f usec/fire' %
+          (name, stats.fired, stats.late / fired * 1e3, cpu / fired * 1e6))
+
+
+def main():
+    wheel = hub.TimerWheel()
+    timers = []
+    bench('TimerWheel.call_later',
+          lambda: timers.append(wheel.call_later(60, int)), number=NUM_TIMERS)
+    bench('TimerHandle.cancel', lambda: timers.pop().cancel(),
+          number=NUM_TIMERS // 3)
+    for timer in timers:
+        timer.cancel()
+
+    stats = _Stats()
+    cpu = _cpu_time()
+    threads = _run_threads(stats)
+    hub.sleep(DURATION)
+    for t in threads:
+        hub.kill(t)
+    hub.joinall(threads)
+    _report('greenthread per timer', stats, _cpu_time() - cpu)
+
+    stats = _Stats()
+    cpu = _cpu_time()
+    _run_wheel(stats, wheel)
+    hub.sleep(DURATION)
+    wheel.stop()
+    _report('TimerWheel', stats, _cpu_time() - cpu)
+
+
+if __name__ == '__main__':
+    hub.patch()
+    main()
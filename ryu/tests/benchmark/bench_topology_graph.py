@@ -0,0 +1,68 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Topology queries on a 10k link topology: TopologyGraph versus the
+LinkState scan that Switches.link_request_handler used to do.
+"""
+
+from ryu.tests.benchmark import bench
+from ryu.topology import graph
+from ryu.topology.switches import Link, LinkState
+
+
+class _Port(object):
+    def __init__(self, dpid, port_no):
+        self.dpid = dpid
+        self.port_no = port_no
+
+    def __eq__(self, other):
+        return self.dpid == other.dpid and self.port_no == other.port_no
+
+    def __hash__(self):
+        return hash((self.dpid, self.port_no))
+
+
+def main(num_switches=1000, degree=10):
+    g = graph.TopologyGraph()
+    links = LinkState()
+    for dpid in range(num_switches):
+        g.add_switch(dpid)
+        for port_no in range(degree):
+            peer = (dpid + port_no + 1) % num_switches
+            src = _Port(dpid, port_no)
+            dst = _Port(peer, port_no)
+            g.add_link(Link(src, dst))
+            links.update_link(src, dst)
+
+    print('%d links' % len(g))
+    dpid = num_switches // 2
+    bench('LinkState scan for one dpid',
+          lambda: [l for l in links if l.src.dpid == dpid], number=100)
+    bench('TopologyGraph.links(dpid)', lambda: g.links(dpid))
+    bench('TopologyGraph.neighbors(dpid)', lambda: g.neighbors(dpid))
+    bench('TopologyGraph.get_peer(dpid, port_no)',
+          lambda: g.get_peer(dpid, 3))
+    bench('TopologyGraph.links()', lambda: g.links(), number=100)
+
+    version = g.version
+    link = g.links(dpid)[0]
+    g.set_link_attrs(link, delay=0.001)
+    bench('TopologyGraph.changes_since(version)',
+          lambda: g.changes_since(version))
+
+
+if __name__ == '__main__':
+    main()
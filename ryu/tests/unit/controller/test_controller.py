@@ -29,12 +29,16 @@ import logging
 import random
 import unittest
 
-from nose.tools import eq_, raises
+from nose.tools import eq_, ok_, raises
 
 from ryu.base import app_manager  # To suppress cyclic import
 from ryu.controller import controller
 from ryu.controller import handler
+from ryu import exception
 from ryu.lib import hub
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_4
 from ryu.ofproto import ofproto_v1_3_parser
 from ryu.ofproto import ofproto_v1_2_parser
 from ryu.ofproto import ofproto_v1_0_parser
@@ -153,6 +157,11 @@ class Test_Datapath(unittest.TestCase):
                 self.buf = self.buf[size:]
                 return out
 
+            def recv_into(self, buf):
+                out = self.recv(len(buf))
+                buf[:len(out)] = out
+                return len(out)
+
         # Prepare mock
         ofp_brick_mock = mock.MagicMock(spec=app_manager.RyuApp)
         app_manager_mock.lookup_service_brick.return_value = ofp_brick_mock
@@ -182,6 +191,177 @@ class Test_Datapath(unittest.TestCase):
         self.assertEqual(expected_json, output_json)
 
 
+class Test_Datapath_send_mods(unittest.TestCase):
+    """
+    Test cases for controller.Datapath.send_mods
+    """
+
+    def setUp(self):
+        with mock.patch('ryu.controller.controller.Datapath.set_state'):
+            self.dp = controller.Datapath(mock.Mock(), mock.Mock())
+
+    def _sent_msgs(self):
+        # [(msg_type, xid, buf), ...] of the messages in the send queue
+        buf, _close_socket = self.dp.send_q.get(block=False)
+        msgs = []
+        while buf:
+            _version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+            msgs.append((msg_type, xid, bytes(buf[:msg_len])))
+            buf = buf[msg_len:]
+        eq_(self.dp.send_q.qsize(), 0)
+        return msgs
+
+    def _reply(self, msg_type, xid):
+        msg = mock.Mock(msg_type=msg_type, xid=xid)
+        self.dp._mod_batch_reply(msg)
+
+    def _flow_mods(self, n):
+        parser = self.dp.ofproto_parser
+        return [parser.OFPFlowMod(self.dp, priority=i,
+                                  match=parser.OFPMatch(in_port=i))
+                for i in range(n)]
+
+    def test_barrier(self):
+        self.dp.set_version(ofproto_v1_3.OFP_VERSION)
+        self.dp.xid = self.dp.ofproto.MAX_XID - 1
+        mods = self._flow_mods(3)
+        future = self.dp.send_mods(mods)
+
+        msgs = self._sent_msgs()
+        eq_([m[0] for m in msgs],
+            [ofproto_v1_3.OFPT_FLOW_MOD] * 3 +
+            [ofproto_v1_3.OFPT_BARRIER_REQUEST])
+        eq_([m[2] for m in msgs[:3]], [bytes(m.buf) for m in mods])
+        # xids wrap around
+        eq_([m[1] for m in msgs], [self.dp.ofproto.MAX_XID, 0, 1, 2])
+
+        self._reply(ofproto_v1_3.OFPT_ERROR, 0)
+        self._reply(ofproto_v1_3.OFPT_ERROR, 3)  # not for the mods
+        eq_(future.done(), False)
+        self._reply(ofproto_v1_3.OFPT_BARRIER_REPLY, 2)
+        errors = future.result(timeout=0)
+        eq_([e.xid for e in errors], [0])
+        eq_(self.dp._mod_batches, {})
+
+    def test_bundle(self):
+        self.dp.set_version(ofproto_v1_4.OFP_VERSION)
+        mods = self._flow_mods(2)
+        future = self.dp.send_mods(mods, bundle=True)
+
+        msgs = self._sent_msgs()
+        eq_([m[0] for m in msgs],
+            [ofproto_v1_4.OFPT_BUNDLE_CONTROL] +
+            [ofproto_v1_4.OFPT_BUNDLE_ADD_MESSAGE] * 2 +
+            [ofproto_v1_4.OFPT_BUNDLE_CONTROL])
+        ctrls = [ofproto_parser.msg(self.dp, ofproto_v1_4.OFP_VERSION,
+                                    m[0], len(m[2]), m[1], m[2])
+                 for m in (msgs[0], msgs[-1])]
+        eq_([c.type for c in ctrls],
+            [ofproto_v1_4.OFPBCT_OPEN_REQUEST,
+             ofproto_v1_4.OFPBCT_COMMIT_REQUEST])
+        eq_([c.flags for c in ctrls], [ofproto_v1_4.OFPBF_ATOMIC] * 2)
+        eq_(ctrls[0].bundle_id, ctrls[1].bundle_id)
+        eq_([mod.xid for mod in mods], [m[1] for m in msgs[1:3]])
+
+        # the commit fails
+        self._reply(ofproto_v1_4.OFPT_ERROR, msgs[-1][1])
+        eq_([e.xid for e in future.result(timeout=0)], [msgs[-1][1]])
+
+    @raises(ValueError)
+    def test_bundle_not_supported(self):
+        self.dp.set_version(ofproto_v1_3.OFP_VERSION)
+        self.dp.send_mods(self._flow_mods(1), bundle=True)
+
+    def test_closed(self):
+        self.dp.set_version(ofproto_v1_3.OFP_VERSION)
+        self.dp.send_q = None
+        future = self.dp.send_mods(self._flow_mods(1))
+        ok_(isinstance(future.exception(timeout=0),
+                       exception.OFPDatapathClosed))
+        eq_(self.dp._mod_batches, {})
+
+
+class Test_Datapath_send_request(unittest.TestCase):
+    """
+    Test cases for controller.Datapath.send_request
+    """
+
+    def setUp(self):
+        with mock.patch('ryu.controller.controller.Datapath.set_state'):
+            self.dp = controller.Datapath(mock.Mock(), mock.Mock())
+        self.dp.set_version(ofproto_v1_3.OFP_VERSION)
+
+    def _request(self, timeout=None):
+        parser = self.dp.ofproto_parser
+        req = parser.OFPPortStatsRequest(self.dp)
+        future = self.dp.send_request(req, timeout=timeout)
+        self.dp.send_q.get(block=False)
+        return req.xid, future
+
+    def _reply(self, xid, more=False,
+               msg_type=ofproto_v1_3.OFPT_MULTIPART_REPLY):
+        flags = ofproto_v1_3.OFPMPF_REPLY_MORE if more else 0
+        msg = mock.Mock(msg_type=msg_type, xid=xid, flags=flags,
+                        type=1, code=2)
+        self.dp._request_reply(msg)
+        return msg
+
+    def test_multipart(self):
+        xid1, future1 = self._request()
+        xid2, future2 = self._request()
+        ok_(xid1 != xid2)
+
+        # the replies to outstanding requests are interleaved
+        parts = [self._reply(xid2, more=True), self._reply(xid1)]
+        self._reply(0x12345678)  # not for the requests
+        eq_(future1.result(timeout=0), [parts[1]])
+        eq_(future2.done(), False)
+        parts.append(self._reply(xid2))
+        eq_(future2.result(timeout=0), [parts[0], parts[2]])
+        eq_(self.dp._requests, {})
+
+    def test_reply(self):
+        parser = self.dp.ofproto_parser
+        req = parser.OFPBarrierRequest(self.dp)
+        future = self.dp.send_request(req)
+        # flags of the other replies are not of multipart
+        reply = self._reply(req.xid, more=True,
+                            msg_type=ofproto_v1_3.OFPT_BARRIER_REPLY)
+        eq_(future.result(timeout=0), [reply])
+
+    def test_error(self):
+        xid, future = self._request()
+        self._reply(xid, more=True)
+        self._reply(xid, msg_type=ofproto_v1_3.OFPT_ERROR)
+        exc = future.exception(timeout=0)
+        ok_(isinstance(exc, exception.OFPErrorReply))
+        eq_((exc.ofpmsg.xid, exc.ofpmsg.type, exc.ofpmsg.code),
+            (xid, 1, 2))
+        eq_(self.dp._requests, {})
+
+    def test_timeout(self):
+        xid, future = self._request(timeout=0.1)
+        # the parts of the reply restart the timeout
+        parts = [self._reply(xid, more=True)]
+        hub.sleep(0.15)
+        parts.append(self._reply(xid, more=True))
+        hub.sleep(0.1)
+        eq_(future.done(), False)
+        exc = future.exception(timeout=1)
+        ok_(isinstance(exc, hub.FutureTimeout))
+        # the parts received before the timeout
+        eq_(exc.partial, parts)
+        eq_(self.dp._requests, {})
+
+    def test_closed(self):
+        self.dp.send_q = None
+        future = self.dp.send_request(
+            self.dp.ofproto_parser.OFPBarrierRequest(self.dp))
+        ok_(isinstance(future.exception(timeout=0),
+                       exception.OFPDatapathClosed))
+        eq_(self.dp._requests, {})
+
+
 class TestOpenFlowController(unittest.TestCase):
     """
     Test cases for OpenFlowController
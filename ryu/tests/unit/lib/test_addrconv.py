@@ -14,8 +14,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import struct
 import unittest
 from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+import netaddr
 
 from ryu.lib import addrconv
 
@@ -54,3 +59,32 @@ class Test_addrconv(unittest.TestCase):
     def test_mac(self):
         self._test_conv(addrconv.mac, 'f2:0b:a4:01:0a:23',
                         b'\xf2\x0b\xa4\x01\x0a\x23')
+
+    def test_ipv4_fallback(self):
+        eq_(addrconv.ipv4.text_to_bin('10.0.0.0/24'),
+            (b'\x0a\x00\x00\x00', b'\xff\xff\xff\x00'))
+        eq_(addrconv.ipv4.text_to_bin(0x7f000001), b'\x7f\x00\x00\x01')
+        eq_(addrconv.ipv4.bin_to_text(bytearray(b'\x7f\x00\x00\x01')),
+            '127.0.0.1')
+
+    @raises(netaddr.AddrFormatError)
+    def test_ipv4_invalid(self):
+        addrconv.ipv4.text_to_bin('127.0.0.x')
+
+    def test_mac_fallback(self):
+        eq_(addrconv.mac.text_to_bin('F2-0B-A4-01-0A-23'),
+            b'\xf2\x0b\xa4\x01\x0a\x23')
+        eq_(addrconv.mac.text_to_bin('F2:0B:A4:01:0A:23'),
+            b'\xf2\x0b\xa4\x01\x0a\x23')
+
+    @raises(netaddr.AddrFormatError)
+    def test_mac_invalid(self):
+        addrconv.mac.text_to_bin('f2:0b:a4:01:0a:2x')
+
+    def test_cache(self):
+        conv = addrconv.ipv4
+        text = conv.bin_to_text(b'\x0a\x00\x00\x01')
+        ok_(conv.bin_to_text(b'\x0a\x00\x00\x01') is text)
+        for i in range(addrconv._CACHE_SIZE + 1):
+            conv.bin_to_text(struct.pack('!I', i))
+        ok_(len(conv._bin_cache) <= addrconv._CACHE_SIZE)
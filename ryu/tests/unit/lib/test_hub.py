@@ -26,6 +26,11 @@ class MyException(BaseException):
     pass
 
 
+# the asyncio hub does not monkey patch select
+_requires_patch = unittest.skipUnless(hub.HUB_TYPE == 'eventlet',
+                                      'requires monkey patched select')
+
+
 class Test_hub(unittest.TestCase):
     """ Test case for ryu.lib.hub
     """
@@ -101,6 +106,7 @@ class Test_hub(unittest.TestCase):
             ev.wait(timeout=1)
         assert len(result) == 2
 
+    @_requires_patch
     def test_spawn_select1(self):
         import select
         import socket
@@ -115,6 +121,7 @@ class Test_hub(unittest.TestCase):
             select.select([s2.fileno()], [], [])
             select.select([s2.fileno()], [], [])  # return immediately
 
+    @_requires_patch
     @raises(MyException)
     def test_select1(self):
         import select
@@ -237,3 +244,158 @@ class Test_hub(unittest.TestCase):
         # allow multiple sets unlike eventlet Event
         ev.set()
         ev.set()
+
+    def test_event_wait_timeout(self):
+        ev = hub.Event()
+        with hub.Timeout(2):
+            assert not ev.wait(timeout=0.1)
+
+    def test_queue(self):
+        q = hub.Queue()
+        result = []
+
+        def _child():
+            while True:
+                item = q.get()
+                if item is None:
+                    break
+                result.append(item)
+
+        with hub.Timeout(2):
+            t = hub.spawn(_child)
+            for i in range(3):
+                q.put(i)
+            q.put(None)
+            hub.joinall([t])
+        assert result == [0, 1, 2]
+
+    @raises(hub.QueueEmpty)
+    def test_queue_timeout(self):
+        q = hub.Queue()
+        with hub.Timeout(2):
+            q.get(timeout=0.1)
+
+    def test_semaphore(self):
+        sem = hub.BoundedSemaphore(1)
+        with hub.Timeout(2):
+            assert sem.acquire()
+            assert not sem.acquire(blocking=False)
+            assert not sem.acquire(timeout=0.1)
+            hub.spawn(sem.release)
+            assert sem.acquire(timeout=1)
+
+    def test_stream_server(self):
+        def _echo(sock, addr):
+            data = sock.recv(100)
+            sock.sendall(data)
+            sock.close()
+
+        server = hub.StreamServer(('127.0.0.1', 0), _echo)
+        port = server.server.getsockname()[1]
+        t = hub.spawn(server.serve_forever)
+        try:
+            with hub.Timeout(2):
+                sock = hub.StreamClient(('127.0.0.1', port)).connect()
+                sock.sendall(b'hoge')
+                assert sock.recv(100) == b'hoge'
+                sock.close()
+        finally:
+            hub.kill(t)
+
+    def test_future(self):
+        future = hub.Future()
+        done = []
+        future.add_done_callback(done.append)
+        with hub.Timeout(2):
+            self.assertRaises(hub.FutureTimeout, future.result, 0.1)
+            hub.spawn(future.set_result, 1)
+            assert future.result() == 1
+        assert done == [future]
+
+        future.add_done_callback(done.append)
+        assert done == [future, future]
+
+    def test_future_exception(self):
+        future = hub.Future()
+        future.set_exception(MyException())
+        with hub.Timeout(2):
+            self.assertRaises(MyException, future.result)
+            assert isinstance(future.exception(), MyException)
+
+
+class Test_TimerWheel(unittest.TestCase):
+    """ Test case for ryu.lib.hub.TimerWheel
+    """
+
+    def setUp(self):
+        # small wheel so that timers cascade through all the levels
+        self.wheel = hub.TimerWheel(tick=0.01, slots=4, levels=3)
+
+    def tearDown(self):
+        self.wheel.stop()
+
+    def test_call_later(self):
+        result = []
+        start = time.time()
+        for delay in (0.3, 0.05, 0.8, 0.2, 0):
+            self.wheel.call_later(delay, result.append, delay)
+        assert len(self.wheel) == 5
+        with hub.Timeout(2):
+            while len(result) < 5:
+                hub.sleep(0.01)
+        assert result == [0, 0.05, 0.2, 0.3, 0.8]
+        assert time.time() - start >= 0.8
+        assert len(self.wheel) == 0
+
+    def test_not_early(self):
+        fired = []
+
+        def _fired(expected):
+            fired.append(time.time() >= expected)
+
+        for delay in (0.01, 0.03, 0.07, 0.15, 0.64, 0.7):
+            self.wheel.call_later(delay, _fired, time.time() + delay)
+        with hub.Timeout(2):
+            while len(fired) < 6:
+                hub.sleep(0.01)
+        assert all(fired)
+
+    def test_cancel(self):
+        result = []
+        t1 = self.wheel.call_later(0.05, result.append, 1)
+        t2 = self.wheel.call_later(0.5, result.append, 2)
+        self.wheel.call_later(0.1, result.append, 3)
+        assert t1.is_pending()
+        t1.cancel()
+        t2.cancel()
+        t2.cancel()
+        assert not t1.is_pending()
+        assert len(self.wheel) == 1
+        hub.sleep(0.7)
+        assert result == [3]
+
+    def test_periodic(self):
+        result = []
+
+        def _tick():
+            result.append(1)
+            if len(result) < 5:
+                self.wheel.call_later(0.02, _tick)
+
+        self.wheel.call_later(0.02, _tick)
+        hub.sleep(0.5)
+        assert len(result) == 5
+        # the wheel is idle now, and works again after that
+        self.wheel.call_later(0.02, result.append, 2)
+        hub.sleep(0.1)
+        assert result[-1] == 2
+
+    def test_exception(self):
+        def _child():
+            raise Exception("hoge")
+
+        result = []
+        self.wheel.call_later(0.01, _child)
+        self.wheel.call_later(0.05, result.append, 1)
+        hub.sleep(0.2)
+        assert result == [1]
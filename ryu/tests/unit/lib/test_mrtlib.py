@@ -92,6 +92,126 @@ class TestMrtlib(unittest.TestCase):
 
             eq_(True, mrt_writer._f.closed)
 
+    def test_reader_stream(self):
+        class _Stream(object):
+            # not seekable
+            def __init__(self, f):
+                self._f = f
+
+            def read(self, size):
+                return self._f.read(size)
+
+            def close(self):
+                self._f.close()
+
+        input_file = os.path.join(MRT_DATA_DIR, 'updates.20161101.0000.bz2')
+        records = list(mrtlib.Reader(bz2.BZ2File(input_file, 'rb')))
+        stream_records = list(mrtlib.Reader(
+            _Stream(bz2.BZ2File(input_file, 'rb'))))
+        eq_(len(records), len(stream_records))
+        eq_(str(records[-1]), str(stream_records[-1]))
+
+    def test_reader_types(self):
+        for f, type_, count in (
+                ('rib.20161101.0000_pick.bz2',
+                 mrtlib.MrtRecord.TYPE_TABLE_DUMP_V2, 3),
+                ('updates.20161101.0000.bz2',
+                 mrtlib.MrtRecord.TYPE_TABLE_DUMP_V2, 0),
+                ('updates.20161101.0000.bz2',
+                 mrtlib.MrtRecord.TYPE_BGP4MP, 2623)):
+            input_file = os.path.join(MRT_DATA_DIR, f)
+            records = list(mrtlib.Reader(bz2.BZ2File(input_file, 'rb'),
+                                         types=[type_]))
+            eq_(count, len(records))
+
+    def test_reader_peers(self):
+        input_file = os.path.join(MRT_DATA_DIR, 'updates.20161101.0000.bz2')
+        peers = ['202.249.2.86', '2001:200:0:fe00:0:0:9d4:0']
+        expected = [r for r in mrtlib.Reader(bz2.BZ2File(input_file, 'rb'))
+                    if r.message.peer_ip in ('202.249.2.86',
+                                             '2001:200:0:fe00::9d4:0')]
+        records = list(mrtlib.Reader(bz2.BZ2File(input_file, 'rb'),
+                                     peers=peers))
+        eq_(883 + 371, len(records))
+        eq_([str(r) for r in expected], [str(r) for r in records])
+
+    def test_reader_peers_table_dump2(self):
+        input_file = os.path.join(MRT_DATA_DIR, 'rib.20161101.0000_pick.bz2')
+        records = list(mrtlib.Reader(bz2.BZ2File(input_file, 'rb')))
+        peer_ip = records[0].message.peer_entries[3].ip_addr
+
+        records = list(mrtlib.Reader(bz2.BZ2File(input_file, 'rb'),
+                                     peers=[peer_ip]))
+        eq_(3, len(records))
+        for r in records[1:]:
+            eq_([3], [e.peer_index for e in r.message.rib_entries])
+            eq_(1, r.message.entry_count)
+
+        records = list(mrtlib.Reader(bz2.BZ2File(input_file, 'rb'),
+                                     peers=['192.0.2.1']))
+        eq_(1, len(records))  # PEER_INDEX_TABLE
+
+    def test_reader_prefix(self):
+        f = io.BytesIO()
+        mrt_writer = mrtlib.Writer(f)
+        prefixes = [bgp.IPAddrPrefix(8, '10.0.0.0'),
+                    bgp.IPAddrPrefix(16, '10.1.0.0'),
+                    bgp.IPAddrPrefix(24, '10.1.2.0'),
+                    bgp.IPAddrPrefix(32, '10.2.0.1'),
+                    bgp.IPAddrPrefix(24, '192.168.0.0'),
+                    bgp.IP6AddrPrefix(32, '2001:db8::')]
+        for seq_num, prefix in enumerate(prefixes):
+            if isinstance(prefix, bgp.IPAddrPrefix):
+                msg_cls = mrtlib.TableDump2RibIPv4UnicastMrtMessage
+            else:
+                msg_cls = mrtlib.TableDump2RibIPv6UnicastMrtMessage
+            rib_entry = mrtlib.MrtRibEntry(
+                peer_index=0, originated_time=0,
+                bgp_attributes=[bgp.BGPPathAttributeOrigin(0)])
+            mrt_writer.write(mrtlib.TableDump2MrtRecord(
+                message=msg_cls(seq_num=seq_num, prefix=prefix,
+                                rib_entries=[rib_entry]),
+                timestamp=0))
+        mrt_writer.write(mrtlib.TableDumpMrtRecord(
+            message=mrtlib.TableDumpAfiIPv4MrtMessage(
+                view_num=0, seq_num=0, prefix='10.3.0.0', prefix_len=16,
+                status=1, originated_time=0, peer_ip='192.0.2.1',
+                peer_as=65000, bgp_attributes=[]),
+            timestamp=0))
+        buf = f.getvalue()
+
+        for prefix, expected in (
+                ('10.0.0.0/8', ['10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24',
+                                '10.2.0.1/32', '10.3.0.0/16']),
+                ('10.1.0.0/16', ['10.1.0.0/16', '10.1.2.0/24']),
+                ('10.2.0.1/32', ['10.2.0.1/32']),
+                ('0.0.0.0/0', ['10.0.0.0/8', '10.1.0.0/16', '10.1.2.0/24',
+                               '10.2.0.1/32', '192.168.0.0/24',
+                               '10.3.0.0/16']),
+                ('2001:db8::/16', ['2001:db8::/32'])):
+            prefixes = []
+            for r in mrtlib.Reader(io.BytesIO(buf), prefix=prefix):
+                if isinstance(r.message, mrtlib.TableDumpMrtMessage):
+                    prefixes.append('%s/%d' % (r.message.prefix,
+                                               r.message.prefix_len))
+                else:
+                    prefixes.append(r.message.prefix.prefix)
+            eq_(expected, prefixes)
+
+    def test_rib_routes(self):
+        input_file = os.path.join(MRT_DATA_DIR, 'rib.20161101.0000_pick.bz2')
+        records = list(mrtlib.Reader(bz2.BZ2File(input_file, 'rb')))
+        routes = list(mrtlib.rib_routes(records))
+        eq_(2, len(routes))
+        for record, (prefix, bgp_attributes, next_hop) in zip(records[1:],
+                                                              routes):
+            rib_entry = record.message.rib_entries[0]
+            eq_(record.message.prefix, prefix)
+            eq_(rib_entry.bgp_attributes, bgp_attributes)
+            next_hops = [a.value for a in bgp_attributes
+                         if isinstance(a, bgp.BGPPathAttributeNextHop)]
+            eq_(next_hops, [next_hop])
+
 
 class TestMrtlibMrtRecord(unittest.TestCase):
     """
@@ -641,6 +761,29 @@ class TestMrtlibMrtRibEntry(unittest.TestCase):
         eq_(nexthop, rib.bgp_attributes[0].value)
         eq_(b'', rest)
 
+    def test_parse_lazy(self):
+        bgp_attribute = bgp.BGPPathAttributeNextHop('1.1.1.1')
+        bgp_attr_buf = bgp_attribute.serialize()
+        buf = (
+            b'\x00\x01'  # peer_index
+            b'\x00\x00\x00\x02'  # originated_time
+            + struct.pack('!H', len(bgp_attr_buf))  # attr_len
+            + bgp_attr_buf  # bgp_attributes
+        )
+
+        rib, _ = mrtlib.MrtRibEntry.parse(buf)
+        # not parsed until accessed
+        eq_(None, rib._bgp_attributes)
+        eq_(buf, rib.serialize())
+        eq_(None, rib._bgp_attributes)
+
+        eq_('1.1.1.1', rib.bgp_attributes[0].value)
+        eq_(buf, rib.serialize())
+        ok_('bgp_attributes=[BGPPathAttributeNextHop(' in str(rib))
+
+        rib.bgp_attributes = [bgp.BGPPathAttributeNextHop('2.2.2.2')]
+        eq_(buf[:-4] + b'\x02\x02\x02\x02', rib.serialize())
+
     def test_serialize_add_path(self):
         peer_index = 1
         originated_time = 2
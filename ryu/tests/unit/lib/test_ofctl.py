@@ -21,12 +21,15 @@ import os
 import sys
 import unittest
 
+from ryu.lib import hub
+from ryu.lib import ofctl_utils
 from ryu.lib import ofctl_v1_0
 from ryu.lib import ofctl_v1_2
 from ryu.lib import ofctl_v1_3
 from ryu.lib import ofctl_v1_4
 from ryu.lib import ofctl_v1_5
 from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
 from ryu.ofproto.ofproto_protocol import ProtocolDesc
 from ryu.tests import test_lib
 
@@ -51,11 +54,11 @@ class DummyDatapath(ProtocolDesc):
         msg.serialize()
         self.request_msg = msg
 
-        if self.reply_msg:
-            lock, msgs = self.waiters[self.id][msg.xid]
-            msgs.append(self.reply_msg)
-            del self.waiters[self.id][msg.xid]
-            lock.set()
+    def send_request(self, msg, timeout=None):
+        self.send_msg(msg)
+        future = hub.Future()
+        future.set_result([self.reply_msg])
+        return future
 
     def set_reply(self, msg, waiters):
         self.reply_msg = msg
@@ -636,6 +639,25 @@ def _add_tests():
             test_lib.add_method(Test_ofctl, name, f)
 
 
+class Test_send_stats_request(unittest.TestCase):
+
+    def test_timeout(self):
+        dp = DummyDatapath(ofproto_v1_3.OFP_VERSION)
+        parts = ['part1', 'part2']
+
+        def _send_request(msg, timeout=None):
+            future = hub.Future()
+            future.set_exception(hub.FutureTimeout(partial=parts))
+            return future
+
+        dp.send_request = _send_request
+        msgs = []
+        ofctl_utils.send_stats_request(
+            dp, dp.ofproto_parser.OFPPortStatsRequest(dp), {}, msgs)
+        # the parts of the reply received before the timeout
+        eq_(msgs, parts)
+
+
 _add_tests()
 
 if __name__ == "__main__":
@@ -57,3 +57,14 @@ class TestMsgPackInto(unittest.TestCase):
 
     def test_msg_pack_into_greater(self):
         ok_(self._test_msg_pack_into('g'))
+
+
+class TestGetStruct(unittest.TestCase):
+    """ Test case for get_struct
+    """
+
+    def test_get_struct(self):
+        s = pack_utils.get_struct('!HI')
+        eq_(s.size, 6)
+        ok_(pack_utils.get_struct('!HI') is s)
+        eq_(s.pack(1, 2), b'\x00\x01\x00\x00\x00\x02')
@@ -15,10 +15,12 @@
 
 from __future__ import print_function
 
+import io
 import logging
 import os
 import struct
 import sys
+import tempfile
 import unittest
 
 try:
@@ -159,6 +161,14 @@ class Test_PcapPktHdr(unittest.TestCase):
         eq_(binary_str(self.buf_little), binary_str(buf))
 
 
+def _pipe(buf):
+    # a stream which is neither mapped nor seekable
+    r, w = os.pipe()
+    os.write(w, buf)
+    os.close(w)
+    return os.fdopen(r, 'rb')
+
+
 class Test_pcaplib_Reader(unittest.TestCase):
     """
     Test case for pcaplib.Reader class
@@ -182,6 +192,136 @@ class Test_pcaplib_Reader(unittest.TestCase):
     def test_with_little_endian(self):
         self._test(os.path.join(PCAP_PACKET_DATA_DIR, 'little_endian.pcap'))
 
+    def test_with_stream(self):
+        # not mapped into memory
+        buf = open(os.path.join(PCAP_PACKET_DATA_DIR, 'big_endian.pcap'),
+                   'rb').read()
+        eq_(self.expected_outputs, list(pcaplib.Reader(io.BytesIO(buf))))
+
+    def test_with_pipe(self):
+        buf = open(os.path.join(PCAP_PACKET_DATA_DIR, 'big_endian.pcap'),
+                   'rb').read()
+        eq_(self.expected_outputs, list(pcaplib.Reader(_pipe(buf))))
+
+    def test_random_access(self):
+        for name in ('big_endian.pcap', 'little_endian.pcap'):
+            file_name = os.path.join(PCAP_PACKET_DATA_DIR, name)
+            buf = open(file_name, 'rb').read()
+            for f in (open(file_name, 'rb'), io.BytesIO(buf)):
+                reader = pcaplib.Reader(f)
+                eq_(2, reader.count())
+                eq_(self.expected_outputs[1], reader[1])
+                eq_(self.expected_outputs[0], reader[-2])
+                # iterating is not affected by the random access
+                eq_(self.expected_outputs, list(reader))
+                eq_(self.expected_outputs[0], reader[0])
+                reader.close()
+
+    @raises(IndexError)
+    def test_random_access_out_of_range(self):
+        pcaplib.Reader(open(os.path.join(PCAP_PACKET_DATA_DIR,
+                                         'big_endian.pcap'), 'rb'))[2]
+
+    def test_with_nsec(self):
+        buf = bytearray(open(os.path.join(PCAP_PACKET_DATA_DIR,
+                                          'little_endian.pcap'), 'rb').read())
+        buf[:4] = pcaplib.PcapFileHdr.MAGIC_NUMBER_SWAPPED_NSEC
+        eq_([(0x1234 + (0x5678 / 1e9), b'test_data_1'),
+             (0x2345 + (0x6789 / 1e9), b'test_data_2')],
+            list(pcaplib.Reader(io.BytesIO(bytes(buf)))))
+
+    def test_with_large_file(self):
+        pkts = [(i + 1.5, struct.pack('!I', i) * (i % 400))
+                for i in range(5000)]
+        with tempfile.NamedTemporaryFile() as f:
+            w = pcaplib.Writer(open(f.name, 'wb'), bufsize=4096)
+            w.write_pkts(pkts)
+            w.close()
+            eq_(pkts, list(pcaplib.Reader(open(f.name, 'rb'))))
+            reader = pcaplib.Reader(open(f.name, 'rb'))
+            eq_(len(pkts), reader.count())
+            eq_(pkts[4321], reader[4321])
+            reader.close()
+
+
+def _pcapng_block(order, block_type, body):
+    body += b'\x00' * (-len(body) % 4)
+    block_len = len(body) + 12
+    return (struct.pack(order + 'II', block_type, block_len) + body +
+            struct.pack(order + 'I', block_len))
+
+
+def _pcapng(order):
+    # a section of 2 interfaces, the second one with the timestamps in
+    # nanoseconds, and the packets of them
+    return b''.join([
+        _pcapng_block(order, 0x0a0d0d0a,
+                      struct.pack(order + 'IHHq', 0x1a2b3c4d, 1, 0, -1)),
+        _pcapng_block(order, 1, struct.pack(order + 'HHI', 1, 0, 0)),
+        _pcapng_block(order, 1,
+                      struct.pack(order + 'HHI', 1, 0, 65535) +
+                      # if_tsresol, opt_endofopt
+                      struct.pack(order + 'HHB3x', 9, 1, 9) +
+                      struct.pack(order + 'HH', 0, 0)),
+        # Name Resolution Block, skipped
+        _pcapng_block(order, 4, struct.pack(order + 'HH', 0, 0)),
+        _pcapng_block(order, 6,
+                      struct.pack(order + 'IIIII', 0, 0, 0x12345678,
+                                  11, 11) + b'test_data_1'),
+        _pcapng_block(order, 6,
+                      struct.pack(order + 'IIIII', 1, 1, 0x12345678,
+                                  11, 100) + b'test_data_2'),
+        _pcapng_block(order, 3, struct.pack(order + 'I', 11) +
+                      b'test_data_3'),
+    ])
+
+
+class Test_pcaplib_Reader_pcapng(unittest.TestCase):
+    """
+    Test case for pcaplib.Reader class with pcapng files
+    """
+
+    expected_outputs = [
+        (0x12345678 / 1e6, b'test_data_1'),
+        ((1 << 32 | 0x12345678) / 1e9, b'test_data_2'),
+        (None, b'test_data_3'),
+    ]
+
+    def _test(self, buf):
+        reader = pcaplib.Reader(io.BytesIO(buf))
+        eq_(None, reader.pcap_header)
+        eq_(self.expected_outputs, list(reader))
+        eq_(3, reader.count())
+        eq_(self.expected_outputs[1], reader[1])
+
+    def test_with_big_endian(self):
+        self._test(_pcapng('>'))
+
+    def test_with_little_endian(self):
+        self._test(_pcapng('<'))
+
+    def test_with_pipe(self):
+        for buf in (_pcapng('<'), _pcapng('>'), _pcapng('<') + _pcapng('>')):
+            reader = pcaplib.Reader(_pipe(buf))
+            eq_(self.expected_outputs * (len(buf) // len(_pcapng('<'))),
+                list(reader))
+            reader.close()
+
+    def test_with_sections(self):
+        buf = _pcapng('<') + _pcapng('>')
+        reader = pcaplib.Reader(io.BytesIO(buf))
+        eq_(self.expected_outputs * 2, list(reader))
+        eq_(self.expected_outputs[1], reader[4])
+
+    def test_with_file(self):
+        with tempfile.NamedTemporaryFile() as f:
+            f.write(_pcapng('<'))
+            f.flush()
+            reader = pcaplib.Reader(open(f.name, 'rb'))
+            eq_(self.expected_outputs, list(reader))
+            eq_(self.expected_outputs[2], reader[2])
+            reader.close()
+
 
 class DummyFile(object):
 
@@ -217,6 +357,28 @@ class Test_pcaplib_Writer(unittest.TestCase):
     def test_with_little_endian(self):
         self._test(os.path.join(PCAP_PACKET_DATA_DIR, 'little_endian.pcap'))
 
+    @mock.patch('sys.byteorder', 'little')
+    def test_with_bufsize(self):
+        expected_buf = open(os.path.join(PCAP_PACKET_DATA_DIR,
+                                         'little_endian.pcap'), 'rb').read()
+        f = DummyFile()
+        w = pcaplib.Writer(f, bufsize=1024)
+        w.write_pkt(b'test_data_1', ts=(0x1234 + (0x5678 / 1e6)))
+        w.write_pkt(b'test_data_2', ts=(0x2345 + (0x6789 / 1e6)))
+        eq_(b'', f.buf)
+        w.flush()
+        eq_(expected_buf, f.buf)
+
+    @mock.patch('sys.byteorder', 'little')
+    def test_write_pkts(self):
+        expected_buf = open(os.path.join(PCAP_PACKET_DATA_DIR,
+                                         'little_endian.pcap'), 'rb').read()
+        f = DummyFile()
+        w = pcaplib.Writer(f)
+        w.write_pkts(pcaplib.Reader(open(os.path.join(
+            PCAP_PACKET_DATA_DIR, 'big_endian.pcap'), 'rb')))
+        eq_(expected_buf, f.buf)
+
     @staticmethod
     @mock.patch.object(pcaplib.Writer, '_write_pcap_file_hdr', mock.MagicMock)
     @mock.patch.object(pcaplib.Writer, '_write_pkt_hdr', mock.MagicMock)
@@ -0,0 +1,125 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import unittest
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.lib import statslib
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__),
+                               '../../packet_data/of13')
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = ofproto_v1_3_parser
+
+
+def _load(name):
+    with open(os.path.join(PACKET_DATA_DIR, name), 'rb') as f:
+        buf = f.read()
+    version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+    return ofproto_parser.msg(_Datapath, version, msg_type, msg_len, xid,
+                              buf)
+
+
+class Test_StatsTable(unittest.TestCase):
+    def setUp(self):
+        self.table = statslib.StatsTable(('packets',), history=3)
+
+    def _update(self, timestamp, counters):
+        self.table.update([k for k, _v in counters],
+                          {'packets': [v for _k, v in counters]},
+                          timestamp=timestamp)
+
+    def test_rates(self):
+        self._update(0, [('a', 10), ('b', 20)])
+        eq_(self.table.rates('packets'), [0.0, 0.0])
+        eq_(self.table.deltas('packets'), [10, 20])
+        self._update(2, [('a', 30), ('b', 20)])
+        eq_(self.table.rates('packets'), [10.0, 0.0])
+        # the counter of b is reset
+        self._update(4, [('a', 30), ('b', 5)])
+        eq_(self.table.deltas('packets'), [0, 5])
+
+    def test_keys_changed(self):
+        self._update(0, [('a', 10), ('b', 20)])
+        self._update(1, [('c', 5), ('a', 15)])
+        eq_(self.table.keys, ['a', 'b', 'c'])
+        eq_(list(self.table.values('packets')), [15, 20, 5])
+        eq_(list(self.table.values('packets', 1)), [10, 20, 0])
+        eq_(self.table.deltas('packets'), [5, 0, 5])
+        # the same keys again
+        self._update(2, [('c', 7), ('a', 16)])
+        eq_(self.table.deltas('packets'), [1, 0, 2])
+
+    def test_compact(self):
+        self._update(0, [('a', 1), ('b', 2), ('c', 3)])
+        self._update(1, [('c', 4)])
+        eq_(self.table.keys, ['c'])
+        eq_(self.table.series('c', 'packets'), [(0, 3), (1, 4)])
+
+    def test_history(self):
+        for t in range(5):
+            self._update(t, [('a', t * 10)])
+        eq_(self.table.timestamps(), [2, 3, 4])
+        eq_(self.table.series('a', 'packets'), [(2, 20), (3, 30), (4, 40)])
+
+    def test_top(self):
+        self._update(0, [(k, 0) for k in 'abcde'])
+        self._update(1, [(k, v) for k, v in zip('abcde', [3, 9, 1, 7, 5])])
+        eq_(self.table.top('packets', 2), [('b', 9.0), ('d', 7.0)])
+        eq_(self.table.top('packets', 1, by='value'), [('b', 9)])
+        eq_(self.table.top('packets', 10, by='delta')[-1], ('c', 1))
+
+    @raises(ValueError)
+    def test_top_unknown(self):
+        self._update(0, [('a', 1)])
+        self.table.top('packets', 1, by='hoge')
+
+
+class Test_statslib(unittest.TestCase):
+    def test_flow_stats_columns(self):
+        msg = _load('4-12-ofp_flow_stats_reply.packet')
+        keys, columns = statslib.flow_stats_columns([msg, msg])
+        body = msg.body * 2
+        eq_(columns['packet_count'], [s.packet_count for s in body])
+        eq_(columns['byte_count'], [s.byte_count for s in body])
+        for key, stats in zip(keys, body):
+            buf = bytearray()
+            stats.match.serialize(buf, 0)
+            eq_(key, (stats.table_id, stats.priority, stats.cookie,
+                      bytes(buf[:stats.match.length])))
+
+    def test_port_stats_columns(self):
+        msg = _load('4-30-ofp_port_stats_reply.packet')
+        keys, columns = statslib.port_stats_columns([msg])
+        eq_(keys, [s.port_no for s in msg.body])
+        eq_(columns['tx_bytes'], [s.tx_bytes for s in msg.body])
+        eq_(sorted(columns), sorted(statslib.PORT_FIELDS))
+
+    def test_top(self):
+        tables = {}
+        for dpid, counts in ((1, [5, 1]), (2, [4, 8])):
+            table = tables[dpid] = statslib.StatsTable(('n',))
+            table.update(['x', 'y'], {'n': counts})
+        eq_(statslib.StatsLib._top(tables, 'n', 2, 'value'),
+            [(2, 'y', 8), (1, 'x', 5)])
@@ -0,0 +1,78 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+import ryu.ofproto.ofproto_v1_3_parser as ofpp
+
+
+def _serialize(action, buf=None, offset=0):
+    if buf is None:
+        buf = bytearray()
+    action.serialize(buf, offset)
+    return buf
+
+
+def _learn(n_bits=16):
+    return ofpp.NXActionLearn(
+        table_id=10,
+        specs=[ofpp.NXFlowSpecMatch(src=0x800, dst=('eth_type_nxm', 0),
+                                    n_bits=16),
+               ofpp.NXFlowSpecLoad(src=('in_port', 0), dst=('reg0', 0),
+                                   n_bits=n_bits),
+               ofpp.NXFlowSpecOutput(src=('in_port', 0), n_bits=16)],
+        idle_timeout=180)
+
+
+class Test_serialize_cache(unittest.TestCase):
+    def test_cached(self):
+        on_wire = (
+            b'\xff\xff\x00\x18\x00\x00\x23\x20'
+            b'\x00\x06\x00\x30\x00\x00\x00\x00'
+            b'\x80\x00\x08\x06\x80\x00\x06\x06'
+        )
+        for _i in range(2):
+            act = ofpp.NXActionRegMove(src_field='eth_src',
+                                       dst_field='eth_dst', n_bits=48)
+            self.assertEqual(on_wire, _serialize(act))
+            self.assertEqual(24, act.len)
+
+    def test_modified(self):
+        act = ofpp.NXActionConjunction(clause=1, n_clauses=2, id_=10)
+        buf = _serialize(act)
+        act.id = 11
+        self.assertNotEqual(buf, _serialize(act))
+        act.id = 10
+        self.assertEqual(buf, _serialize(act))
+
+    def test_learn(self):
+        buf = _serialize(_learn())
+        self.assertEqual(buf, _serialize(_learn()))
+        self.assertNotEqual(buf, _serialize(_learn(n_bits=8)))
+        o = ofpp.NXAction.parse(buf[8:])
+        self.assertEqual(str(_learn()), str(o))
+
+    def test_unhashable(self):
+        spec = ofpp.NXFlowSpecMatch(src=99, dst=['in_port', 0], n_bits=16)
+        self.assertEqual(b'\x20\x10'
+                         b'\x00\x63'
+                         b'\x80\x00\x00\x04\x00\x00', spec.serialize())
+
+    def test_offset(self):
+        act = ofpp.NXActionResubmitTable(in_port=8080, table_id=10)
+        _serialize(act)
+        buf = _serialize(act, bytearray(b'\x01'), 8)
+        self.assertEqual(b'\x01' + b'\x00' * 7, buf[:8])
+        self.assertEqual(_serialize(act), buf[8:])
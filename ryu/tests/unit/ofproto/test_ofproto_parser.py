@@ -123,6 +123,33 @@ class TestOfproto_Parser(unittest.TestCase):
                            xid,
                            self.bufPacketIn)
 
+    def test_msg_dispatch(self):
+        for buf in (self.bufHello, self.bufFeaturesReply, self.bufPacketIn):
+            (version, msg_type, msg_len, xid) = ofproto_parser.header(buf)
+            msg = ofproto_parser.msg(self, version, msg_type, msg_len, xid,
+                                     buf)
+            eq_(msg.__class__.cls_msg_type, msg_type)
+
+        # an unknown message type is logged and ignored
+        buf = struct.pack(ofproto_v1_0.OFP_HEADER_PACK_STR,
+                          ofproto_v1_0.OFP_VERSION, 0xff, 8, 0)
+        eq_(ofproto_parser.msg(self, ofproto_v1_0.OFP_VERSION, 0xff, 8, 0,
+                               buf), None)
+
+    def test_msg_to_ev(self):
+        from ryu.controller import ofp_event
+        from ryu.ofproto import ofproto_v1_3_parser
+
+        (version, msg_type, msg_len, xid) = ofproto_parser.header(
+            self.bufPacketIn)
+        msg = ofproto_parser.msg(self, version, msg_type, msg_len, xid,
+                                 self.bufPacketIn)
+        ev = ofp_event.ofp_msg_to_ev(msg)
+        ok_(isinstance(ev, ofp_event.EventOFPPacketIn))
+        ok_(ev.msg is msg)
+        eq_(ofp_event.ofp_msg_to_ev_cls(ofproto_v1_3_parser.OFPPacketIn),
+            ofp_event.EventOFPPacketIn)
+
     @raises(exception.OFPUnknownVersion)
     def test_check_msg_parser(self):
         (version,
@@ -225,6 +252,41 @@ class TestMsgBase(unittest.TestCase):
     def test_serialize(self):
         ok_(self._test_serialize())
 
+    def test_parser_new(self):
+        # the hot message types are parsed without __init__()
+        class Datapath(object):
+            ofproto = ofproto_v1_0
+            ofproto_parser = ofproto_v1_0_parser
+
+        c = ofproto_v1_0_parser.OFPEchoReply(Datapath, data=b'hoge')
+        c.serialize()
+        msgs = [ofproto_v1_0_parser.OFPEchoReply.parser(
+            Datapath, c.version, c.msg_type, c.msg_len, c.xid, c.buf)
+            for _i in range(2)]
+        for msg in msgs:
+            eq_(msg.data, b'hoge')
+            eq_(msg.to_jsondict(), c.to_jsondict())
+            eq_(str(msg), str(msgs[0]))
+            ok_('datapath' not in str(msg))
+
+    def test_serialize_into(self):
+        class Datapath(object):
+            ofproto = ofproto_v1_0
+            ofproto_parser = ofproto_v1_0_parser
+
+        c = ofproto_v1_0_parser.OFPEchoRequest(Datapath)
+        c.data = b'hoge'
+        buf = bytearray(b'\xff' * 4)
+        eq_(c.serialize_into(buf, 2), 12)
+        eq_(len(buf), 14)
+        eq_(buf[:2], b'\xff\xff')
+        eq_(bytes(buf[2:]), bytes(c.buf))
+
+        # msg is placed at offset even if buf is shorter
+        buf = bytearray()
+        c.serialize_into(buf, 4)
+        eq_(bytes(buf[4:]), bytes(c.buf))
+
 
 class TestMsgStrAttr(unittest.TestCase):
     """ Test case for ofproto_parser.msg_str_attr
@@ -242,3 +304,77 @@ class TestMsgStrAttr(unittest.TestCase):
         str_ = str_.rsplit()
         eq_('check', str_[0])
         eq_('msg_str_attr_test', str_[1])
+
+
+class TestPacketDataMixin(unittest.TestCase):
+    """ Test case for ofproto_parser.PacketDataMixin
+    """
+
+    def setUp(self):
+        from ryu.ofproto import ofproto_v1_3
+        from ryu.ofproto import ofproto_v1_3_parser
+
+        class Datapath(object):
+            ofproto = ofproto_v1_3
+            ofproto_parser = ofproto_v1_3_parser
+
+        self.dp = Datapath
+        self.ofp = ofproto_v1_3
+        self.parser = ofproto_v1_3_parser
+        self.frame = binascii.unhexlify(
+            'ffffffffffff000000000001080600010800060400010000000000010a000001'
+            '0000000000000a000002')
+
+    def _packet_in(self, pad=b''):
+        match = bytearray()
+        self.parser.OFPMatch(in_port=1).serialize(match, 0)
+        body = struct.pack(self.ofp.OFP_PACKET_IN_PACK_STR,
+                           self.ofp.OFP_NO_BUFFER, len(self.frame),
+                           self.ofp.OFPR_NO_MATCH, 0, 0)
+        body += bytes(match) + b'\x00' * 2 + self.frame + pad
+        buf = struct.pack(self.ofp.OFP_HEADER_PACK_STR, self.ofp.OFP_VERSION,
+                          self.ofp.OFPT_PACKET_IN,
+                          self.ofp.OFP_HEADER_SIZE + len(body), 0) + body
+        version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+        return ofproto_parser.msg(self.dp, version, msg_type, msg_len, xid,
+                                  buf)
+
+    def test_data_view(self):
+        msg = self._packet_in(pad=b'\x00' * 6)
+        ok_(isinstance(msg.data_view, memoryview))
+        if six.PY3:
+            # refers to the message buffer without copy
+            ok_(msg.data_view.obj is msg.buf)
+        eq_(msg.data_view.tobytes(), self.frame)
+        eq_(msg.data, self.frame)
+        ok_(isinstance(msg.data, bytes))
+
+    def test_set_data(self):
+        msg = self.parser.OFPPacketIn(self.dp, data=self.frame)
+        eq_(msg.data, self.frame)
+        eq_(msg.data_view.tobytes(), self.frame)
+
+        msg = self._packet_in()
+        msg.data = b'hoge'
+        eq_(msg.data_view.tobytes(), b'hoge')
+
+    def test_jsondict(self):
+        msg = self._packet_in()
+        msg2 = self.parser.OFPPacketIn(self.dp, data=self.frame)
+        eq_(msg.to_jsondict()['OFPPacketIn']['data'],
+            msg2.to_jsondict()['OFPPacketIn']['data'])
+        ok_('data_view' not in msg.to_jsondict()['OFPPacketIn'])
+
+    def test_packet_out(self):
+        msg = self._packet_in()
+        actions = [self.parser.OFPActionOutput(2)]
+        outs = []
+        for data in (msg.data_view, self.frame):
+            out = self.parser.OFPPacketOut(
+                self.dp, buffer_id=self.ofp.OFP_NO_BUFFER,
+                in_port=1, actions=actions, data=data)
+            out.serialize()
+            outs.append(out)
+        eq_(bytes(outs[0].buf), bytes(outs[1].buf))
+        eq_(outs[0].to_jsondict(), outs[1].to_jsondict())
+        eq_(str(outs[0]), str(outs[1]))
@@ -0,0 +1,131 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import struct
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from ryu.ofproto import ofproto_parser
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+
+PACKET_DATA_DIR = os.path.join(os.path.dirname(__file__),
+                               '../../packet_data/of13')
+
+
+class _Datapath(object):
+    ofproto = ofproto_v1_3
+    ofproto_parser = ofproto_v1_3_parser
+
+
+def _load(name):
+    with open(os.path.join(PACKET_DATA_DIR, name), 'rb') as f:
+        return f.read()
+
+
+def _repeat_body(buf, count):
+    # a reply with the body of buf repeated count times
+    body = buf[ofproto_v1_3.OFP_MULTIPART_REPLY_SIZE:] * count
+    header = bytearray(buf[:ofproto_v1_3.OFP_MULTIPART_REPLY_SIZE])
+    struct.pack_into('!H', header, 2, len(header) + len(body))
+    return bytes(header) + body
+
+
+def _parse(buf):
+    version, msg_type, msg_len, xid = ofproto_parser.header(buf)
+    return ofproto_parser.msg(_Datapath, version, msg_type, msg_len, xid,
+                              buf)
+
+
+class Test_Parser_OFPMultipartReply(unittest.TestCase):
+    def setUp(self):
+        self.flow_stats = _load('4-12-ofp_flow_stats_reply.packet')
+        self.port_stats = _load('4-30-ofp_port_stats_reply.packet')
+        self.table_features = _load('4-56-ofp_table_features_reply.packet')
+
+    def _test_lazy_body(self, buf, cls):
+        msg = _parse(_repeat_body(buf, 3))
+        ok_(isinstance(msg, cls))
+        entries = list(msg.iter_body())
+        body = msg.body
+        ok_(isinstance(body, list))
+        eq_(len(body), 3 * len(_parse(buf).body))
+        eq_([e.to_jsondict() for e in entries],
+            [e.to_jsondict() for e in body])
+        # iterating a decoded body returns the same entries
+        eq_(list(msg.iter_body()), body)
+
+    def test_flow_stats_reply(self):
+        self._test_lazy_body(self.flow_stats,
+                             ofproto_v1_3_parser.OFPFlowStatsReply)
+
+    def test_port_stats_reply(self):
+        self._test_lazy_body(self.port_stats,
+                             ofproto_v1_3_parser.OFPPortStatsReply)
+
+    def test_table_features_reply(self):
+        self._test_lazy_body(self.table_features,
+                             ofproto_v1_3_parser.OFPTableFeaturesStatsReply)
+
+    def test_flow_stats_fields(self):
+        msg = _parse(_repeat_body(self.flow_stats, 2))
+        expected = _parse(self.flow_stats).body * 2
+        stats = list(msg.iter_body(fields=('cookie', 'packet_count')))
+        eq_(len(stats), len(expected))
+        for stat, e in zip(stats, expected):
+            eq_(stat.cookie, e.cookie)
+            eq_(stat.packet_count, e.packet_count)
+            eq_(stat.length, e.length)
+            eq_(stat.match, None)
+            eq_(stat.instructions, None)
+
+        stats = msg.iter_body(fields=('instructions',))
+        for stat, e in zip(stats, expected):
+            eq_(stat.match, None)
+            eq_([i.to_jsondict() for i in stat.instructions],
+                [i.to_jsondict() for i in e.instructions])
+
+        stats = msg.iter_body(fields=('match',))
+        for stat, e in zip(stats, expected):
+            eq_(stat.match.to_jsondict(), e.match.to_jsondict())
+            eq_(stat.instructions, None)
+
+    def test_table_features_fields(self):
+        msg = _parse(self.table_features)
+        stats = list(msg.iter_body(fields=('name',)))
+        eq_([s.name for s in stats], [s.name for s in msg.body])
+        eq_(set(s.properties for s in stats), set([None]))
+
+    def test_yield_every(self):
+        msg = _parse(_repeat_body(self.port_stats, 5))
+        eq_(list(msg.iter_body(yield_every=2)), msg.body)
+
+    def test_str(self):
+        msg = _parse(self.port_stats)
+        ok_('body=[OFPPortStats(' in str(msg))
+        eq_(msg.to_jsondict(), _parse(self.port_stats).to_jsondict())
+
+    def test_constructed_body(self):
+        body = [ofproto_v1_3_parser.OFPPortStats(*range(15))]
+        msg = ofproto_v1_3_parser.OFPPortStatsReply(_Datapath, body=body)
+        eq_(msg.body, body)
+        eq_(list(msg.iter_body()), body)
+
+        msg = ofproto_v1_3_parser.OFPPortStatsReply(_Datapath)
+        eq_(msg.body, None)
+        eq_(list(msg.iter_body()), [])
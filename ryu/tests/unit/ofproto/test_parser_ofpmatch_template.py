@@ -0,0 +1,124 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from nose.tools import eq_
+from nose.tools import ok_
+from nose.tools import raises
+
+from ryu.ofproto import ofproto_v1_3
+from ryu.ofproto import ofproto_v1_3_parser
+from ryu.ofproto import ofproto_v1_4_parser
+from ryu.ofproto import ofproto_v1_5_parser
+
+
+def _serialize(match):
+    buf = bytearray()
+    length = match.serialize(buf, 0)
+    eq_(length, len(buf))
+    return bytes(buf)
+
+
+class Test_Parser_OFPMatchTemplate(unittest.TestCase):
+    _parsers = [ofproto_v1_3_parser, ofproto_v1_4_parser, ofproto_v1_5_parser]
+
+    def _test(self, fields, masked=()):
+        for ofpp in self._parsers:
+            template = ofpp.OFPMatchTemplate(*fields.keys(), masked=masked)
+            match = template(**fields)
+            expected = ofpp.OFPMatch(**fields)
+            ok_(isinstance(match, ofpp.OFPMatch))
+            eq_(_serialize(match), _serialize(expected))
+            eq_(match.length, expected.length)
+            eq_(match.to_jsondict(), expected.to_jsondict())
+            eq_(str(match), str(expected))
+            for k in fields:
+                eq_(match[k], expected[k])
+
+    def test_fields(self):
+        self._test({'in_port': 1, 'eth_type': 0x0800})
+        self._test({'eth_type': 0x0800, 'ipv4_src': '10.0.0.1',
+                    'ipv4_dst': '10.0.0.2'})
+        self._test({'in_port': 1, 'eth_src': '00:00:00:00:00:01',
+                    'eth_dst': '00:00:00:00:00:02', 'eth_type': 0x86dd,
+                    'ipv6_dst': '2001:db8::1'})
+
+    def test_masked(self):
+        self._test({'eth_type': 0x0800, 'ipv4_dst': '10.0.0.7/24'},
+                   masked=['ipv4_dst'])
+        self._test({'eth_type': 0x0800,
+                    'ipv4_dst': ('10.0.0.7', '255.255.0.0')},
+                   masked=['ipv4_dst'])
+
+    def test_masked_exact(self):
+        self._test({'eth_type': 0x0800, 'ipv4_dst': '10.0.0.7/32'},
+                   masked=['ipv4_dst'])
+
+    @raises(ValueError)
+    def test_masked_without_mask(self):
+        template = ofproto_v1_3_parser.OFPMatchTemplate(
+            'ipv4_dst', masked=['ipv4_dst'])
+        template(ipv4_dst='10.0.0.1')
+
+    def test_positional(self):
+        template = ofproto_v1_3_parser.OFPMatchTemplate(
+            'ipv4_dst', 'eth_type')
+        match = template('10.0.0.2', 0x0800)
+        expected = ofproto_v1_3_parser.OFPMatch(eth_type=0x0800,
+                                                ipv4_dst='10.0.0.2')
+        eq_(_serialize(match), _serialize(expected))
+
+    def test_reuse(self):
+        template = ofproto_v1_3_parser.OFPMatchTemplate('in_port')
+        eq_(template(in_port=1)['in_port'], 1)
+        eq_(template(in_port=2)['in_port'], 2)
+        eq_(template(in_port=1)['in_port'], 1)
+
+    def test_flow_mod(self):
+        class Datapath(object):
+            ofproto = ofproto_v1_3
+            ofproto_parser = ofproto_v1_3_parser
+
+        template = ofproto_v1_3_parser.OFPMatchTemplate('eth_type',
+                                                        'ipv4_dst')
+        msgs = []
+        for match in (template(eth_type=0x0800, ipv4_dst='10.0.0.1'),
+                      ofproto_v1_3_parser.OFPMatch(eth_type=0x0800,
+                                                   ipv4_dst='10.0.0.1')):
+            msg = ofproto_v1_3_parser.OFPFlowMod(Datapath, match=match)
+            msg.serialize()
+            msgs.append(bytes(msg.buf))
+        eq_(msgs[0], msgs[1])
+
+    @raises(ValueError)
+    def test_not_masked(self):
+        template = ofproto_v1_3_parser.OFPMatchTemplate('ipv4_dst')
+        template(ipv4_dst='10.0.0.0/24')
+
+    @raises(TypeError)
+    def test_missing_field(self):
+        template = ofproto_v1_3_parser.OFPMatchTemplate('eth_type',
+                                                        'ipv4_dst')
+        template(eth_type=0x0800)
+
+    @raises(TypeError)
+    def test_unknown_field(self):
+        template = ofproto_v1_3_parser.OFPMatchTemplate('eth_type')
+        template(eth_type=0x0800, in_port=1)
+
+    @raises(KeyError)
+    def test_unknown_template_field(self):
+        ofproto_v1_3_parser.OFPMatchTemplate('no_such_field')
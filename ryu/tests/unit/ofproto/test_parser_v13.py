@@ -162,3 +162,58 @@ class TestOFPMatch(unittest.TestCase):
 
     def test_set_vlan_vid_none(self):
         self._test_set_vlan_vid_none()
+
+    def test_parser_fields(self):
+        # the OFPMatchField list is decoded when it is used
+        match = OFPMatch(in_port=1, eth_type=ether.ETH_TYPE_IP)
+        buf = bytearray()
+        match.serialize(buf, 0)
+        res = OFPMatch.parser(six.binary_type(buf), 0)
+        eq_(res._old_fields, None)
+        eq_([(f.header, f.value) for f in res.fields],
+            [(ofproto_v1_3.OXM_OF_IN_PORT, 1),
+             (ofproto_v1_3.OXM_OF_ETH_TYPE, ether.ETH_TYPE_IP)])
+        eq_(res['in_port'], 1)
+        ok_(not res._composed_with_old_api())
+
+    def test_old_api_lazy(self):
+        res = OFPMatch(in_port=1)
+        eq_(res._old_wc, None)
+        eq_(res._old_flow, None)
+        ok_(not res._composed_with_old_api())
+        res = OFPMatch()
+        res.set_in_port(1)
+        ok_(res._composed_with_old_api())
+
+
+class TestSlots(unittest.TestCase):
+    """ Test case for the classes with __slots__
+    """
+
+    def _test_slots(self, obj):
+        ok_(not hasattr(obj, '__dict__'))
+        jsondict = obj.to_jsondict()
+        obj2 = obj.__class__.from_jsondict(jsondict[obj.__class__.__name__])
+        eq_(str(obj), str(obj2))
+
+    def test_action_output(self):
+        self._test_slots(OFPActionOutput(1, 128))
+        eq_(str(OFPActionOutput(1, 128)),
+            'OFPActionOutput(len=16,max_len=128,port=1,type=0)')
+
+    def test_instruction_actions(self):
+        inst = OFPInstructionActions(ofproto_v1_3.OFPIT_APPLY_ACTIONS,
+                                     [OFPActionOutput(1)])
+        self._test_slots(inst)
+        # len is set by the parser only
+        eq_(inst.to_jsondict()['OFPInstructionActions'].get('len'), None)
+
+    def test_flow_stats(self):
+        stats = OFPFlowStats(table_id=1, priority=10, packet_count=5,
+                             byte_count=320, match=OFPMatch(in_port=1),
+                             instructions=[])
+        self._test_slots(stats)
+
+    @raises(AttributeError)
+    def test_unknown_attribute(self):
+        OFPActionOutput(1).hoge = 1
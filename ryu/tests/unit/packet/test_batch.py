@@ -0,0 +1,213 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import glob
+import os
+import struct
+import unittest
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.lib import addrconv
+from ryu.lib import pcaplib
+from ryu.lib.packet import arp
+from ryu.lib.packet import batch
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import ipv6
+from ryu.lib.packet import packet
+from ryu.lib.packet import sctp
+from ryu.lib.packet import tcp
+from ryu.lib.packet import udp
+from ryu.lib.packet import vlan
+from ryu.lib.xflow import sflow
+from ryu.ofproto import ether
+from ryu.ofproto import inet
+
+PCAP_DIR = os.path.join(os.path.dirname(__file__), '../../packet_data/pcap')
+
+_SRC = 'f2:0b:a4:01:0a:23'
+_DST = 'f2:0b:a4:01:0a:24'
+
+
+def _ipv4_to_int(addr):
+    return struct.unpack('!I', addrconv.ipv4.text_to_bin(addr))[0]
+
+
+def _expected(data):
+    # the columns decoded by packet.Packet
+    pkt = packet.Packet(data)
+    eth_type = vlan_vid = ip_len = ip_proto = 0
+    ipv4_src = ipv4_dst = src_port = dst_port = 0
+    for p in pkt.protocols:
+        if isinstance(p, ethernet.ethernet):
+            eth_type = p.ethertype
+        elif isinstance(p, (vlan.vlan, vlan.svlan)):
+            vlan_vid = vlan_vid or p.vid | 0x1000
+            eth_type = p.ethertype
+        elif isinstance(p, ipv4.ipv4):
+            ip_len = p.total_length
+            ip_proto = p.proto
+            ipv4_src = _ipv4_to_int(p.src)
+            ipv4_dst = _ipv4_to_int(p.dst)
+        elif isinstance(p, ipv6.ipv6):
+            ip_len = p.payload_length + 40
+            ip_proto = p.nxt
+        elif isinstance(p, (tcp.tcp, udp.udp, sctp.sctp)):
+            src_port = p.src_port
+            dst_port = p.dst_port
+            break
+        else:
+            break
+    return (len(data), eth_type, vlan_vid, ip_len, ip_proto,
+            ipv4_src, ipv4_dst, src_port, dst_port)
+
+
+def _row(b, i):
+    return tuple(getattr(b, name)[i] for name, _ in batch.COLUMNS[1:])
+
+
+def _frames():
+    frames = []
+    for pkt in (
+            ethernet.ethernet(_DST, _SRC, ether.ETH_TYPE_IP) /
+            ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2',
+                      proto=inet.IPPROTO_TCP) /
+            tcp.tcp(1234, 80) / (b'\x01' * 100),
+            ethernet.ethernet(_DST, _SRC, ether.ETH_TYPE_IP) /
+            ipv4.ipv4(src='10.0.0.1', dst='192.168.0.2',
+                      proto=inet.IPPROTO_UDP) /
+            udp.udp(5353, 53),
+            ethernet.ethernet(_DST, _SRC, ether.ETH_TYPE_8021Q) /
+            vlan.vlan(vid=100, ethertype=ether.ETH_TYPE_IP) /
+            ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2',
+                      proto=inet.IPPROTO_UDP) /
+            udp.udp(1, 2),
+            ethernet.ethernet(_DST, _SRC, ether.ETH_TYPE_8021AD) /
+            vlan.svlan(vid=10, ethertype=ether.ETH_TYPE_8021Q) /
+            vlan.vlan(vid=20, ethertype=ether.ETH_TYPE_IPV6) /
+            ipv6.ipv6(src='fe80::1', dst='fe80::2',
+                      nxt=inet.IPPROTO_TCP) /
+            tcp.tcp(1234, 443),
+            ethernet.ethernet(_DST, _SRC, ether.ETH_TYPE_IPV6) /
+            ipv6.ipv6(src='fe80::1', dst='fe80::2',
+                      nxt=inet.IPPROTO_UDP) /
+            udp.udp(546, 547),
+            ethernet.ethernet('ff:ff:ff:ff:ff:ff', _SRC,
+                              ether.ETH_TYPE_ARP) /
+            arp.arp(src_mac=_SRC, src_ip='10.0.0.1', dst_ip='10.0.0.2')):
+        pkt.serialize()
+        frames.append(bytes(pkt.data))
+    return frames
+
+
+class Test_Batch(unittest.TestCase):
+    def test_frames(self):
+        frames = _frames()
+        b = batch.Batch(frames)
+        eq_(len(frames), len(b))
+        for i, data in enumerate(frames):
+            eq_(_expected(data), _row(b, i))
+            eq_(0.0, b.ts[i])
+            eq_(str(packet.Packet(data)), str(b.packet(i)))
+
+    def test_pcap(self):
+        for name in sorted(glob.glob(os.path.join(PCAP_DIR, '*.pcap'))):
+            with open(name, 'rb') as f:
+                ts_frames = list(pcaplib.Reader(f))
+            with open(name, 'rb') as f:
+                b = batch.Batch.from_pcap(pcaplib.Reader(f))
+            eq_(len(ts_frames), len(b))
+            for i, (ts, data) in enumerate(ts_frames):
+                eq_(ts, b.ts[i])
+                eq_(_expected(data), _row(b, i))
+
+    def test_ipv4_options_fragment(self):
+        pkt = (ethernet.ethernet(_DST, _SRC, ether.ETH_TYPE_IP) /
+               ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2', header_length=6,
+                         option=b'\x01' * 4, proto=inet.IPPROTO_TCP) /
+               tcp.tcp(1234, 80))
+        pkt.serialize()
+        data = bytes(pkt.data)
+        # a fragment other than the first one has no ports
+        frag = bytearray(data)
+        frag[20] = 0x20
+        frag[21] = 0x01
+        b = batch.Batch([data, bytes(frag)])
+        eq_(_expected(data), _row(b, 0))
+        eq_((inet.IPPROTO_TCP, 0, 0), (b.ip_proto[1], b.src_port[1],
+                                       b.dst_port[1]))
+
+    def test_truncated(self):
+        data = _frames()[0]
+        b = batch.Batch([data[:0], data[:13], data[:14], data[:30],
+                         data[:34], data[:35]])
+        eq_((0, 0, 0, 0, 0, 0, 0, 0, 0), _row(b, 0))
+        eq_((13, 0, 0, 0, 0, 0, 0, 0, 0), _row(b, 1))
+        eq_((14, 0x0800, 0, 0, 0, 0, 0, 0, 0), _row(b, 2))
+        eq_((30, 0x0800, 0, 0, 0, 0, 0, 0, 0), _row(b, 3))
+        eq_(_expected(data)[1:7], _row(b, 4)[1:7])
+        eq_((0, 0), _row(b, 5)[7:])
+
+    def test_extend(self):
+        frames = _frames()
+        b = batch.Batch(frames[:2])
+        b.extend(frames[2:], ts=[1.0] * (len(frames) - 2),
+                 lengths=range(len(frames) - 2))
+        eq_(len(frames), len(b))
+        for i, data in enumerate(frames):
+            eq_(_expected(data)[1:], _row(b, i)[1:])
+        eq_([0.0, 0.0] + [1.0] * (len(frames) - 2), list(b.ts))
+        eq_([len(frames[0]), len(frames[1])] +
+            list(range(len(frames) - 2)), list(b.length))
+
+    def test_ipv6_max_length(self):
+        pkt = (ethernet.ethernet(_DST, _SRC, ether.ETH_TYPE_IPV6) /
+               ipv6.ipv6(src='fe80::1', dst='fe80::2',
+                         nxt=inet.IPPROTO_UDP) /
+               udp.udp(546, 547) / (b'\x00' * (0xffff - udp.udp._MIN_LEN)))
+        pkt.serialize()
+        data = bytes(pkt.data)
+        b = batch.Batch([data])
+        eq_(_expected(data), _row(b, 0))
+        eq_(0xffff + 40, b.ip_len[0])
+
+    def test_extend_overflow(self):
+        frames = _frames()
+        b = batch.Batch(frames[:2])
+
+        @raises(OverflowError)
+        def _extend():
+            b.extend(frames[2:], lengths=[-1] * (len(frames) - 2))
+
+        _extend()
+        eq_(2, len(b))
+        for name, _ in batch.COLUMNS:
+            eq_(2, len(getattr(b, name)))
+
+    def test_sflow(self):
+        frames = _frames()
+        samples = [sflow.sFlowV5RawPacketHeader(
+            1, len(data) + 4, 4, len(data), tuple(data[i:i + 1]
+                                                  for i in range(len(data))))
+            for data in frames]
+        samples.append(sflow.sFlowV5RawPacketHeader(11, 20, 0, 20,
+                                                    b'\x45' * 20))
+        b = batch.Batch.from_sflow(samples)
+        eq_(len(frames), len(b))
+        for i, data in enumerate(frames):
+            eq_(_expected(data)[1:], _row(b, i)[1:])
+            eq_(len(data) + 4, b.length[i])
@@ -358,6 +358,13 @@ class Test_bgp(unittest.TestCase):
                 results.append(m)
         eq_(str(results), str(msgs))
 
+        # chunks of bytes
+        sp = bgp.StreamParser()
+        results = []
+        for i in range(0, len(binmsgs), 7):
+            results.extend(sp.parse(binmsgs[i:i + 7]))
+        eq_(str(results), str(msgs))
+
     def test_parser(self):
         files = [
             'bgp4-open',
@@ -811,3 +818,155 @@ class Test_bgp(unittest.TestCase):
         msg3, rest = bgp.FlowSpecL2VPNNLRI.parser(binmsg)
         eq_(str(msg), str(msg3))
         eq_(rest, b'')
+
+    def test_parse_prefixes(self):
+        for cls, addrs in (
+                (bgp.IPAddrPrefix, ['0.0.0.0', '192.0.2.13',
+                                    '255.255.255.255']),
+                (bgp.IP6AddrPrefix, ['::', '2001:db8::13',
+                                     'ffff:ffff:ffff:ffff::ffff:ffff'])):
+            bits = len(cls._prefix_to_bin((addrs[0],))) * 8
+            prefixes = [cls(length=length, addr=addr)
+                        for addr in addrs for length in range(bits + 1)]
+            buf = b''.join(bytes(p.serialize()) for p in prefixes)
+            expected = []
+            rest = buf
+            while rest:
+                p, rest = cls.parser(rest)
+                expected.append(p)
+            parsed = cls.parse_prefixes(buf)
+            eq_([str(p) for p in expected], [str(p) for p in parsed])
+            ok_(all(type(p) is cls for p in parsed))
+        eq_([], bgp.BGPNLRI.parse_prefixes(b''))
+
+    def test_parse_prefixes_invalid(self):
+        for cls, buf in (
+                # prefix length longer than the address
+                (bgp.IPAddrPrefix, b'\x21\xc0\x00\x02\x0d\x00'),
+                (bgp.IP6AddrPrefix, b'\x81' + b'\x00' * 17),
+                # truncated prefix
+                (bgp.IPAddrPrefix, b'\x18\xc0\x00'),
+                (bgp.IPAddrPrefix, b'\x08\x0a\x18\xc0\x00')):
+            self.assertRaises(bgp.InvalidNetworkField,
+                              cls.parse_prefixes, buf)
+
+    def test_prefix_serialize(self):
+        prefix = bgp.IPAddrPrefix(length=24, addr='192.0.2.13')
+        eq_(b'\x18\xc0\x00\x02', bytes(prefix.serialize()))
+        # host bits are cleared
+        eq_('192.0.2.0', prefix.addr)
+        eq_(b'\x18\xc0\x00\x02', bytes(prefix.serialize()))
+        prefix.addr = '198.51.100.0'
+        eq_(b'\x18\xc6\x33\x64', bytes(prefix.serialize()))
+        prefix.length = 16
+        eq_(b'\x10\xc6\x33', bytes(prefix.serialize()))
+        eq_('198.51.0.0', prefix.addr)
+
+    def test_parse_attributes(self):
+        path_attributes = [
+            bgp.BGPPathAttributeOrigin(value=1),
+            bgp.BGPPathAttributeAsPath(value=[[1000], set([1001, 1002]),
+                                              [1003, 1004]]),
+            bgp.BGPPathAttributeNextHop(value='192.0.2.199'),
+            bgp.BGPPathAttributeMultiExitDisc(value=2000000000),
+            bgp.BGPPathAttributeLocalPref(value=1000000000),
+            bgp.BGPPathAttributeCommunities(
+                communities=[bgp.BGPPathAttributeCommunities.NO_EXPORT] +
+                list(range(100))),
+            bgp.BGPPathAttributeMpReachNLRI(
+                afi=afi.IP6, safi=safi.UNICAST, next_hop='2001:db8::1',
+                nlri=[bgp.IP6AddrPrefix(64, '2001:db8:%x::' % i)
+                      for i in range(100)]),
+            bgp.BGPPathAttributeMpUnreachNLRI(
+                afi=afi.IP6, safi=safi.UNICAST,
+                withdrawn_routes=[bgp.IP6AddrPrefix(48, '2001:db8::')]),
+            bgp.BGPPathAttributeUnknown(flags=0, type_=100, value=b'x' * 300),
+        ]
+        buf = b''.join(bytes(a.serialize()) for a in path_attributes)
+        expected = []
+        rest = buf
+        while rest:
+            a, rest = bgp._PathAttribute.parser(rest)
+            expected.append(a)
+        parsed = bgp._PathAttribute.parse_attributes(buf)
+        eq_([str(a) for a in expected], [str(a) for a in parsed])
+        eq_([str(a) for a in path_attributes], [str(a) for a in parsed])
+        eq_(buf, b''.join(bytes(a.serialize()) for a in parsed))
+
+    def test_as_path_4byte(self):
+        as_path = bgp.BGPPathAttributeAsPath(
+            value=[[65536, 1], set([4200000000])], as_pack_str='!I')
+        buf = as_path.serialize()
+        eq_(b'\x40\x02\x10\x02\x02\x00\x01\x00\x00\x00\x00\x00\x01'
+            b'\x01\x01\xfa\x56\xea\x00', bytes(buf))
+        (parsed, ) = bgp._PathAttribute.parse_attributes(buf)
+        eq_([[65536, 1], set([4200000000])], parsed.value)
+
+    def test_intern_path_attributes(self):
+        msg = bgp.BGPUpdate(
+            path_attributes=[
+                bgp.BGPPathAttributeOrigin(value=1),
+                bgp.BGPPathAttributeAsPath(value=[[1000, 1001]]),
+                bgp.BGPPathAttributeNextHop(value='192.0.2.199'),
+                bgp.BGPPathAttributeCommunities(communities=[1, 2]),
+                bgp.BGPPathAttributeOriginatorId(value='10.1.1.1')],
+            nlri=[bgp.BGPNLRI(length=24, addr='203.0.113.0')])
+        binmsg = msg.serialize()
+
+        msg1, _, _ = bgp.BGPMessage.parser(binmsg)
+        msg2, _, _ = bgp.BGPMessage.parser(binmsg)
+        ok_(not any(a1 is a2 for a1, a2 in zip(msg1.path_attributes,
+                                               msg2.path_attributes)))
+
+        interned = {}
+        msg1, _, _ = bgp.BGPMessage.parser(binmsg, interned=interned)
+        msg2, _, _ = bgp.BGPMessage.parser(binmsg, interned=interned)
+        eq_([True, True, True, True, False],
+            [a1 is a2 for a1, a2 in zip(msg1.path_attributes,
+                                        msg2.path_attributes)])
+        eq_(str(msg), str(msg1))
+        ok_(msg1.path_attributes is not msg2.path_attributes)
+        ok_(msg1.nlri[0] is not msg2.nlri[0])
+
+    def test_path_attribute_serialize(self):
+        communities = bgp.BGPPathAttributeCommunities(communities=[1, 2])
+        eq_(b'\xc0\x08\x08\x00\x00\x00\x01\x00\x00\x00\x02',
+            bytes(communities.serialize()))
+        # the same values
+        communities2 = bgp.BGPPathAttributeCommunities(communities=[1, 2])
+        eq_(b'\xc0\x08\x08\x00\x00\x00\x01\x00\x00\x00\x02',
+            bytes(communities2.serialize()))
+        eq_(bgp.BGP_ATTR_FLAG_OPTIONAL | bgp.BGP_ATTR_FLAG_TRANSITIVE,
+            communities2.flags)
+        eq_(8, communities2.length)
+        # the same values with the other flags
+        communities3 = bgp.BGPPathAttributeCommunities(
+            communities=[1, 2], flags=bgp.BGP_ATTR_FLAG_EXTENDED_LENGTH)
+        eq_(b'\xd0\x08\x00\x08\x00\x00\x00\x01\x00\x00\x00\x02',
+            bytes(communities3.serialize()))
+        # modified
+        communities.communities.append(3)
+        eq_(b'\xc0\x08\x0c\x00\x00\x00\x01\x00\x00\x00\x02\x00\x00\x00\x03',
+            bytes(communities.serialize()))
+        eq_(12, communities.length)
+
+        as_path = bgp.BGPPathAttributeAsPath(value=[[1000, 1001]])
+        as_set = bgp.BGPPathAttributeAsPath(value=[set([1000, 1001])])
+        eq_(b'\x40\x02\x06\x02\x02\x03\xe8\x03\xe9',
+            bytes(as_path.serialize()))
+        eq_(b'\x40\x02\x06\x01\x02\x03\xe8\x03\xe9',
+            bytes(as_set.serialize()))
+        as_path.value[0].insert(0, 1002)
+        eq_(b'\x40\x02\x08\x02\x03\x03\xea\x03\xe8\x03\xe9',
+            bytes(as_path.serialize()))
+
+    def test_mp_reach_ipv6_next_hop(self):
+        for next_hop, expected in (
+                ('2001:db8::1', '2001:db8::1'),
+                ('192.0.2.1', '::ffff:192.0.2.1')):
+            mp_reach = bgp.BGPPathAttributeMpReachNLRI(
+                afi=afi.IP6, safi=safi.UNICAST, next_hop=next_hop,
+                nlri=[bgp.IP6AddrPrefix(64, '2001:db8::')])
+            (parsed, ) = bgp._PathAttribute.parse_attributes(
+                mp_reach.serialize())
+            eq_(expected, parsed.next_hop)
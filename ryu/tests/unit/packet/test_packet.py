@@ -28,7 +28,7 @@ from ryu.lib.packet import ethernet
 from ryu.lib.packet import icmp, icmpv6
 from ryu.lib.packet import ipv4, ipv6
 from ryu.lib.packet import llc
-from ryu.lib.packet import packet, packet_utils
+from ryu.lib.packet import packet, packet_base, packet_utils
 from ryu.lib.packet import sctp
 from ryu.lib.packet import tcp, udp
 from ryu.lib.packet import vlan
@@ -1551,3 +1551,96 @@ class TestPacket(unittest.TestCase):
         ok_(isinstance(pkt.protocols[0], ethernet.ethernet))
         ok_(isinstance(pkt.protocols[1], ipv4.ipv4))
         ok_(isinstance(pkt.protocols[2], udp.udp))
+
+    def _ipv4_tcp_data(self):
+        e = ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP)
+        i = ipv4.ipv4(proto=inet.IPPROTO_TCP, src=self.src_ip,
+                      dst=self.dst_ip)
+        t = tcp.tcp(self.src_port, self.dst_port)
+        p = e / i / t / self.payload
+        p.serialize()
+        return p.data
+
+    def test_max_layer(self):
+        data = self._ipv4_tcp_data()
+        pkt = packet.Packet(data, max_layer=2)
+        eq_(3, len(pkt))
+        ok_(isinstance(pkt.protocols[1], ipv4.ipv4))
+        # the rest is the payload
+        eq_(data[34:], pkt.protocols[2])
+        eq_(None, pkt.get_protocol(tcp.tcp))
+
+    def test_lazy(self):
+        data = self._ipv4_tcp_data()
+        pkt = packet.Packet(data, lazy=True)
+        p_ipv4 = pkt.get_protocol(ipv4.ipv4)
+        eq_(self.dst_ip, p_ipv4.dst)
+        # decoded until ipv4
+        eq_(2, len(pkt._protocols))
+        eq_(None, pkt.get_protocol(arp.arp))
+        eq_(str(packet.Packet(data)), str(pkt))
+        eq_(packet.Packet(data).to_jsondict(), pkt.to_jsondict())
+
+    def test_lazy_protocols(self):
+        pkt = packet.Packet(self._ipv4_tcp_data(), lazy=True)
+        eq_([ethernet.ethernet, ipv4.ipv4, tcp.tcp],
+            [p.__class__ for p in pkt.protocols[:3]])
+        eq_(self.payload, pkt[3])
+
+    def test_padding(self):
+        e = ethernet.ethernet(self.dst_mac, self.src_mac,
+                              ether.ETH_TYPE_ARP)
+        a = arp.arp(1, ether.ETH_TYPE_IP, 6, 4, 2,
+                    self.src_mac, self.src_ip, self.dst_mac,
+                    self.dst_ip)
+        p = e / a
+        p.serialize()
+        # the padding up to 60 bytes is ignored
+        eq_(2, len(packet.Packet(p.data)))
+        eq_(2, len(packet.Packet(p.data, lazy=True)))
+
+    def test_protocol_index(self):
+        pkt = packet.Packet(self._ipv4_tcp_data())
+        p_tcp = pkt.get_protocol(tcp.tcp)
+        ok_(pkt.get_protocol(packet_base.PacketBase) is pkt[0])
+        eq_(None, pkt.get_protocol(udp.udp))
+
+        # replaced and deleted
+        u = udp.udp(self.src_port, self.dst_port)
+        pkt[2] = u
+        eq_(None, pkt.get_protocol(tcp.tcp))
+        ok_(pkt.get_protocol(udp.udp) is u)
+        del pkt[1]
+        eq_(None, pkt.get_protocol(ipv4.ipv4))
+        ok_(udp.udp in pkt)
+
+        # added
+        pkt.add_protocol(p_tcp)
+        ok_(pkt.get_protocol(tcp.tcp) is p_tcp)
+        # appended to the list directly
+        i = ipv4.ipv4()
+        pkt.protocols.append(i)
+        ok_(pkt.get_protocol(ipv4.ipv4) is i)
+        eq_([i], pkt.get_protocols(ipv4.ipv4))
+        # replaced in the list directly
+        e = ethernet.ethernet()
+        pkt.protocols[0] = e
+        ok_(pkt.get_protocol(ethernet.ethernet) is e)
+        pkt.protocols[0] = u
+        eq_(None, pkt.get_protocol(ethernet.ethernet))
+        ok_(pkt.get_protocol(udp.udp) is u)
+        eq_(2, len(pkt.get_protocols(udp.udp)))
+
+    def test_protocol_index_subclass(self):
+        class _ipv4(ipv4.ipv4):
+            pass
+
+        e = ethernet.ethernet(self.dst_mac, self.src_mac, ether.ETH_TYPE_IP)
+        i = _ipv4()
+        pkt = e / i / ipv4.ipv4()
+        ok_(pkt.get_protocol(ipv4.ipv4) is i)
+        ok_(pkt.get_protocol(_ipv4) is i)
+        eq_(2, len(pkt.get_protocols(ipv4.ipv4)))
+        ok_(ipv4.ipv4 in pkt)
+        ok_(_ipv4 in pkt)
+        ok_(_ipv4 not in e / ipv4.ipv4())
@@ -0,0 +1,87 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import array
+import random
+import socket
+import struct
+import unittest
+
+import six
+from nose.tools import eq_
+
+from ryu.lib.packet import ipv4
+from ryu.lib.packet import packet_utils
+
+
+def _checksum(data):
+    # the implementation summing an array of the words
+    data = six.binary_type(data)
+    if len(data) % 2:
+        data += b'\x00'
+    s = sum(array.array('H', data))
+    s = (s & 0xffff) + (s >> 16)
+    s += (s >> 16)
+    return socket.ntohs(~s & 0xffff)
+
+
+class Test_checksum(unittest.TestCase):
+    def setUp(self):
+        self.random = random.Random(0)
+
+    def _data(self, length):
+        return bytearray(self.random.choice([0, 0xff,
+                                             self.random.getrandbits(8)])
+                         for _i in range(length))
+
+    def test_checksum(self):
+        for data in (b'', b'\x00', b'\x00\x00', b'\xff', b'\xff\xff',
+                     b'\xff\xff' * 3, b'\xff\xfe\x00\x01'):
+            eq_(_checksum(data), packet_utils.checksum(data))
+        for length in range(200):
+            data = self._data(length)
+            eq_(_checksum(data), packet_utils.checksum(data))
+            eq_(_checksum(data), packet_utils.checksum(bytes(data)))
+
+    def test_checksum_ip(self):
+        ip = ipv4.ipv4(src='10.0.0.1', dst='10.0.0.2', proto=17)
+        for length in (0, 1, 8, 9, 1500):
+            payload = bytes(self._data(length))
+            header = struct.pack('!4s4sxBH', b'\x0a\x00\x00\x01',
+                                 b'\x0a\x00\x00\x02', 17, length)
+            eq_(_checksum(header + payload),
+                packet_utils.checksum_ip(ip, length, payload))
+
+    def test_checksum_update(self):
+        for _i in range(200):
+            data = self._data(20)
+            data[0] = 0x45
+            csum = packet_utils.checksum(data)
+            offset = self.random.choice([2, 8, 12, 16])
+            length = min(self.random.choice([2, 4]), 20 - offset)
+            old = bytes(data[offset:offset + length])
+            new = bytes(self._data(length))
+            data[offset:offset + length] = new
+            eq_(packet_utils.checksum(data),
+                packet_utils.checksum_update(csum, old, new))
+
+    def test_checksum_update_word(self):
+        # TTL and protocol of an IPv4 header
+        data = bytearray(b'\x45\x00\x00\x54\x00\x00\x40\x00\x40\x01'
+                         b'\x00\x00\x0a\x00\x00\x01\x0a\x00\x00\x02')
+        csum = packet_utils.checksum(data)
+        data[8] -= 1
+        eq_(packet_utils.checksum(data),
+            packet_utils.checksum_update(csum, 0x4001, 0x3f01))
@@ -0,0 +1,142 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import socket
+import struct
+import unittest
+
+from nose.tools import eq_
+from nose.tools import raises
+
+from ryu.lib.packet import stream_parser
+
+
+def _msg(i):
+    # uint16_t length, uint16_t sequence number, body
+    body = b'\x01' * (i % 50) * 7
+    return struct.pack('!HH', 4 + len(body), i) + body
+
+
+class Test_Framer(unittest.TestCase):
+    def _framer(self, size=64):
+        return stream_parser.Framer(
+            4, stream_parser.length_field('!H'), size=size)
+
+    def _frames(self, framer):
+        return [frame.tobytes() for frame in framer.frames()]
+
+    def test_feed(self):
+        msgs = [_msg(i) for i in range(100)]
+        data = b''.join(msgs)
+        for chunk_len in (1, 3, 64, 1000, len(data)):
+            framer = self._framer()
+            frames = []
+            for i in range(0, len(data), chunk_len):
+                framer.feed(data[i:i + chunk_len])
+                frames.extend(self._frames(framer))
+            eq_(msgs, frames)
+            eq_(0, len(framer))
+
+    def test_partial(self):
+        framer = self._framer()
+        msg = _msg(10)
+        framer.feed(msg + msg[:3])
+        eq_([msg], self._frames(framer))
+        eq_(3, len(framer))
+        eq_([], self._frames(framer))
+        framer.feed(msg[3:])
+        eq_([msg], self._frames(framer))
+
+    def test_frames_view(self):
+        framer = self._framer()
+        msgs = [_msg(1), _msg(2)]
+        framer.feed(b''.join(msgs))
+        # the generator consumes a message only when it is yielded
+        frames = framer.frames()
+        eq_(msgs[0], next(frames).tobytes())
+        eq_(len(msgs[1]), len(framer))
+        eq_(msgs[1], next(frames).tobytes())
+        eq_(0, len(framer))
+
+    def test_recv_into(self):
+        msgs = [_msg(i) for i in range(1000)]
+        rsock, wsock = socket.socketpair()
+        try:
+            wsock.sendall(b''.join(msgs))
+            wsock.close()
+            framer = self._framer()
+            frames = []
+            while framer.recv_into(rsock):
+                frames.extend(self._frames(framer))
+            eq_(msgs, frames)
+        finally:
+            rsock.close()
+
+    def test_invalid_length(self):
+        framer = self._framer()
+        framer.feed(struct.pack('!HH', 3, 0))
+        self.assertRaises(ValueError, self._frames, framer)
+
+    def test_no_length(self):
+        framer = stream_parser.Framer()
+        eq_([], self._frames(framer))
+        framer.feed(b'foo')
+        framer.feed(b'bar')
+        eq_([b'foobar'], self._frames(framer))
+        eq_([], self._frames(framer))
+
+
+class _StreamParser(stream_parser.StreamParser):
+    HEADER_LEN = 4
+
+    def get_length(self, buf, offset):
+        return struct.unpack_from('!H', buf, offset)[0]
+
+    def try_parse(self, data):
+        return struct.unpack_from('!H', data, 2)[0], data[len(data):]
+
+
+class Test_StreamParser(unittest.TestCase):
+    def test_parse(self):
+        data = b''.join(_msg(i) for i in range(10))
+        sp = _StreamParser()
+        eq_(list(range(10)), sp.parse(data))
+        # an item of bytes
+        results = []
+        for b in data:
+            results.extend(sp.parse(b))
+        eq_(list(range(10)), results)
+
+    def test_parse_without_framing(self):
+        class _Parser(stream_parser.StreamParser):
+            def try_parse(self, q):
+                if len(q) < 4:
+                    raise self.TooSmallException()
+                return bytes(q[:4]), q[4:]
+
+        sp = _Parser()
+        eq_([], sp.parse(b'foo'))
+        eq_([b'foob', b'arba'], sp.parse(b'barbaz'))
+        eq_([b'z' + b'qux'], sp.parse(b'qux'))
+
+    @raises(TypeError)
+    def test_header_len_without_get_length(self):
+        class _Parser(stream_parser.StreamParser):
+            HEADER_LEN = 4
+
+            def try_parse(self, q):
+                pass
+
+        _Parser()
@@ -25,9 +25,12 @@ from nose.tools import ok_, eq_, raises
 
 from ryu.lib.packet.bgp import BGPPathAttributeOrigin
 from ryu.lib.packet.bgp import BGPPathAttributeAsPath
+from ryu.lib.packet.bgp import BGPPathAttributeMultiExitDisc
+from ryu.lib.packet.bgp import BGPPathAttributeNextHop
 from ryu.lib.packet.bgp import BGP_ATTR_ORIGIN_IGP
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_ORIGIN
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_AS_PATH
+from ryu.lib.packet.bgp import BGP_ATTR_TYPE_MULTI_EXIT_DISC
 from ryu.lib.packet.bgp import BGP_ATTR_TYPE_EXTENDED_COMMUNITIES
 from ryu.lib.packet.bgp import IPAddrPrefix
 from ryu.lib.packet.bgp import IP6AddrPrefix
@@ -441,6 +444,57 @@ class Test_TableCoreManager(unittest.TestCase):
             expected_next_hop='::',
         )
 
+    @mock.patch(
+        'ryu.services.protocols.bgp.core_managers.TableCoreManager.__init__',
+        mock.MagicMock(return_value=None))
+    @mock.patch(
+        'ryu.services.protocols.bgp.core_managers.TableCoreManager.learn_path')
+    def test_load_global_table(self, learn_path_mock):
+        # Prepare test data
+        origin = BGPPathAttributeOrigin(BGP_ATTR_ORIGIN_IGP)
+        aspath = BGPPathAttributeAsPath([[65001, 65002]])
+        med = BGPPathAttributeMultiExitDisc(100)
+        nexthop = BGPPathAttributeNextHop('10.0.0.1')
+        routes = [
+            (IPAddrPrefix(24, '192.168.0.0'), [med, nexthop, aspath, origin],
+             '10.0.0.1'),
+            (IPAddrPrefix(16, '172.16.0.0'), [], None),
+            (IP6AddrPrefix(64, 'fe80::'), [origin], None),
+        ]
+
+        # Instantiate TableCoreManager
+        tbl_mng = table_manager.TableCoreManager(None, None)
+
+        # Test
+        eq_(3, tbl_mng.load_global_table(routes))
+
+        # Check
+        call_args_list = learn_path_mock.call_args_list
+        eq_(3, len(call_args_list))
+        paths = [args[0] for args, _ in call_args_list]
+        for path, (nlri, _, _) in zip(paths, routes):
+            eq_(None, path.source)
+            ok_(path.nlri is nlri)
+            ok_(not path.is_withdraw)
+            # ORIGIN and AS_PATH come first
+            eq_([BGP_ATTR_TYPE_ORIGIN, BGP_ATTR_TYPE_AS_PATH],
+                list(path.pathattr_map)[:2])
+        eq_([BGP_ATTR_TYPE_ORIGIN, BGP_ATTR_TYPE_AS_PATH,
+             BGP_ATTR_TYPE_MULTI_EXIT_DISC], list(paths[0].pathattr_map))
+        ok_(paths[0].get_pattr(BGP_ATTR_TYPE_AS_PATH) is aspath)
+        eq_(BGP_ATTR_ORIGIN_IGP,
+            paths[1].get_pattr(BGP_ATTR_TYPE_ORIGIN).value)
+        eq_([[]], paths[1].get_pattr(BGP_ATTR_TYPE_AS_PATH).path_seg_list)
+        eq_(['10.0.0.1', '0.0.0.0', '::'], [p.nexthop for p in paths])
+
+    @raises(ValueError)
+    @mock.patch(
+        'ryu.services.protocols.bgp.core_managers.TableCoreManager.__init__',
+        mock.MagicMock(return_value=None))
+    def test_load_global_table_invalid_nlri(self):
+        tbl_mng = table_manager.TableCoreManager(None, None)
+        tbl_mng.load_global_table([('192.168.0.0/24', [], None)])
+
     @mock.patch(
         'ryu.services.protocols.bgp.core_managers.TableCoreManager.__init__',
         mock.MagicMock(return_value=None))
@@ -20,6 +20,7 @@ try:
 except ImportError:
     from unittest import mock  # Python 3
 
+from nose.tools import eq_
 from nose.tools import raises
 
 from ryu.services.protocols.bgp import bgpspeaker
@@ -1086,3 +1087,19 @@ class Test_BGPSpeaker(unittest.TestCase):
         # Check
         mock_call.assert_called_with(
             'flowspec.del_local', **expected_kwargs)
+
+    @mock.patch(
+        'ryu.services.protocols.bgp.bgpspeaker.BGPSpeaker.__init__',
+        mock.MagicMock(return_value=None))
+    @mock.patch('ryu.services.protocols.bgp.bgpspeaker.call')
+    def test_rib_load(self, mock_call):
+        # Prepare test data
+        routes = [(mock.MagicMock(), [], None)]
+        mock_call.return_value = 1
+
+        # Test
+        speaker = bgpspeaker.BGPSpeaker(65000, '10.0.0.1')
+        eq_(1, speaker.rib_load(routes))
+
+        # Check
+        mock_call.assert_called_with('network.load', routes=routes)
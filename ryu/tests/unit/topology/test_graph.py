@@ -0,0 +1,131 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import unittest
+
+from nose.tools import eq_, ok_
+
+from ryu.topology import graph
+from ryu.topology.switches import Link
+
+
+class _Port(object):
+    def __init__(self, dpid, port_no):
+        self.dpid = dpid
+        self.port_no = port_no
+
+    def __eq__(self, other):
+        return self.dpid == other.dpid and self.port_no == other.port_no
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash((self.dpid, self.port_no))
+
+
+def _link(src_dpid, src_port_no, dst_dpid, dst_port_no):
+    return Link(_Port(src_dpid, src_port_no), _Port(dst_dpid, dst_port_no))
+
+
+class TestTopologyGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = graph.TopologyGraph()
+        self.graph.add_switch(1)
+        self.graph.add_switch(2)
+        self.graph.add_switch(3)
+        self.l12 = _link(1, 1, 2, 1)
+        self.l21 = _link(2, 1, 1, 1)
+        self.l23 = _link(2, 2, 3, 1)
+        for link in (self.l12, self.l21, self.l23):
+            self.graph.add_link(link)
+
+    def test_query(self):
+        eq_(len(self.graph), 3)
+        ok_(self.l12 in self.graph)
+        eq_(sorted(self.graph.switches()), [1, 2, 3])
+        eq_(sorted(self.graph.neighbors(2)), [1, 3])
+        eq_(self.graph.neighbors(3), [])
+        eq_(self.graph.port_map(2), {1: 1, 3: 2})
+        eq_(self.graph.links(1), [self.l12])
+        eq_(self.graph.get_link(2, 2), self.l23)
+        eq_(self.graph.get_peer(2, 2), _Port(3, 1))
+        eq_(self.graph.get_peer(2, 3), None)
+
+    def test_del_link(self):
+        self.graph.del_link(self.l23)
+        ok_(self.l23 not in self.graph)
+        eq_(self.graph.neighbors(2), [1])
+        eq_(self.graph.get_link(2, 2), None)
+
+        # deleting an unknown link is a no-op
+        version = self.graph.version
+        self.graph.del_link(self.l23)
+        eq_(self.graph.version, version)
+
+    def test_replace_link(self):
+        # the peer of port 1 on dpid 1 has changed
+        l13 = _link(1, 1, 3, 2)
+        self.graph.add_link(l13)
+        ok_(self.l12 not in self.graph)
+        eq_(self.graph.neighbors(1), [3])
+
+    def test_parallel_links(self):
+        l12_2 = _link(1, 2, 2, 2)
+        self.graph.add_link(l12_2)
+        self.graph.del_link(self.l12)
+        eq_(self.graph.neighbors(1), [2])
+        eq_(self.graph.port_map(1), {2: 2})
+
+    def test_is_link_port(self):
+        ok_(self.graph.is_link_port(2, 2))
+        # the destination of a link whose reverse is not discovered yet
+        ok_(self.graph.is_link_port(3, 1))
+        ok_(not self.graph.is_link_port(3, 2))
+        self.graph.del_link(self.l23)
+        ok_(not self.graph.is_link_port(2, 2))
+        ok_(not self.graph.is_link_port(3, 1))
+
+    def test_del_switch(self):
+        self.graph.del_switch(2)
+        eq_(sorted(self.graph.switches()), [1, 3])
+        eq_(len(self.graph), 0)
+
+    def test_link_attrs(self):
+        self.graph.set_link_attrs(self.l12, delay=0.5)
+        eq_(self.graph.link_attrs(self.l12), {'delay': 0.5})
+        self.assertRaises(KeyError, self.graph.set_link_attrs,
+                          _link(3, 1, 2, 2), delay=1)
+
+    def test_changes_since(self):
+        version = self.graph.version
+        eq_(self.graph.changes_since(version), [])
+
+        self.graph.del_link(self.l23)
+        self.graph.set_link_attrs(self.l12, delay=0.5)
+        changes = self.graph.changes_since(version)
+        eq_([(op, obj) for _, op, obj in changes],
+            [(graph.LINK_DELETE, self.l23), (graph.LINK_MODIFY, self.l12)])
+        eq_(changes[-1][0], self.graph.version)
+
+        eq_(len(self.graph.changes_since(0)), self.graph.version)
+
+    def test_changes_since_overflow(self):
+        g = graph.TopologyGraph(changelog_size=2)
+        for dpid in range(4):
+            g.add_switch(dpid)
+        eq_(g.changes_since(0), None)
+        eq_(g.changes_since(1), None)
+        eq_([obj for _, _, obj in g.changes_since(2)], [2, 3])
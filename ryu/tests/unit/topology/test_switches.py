@@ -0,0 +1,203 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import struct
+import unittest
+
+from nose.tools import eq_, ok_
+
+from ryu.lib.packet import arp
+from ryu.lib.packet import ethernet
+from ryu.lib.packet import lldp
+from ryu.ofproto import ether
+from ryu.topology import switches
+
+LLDPPacket = switches.LLDPPacket
+
+
+class _Port(object):
+    def __init__(self, port_no, down=False):
+        self.port_no = port_no
+        self.down = down
+
+    def is_down(self):
+        return self.down
+
+
+class TestPortDataState(unittest.TestCase):
+    def setUp(self):
+        self.ports = switches.PortDataState(min_period=1, max_period=8,
+                                            max_drop=2)
+        self.p1 = _Port(1)
+        self.p2 = _Port(2)
+        self.ports.add_port(self.p1, b'lldp1')
+        self.ports.add_port(self.p2, b'lldp2')
+
+    def _send(self, port):
+        port_data = self.ports.lldp_sent(port)
+        return port_data.entry[0] - port_data.timestamp
+
+    def test_pop_expired(self):
+        eq_(self.ports.next_deadline(), 0)
+        eq_(sorted(p.port_no for p in self.ports.pop_expired(0, 10)), [1, 2])
+        eq_(self.ports.next_deadline(), None)
+
+        self.ports.lldp_sent(self.p1)
+        deadline = self.ports.next_deadline()
+        eq_(self.ports.pop_expired(deadline - 0.5, 10), [])
+        eq_(self.ports.pop_expired(deadline, 10), [self.p1])
+
+    def test_pop_expired_limit(self):
+        eq_(len(self.ports.pop_expired(0, 1)), 1)
+        eq_(len(self.ports.pop_expired(0, 1)), 1)
+        eq_(self.ports.pop_expired(0, 1), [])
+
+    def test_back_off(self):
+        # a stable link backs off up to max_period
+        periods = []
+        for _ in range(6):
+            periods.append(self._send(self.p1))
+            self.ports.lldp_received(self.p1)
+        eq_(periods, [1, 2, 4, 8, 8, 8])
+
+        # a lost LLDP does not change the period, the second one does
+        eq_(self._send(self.p1), 8)
+        eq_(self._send(self.p1), 1)
+        eq_(self._send(self.p1), 1)
+
+        # no link: back off again after max_drop lost LLDPs
+        eq_(self._send(self.p1), 2)
+
+    def test_move_front(self):
+        for _ in range(3):
+            self._send(self.p1)
+            self.ports.lldp_received(self.p1)
+        self.ports.pop_expired(0, 10)
+
+        self.ports.move_front(self.p1)
+        eq_(self.ports.next_deadline(), 0)
+        eq_(self.ports.pop_expired(0, 10), [self.p1])
+        eq_(self._send(self.p1), 1)
+
+    def test_down_port(self):
+        self.ports.pop_expired(0, 10)
+        self.p1.down = True
+        ok_(self.ports.set_down(self.p1))
+        self.ports.lldp_sent(self.p1)
+        # down ports are not probed until they come up
+        eq_(self.ports.next_deadline(), None)
+
+        self.p1.down = False
+        ok_(not self.ports.set_down(self.p1))
+        eq_(self.ports.pop_expired(0, 10), [self.p1])
+
+    def test_add_port_up(self):
+        # a known port re-added up after it went down is probed again
+        self.ports.pop_expired(0, 10)
+        self.p1.down = True
+        self.ports.add_port(self.p1, b'lldp1')
+        self.ports.lldp_sent(self.p1)
+        eq_(self.ports.next_deadline(), None)
+
+        self.p1.down = False
+        self.ports.add_port(self.p1, b'lldp1')
+        eq_(self.ports.pop_expired(0, 10), [self.p1])
+        eq_(self._send(self.p1), 1)
+
+    def test_del_port(self):
+        self.ports.del_port(self.p1)
+        eq_(self.ports.pop_expired(0, 10), [self.p2])
+
+
+class TestLLDPPacket(unittest.TestCase):
+    _VALUES = [(0, 0, '00:00:00:00:00:00', 0),
+               (1, 2, 'f2:0b:a4:01:0a:23', 120),
+               (0xfedcba9876543210, 0xfffffffe, 'ff:ff:ff:ff:ff:ff', 0xffff)]
+
+    def test_lldp_packet(self):
+        for dpid, port_no, dl_addr, ttl in self._VALUES:
+            data = LLDPPacket.lldp_packet(dpid, port_no, dl_addr, ttl)
+            eq_(LLDPPacket._lldp_packet(dpid, port_no, dl_addr, ttl), data)
+            eq_(switches.Switches.LLDP_PACKET_LEN, len(data))
+
+    def test_lldp_packet_template(self):
+        # the template is not changed by the frames made of it
+        data = LLDPPacket.lldp_packet(1, 2, 'f2:0b:a4:01:0a:23', 120)
+        data[20] = 0
+        eq_(LLDPPacket._lldp_packet(3, 4, 'f2:0b:a4:01:0a:24', 5),
+            LLDPPacket.lldp_packet(3, 4, 'f2:0b:a4:01:0a:24', 5))
+
+    def test_lldp_parse(self):
+        for dpid, port_no, dl_addr, ttl in self._VALUES:
+            data = LLDPPacket.lldp_packet(dpid, port_no, dl_addr, ttl)
+            for buf in (data, bytes(data), memoryview(bytes(data)),
+                        bytes(data[:51])):
+                eq_((dpid, port_no), LLDPPacket.lldp_parse(buf))
+            eq_((dpid, port_no), LLDPPacket._lldp_parse(bytes(data)))
+
+    def _lldp(self, chassis_id, port_id, tlvs=()):
+        pkt = (ethernet.ethernet(lldp.LLDP_MAC_NEAREST_BRIDGE,
+                                 'f2:0b:a4:01:0a:23', ether.ETH_TYPE_LLDP) /
+               lldp.lldp((chassis_id, port_id, lldp.TTL(ttl=120)) +
+                         tuple(tlvs) + (lldp.End(), )))
+        pkt.serialize()
+        return bytes(pkt.data)
+
+    def _chassis_id(self, chassis_id,
+                    subtype=lldp.ChassisID.SUB_LOCALLY_ASSIGNED):
+        return lldp.ChassisID(subtype=subtype, chassis_id=chassis_id)
+
+    def _port_id(self, port_no, subtype=lldp.PortID.SUB_PORT_COMPONENT):
+        return lldp.PortID(subtype=subtype, port_id=struct.pack('!I', port_no))
+
+    def test_lldp_parse_fallback(self):
+        # other TLVs and chassis ids of other lengths are parsed by
+        # packet.Packet
+        data = self._lldp(self._chassis_id(b'dpid:0000000000000001'),
+                          self._port_id(2),
+                          [lldp.SystemName(system_name=b'switch')])
+        eq_((1, 2), LLDPPacket.lldp_parse(data))
+
+        self.assertRaises(AssertionError, LLDPPacket.lldp_parse,
+                          self._lldp(self._chassis_id(b'dpid:1'),
+                                     self._port_id(2)))
+        chassis_id = self._chassis_id(b'dpid:000000000000000g')
+        self.assertRaises(ValueError, LLDPPacket.lldp_parse,
+                          self._lldp(chassis_id, self._port_id(2)))
+
+    def test_lldp_parse_unknown(self):
+        mac_chassis_id = self._lldp(
+            self._chassis_id(b'dpid:0000000000000001',
+                             lldp.ChassisID.SUB_MAC_ADDRESS),
+            self._port_id(2))
+        name_port_id = self._lldp(
+            self._chassis_id(b'dpid:0000000000000001'),
+            self._port_id(2, lldp.PortID.SUB_INTERFACE_NAME))
+        pkt = (ethernet.ethernet('ff:ff:ff:ff:ff:ff', 'f2:0b:a4:01:0a:23',
+                                 ether.ETH_TYPE_ARP) /
+               arp.arp(src_mac='f2:0b:a4:01:0a:23', src_ip='10.0.0.1',
+                       dst_ip='10.0.0.2'))
+        pkt.serialize()
+        lldp_data = bytes(LLDPPacket.lldp_packet(1, 2, 'f2:0b:a4:01:0a:23',
+                                                 120))
+        tagged = (lldp_data[:12] + b'\x81\x00\x00\x64' + lldp_data[12:])
+        # a truncated end TLV
+        truncated = lldp_data[:50]
+        for buf in (mac_chassis_id, name_port_id, bytes(pkt.data), tagged,
+                    truncated):
+            self.assertRaises(LLDPPacket.LLDPUnknownFormat,
+                              LLDPPacket.lldp_parse, buf)
+            self.assertRaises(LLDPPacket.LLDPUnknownFormat,
+                              LLDPPacket._lldp_parse, buf)
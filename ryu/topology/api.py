@@ -44,4 +44,15 @@ def get_all_host(app):
     return get_host(app)
 
 
+def get_topology_graph(app):
+    """Return the TopologyGraph maintained by Switches.
+
+    Unlike get_link(), no request is sent and nothing is copied; the
+    returned object is shared with Switches and kept up to date by it.
+    See ryu.topology.graph for how to follow its changes.
+    """
+    switches = app_manager.lookup_service_brick('switches')
+    return switches.graph
+
+
 app_manager.require_app('ryu.topology.switches', api_style=True)
@@ -171,9 +171,9 @@ class EventHostAdd(EventHostBase):
         super(EventHostAdd, self).__init__(host)
 
 
-# Note: Currently, EventHostDelete will never be raised, because we have no
-# appropriate way to detect the disconnection of hosts. Just defined for
-# future use.
+# Note: EventHostDelete is raised only when a host turns out to be learned
+# on a switch-to-switch port, because we have no appropriate way to detect
+# the disconnection of hosts.
 class EventHostDelete(EventHostBase):
     def __init__(self, host):
         super(EventHostDelete, self).__init__(host)
@@ -0,0 +1,209 @@
+# Copyright (C) 2013 Nippon Telegraph and Telephone Corporation.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Versioned topology graph shared between Switches and applications.
+
+Switches updates the graph in place as switches and links come and go.
+Applications get a reference to the very same object (see
+ryu.topology.api.get_topology_graph) and query it directly instead of
+sending EventLinkRequest and copying all links each time.
+
+Every mutation increments ``version`` and is appended to a bounded
+change log, so that an application can keep its own derived state in
+sync by applying only the changes since the last version it has seen::
+
+    changes = graph.changes_since(my_version)
+    if changes is None:
+        # too far behind, rebuild from graph.links()
+        ...
+    for version, op, obj in changes:
+        ...
+    my_version = graph.version
+
+The topology must be treated as read-only by applications.  They may
+annotate the links with attributes by set_link_attrs(), e.g. the
+measured delay of a link as ``delay``, which is recorded in the change
+log as LINK_MODIFY like the other changes.
+"""
+
+import collections
+
+# operations recorded in the change log
+SWITCH_ADD = 'switch_add'
+SWITCH_DELETE = 'switch_delete'
+LINK_ADD = 'link_add'
+LINK_DELETE = 'link_delete'
+LINK_MODIFY = 'link_modify'
+
+
+class TopologyGraph(object):
+    DEFAULT_CHANGELOG_SIZE = 4096
+
+    def __init__(self, changelog_size=DEFAULT_CHANGELOG_SIZE):
+        super(TopologyGraph, self).__init__()
+        self.version = 0
+        self._switches = set()
+        # src dpid -> {src port_no -> Link}
+        self._ports = {}
+        # src dpid -> {dst dpid -> number of links}
+        self._adj = {}
+        # (dst dpid, dst port_no) -> number of links
+        self._dst_ports = {}
+        # Link -> dict of link attributes
+        self._attrs = {}
+        # (version, op, obj); versions are contiguous
+        self._changelog = collections.deque(maxlen=changelog_size)
+
+    def _changed(self, op, obj):
+        self.version += 1
+        self._changelog.append((self.version, op, obj))
+
+    # --- updates: only Switches should call these ---
+
+    def add_switch(self, dpid):
+        if dpid in self._switches:
+            return
+        self._switches.add(dpid)
+        self._changed(SWITCH_ADD, dpid)
+
+    def del_switch(self, dpid):
+        if dpid not in self._switches:
+            return
+        for link in list(self._ports.get(dpid, {}).values()):
+            self.del_link(link)
+        for link in [l for l in self._attrs if l.dst.dpid == dpid]:
+            self.del_link(link)
+        self._switches.discard(dpid)
+        self._changed(SWITCH_DELETE, dpid)
+
+    def add_link(self, link, **attrs):
+        src = link.src
+        ports = self._ports.setdefault(src.dpid, {})
+        old_link = ports.get(src.port_no, None)
+        if old_link is not None:
+            if old_link == link:
+                return
+            self.del_link(old_link)
+
+        ports[src.port_no] = link
+        adj = self._adj.setdefault(src.dpid, {})
+        adj[link.dst.dpid] = adj.get(link.dst.dpid, 0) + 1
+        dst = (link.dst.dpid, link.dst.port_no)
+        self._dst_ports[dst] = self._dst_ports.get(dst, 0) + 1
+        self._attrs[link] = attrs
+        self._changed(LINK_ADD, link)
+
+    def del_link(self, link):
+        if link not in self._attrs:
+            return
+        src = link.src
+        ports = self._ports[src.dpid]
+        del ports[src.port_no]
+        if not ports:
+            del self._ports[src.dpid]
+
+        adj = self._adj[src.dpid]
+        count = adj[link.dst.dpid] - 1
+        if count:
+            adj[link.dst.dpid] = count
+        else:
+            del adj[link.dst.dpid]
+            if not adj:
+                del self._adj[src.dpid]
+
+        dst = (link.dst.dpid, link.dst.port_no)
+        count = self._dst_ports[dst] - 1
+        if count:
+            self._dst_ports[dst] = count
+        else:
+            del self._dst_ports[dst]
+
+        del self._attrs[link]
+        self._changed(LINK_DELETE, link)
+
+    # --- updates: also by applications ---
+
+    def set_link_attrs(self, link, **attrs):
+        link_attrs = self._attrs.get(link, None)
+        if link_attrs is None:
+            raise KeyError(link)
+        link_attrs.update(attrs)
+        self._changed(LINK_MODIFY, link)
+
+    # --- queries ---
+
+    def __contains__(self, link):
+        return link in self._attrs
+
+    def __len__(self):
+        return len(self._attrs)
+
+    def switches(self):
+        return list(self._switches)
+
+    def has_switch(self, dpid):
+        return dpid in self._switches
+
+    def links(self, dpid=None):
+        """Return the list of links, or the links leaving dpid."""
+        if dpid is None:
+            return list(self._attrs)
+        return list(self._ports.get(dpid, {}).values())
+
+    def get_link(self, dpid, port_no):
+        """Return the link leaving the given port, or None."""
+        return self._ports.get(dpid, {}).get(port_no, None)
+
+    def is_link_port(self, dpid, port_no):
+        """Return True if a link leaves or arrives at the given port."""
+        return (port_no in self._ports.get(dpid, {}) or
+                (dpid, port_no) in self._dst_ports)
+
+    def get_peer(self, dpid, port_no):
+        """Return the Port at the other end of the given port, or None."""
+        link = self.get_link(dpid, port_no)
+        if link is None:
+            return None
+        return link.dst
+
+    def neighbors(self, dpid):
+        """Return the list of dpids which dpid has a link to."""
+        return list(self._adj.get(dpid, {}))
+
+    def port_map(self, dpid):
+        """Return {dst dpid: src port_no} of the links leaving dpid.
+
+        If there are parallel links, one of them is chosen.
+        """
+        return dict((link.dst.dpid, port_no)
+                    for port_no, link in self._ports.get(dpid, {}).items())
+
+    def link_attrs(self, link):
+        return self._attrs[link]
+
+    def changes_since(self, version):
+        """Return the list of (version, op, obj) recorded after version.
+
+        None is returned if the change log no longer covers version, in
+        which case the caller has to rebuild its state from scratch.
+        """
+        if version >= self.version:
+            return []
+        if not self._changelog or version < self._changelog[0][0] - 1:
+            return None
+        # recent entries are at the right end of the deque
+        changelog = self._changelog
+        return [changelog[-i] for i in range(self.version - version, 0, -1)]
@@ -13,6 +13,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import heapq
 import logging
 import six
 import struct
@@ -20,6 +21,7 @@ import time
 from ryu import cfg
 
 from ryu.topology import event
+from ryu.topology import graph
 from ryu.base import app_manager
 from ryu.controller import ofp_event
 from ryu.controller.handler import set_ev_cls
@@ -242,12 +244,16 @@ class PortState(dict):
 
 
 class PortData(object):
-    def __init__(self, is_down, lldp_data):
+    def __init__(self, is_down, lldp_data, period):
         super(PortData, self).__init__()
         self.is_down = is_down
         self.lldp_data = lldp_data
         self.timestamp = None
         self.sent = 0
+        # current LLDP send period of this port
+        self.period = period
+        # heap entry of the next LLDP send
+        self.entry = None
 
     def lldp_sent(self):
         self.timestamp = time.time()
@@ -266,59 +272,73 @@ class PortData(object):
         self.is_down = is_down
 
     def __str__(self):
-        return 'PortData<live=%s, timestamp=%s, sent=%d>' \
-            % (not self.is_down, self.timestamp, self.sent)
+        return 'PortData<live=%s, timestamp=%s, sent=%d, period=%s>' \
+            % (not self.is_down, self.timestamp, self.sent, self.period)
 
 
 class PortDataState(dict):
     # dict: Port class -> PortData class
-    # slimed down version of OrderedDict as python 2.6 doesn't support it.
-    _PREV = 0
-    _NEXT = 1
-    _KEY = 2
-
-    def __init__(self):
+    #
+    # Ports are scheduled for LLDP in a heap ordered by the time of the
+    # next send, so that the ports to probe are found without walking
+    # all of them.  The send period of a port adapts to its stability:
+    # it starts at min_period, doubles on every send up to max_period
+    # while nothing changes, and falls back to min_period when the port
+    # changes or when an LLDP on a discovered link goes unanswered.
+    # Heap entries are [deadline, seq, port]; an entry is stale once its
+    # port has been rescheduled or deleted.
+
+    def __init__(self, min_period=.9, max_period=.9, max_drop=5):
         super(PortDataState, self).__init__()
-        self._root = root = []  # sentinel node
-        root[:] = [root, root, None]  # [_PREV, _NEXT, _KEY] doubly linked list
-        self._map = {}
-
-    def _remove_key(self, key):
-        link_prev, link_next, key = self._map.pop(key)
-        link_prev[self._NEXT] = link_next
-        link_next[self._PREV] = link_prev
-
-    def _append_key(self, key):
-        root = self._root
-        last = root[self._PREV]
-        last[self._NEXT] = root[self._PREV] = self._map[key] = [last, root,
-                                                                key]
-
-    def _prepend_key(self, key):
-        root = self._root
-        first = root[self._NEXT]
-        first[self._PREV] = root[self._NEXT] = self._map[key] = [root, first,
-                                                                 key]
-
-    def _move_last_key(self, key):
-        self._remove_key(key)
-        self._append_key(key)
-
-    def _move_front_key(self, key):
-        self._remove_key(key)
-        self._prepend_key(key)
+        self.min_period = min_period
+        self.max_period = max(max_period, min_period)
+        self.max_drop = max_drop
+        self._heap = []
+        self._seq = 0
+
+    def _schedule(self, port_data, port, deadline):
+        self._seq += 1
+        port_data.entry = entry = [deadline, self._seq, port]
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self) + 64:
+            self._compact()
+
+    def _compact(self):
+        self._heap = [port_data.entry for port_data in self.values()
+                      if port_data.entry is not None]
+        heapq.heapify(self._heap)
+
+    def _is_stale(self, entry):
+        port_data = self.get(entry[2], None)
+        return port_data is None or port_data.entry is not entry
 
     def add_port(self, port, lldp_data):
         if port not in self:
-            self._prepend_key(port)
-            self[port] = PortData(port.is_down(), lldp_data)
+            port_data = PortData(port.is_down(), lldp_data, self.min_period)
+            self[port] = port_data
+            self._schedule(port_data, port, 0)
         else:
-            self[port].is_down = port.is_down()
+            port_data = self[port]
+            was_down = port_data.is_down
+            port_data.set_down(port.is_down())
+            if was_down and not port_data.is_down:
+                # the port is not in the heap while down: probe it fast
+                port_data.clear_timestamp()
+                self._schedule(port_data, port, 0)
 
     def lldp_sent(self, port):
         port_data = self[port]
+        port_data.entry = None
+        if port_data.timestamp is None or \
+                0 < port_data.sent <= self.max_drop:
+            # new or changed port, or the link may be down: probe fast
+            port_data.period = self.min_period
+        else:
+            port_data.period = min(port_data.period * 2, self.max_period)
         port_data.lldp_sent()
-        self._move_last_key(port)
+        if not port_data.is_down:
+            self._schedule(port_data, port,
+                           port_data.timestamp + port_data.period)
         return port_data
 
     def lldp_received(self, port):
@@ -328,7 +348,7 @@ class PortDataState(dict):
         port_data = self.get(port, None)
         if port_data is not None:
             port_data.clear_timestamp()
-            self._move_front_key(port)
+            self._schedule(port_data, port, 0)
 
     def set_down(self, port):
         is_down = port.is_down()
@@ -336,7 +356,7 @@ class PortDataState(dict):
         port_data.set_down(is_down)
         port_data.clear_timestamp()
         if not is_down:
-            self._move_front_key(port)
+            self._schedule(port_data, port, 0)
         return is_down
 
     def get_port(self, port):
@@ -344,32 +364,35 @@ class PortDataState(dict):
 
     def del_port(self, port):
         del self[port]
-        self._remove_key(port)
 
-    def __iter__(self):
-        root = self._root
-        curr = root[self._NEXT]
-        while curr is not root:
-            yield curr[self._KEY]
-            curr = curr[self._NEXT]
+    def next_deadline(self):
+        """Return the time of the next LLDP send, or None."""
+        heap = self._heap
+        while heap and self._is_stale(heap[0]):
+            heapq.heappop(heap)
+        if heap:
+            return heap[0][0]
+        return None
+
+    def pop_expired(self, now, limit):
+        """Remove and return at most limit ports whose LLDP is due.
+
+        The caller is expected to call lldp_sent() for each of them,
+        which schedules the next send.
+        """
+        heap = self._heap
+        ports = []
+        while heap and len(ports) < limit and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if not self._is_stale(entry):
+                self[entry[2]].entry = None
+                ports.append(entry[2])
+        return ports
 
     def clear(self):
-        for node in self._map.values():
-            del node[:]
-        root = self._root
-        root[:] = [root, root, None]
-        self._map.clear()
+        del self._heap[:]
         dict.clear(self)
 
-    def items(self):
-        'od.items() -> list of (key, value) pairs in od'
-        return [(key, self[key]) for key in self]
-
-    def iteritems(self):
-        'od.iteritems -> an iterator over the (key, value) pairs in od'
-        for k in self:
-            yield (k, self[k])
-
 
 class LinkState(dict):
     # dict: Link class -> timestamp
@@ -425,11 +448,27 @@ class LLDPPacket(object):
     PORT_ID_STR = '!I'      # uint32_t
     PORT_ID_SIZE = 4
 
+    # The frames made by lldp_packet() differ only in the source MAC,
+    # the dpid, the port number and the TTL, which are patched at fixed
+    # offsets into a copy of the template frame.
+    #   ethernet header, chassis id TLV header, subtype and prefix,
+    #   dpid (%016x), port id TLV header and subtype, port number,
+    #   TTL TLV header, TTL, end TLV
+    _ETH_SRC_OFFSET = 6
+    _DPID_OFFSET = 14 + lldp.LLDP_TLV_SIZE + 1 + CHASSIS_ID_PREFIX_LEN
+    _DPID_LEN = 16
+    _PORT_ID_OFFSET = _DPID_OFFSET + _DPID_LEN + lldp.LLDP_TLV_SIZE + 1
+    _TTL_OFFSET = _PORT_ID_OFFSET + PORT_ID_SIZE + lldp.LLDP_TLV_SIZE
+    _FRAME = struct.Struct('!12xH8s16s3sI2sH2s')
+    _ETH_TYPE = struct.Struct('!H')
+    _template = None
+    _headers = None
+
     class LLDPUnknownFormat(RyuException):
         message = '%(msg)s'
 
     @staticmethod
-    def lldp_packet(dpid, port_no, dl_addr, ttl):
+    def _lldp_packet(dpid, port_no, dl_addr, ttl):
         pkt = packet.Packet()
 
         dst = lldp.LLDP_MAC_NEAREST_BRIDGE
@@ -458,8 +497,59 @@ class LLDPPacket(object):
         pkt.serialize()
         return pkt.data
 
+    @classmethod
+    def _get_template(cls):
+        if cls._template is None:
+            template = cls._lldp_packet(0, 0, DONTCARE_STR, 0)
+            # the fixed fields of _FRAME but the dpid, port number and TTL
+            (_, chassis_id, _, port_id, _, ttl,
+             _, end) = cls._FRAME.unpack_from(template)
+            cls._headers = (chassis_id, port_id, ttl, end)
+            cls._template = template
+        return cls._template
+
+    @staticmethod
+    def lldp_packet(dpid, port_no, dl_addr, ttl):
+        dpid_str = dpid_to_str(dpid)
+        if len(dpid_str) != LLDPPacket._DPID_LEN:
+            # out of the range of 64 bits
+            return LLDPPacket._lldp_packet(dpid, port_no, dl_addr, ttl)
+
+        data = bytearray(LLDPPacket._get_template())
+        offset = LLDPPacket._ETH_SRC_OFFSET
+        data[offset:offset + 6] = addrconv.mac.text_to_bin(dl_addr)
+        offset = LLDPPacket._DPID_OFFSET
+        data[offset:offset + LLDPPacket._DPID_LEN] = dpid_str.encode('ascii')
+        offset = LLDPPacket._PORT_ID_OFFSET
+        data[offset:offset + LLDPPacket.PORT_ID_SIZE] = struct.pack(
+            LLDPPacket.PORT_ID_STR, port_no)
+        offset = LLDPPacket._TTL_OFFSET
+        data[offset:offset + 2] = struct.pack('!H', ttl)
+        return data
+
     @staticmethod
     def lldp_parse(data):
+        if len(data) >= ethernet.ethernet._MIN_LEN:
+            (ethertype, ) = LLDPPacket._ETH_TYPE.unpack_from(data, 12)
+            if ethertype != ETH_TYPE_LLDP:
+                # the most of the packet-ins
+                raise LLDPPacket.LLDPUnknownFormat()
+
+        # the frames made by lldp_packet() at the fixed offsets
+        if len(data) >= LLDPPacket._FRAME.size:
+            LLDPPacket._get_template()
+            (_, chassis_id, dpid, port_id, src_port_no, ttl,
+             _, end) = LLDPPacket._FRAME.unpack_from(data)
+            if (chassis_id, port_id, ttl, end) == LLDPPacket._headers:
+                try:
+                    return int(dpid.decode('ascii'), 16), src_port_no
+                except ValueError:
+                    pass
+
+        return LLDPPacket._lldp_parse(data)
+
+    @staticmethod
+    def _lldp_parse(data):
         pkt = packet.Packet(data)
         i = iter(pkt)
         eth_pkt = six.next(i)
@@ -500,16 +590,23 @@ class Switches(app_manager.RyuApp):
                event.EventPortAdd, event.EventPortDelete,
                event.EventPortModify,
                event.EventLinkAdd, event.EventLinkDelete,
-               event.EventHostAdd]
+               event.EventHostAdd, event.EventHostDelete,
+               event.EventHostMove]
 
     DEFAULT_TTL = 120  # unused. ignored.
     LLDP_PACKET_LEN = len(LLDPPacket.lldp_packet(0, 0, DONTCARE_STR, 0))
 
-    LLDP_SEND_GUARD = .05
+    # LLDP send period of new, changed and suspected ports
     LLDP_SEND_PERIOD_PER_PORT = .9
+    # budget of LLDP packet-outs per second over all the ports
+    LLDP_SEND_RATE = 1000.
+    LLDP_SEND_BURST = 100
     TIMEOUT_CHECK_PERIOD = 5.
     LINK_TIMEOUT = TIMEOUT_CHECK_PERIOD * 2
     LINK_LLDP_DROP = 5
+    # upper bound of the time to detect a link down without port status.
+    # The LLDP send period of stable ports backs off as far as this allows.
+    LINK_DETECT_TIME = 60.
 
     def __init__(self, *args, **kwargs):
         super(Switches, self).__init__(*args, **kwargs)
@@ -517,9 +614,13 @@ class Switches(app_manager.RyuApp):
         self.name = 'switches'
         self.dps = {}                 # datapath_id => Datapath class
         self.port_state = {}          # datapath_id => ports
-        self.ports = PortDataState()  # Port class -> PortData class
+        # Port class -> PortData class
+        self.ports = PortDataState(self.LLDP_SEND_PERIOD_PER_PORT,
+                                   self._lldp_send_period_max(),
+                                   self.LINK_LLDP_DROP)
         self.links = LinkState()      # Link class -> timestamp
         self.hosts = HostState()      # mac address -> Host class list
+        self.graph = graph.TopologyGraph()
         self.is_active = True
 
         self.link_discovery = self.CONF.observe_links
@@ -531,6 +632,16 @@ class Switches(app_manager.RyuApp):
             self.threads.append(hub.spawn(self.lldp_loop))
             self.threads.append(hub.spawn(self.link_loop))
 
+    def _lldp_send_period_max(self):
+        # Worst case, a link goes down just after answering an LLDP. The
+        # next backed-off LLDP is the first one lost, the one after that
+        # is lost too and switches the port to fast probing, and then
+        # LINK_LLDP_DROP more fast ones are lost before link_loop deletes
+        # the link.
+        fast = (self.LINK_LLDP_DROP * self.LLDP_SEND_PERIOD_PER_PORT +
+                self.TIMEOUT_CHECK_PERIOD)
+        return (self.LINK_DETECT_TIME - fast) / 2
+
     def close(self):
         self.is_active = False
         if self.link_discovery:
@@ -542,6 +653,7 @@ class Switches(app_manager.RyuApp):
         assert dp.id is not None
 
         self.dps[dp.id] = dp
+        self.graph.add_switch(dp.id)
         if dp.id not in self.port_state:
             self.port_state[dp.id] = PortState()
             for port in dp.ports.values():
@@ -552,6 +664,7 @@ class Switches(app_manager.RyuApp):
             if (self.dps[dp.id] == dp):
                 del self.dps[dp.id]
                 del self.port_state[dp.id]
+                self.graph.del_switch(dp.id)
 
     def _get_switch(self, dpid):
         if dpid in self.dps:
@@ -582,9 +695,11 @@ class Switches(app_manager.RyuApp):
             #           port, self.links.get_peer(port))
             return
         link = Link(port, dst)
+        self.graph.del_link(link)
         self.send_event_to_observers(event.EventLinkDelete(link))
         if rev_link_dst:
             rev_link = Link(dst, rev_link_dst)
+            self.graph.del_link(rev_link)
             self.send_event_to_observers(event.EventLinkDelete(rev_link))
         self.ports.move_front(dst)
 
@@ -810,20 +925,23 @@ class Switches(app_manager.RyuApp):
         if old_peer and old_peer != dst:
             old_link = Link(src, old_peer)
             del self.links[old_link]
+            self.graph.del_link(old_link)
             self.send_event_to_observers(event.EventLinkDelete(old_link))
 
         link = Link(src, dst)
         if link not in self.links:
+            self.graph.add_link(link)
             self.send_event_to_observers(event.EventLinkAdd(link))
 
             # remove hosts if it's not attached to edge port
             host_to_del = []
             for host in self.hosts.values():
                 if not self._is_edge_port(host.port):
-                    host_to_del.append(host.mac)
+                    host_to_del.append(host)
 
-            for host_mac in host_to_del:
-                del self.hosts[host_mac]
+            for host in host_to_del:
+                del self.hosts[host.mac]
+                self.send_event_to_observers(event.EventHostDelete(host))
 
         if not self.links.update_link(src, dst):
             # reverse link is not detected yet.
@@ -921,34 +1039,27 @@ class Switches(app_manager.RyuApp):
                       dp.ofproto.OFP_VERSION)
 
     def lldp_loop(self):
+        tokens = self.LLDP_SEND_BURST
+        last = time.time()
         while self.is_active:
             self.lldp_event.clear()
 
             now = time.time()
-            timeout = None
-            ports_now = []
-            ports = []
-            for (key, data) in self.ports.items():
-                if data.timestamp is None:
-                    ports_now.append(key)
-                    continue
-
-                expire = data.timestamp + self.LLDP_SEND_PERIOD_PER_PORT
-                if expire <= now:
-                    ports.append(key)
-                    continue
-
-                timeout = expire - now
-                break
-
-            for port in ports_now:
-                self.send_lldp_packet(port)
-            for port in ports:
+            tokens = min(tokens + (now - last) * self.LLDP_SEND_RATE,
+                         self.LLDP_SEND_BURST)
+            last = now
+            for port in self.ports.pop_expired(now, int(tokens)):
                 self.send_lldp_packet(port)
-                hub.sleep(self.LLDP_SEND_GUARD)      # don't burst
-
-            if timeout is not None and ports:
-                timeout = 0     # We have already slept
+                tokens -= 1
+
+            deadline = self.ports.next_deadline()
+            if deadline is None:
+                timeout = None
+            elif deadline <= now:
+                # over budget, wait for the next token
+                timeout = max(1 - tokens, 0) / self.LLDP_SEND_RATE
+            else:
+                timeout = deadline - now
             # LOG.debug('lldp sleep %s', timeout)
             self.lldp_event.wait(timeout=timeout)
 
@@ -970,6 +1081,7 @@ class Switches(app_manager.RyuApp):
 
             for link in deleted:
                 self.links.link_down(link)
+                self.graph.del_link(link)
                 # LOG.debug('delete %s', link)
                 self.send_event_to_observers(event.EventLinkDelete(link))
 
@@ -1010,7 +1122,7 @@ class Switches(app_manager.RyuApp):
         if dpid is None:
             links = self.links
         else:
-            links = [link for link in self.links if link.src.dpid == dpid]
+            links = self.graph.links(dpid)
         rep = event.EventLinkReply(req.src, dpid, links)
         self.reply_to_request(req, rep)
 
@@ -2,7 +2,60 @@
 
 import unittest
 
-from mindelaypath import MinDelayPathController
+from mindelaypath import MinDelayPathController, HostTable
+from ryu.ofproto import ofproto_v1_3, ofproto_v1_3_parser
+from ryu.topology import graph
+from ryu.topology.switches import Host, HostState, Link
+
+
+class _Port(object):
+    def __init__(self, dpid, port_no):
+        self.dpid = dpid
+        self.port_no = port_no
+
+
+class _Switches(object):
+    def __init__(self, topology=None):
+        self.hosts = HostState()
+        self.graph = topology if topology is not None else graph.TopologyGraph()
+
+
+def _topology(switch_link, ignore_ports=False):
+    """
+    由 {s1: {s2: s1's-port-to-s2}, } 构造拓扑图。
+    ignore_ports 为 True 时忽略给出的端口，以对端交换机的 dpid 作为端口号。
+    """
+    topology = graph.TopologyGraph()
+    for s1 in switch_link:
+        for s2, port_no in switch_link[s1].items():
+            if ignore_ports:
+                src, dst = s2, s1
+            else:
+                src, dst = port_no, switch_link[s2][s1]
+            topology.add_link(Link(_Port(s1, src), _Port(s2, dst)))
+    return topology
+
+
+def _delay_topology(delay_dict):
+    """
+    由 {s1: {s2: s1-to-s2's delay}, } 构造拓扑图，并记录链路的 delay 属性。
+    """
+    topology = _topology(delay_dict, ignore_ports=True)
+    for s1 in delay_dict:
+        for s2, delay in delay_dict[s1].items():
+            topology.set_link_attrs(topology.get_link(s1, s2), delay=delay)
+    return topology
+
+
+class _Datapath(object):
+    def __init__(self, dpid):
+        self.id = dpid
+        self.ofproto = ofproto_v1_3
+        self.ofproto_parser = ofproto_v1_3_parser
+        self.msgs = []
+
+    def send_msg(self, msg):
+        self.msgs.append(msg)
 
 
 class TestMinDelayPathController(unittest.TestCase):
@@ -70,7 +123,7 @@ class TestMinDelayPathController(unittest.TestCase):
 
         ctr = MinDelayPathController()
         for case in test_cases_list:
-            ctr.switch_link_dict = case["input"]
+            ctr.switches_module = _Switches(_topology(case["input"], ignore_ports=True))
             actual_lst = ctr.get_paths(case["src"], case["dst"])
             expect_list = case["expect"]
             self.assertListEqual(sorted(actual_lst), sorted(expect_list))
@@ -119,7 +172,7 @@ class TestMinDelayPathController(unittest.TestCase):
         ]
 
         ctr = MinDelayPathController()
-        ctr.link_delay_dict = test_delay_dict
+        ctr.switches_module = _Switches(_delay_topology(test_delay_dict))
 
         for case in test_cases_list:
             actcual = ctr.get_link_delay(case["s1"], case["s2"])
@@ -166,7 +219,7 @@ class TestMinDelayPathController(unittest.TestCase):
         ]
 
         ctr = MinDelayPathController()
-        ctr.link_delay_dict = test_delay_dict
+        ctr.switches_module = _Switches(_delay_topology(test_delay_dict))
 
         for case in test_cases_list:
             actual = ctr.get_path_delay(case["path"])
@@ -231,10 +284,208 @@ class TestMinDelayPathController(unittest.TestCase):
 
         ctr = MinDelayPathController()
         for case in test_cases_list:
-            ctr.switch_link_dict = case["switch_link"]
+            ctr.switches_module = _Switches(_topology(case["switch_link"]))
             actual = ctr.add_ports_to_paths(case["paths"], case["first_port"], case["last_port"])
             self.assertListEqual(actual, case["expect"])
 
+    def test_calculate_delay(self):
+        ctr = MinDelayPathController()
+        ctr.switches_module = _Switches(_topology({1: {2: 0, 3: 0}, 2: {1: 0}, 3: {1: 0}}, ignore_ports=True))
+        ctr.lldp_delay_dict = {1: {2: 0.05, 3: 0.05}, 2: {1: 0.03}}
+        ctr.echo_delay_dict = {1: 0.02, 2: 0.01, 3: 0.01}
+
+        ctr.calculate_delay()
+        version = ctr.topology.version
+
+        topology = ctr.topology
+        self.assertAlmostEqual(topology.link_attrs(topology.get_link(1, 2))["delay"], 0.025)
+        self.assertAlmostEqual(topology.link_attrs(topology.get_link(2, 1))["delay"], 0.025)
+        # 缺少 3 -> 1 的 lldp 延迟
+        self.assertEqual(topology.link_attrs(topology.get_link(1, 3))["delay"], float("inf"))
+        self.assertAlmostEqual(ctr.get_link_delay(1, 2), 0.025)
+
+        # 延迟未变化时不更新拓扑图
+        ctr.calculate_delay()
+        self.assertEqual(ctr.topology.version, version)
+
+
+class TestHostTable(unittest.TestCase):
+    def test_learn_and_move(self):
+        table = HostTable(capacity=10, idle_timeout=100)
+        self.assertIsNone(table.learn("00:00:00:00:00:01", 1, 1, now=0))
+        self.assertIsNone(table.learn("00:00:00:00:00:01", 1, 1, now=1))
+        self.assertEqual(table.get_location("00:00:00:00:00:01"), (1, 1))
+
+        # 主机迁移到交换机 2 的端口 3 上
+        self.assertEqual(table.learn("00:00:00:00:00:01", 2, 3, now=2), (1, 1))
+        self.assertEqual(table.get_location("00:00:00:00:00:01"), (2, 3))
+        self.assertIsNone(table.get_location("00:00:00:00:00:02"))
+
+    def test_update_ip(self):
+        table = HostTable(capacity=10, idle_timeout=100)
+        table.learn("00:00:00:00:00:01", 1, 1, now=0)
+        table.learn("00:00:00:00:00:02", 1, 2, now=0)
+
+        table.update_ip("00:00:00:00:00:01", "10.0.0.1")
+        self.assertEqual(table.get_mac_by_ip("10.0.0.1"), "00:00:00:00:00:01")
+
+        # IP 被另一台主机使用
+        table.update_ip("00:00:00:00:00:02", "10.0.0.1")
+        self.assertEqual(table.get_mac_by_ip("10.0.0.1"), "00:00:00:00:00:02")
+        self.assertIsNone(table.get("00:00:00:00:00:01").ip)
+
+        # 主机更换 IP
+        table.update_ip("00:00:00:00:00:02", "10.0.0.2")
+        self.assertIsNone(table.get_mac_by_ip("10.0.0.1"))
+        self.assertEqual(table.get_mac_by_ip("10.0.0.2"), "00:00:00:00:00:02")
+
+        # 未知主机
+        table.update_ip("00:00:00:00:00:03", "10.0.0.3")
+        self.assertIsNone(table.get_mac_by_ip("10.0.0.3"))
+
+    def test_capacity(self):
+        table = HostTable(capacity=2, idle_timeout=100)
+        table.learn("00:00:00:00:00:01", 1, 1, now=0)
+        table.update_ip("00:00:00:00:00:01", "10.0.0.1")
+        table.learn("00:00:00:00:00:02", 1, 2, now=1)
+        # 刷新主机 1，主机 2 成为最久未出现的主机
+        table.learn("00:00:00:00:00:01", 1, 1, now=2)
+        table.learn("00:00:00:00:00:03", 1, 3, now=3)
+
+        self.assertEqual(len(table), 2)
+        self.assertIn("00:00:00:00:00:01", table)
+        self.assertNotIn("00:00:00:00:00:02", table)
+        self.assertIn("00:00:00:00:00:03", table)
+        self.assertEqual(table.get_mac_by_ip("10.0.0.1"), "00:00:00:00:00:01")
+
+    def test_expire(self):
+        table = HostTable(capacity=10, idle_timeout=10)
+        table.learn("00:00:00:00:00:01", 1, 1, now=0)
+        table.update_ip("00:00:00:00:00:01", "10.0.0.1")
+        table.learn("00:00:00:00:00:02", 1, 2, now=5)
+
+        self.assertListEqual(table.expire(now=9), [])
+        self.assertListEqual(table.expire(now=10), ["00:00:00:00:00:01"])
+        self.assertIsNone(table.get_mac_by_ip("10.0.0.1"))
+        self.assertListEqual(table.expire(now=20), ["00:00:00:00:00:02"])
+        self.assertEqual(len(table), 0)
+
+    def test_remove(self):
+        table = HostTable(capacity=10, idle_timeout=10)
+        table.learn("00:00:00:00:00:01", 1, 1, now=0)
+        table.update_ip("00:00:00:00:00:01", "10.0.0.1")
+
+        self.assertEqual(table.remove("00:00:00:00:00:01").port_no, 1)
+        self.assertIsNone(table.remove("00:00:00:00:00:01"))
+        self.assertIsNone(table.get_mac_by_ip("10.0.0.1"))
+        self.assertEqual(len(table), 0)
+
+
+class TestHostSync(unittest.TestCase):
+    MAC1 = "00:00:00:00:00:01"
+    MAC2 = "00:00:00:00:00:02"
+
+    def setUp(self):
+        self.ctr = MinDelayPathController()
+        # 交换机 1 的端口 2 连接交换机 2 的端口 1
+        self.ctr.switches_module = _Switches(_topology({1: {2: 2}, 2: {1: 1}}))
+        self.ctr.port_up_timestamp = 0
+        for link in self.ctr.topology.links():
+            self.ctr.topology.set_link_attrs(link, delay=1)
+        self.ctr.datapath_dict = {1: _Datapath(1), 2: _Datapath(2)}
+        self.now = MinDelayPathController.LINK_DISCOVERY_SETTLE_TIME
+
+    def _switches_learn(self, mac, dpid, port_no):
+        self.ctr.switches_module.hosts[mac] = Host(mac, _Port(dpid, port_no))
+
+    def _flow_mods(self, dpid):
+        msgs = self.ctr.datapath_dict[dpid].msgs
+        self.ctr.datapath_dict[dpid].msgs = []
+        return msgs
+
+    def test_sync_host(self):
+        # 主机位置以 Switches 为准，Switches 不知道的主机不记录
+        self.ctr.sync_host(self.MAC1, now=self.now)
+        self.assertNotIn(self.MAC1, self.ctr.host_table)
+
+        self._switches_learn(self.MAC1, 1, 1)
+        self.ctr.sync_host(self.MAC1, now=self.now)
+        self.assertEqual(self.ctr.host_table.get_location(self.MAC1), (1, 1))
+
+        # 链路端口上的主机不记录
+        self._switches_learn(self.MAC2, 1, 2)
+        self.ctr.sync_host(self.MAC2, now=self.now)
+        self.assertNotIn(self.MAC2, self.ctr.host_table)
+
+    def test_link_discovery_settle(self):
+        # 链路发现完成之前，尚未发现的链路端口上看到的主机不算迁移
+        self.ctr.port_up_timestamp = self.now
+        self.ctr.host_table.learn(self.MAC1, 1, 1, now=0)
+        self._switches_learn(self.MAC1, 2, 3)
+        self.ctr.sync_host(self.MAC1, now=self.now + 1)
+        self.assertEqual(self.ctr.host_table.get_location(self.MAC1), (1, 1))
+
+        settled = self.now + MinDelayPathController.LINK_DISCOVERY_SETTLE_TIME
+        self.assertFalse(self.ctr.is_edge_port(2, 3, now=settled - 1))
+        self.assertTrue(self.ctr.is_edge_port(2, 3, now=settled))
+        self.assertFalse(self.ctr.is_edge_port(1, 2, now=settled))
+
+    def test_host_moved(self):
+        self._switches_learn(self.MAC1, 1, 1)
+        self._switches_learn(self.MAC2, 2, 2)
+        self.ctr.sync_host(self.MAC1, now=self.now)
+        self.ctr.sync_host(self.MAC2, now=self.now)
+
+        self.assertEqual(self.ctr.install_host_paths(self.MAC1, self.MAC2,
+                                                     "10.0.0.1", "10.0.0.2"), 2)
+        self.assertIn((self.MAC1, self.MAC2), self.ctr.host_pairs_dict)
+        self.assertEqual(len(self._flow_mods(1)), 4)
+        self.assertEqual(len(self._flow_mods(2)), 4)
+        self.ctr.host_table.update_ip(self.MAC2, "10.0.0.2")
+
+        # 主机 2 迁移到交换机 1 的端口 3 上
+        self._switches_learn(self.MAC2, 1, 3)
+        self.ctr.sync_host(self.MAC2, now=self.now)
+        self.assertEqual(self.ctr.host_table.get_location(self.MAC2), (1, 3))
+
+        # 删除各交换机上发往主机 2 的流表项，并只在交换机 1 上重新安装双向路径
+        ofp = ofproto_v1_3
+        for dpid, adds in ((1, 4), (2, 0)):
+            msgs = self._flow_mods(dpid)
+            deletes = [msg for msg in msgs if msg.command == ofp.OFPFC_DELETE]
+            self.assertEqual([dict(msg.match.items()) for msg in deletes],
+                             [{"eth_type": 0x0800, "ipv4_dst": "10.0.0.2"},
+                              {"eth_type": 0x0806, "arp_tpa": "10.0.0.2"}])
+            self.assertEqual(len(msgs) - len(deletes), adds)
+        self.assertIn((self.MAC1, self.MAC2), self.ctr.host_pairs_dict)
+
+    def test_host_moved_expired_pair(self):
+        self._switches_learn(self.MAC1, 1, 1)
+        self._switches_learn(self.MAC2, 2, 2)
+        self.ctr.sync_host(self.MAC1, now=self.now)
+        self.ctr.sync_host(self.MAC2, now=self.now)
+        # 路径的流表项已经超时的主机对，迁移时不重新安装
+        self.ctr.host_pairs_dict[(self.MAC1, self.MAC2)] = ("10.0.0.1", "10.0.0.2", 0)
+
+        self._switches_learn(self.MAC2, 1, 3)
+        self.ctr.sync_host(self.MAC2)
+        self.assertNotIn((self.MAC1, self.MAC2), self.ctr.host_pairs_dict)
+        self.assertEqual(self._flow_mods(1), [])
+
+    def test_expire_hosts(self):
+        self._switches_learn(self.MAC1, 1, 1)
+        self.ctr.sync_host(self.MAC1, now=0)
+        self.ctr.host_table.idle_timeout = 0
+        self.ctr.host_pairs_dict[(self.MAC1, self.MAC2)] = ("10.0.0.1", "10.0.0.2", 0)
+
+        self.ctr.expire_hosts()
+        self.assertNotIn(self.MAC1, self.ctr.host_table)
+        self.assertEqual(self.ctr.host_pairs_dict, {})
+        # Switches 中的主机不受影响，再次出现时重新记录
+        self.assertIn(self.MAC1, self.ctr.switches_module.hosts)
+        self.ctr.sync_host(self.MAC1)
+        self.assertIn(self.MAC1, self.ctr.host_table)
+
 
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
\ No newline at end of file